@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Persistent activity-run cache
+Activity runs of a finished pipeline run never change, so they are kept permanently;
+runs still in progress are cached for a short TTL only
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from run_utils import is_terminal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_runs (
+    run_id        TEXT PRIMARY KEY,
+    parent_status TEXT,
+    terminal      INTEGER NOT NULL,
+    fetched_at    REAL NOT NULL,
+    payload       TEXT NOT NULL
+)
+"""
+
+
+class ActivityRunCache:
+    """SQLite-backed cache of activity runs keyed by pipeline runId"""
+
+    def __init__(self, path: str = ":memory:", in_progress_ttl: float = 60.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        path: SQLite database file (shared by every process that points at it)
+        in_progress_ttl: seconds to reuse activity runs of a pipeline run that is still moving
+        """
+        self.path = path
+        self.in_progress_ttl = in_progress_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        if path != ":memory:":
+            # Readers in other processes don't block the writer
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def get(self, run_id: str) -> Optional[List[Dict]]:
+        """Return cached activity runs for `run_id`, or None if missing or stale"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT terminal, fetched_at, payload FROM activity_runs WHERE run_id = ?",
+                (run_id,)).fetchone()
+        if row is None:
+            return None
+        terminal, fetched_at, payload = row
+        if not terminal and self.clock() - fetched_at > self.in_progress_ttl:
+            return None
+        return json.loads(payload)
+
+    def put(self, run_id: str, parent_status: Optional[str], activities: List[Dict]):
+        """Store activity runs; they are kept for good once the parent run is terminal"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO activity_runs (run_id, parent_status, terminal, fetched_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, parent_status, int(is_terminal(parent_status)), self.clock(),
+                 json.dumps(activities, separators=(",", ":"))))
+            self._conn.commit()
+
+    def get_or_fetch(self, pipeline_run: Dict, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Serve activity runs for `pipeline_run` from the cache, calling `fetch` on a miss"""
+        run_id = pipeline_run["runId"]
+        cached = self.get(run_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        activities = fetch()
+        self.put(run_id, pipeline_run.get("status"), activities)
+        return activities
+
+    def purge_stale(self) -> int:
+        """Drop expired in-progress entries; returns the number removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM activity_runs WHERE terminal = 0 AND fetched_at < ?",
+                (self.clock() - self.in_progress_ttl,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Asyncio client for the Azure Data Factory REST API
+Same operations as AzureDataFactoryClient, built for high fan-out monitoring
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from http_transport import RETRY_STATUS_CODES, retry_delay
+from rate_limit import EndpointRateLimiter
+from token_cache import TokenCache, default_credential
+
+SCOPE = "https://management.azure.com/.default"
+
+
+class AsyncDataFactoryClient:
+    """Asyncio client for Azure Data Factory REST API operations"""
+
+    def __init__(self, subscription_id: str, resource_group: str, factory_name: str,
+                 max_concurrency: int = 256, rate_limits: Optional[Dict[str, float]] = None,
+                 default_rate: float = 200.0, max_retries: int = 5,
+                 credential=None, token_cache: Optional[TokenCache] = None):
+        """
+        max_concurrency: requests allowed in flight at once
+        rate_limits: requests per second per endpoint, e.g. {"createRun": 5}
+        """
+        self.subscription_id = subscription_id
+        self.resource_group = resource_group
+        self.factory_name = factory_name
+        self.api_version = "2018-06-01"
+        self.base_url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.DataFactory/factories/{factory_name}"
+
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.rate_limiter = EndpointRateLimiter(rate_limits, default_rate)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.credential = credential or default_credential()
+        self.token_cache = token_cache or TokenCache(
+            self.credential, cache_path=os.getenv("AZURE_TOKEN_CACHE_FILE"))
+
+    async def __aenter__(self) -> "AsyncDataFactoryClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the running event loop
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _get_headers(self) -> Dict[str, str]:
+        """Get HTTP headers with authentication"""
+        if self.token_cache.has_valid_token(SCOPE):
+            token = self.token_cache.get_token(SCOPE)
+        else:
+            # Credential calls block; keep them off the event loop
+            token = await asyncio.to_thread(self.token_cache.get_token, SCOPE)
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+    async def _request(self, method: str, endpoint: str, url: str, body: Optional[Dict] = None) -> Any:
+        """Send a rate-limited request, retrying 429/503 responses"""
+        session = self._get_session()
+        bucket = self.rate_limiter.bucket(endpoint)
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                await bucket.acquire_async()
+                headers = await self._get_headers()
+                async with session.request(method, url, headers=headers, json=body) as response:
+                    if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                        delay = retry_delay(response.headers, attempt)
+                    else:
+                        response.raise_for_status()
+                        text = await response.text()
+                        return json.loads(text) if text else {}
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def get_pipeline(self, pipeline_name: str) -> Dict:
+        """Get pipeline definition"""
+        url = f"{self.base_url}/pipelines/{pipeline_name}?api-version={self.api_version}"
+        return await self._request("GET", "pipelines", url)
+
+    async def list_pipelines(self) -> List[Dict]:
+        """List all pipelines"""
+        url = f"{self.base_url}/pipelines?api-version={self.api_version}"
+        return (await self._request("GET", "pipelines", url)).get("value", [])
+
+    async def create_pipeline_run(self, pipeline_name: str, parameters: Optional[Dict] = None) -> str:
+        """Trigger a pipeline run"""
+        url = f"{self.base_url}/pipelines/{pipeline_name}/createRun?api-version={self.api_version}"
+        body = {"parameters": parameters} if parameters else {}
+        return (await self._request("POST", "createRun", url, body)).get("runId")
+
+    async def get_pipeline_run(self, run_id: str) -> Dict:
+        """Get pipeline run details"""
+        url = f"{self.base_url}/pipelineruns/{run_id}?api-version={self.api_version}"
+        return await self._request("GET", "pipelineruns", url)
+
+    async def _iter_query_pages(self, endpoint: str, url: str, body: Dict) -> AsyncIterator[List[Dict]]:
+        """Yield query result pages, following continuationToken until exhausted"""
+        continuation_token = None
+        while True:
+            page_body = dict(body, continuationToken=continuation_token) if continuation_token else body
+            payload = await self._request("POST", endpoint, url, page_body)
+            yield payload.get("value", [])
+            continuation_token = payload.get("continuationToken")
+            if not continuation_token:
+                return
+
+    def iter_pipeline_run_pages(self, start_time: datetime, end_time: datetime,
+                                filters: Optional[List[Dict]] = None) -> AsyncIterator[List[Dict]]:
+        """Yield pipeline runs in a time range, one page at a time"""
+        url = f"{self.base_url}/queryPipelineRuns?api-version={self.api_version}"
+        body = {
+            "lastUpdatedAfter": start_time.isoformat() + "Z",
+            "lastUpdatedBefore": end_time.isoformat() + "Z",
+            "filters": filters or []
+        }
+        return self._iter_query_pages("queryPipelineRuns", url, body)
+
+    async def query_pipeline_runs(self, start_time: datetime, end_time: datetime,
+                                  filters: Optional[List[Dict]] = None) -> List[Dict]:
+        """Query pipeline runs in a time range"""
+        return [run async for page in self.iter_pipeline_run_pages(start_time, end_time, filters)
+                for run in page]
+
+    def iter_activity_run_pages(self, run_id: str, start_time: datetime,
+                                end_time: datetime) -> AsyncIterator[List[Dict]]:
+        """Yield activity runs for a pipeline run, one page at a time"""
+        url = f"{self.base_url}/pipelineruns/{run_id}/queryActivityruns?api-version={self.api_version}"
+        body = {
+            "lastUpdatedAfter": start_time.isoformat() + "Z",
+            "lastUpdatedBefore": end_time.isoformat() + "Z"
+        }
+        return self._iter_query_pages("queryActivityruns", url, body)
+
+    async def query_activity_runs(self, run_id: str, start_time: datetime, end_time: datetime) -> List[Dict]:
+        """Query activity runs for a pipeline run"""
+        return [run async for page in self.iter_activity_run_pages(run_id, start_time, end_time)
+                for run in page]
+
+    async def cancel_pipeline_run(self, run_id: str) -> Dict:
+        """Cancel a running pipeline"""
+        url = f"{self.base_url}/pipelineruns/{run_id}/cancel?api-version={self.api_version}"
+        return await self._request("POST", "cancel", url)
+
+    async def get_linked_service(self, linked_service_name: str) -> Dict:
+        """Get linked service definition"""
+        url = f"{self.base_url}/linkedservices/{linked_service_name}?api-version={self.api_version}"
+        return await self._request("GET", "linkedservices", url)
+
+    async def get_dataset(self, dataset_name: str) -> Dict:
+        """Get dataset definition"""
+        url = f"{self.base_url}/datasets/{dataset_name}?api-version={self.api_version}"
+        return await self._request("GET", "datasets", url)
+
+    # Batch helpers
+    async def gather(self, calls: Iterable[Awaitable], return_exceptions: bool = False) -> List:
+        """Run many client calls concurrently; the semaphore bounds requests in flight"""
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def get_pipeline_runs(self, run_ids: Iterable[str], return_exceptions: bool = False) -> List:
+        """Get details for many pipeline runs at once, in the order given"""
+        return await self.gather((self.get_pipeline_run(run_id) for run_id in run_ids),
+                                 return_exceptions=return_exceptions)
+
+    async def query_activity_runs_for(self, run_ids: Iterable[str], start_time: datetime,
+                                      end_time: datetime, return_exceptions: bool = False) -> List:
+        """Query activity runs for many pipeline runs at once, in the order given"""
+        return await self.gather((self.query_activity_runs(run_id, start_time, end_time) for run_id in run_ids),
+                                 return_exceptions=return_exceptions)
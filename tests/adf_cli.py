@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for validation, listing, triggering, watching and run metrics
+Heavy imports (requests, azure.identity) and credentials are deferred until a subcommand needs the service
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import ExitStack
+
+# Kinds `list` accepts; notebooks only exist in Synapse
+LIST_KINDS = ("pipelines", "datasets", "linkedservices", "notebooks")
+
+
+def _print_json(payload):
+    print(json.dumps(payload, indent=2, default=str))
+
+
+def _parse_parameter(text: str):
+    """key=value, with the value read as JSON when it parses (numbers, booleans, objects)"""
+    key, separator, value = text.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+# Clients
+def _standin(args):
+    """Local stand-in with a week of run history, for trying the CLI without Azure"""
+    from standin_server import StandInConfig, StandInServer
+    server = args.resources.enter_context(StandInServer(StandInConfig(seed=0)))
+    server.state.seed_history(200)
+    return server
+
+
+def _adf_client(args):
+    if args.standin:
+        return _standin(args).adf_client()
+    subscription_id = os.getenv("AZURE_SUBSCRIPTION_ID")
+    factory_name = os.getenv("AZURE_DATA_FACTORY_NAME")
+    if not subscription_id or not factory_name:
+        raise SystemExit("Set AZURE_SUBSCRIPTION_ID, AZURE_RESOURCE_GROUP and AZURE_DATA_FACTORY_NAME "
+                         "(or pass --standin)")
+    from test_adf_api import AzureDataFactoryClient
+    return AzureDataFactoryClient(subscription_id, os.getenv("AZURE_RESOURCE_GROUP", ""), factory_name)
+
+
+def _synapse_client(args):
+    if args.standin:
+        return _standin(args).synapse_client()
+    workspace = os.getenv("SYNAPSE_WORKSPACE_NAME")
+    if not workspace:
+        raise SystemExit("Set SYNAPSE_WORKSPACE_NAME (or pass --standin)")
+    from test_synapse_api import SynapseWorkspaceClient
+    return SynapseWorkspaceClient(workspace)
+
+
+# Subcommands
+def cmd_validate(args) -> int:
+    from validation_engine import ValidationEngine
+    engine = ValidationEngine(args.root, max_workers=args.workers)
+    results = engine.validate(args.kind or None)
+    failed = [result for result in results.values() if not result.valid]
+    if args.json:
+        _print_json({relative: result._asdict() for relative, result in results.items()})
+    else:
+        for result in failed:
+            print(f"✗ {result.path}")
+            for issue in result.issues:
+                print(f"    {issue}")
+        print(f"{len(results) - len(failed)}/{len(results)} definitions valid "
+              f"({engine.stats['cached']} cached, {engine.stats['validated']} checked)")
+    return 1 if failed else 0
+
+
+def cmd_list(args) -> int:
+    if args.local:
+        from validation_engine import KIND_FOLDERS, REPO_ROOT
+        if args.kind not in KIND_FOLDERS:
+            raise SystemExit(f"No local folder for {args.kind}")
+        folder = os.path.join(args.root or REPO_ROOT, KIND_FOLDERS[args.kind])
+        names = sorted(entry.name[:-5] for entry in os.scandir(folder) if entry.name.endswith(".json"))
+    elif args.kind == "notebooks" or args.synapse:
+        client = _synapse_client(args)
+        method = {"pipelines": client.list_pipelines, "datasets": client.list_datasets,
+                  "linkedservices": client.list_linked_services, "notebooks": client.list_notebooks}[args.kind]
+        names = sorted(item["name"] for item in method())
+    else:
+        client = _adf_client(args)
+        if args.kind == "pipelines":
+            names = sorted(item["name"] for item in client.list_pipelines())
+        else:
+            raise SystemExit(f"The Data Factory client cannot list {args.kind}; use --local or --synapse")
+    if args.json:
+        _print_json(names)
+    else:
+        print("\n".join(names))
+    return 0
+
+
+def _watch(client, runs, timeout, interval) -> int:
+    """Read each run once, report the finished ones, then poll the rest in bulk until they finish"""
+    from run_utils import is_terminal
+    from run_watcher import RunWatcher
+
+    def report(run):
+        print(f"{run['runId']}  {run['pipelineName']}  {run['status']}")
+
+    watcher = RunWatcher(client, min_interval=interval, on_complete=report)
+    latest = {}
+    for run_id, pipeline_name in runs:
+        try:
+            run = client.get_pipeline_run(run_id)
+        except Exception as e:
+            if getattr(getattr(e, "response", None), "status_code", None) != 404:
+                raise
+            print(f"{run_id}  not found")
+            continue
+        if is_terminal(run.get("status")):
+            latest[run_id] = run
+            report(run)
+        else:
+            watcher.add(run_id, pipeline_name or run.get("pipelineName"),
+                        run_start=run.get("runStart"), last_updated=run.get("lastUpdated"))
+    if watcher.pending:
+        latest.update(watcher.wait(timeout=timeout))
+    statuses = {run_id: latest.get(run_id, {}).get("status") for run_id, _ in runs}
+    for run_id, status in statuses.items():
+        if run_id in latest and not is_terminal(status):
+            print(f"{run_id}  {status} after {timeout:g}s")
+    unfinished = [run_id for run_id, status in statuses.items() if not is_terminal(status)]
+    failed = [run_id for run_id, status in statuses.items() if status in ("Failed", "Cancelled")]
+    return 1 if failed or unfinished else 0
+
+
+def cmd_trigger(args) -> int:
+    client = _adf_client(args)
+    run_id = client.create_pipeline_run(args.pipeline, dict(args.parameter) or None)
+    print(run_id)
+    if args.wait:
+        return _watch(client, [(run_id, args.pipeline)], args.timeout, args.interval)
+    return 0
+
+
+def cmd_watch(args) -> int:
+    return _watch(_adf_client(args), [(run_id, None) for run_id in args.run_id], args.timeout, args.interval)
+
+
+def cmd_metrics(args) -> int:
+    from datetime import datetime, timedelta
+    client = _adf_client(args)
+    end_time = datetime.utcnow()
+    filters = [{"operand": "PipelineName", "operator": "In", "values": args.pipeline}] if args.pipeline else None
+    summary = client.pipeline_run_metrics(end_time - timedelta(days=args.days), end_time, filters).summary()
+    if args.json:
+        _print_json(summary)
+        return 0
+    print(f"{'pipeline':<32} {'runs':>6} {'failed':>6} {'success':>8} {'p50 min':>8} {'p95 min':>8}")
+    for name, stats in summary.items():
+        p50, p95 = ((stats[key] or 0) / 60000 for key in ("p50_duration_ms", "p95_duration_ms"))
+        rate = stats["success_rate"]
+        print(f"{name:<32} {stats['runs']:>6} {stats['failed']:>6} "
+              f"{(f'{rate:.1f}%' if rate is not None else '-'):>8} {p50:>8.2f} {p95:>8.2f}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="adf_cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--standin", action="store_true",
+                        help="run against the local stand-in instead of Azure")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="check pipeline, dataset and linked service definitions")
+    validate.add_argument("--kind", action="append", choices=("pipelines", "datasets", "linkedservices"))
+    validate.add_argument("--root", help="repository root (default: this repo)")
+    validate.add_argument("--workers", type=int)
+    validate.add_argument("--json", action="store_true")
+    validate.set_defaults(handler=cmd_validate)
+
+    listing = commands.add_parser("list", help="list definition names")
+    listing.add_argument("kind", choices=LIST_KINDS)
+    listing.add_argument("--local", action="store_true", help="list the repo's files instead of the service")
+    listing.add_argument("--synapse", action="store_true", help="list the Synapse workspace")
+    listing.add_argument("--root", help="repository root for --local")
+    listing.add_argument("--json", action="store_true")
+    listing.set_defaults(handler=cmd_list)
+
+    trigger = commands.add_parser("trigger", help="start a pipeline run and print its runId")
+    trigger.add_argument("pipeline")
+    trigger.add_argument("-p", "--parameter", action="append", type=_parse_parameter, default=[],
+                         metavar="KEY=VALUE")
+    trigger.add_argument("--wait", action="store_true", help="watch the run until it finishes")
+    trigger.set_defaults(handler=cmd_trigger)
+
+    watch = commands.add_parser("watch", help="wait for runs to finish; exit 1 if any failed")
+    watch.add_argument("run_id", nargs="+")
+    watch.set_defaults(handler=cmd_watch)
+    for command in (trigger, watch):
+        command.add_argument("--timeout", type=float, default=3600.0)
+        command.add_argument("--interval", type=float, default=5.0, help="shortest poll interval (s)")
+
+    metrics = commands.add_parser("metrics", help="run counts, success rate and duration percentiles")
+    metrics.add_argument("--days", type=float, default=7.0)
+    metrics.add_argument("--pipeline", action="append")
+    metrics.add_argument("--json", action="store_true")
+    metrics.set_defaults(handler=cmd_metrics)
+    return parser
+
+
+def main(argv=None) -> int:
+    """Parse arguments and run one subcommand; returns the exit code"""
+    args = build_parser().parse_args(argv)
+    with ExitStack() as args.resources:
+        return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+ADF expression evaluator
+Compiles expression strings (@concat(...), @{...} interpolation, @@ escapes) once into cached closures
+"""
+
+import json
+import re
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from run_utils import parse_timestamp
+
+Evaluator = Callable[["ExpressionContext"], Any]
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^']|'')*')
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<punct>\?\.|\?\[|[().,\[\]])
+)""", re.VERBOSE)
+
+
+class ExpressionContext:
+    """What pipeline(), item(), activity(), variables() and dataset() see during a run"""
+
+    def __init__(self, pipeline_name: Optional[str] = None, run_id: Optional[str] = None,
+                 parameters: Optional[Dict] = None, data_factory: str = "adf",
+                 activity_outputs: Optional[Dict[str, Any]] = None, variables: Optional[Dict] = None,
+                 item: Any = None, dataset_parameters: Optional[Dict] = None,
+                 linked_service_parameters: Optional[Dict] = None, trigger_time: Optional[datetime] = None,
+                 trigger_type: str = "Manual", group_id: Optional[str] = None,
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        activity_outputs: activity name -> its output, as returned by queryActivityruns
+        item: the current ForEach item (see with_item)
+        clock: returns the naive UTC time used by utcNow()
+        """
+        self.parameters = parameters or {}
+        self.activity_outputs = activity_outputs or {}
+        self.variables = variables or {}
+        self.item = item
+        self.dataset_parameters = dataset_parameters or {}
+        self.linked_service_parameters = linked_service_parameters or {}
+        self.clock = clock
+        run_id = run_id or str(uuid.uuid4())
+        self.pipeline_info = {
+            "DataFactory": data_factory,
+            "Pipeline": pipeline_name,
+            "RunId": run_id,
+            "TriggerType": trigger_type,
+            "TriggerId": None,
+            "TriggerName": None,
+            "TriggerTime": _format_datetime(trigger_time or clock(), "o"),
+            "GroupId": group_id or run_id,
+            "parameters": self.parameters,
+        }
+
+    def with_item(self, item: Any) -> "ExpressionContext":
+        """Shallow copy for one ForEach iteration"""
+        copy = object.__new__(ExpressionContext)
+        copy.__dict__.update(self.__dict__)
+        copy.item = item
+        return copy
+
+
+# .NET date formatting, as used by formatDateTime and friends
+_STANDARD_FORMATS = {
+    "o": "yyyy-MM-ddTHH:mm:ss.fffffffK", "O": "yyyy-MM-ddTHH:mm:ss.fffffffK",
+    "s": "yyyy-MM-ddTHH:mm:ss", "u": "yyyy-MM-dd HH:mm:ss'Z'",
+    "d": "MM/dd/yyyy", "D": "dddd, MMMM d, yyyy",
+    "t": "h:mm tt", "T": "h:mm:ss tt",
+    "g": "MM/dd/yyyy h:mm tt", "G": "MM/dd/yyyy h:mm:ss tt",
+    "R": "ddd, dd MMM yyyy HH':'mm':'ss 'GMT'", "r": "ddd, dd MMM yyyy HH':'mm':'ss 'GMT'",
+}
+
+_DATE_PARTS: Dict[str, Callable[[datetime], str]] = {
+    "yyyy": lambda d: f"{d.year:04d}", "yy": lambda d: f"{d.year % 100:02d}",
+    "MMMM": lambda d: d.strftime("%B"), "MMM": lambda d: d.strftime("%b"),
+    "MM": lambda d: f"{d.month:02d}", "M": lambda d: str(d.month),
+    "dddd": lambda d: d.strftime("%A"), "ddd": lambda d: d.strftime("%a"),
+    "dd": lambda d: f"{d.day:02d}", "d": lambda d: str(d.day),
+    "HH": lambda d: f"{d.hour:02d}", "H": lambda d: str(d.hour),
+    "hh": lambda d: f"{(d.hour % 12) or 12:02d}", "h": lambda d: str((d.hour % 12) or 12),
+    "mm": lambda d: f"{d.minute:02d}", "m": lambda d: str(d.minute),
+    "ss": lambda d: f"{d.second:02d}", "s": lambda d: str(d.second),
+    "tt": lambda d: "AM" if d.hour < 12 else "PM",
+    "K": lambda d: "Z", "zzz": lambda d: "+00:00",
+}
+_DATE_TOKEN = re.compile(r"'[^']*'|\"[^\"]*\"|\\.|f{1,7}|yyyy|yy|MMMM|MMM|MM|M|dddd|ddd|dd|d|HH|H|hh|h|mm|m|ss|s|tt|K|zzz|.",
+                         re.DOTALL)
+
+
+@lru_cache(maxsize=256)
+def _date_formatter(fmt: str) -> Callable[[datetime], str]:
+    """Translate a .NET format string once into a list of part renderers"""
+    fmt = _STANDARD_FORMATS.get(fmt, fmt)
+    parts: List[Any] = []
+    for token in _DATE_TOKEN.findall(fmt):
+        if token in _DATE_PARTS:
+            parts.append(_DATE_PARTS[token])
+        elif token[0] == "f":
+            digits = len(token)
+            parts.append(lambda d, digits=digits: f"{d.microsecond:06d}0"[:digits])
+        elif token[0] in "'\"" and len(token) > 1:
+            parts.append(token[1:-1])
+        elif token[0] == "\\" and len(token) > 1:
+            parts.append(token[1])
+        else:
+            parts.append(token)
+    return lambda d: "".join(part if isinstance(part, str) else part(d) for part in parts)
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a timestamp string, got {value!r}")
+    return parse_timestamp(value.replace(" ", "T", 1) if len(value) > 10 and value[10] == " " else value)
+
+
+def _format_datetime(value: Any, fmt: str = "o") -> str:
+    return _date_formatter(fmt)(_to_datetime(value))
+
+
+def _to_string(value: Any) -> str:
+    """How ADF turns a value into text for concat() and @{...}"""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _shift(unit: str) -> Callable:
+    def shift(timestamp: Any, amount: float, fmt: str = "o") -> str:
+        return _format_datetime(_to_datetime(timestamp) + timedelta(**{unit: amount}), fmt)
+    return shift
+
+
+def _substring(text: str, start: int, length: Optional[int] = None) -> str:
+    if start < 0 or start > len(text) or (length is not None and (length < 0 or start + length > len(text))):
+        raise ValueError(f"substring({text!r}, {start}, {length}) is out of range")
+    return text[start:] if length is None else text[start:start + length]
+
+
+def _div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return int(a / b)
+    return a / b
+
+
+# Pure functions: called with evaluated arguments, folded at compile time when all are literals
+FUNCTIONS: Dict[str, Callable] = {
+    "concat": lambda *parts: "".join(_to_string(part) for part in parts),
+    "formatdatetime": _format_datetime,
+    "adddays": _shift("days"),
+    "addhours": _shift("hours"),
+    "addminutes": _shift("minutes"),
+    "addseconds": _shift("seconds"),
+    "startofday": lambda timestamp, fmt="o": _format_datetime(
+        _to_datetime(timestamp).replace(hour=0, minute=0, second=0, microsecond=0), fmt),
+    "string": _to_string,
+    "int": int,
+    "float": float,
+    "bool": lambda value: value.lower() == "true" if isinstance(value, str) else bool(value),
+    "json": lambda value: json.loads(value) if isinstance(value, str) else value,
+    "tolower": lambda text: text.lower(),
+    "toupper": lambda text: text.upper(),
+    "trim": lambda text: text.strip(),
+    "replace": lambda text, old, new: text.replace(old, new),
+    "substring": _substring,
+    "indexof": lambda text, part: text.lower().find(part.lower()),
+    "lastindexof": lambda text, part: text.lower().rfind(part.lower()),
+    "split": lambda text, separator: text.split(separator),
+    "join": lambda items, separator: separator.join(_to_string(item) for item in items),
+    "length": len,
+    "empty": lambda value: value is None or len(value) == 0,
+    "coalesce": lambda *values: next((value for value in values if value is not None), None),
+    "equals": lambda a, b: a == b,
+    "not": lambda value: not value,
+    "and": lambda *values: all(values),
+    "or": lambda *values: any(values),
+    "if": lambda condition, then, otherwise: then if condition else otherwise,
+    "greater": lambda a, b: a > b,
+    "greaterorequals": lambda a, b: a >= b,
+    "less": lambda a, b: a < b,
+    "lessorequals": lambda a, b: a <= b,
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": _div,
+    "mod": lambda a, b: a % b,
+    "contains": lambda collection, value: value in collection,
+    "startswith": lambda text, prefix: text.lower().startswith(prefix.lower()),
+    "endswith": lambda text, suffix: text.lower().endswith(suffix.lower()),
+    "first": lambda collection: collection[0] if len(collection) else None,
+    "last": lambda collection: collection[-1] if len(collection) else None,
+    "createarray": lambda *values: list(values),
+}
+
+
+def _activity(context: ExpressionContext, name: str) -> Dict:
+    if name not in context.activity_outputs:
+        raise ValueError(f"activity('{name}') has not run in this context")
+    return {"output": context.activity_outputs[name]}
+
+
+def _item(context: ExpressionContext) -> Any:
+    if context.item is None:
+        raise ValueError("item() is only available inside a ForEach")
+    return context.item
+
+
+def _variables(context: ExpressionContext, name: str) -> Any:
+    if name not in context.variables:
+        raise ValueError(f"variables('{name}') is not set")
+    return context.variables[name]
+
+
+# Functions that read the context (or the clock) and are never folded
+CONTEXT_FUNCTIONS: Dict[str, Callable] = {
+    "pipeline": lambda context: context.pipeline_info,
+    "item": _item,
+    "activity": _activity,
+    "variables": _variables,
+    "dataset": lambda context: context.dataset_parameters,
+    "linkedservice": lambda context: context.linked_service_parameters,
+    "utcnow": lambda context, fmt="o": _format_datetime(context.clock(), fmt),
+    "guid": lambda context: str(uuid.uuid4()),
+}
+
+
+def _member(value: Any, name: Any, safe: bool) -> Any:
+    """obj.name / obj[index]; property names fall back to a case-insensitive match like ADF"""
+    if value is None:
+        if safe:
+            return None
+        raise ValueError(f"Cannot read '{name}' of null")
+    if isinstance(value, dict):
+        if name in value:
+            return value[name]
+        if isinstance(name, str):
+            lowered = name.lower()
+            for key, item in value.items():
+                if key.lower() == lowered:
+                    return item
+    elif isinstance(value, list) and isinstance(name, int):
+        if -len(value) <= name < len(value):
+            return value[name]
+    if safe:
+        return None
+    raise ValueError(f"Property '{name}' does not exist")
+
+
+# Compiled nodes are (evaluator, is_constant, constant value)
+_Node = Tuple[Optional[Evaluator], bool, Any]
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: List[Tuple[str, str]] = []
+        position = 0
+        while position < len(text):
+            if text[position:].strip() == "":
+                break
+            match = _TOKEN.match(text, position)
+            if match is None:
+                raise ValueError(f"Unexpected character {text[position:].strip()[0]!r} in expression '{text}'")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise ValueError(f"Unexpected end of expression '{self.text}'")
+        token = self.tokens[self.position]
+        if expected is not None and token[1] != expected:
+            raise ValueError(f"Expected '{expected}' but found '{token[1]}' in expression '{self.text}'")
+        self.position += 1
+        return token
+
+    def parse(self) -> _Node:
+        node = self.expression()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.peek()}' in expression '{self.text}'")
+        return node
+
+    def expression(self) -> _Node:
+        node = self.primary()
+        while self.peek() in (".", "?.", "[", "?["):
+            operator = self.take()[1]
+            safe = operator[0] == "?"
+            if operator.endswith("."):
+                kind, name = self.take()
+                if kind != "name":
+                    raise ValueError(f"Expected a property name after '{operator}' in expression '{self.text}'")
+                node = self.member(node, (None, True, name), safe)
+            else:
+                index = self.expression()
+                self.take("]")
+                node = self.member(node, index, safe)
+        return node
+
+    @staticmethod
+    def member(target: _Node, key: _Node, safe: bool) -> _Node:
+        evaluate, constant, value = target
+        if constant and key[1]:
+            return None, True, _member(value, key[2], safe)
+        get_target = evaluate if not constant else (lambda context: value)
+        if key[1]:
+            name = key[2]
+            return (lambda context: _member(get_target(context), name, safe)), False, None
+        get_key = key[0]
+        return (lambda context: _member(get_target(context), get_key(context), safe)), False, None
+
+    def primary(self) -> _Node:
+        kind, token = self.take()
+        if kind == "string":
+            return None, True, token[1:-1].replace("''", "'")
+        if kind == "number":
+            return None, True, float(token) if "." in token else int(token)
+        if kind == "name":
+            if self.peek() != "(":
+                literal = {"true": True, "false": False, "null": None}.get(token.lower(), ...)
+                if literal is ...:
+                    raise ValueError(f"Unknown identifier '{token}' in expression '{self.text}'")
+                return None, True, literal
+            self.take("(")
+            arguments = []
+            while self.peek() != ")":
+                arguments.append(self.expression())
+                if self.peek() != ")":
+                    self.take(",")
+                    if self.peek() == ")":
+                        raise ValueError(f"Missing argument after ',' in expression '{self.text}'")
+            self.take(")")
+            return self.call(token, arguments)
+        raise ValueError(f"Unexpected '{token}' in expression '{self.text}'")
+
+    def call(self, name: str, arguments: List[_Node]) -> _Node:
+        key = name.lower()
+        if key in CONTEXT_FUNCTIONS:
+            function = CONTEXT_FUNCTIONS[key]
+            getters = [_getter(argument) for argument in arguments]
+            if not getters:
+                return (lambda context: function(context)), False, None
+            if all(argument[1] for argument in arguments):
+                values = [argument[2] for argument in arguments]
+                return (lambda context: function(context, *values)), False, None
+            return (lambda context: function(context, *[get(context) for get in getters])), False, None
+        getters = [_getter(argument) for argument in arguments]
+        if key not in FUNCTIONS:
+            # Valid ADF the evaluator does not implement (getPastTime, base64, ...): fail only when evaluated
+            message = f"Unknown function '{name}' in expression '{self.text}'"
+
+            def unsupported(context):
+                raise ValueError(message)
+            return unsupported, False, None
+        function = FUNCTIONS[key]
+        if all(argument[1] for argument in arguments):
+            try:
+                return None, True, function(*[argument[2] for argument in arguments])
+            except Exception:
+                pass  # e.g. div(1, 0): leave the error to evaluation time, like the service
+        return (lambda context: function(*[get(context) for get in getters])), False, None
+
+
+def _getter(node: _Node) -> Evaluator:
+    evaluate, constant, value = node
+    return (lambda context: value) if constant else evaluate
+
+
+def _compile_template(text: str) -> Evaluator:
+    """String with @{...} holes and @@ escapes -> joined string"""
+    parts: List[Any] = []
+    literal: List[str] = []
+    position = 0
+    while position < len(text):
+        if text.startswith("@@", position):
+            literal.append("@")
+            position += 2
+        elif text.startswith("@{", position):
+            end, quoted = position + 2, False
+            while end < len(text) and (quoted or text[end] != "}"):
+                if text[end] == "'":
+                    quoted = not quoted
+                end += 1
+            if end >= len(text):
+                raise ValueError(f"Unterminated '@{{' in '{text}'")
+            node = _Parser(text[position + 2:end]).parse()
+            if node[1]:
+                literal.append(_to_string(node[2]))
+            else:
+                if literal:
+                    parts.append("".join(literal))
+                    literal = []
+                parts.append(node[0])
+            position = end + 1
+        else:
+            literal.append(text[position])
+            position += 1
+    if literal:
+        parts.append("".join(literal))
+    if all(isinstance(part, str) for part in parts):
+        constant = "".join(parts)
+        return lambda context: constant
+    return lambda context: "".join(part if isinstance(part, str) else _to_string(part(context)) for part in parts)
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(text: str) -> Evaluator:
+    """
+    Compile an ADF value once: "@expr" evaluates to any type, "...@{expr}..." to a string,
+    a leading "@@" escapes a literal "@", anything else is returned as-is.
+    Literal-only sub-expressions are folded at compile time. Raises ValueError on syntax errors;
+    functions the evaluator does not implement compile and raise ValueError when evaluated.
+    """
+    if text.startswith("@@"):
+        constant = text[1:]
+        return lambda context: constant
+    if text.startswith("@") and not text.startswith("@{"):
+        return _getter(_Parser(text[1:]).parse())
+    if "@" in text:
+        return _compile_template(text)
+    return lambda context: text
+
+
+def evaluate(value: Any, context: ExpressionContext) -> Any:
+    """Evaluate a string value (or an {"value": ..., "type": "Expression"} object); other values pass through"""
+    if isinstance(value, dict) and value.get("type") == "Expression" and isinstance(value.get("value"), str):
+        value = value["value"]
+    if isinstance(value, str):
+        return compile_expression(value)(context)
+    return value
+
+
+def resolve(document: Any, context: ExpressionContext) -> Any:
+    """Copy of a definition fragment with every expression evaluated (for dry runs)"""
+    if isinstance(document, dict):
+        if document.get("type") == "Expression" and isinstance(document.get("value"), str):
+            return evaluate(document, context)
+        return {key: resolve(value, context) for key, value in document.items()}
+    if isinstance(document, list):
+        return [resolve(value, context) for value in document]
+    if isinstance(document, str):
+        return compile_expression(document)(context)
+    return document
+
+
+def iter_expressions(document: Any) -> List[str]:
+    """Every string in a definition that the service would treat as an expression"""
+    found = []
+    pending = [document]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, str) and "@" in value and (value.startswith("@") or "@{" in value):
+            found.append(value)
+    return found
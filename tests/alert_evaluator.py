@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Streaming alert evaluator
+Applies monitoring/alert_rules.json to the run stream as it is polled instead of after Log Analytics ingestion
+"""
+
+import json
+import operator
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from run_utils import is_terminal, parse_timestamp
+
+ALERT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "monitoring", "alert_rules.json")
+
+PIPELINE_RUNS, ACTIVITY_RUNS, METRICS = "PipelineRuns", "ActivityRuns", "Metrics"
+FIRED, RESOLVED = "Fired", "Resolved"
+
+# Buckets per window: PT5M windows move in 5 second steps
+DEFAULT_BUCKETS = 60
+
+# A failure rate over fewer finished activities than this is noise (1 of 1 is 100%)
+DEFAULT_MIN_RATE_SAMPLES = 10
+
+_EPOCH = datetime(1970, 1, 1)
+_DURATION_PATTERN = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$")
+
+_FIELD_OPERATORS = {
+    "equals": operator.eq,
+    "notEquals": operator.ne,
+    "greaterThan": operator.gt,
+    "greaterThanOrEqual": operator.ge,
+    "lessThan": operator.lt,
+    "lessThanOrEqual": operator.le,
+}
+_METRIC_OPERATORS = {
+    "GreaterThan": operator.gt,
+    "GreaterThanOrEqual": operator.ge,
+    "LessThan": operator.lt,
+    "LessThanOrEqual": operator.le,
+    "Equals": operator.eq,
+}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in an ISO 8601 duration such as PT5M or P1DT2H"""
+    match = _DURATION_PATTERN.match(text or "")
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid ISO 8601 duration: {text!r}")
+    days, hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _epoch(value: datetime) -> float:
+    return (value - _EPOCH).total_seconds()
+
+
+class SlidingWindow:
+    """
+    Sum and count over the last `window` seconds in a ring of buckets: O(1) per add,
+    with expiry at bucket granularity. Samples older than the window are dropped.
+    """
+
+    __slots__ = ("width", "size", "_sums", "_counts", "_head", "total", "count")
+
+    def __init__(self, window: float, buckets: int = DEFAULT_BUCKETS):
+        self.width = window / buckets
+        self.size = buckets
+        self._sums = [0.0] * buckets
+        self._counts = [0] * buckets
+        self._head: Optional[int] = None
+        self.total = 0.0
+        self.count = 0
+
+    def advance(self, now: float):
+        """Expire buckets that fell out of the window ending at `now`"""
+        index = int(now // self.width)
+        if self._head is None:
+            self._head = index
+            return
+        steps = index - self._head
+        if steps <= 0:
+            return
+        if steps >= self.size:
+            self._sums = [0.0] * self.size
+            self._counts = [0] * self.size
+            self.total, self.count = 0.0, 0
+        else:
+            for bucket in range(self._head + 1, index + 1):
+                slot = bucket % self.size
+                self.total -= self._sums[slot]
+                self.count -= self._counts[slot]
+                self._sums[slot], self._counts[slot] = 0.0, 0
+        self._head = index
+
+    def add(self, now: float, value: float = 1.0):
+        self.advance(now)
+        index = int(now // self.width)
+        if index <= self._head - self.size:
+            return
+        slot = index % self.size
+        self._sums[slot] += value
+        self._counts[slot] += 1
+        self.total += value
+        self.count += 1
+
+
+class SlidingExtreme:
+    """Maximum (or minimum) over the last `window` seconds: monotonic deque, amortised O(1)"""
+
+    __slots__ = ("window", "_better", "_items")
+
+    def __init__(self, window: float, maximum: bool = True):
+        self.window = window
+        self._better = operator.ge if maximum else operator.le
+        self._items: Deque[Tuple[float, float]] = deque()
+
+    def add(self, now: float, value: float):
+        while self._items and self._better(value, self._items[-1][1]):
+            self._items.pop()
+        self._items.append((now, value))
+        self.advance(now)
+
+    def advance(self, now: float):
+        while self._items and self._items[0][0] <= now - self.window:
+            self._items.popleft()
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._items[0][1] if self._items else None
+
+
+class _Seen:
+    """Identities seen within a window, so re-polled records count once"""
+
+    __slots__ = ("window", "_times", "_order")
+
+    def __init__(self, window: float):
+        self.window = window
+        self._times: Dict[str, float] = {}
+        self._order: Deque[Tuple[float, str]] = deque()
+
+    def first(self, key: Optional[str], now: float) -> bool:
+        while self._order and self._order[0][0] <= now - self.window:
+            expired_at, expired = self._order.popleft()
+            if self._times.get(expired) == expired_at:
+                del self._times[expired]
+        if key is None:
+            return True
+        if key in self._times:
+            return False
+        self._times[key] = now
+        self._order.append((now, key))
+        return True
+
+
+class Alert(NamedTuple):
+    rule: str
+    severity: str
+    state: str                  # Fired or Resolved
+    time: datetime
+    value: Optional[float]
+    threshold: float
+    actions: Tuple[str, ...]
+    event: Optional[Dict]       # the event that tipped the rule over, when fired by one
+
+
+class _Rule(ABC):
+    """Shared state machine: fire when the windowed value breaches, resolve when it no longer does"""
+
+    def __init__(self, definition: Dict, buckets: int, threshold: float):
+        self.name = definition["name"]
+        self.threshold = threshold
+        self.severity = str(definition.get("severity", ""))
+        self.window = parse_duration(definition.get("windowSize", "PT5M"))
+        self.frequency = parse_duration(definition.get("evaluationFrequency", "PT5M"))
+        self.actions = tuple(action.get("actionGroupId", "") for action in definition.get("actions", []))
+        self.buckets = buckets
+        self.firing = False
+
+    @abstractmethod
+    def observe(self, event: Dict, now: float) -> bool:
+        """Fold the event in; True when it changed the windowed value"""
+
+    @abstractmethod
+    def value(self, now: float) -> Optional[float]:
+        """Windowed value at `now`; None when there is too little data"""
+
+    @abstractmethod
+    def breached(self, value: Optional[float]) -> bool:
+        """Does `value` cross the threshold?"""
+
+    def evaluate(self, now: float, event: Optional[Dict] = None) -> Optional[Alert]:
+        value = self.value(now)
+        breached = self.breached(value)
+        if breached == self.firing:
+            return None
+        self.firing = breached
+        return Alert(self.name, self.severity, FIRED if breached else RESOLVED,
+                     _EPOCH + timedelta(seconds=now), value, self.threshold, self.actions, event)
+
+
+def _compile_conditions(conditions: List[Dict]) -> List[Tuple[str, Callable, object]]:
+    compiled = []
+    for condition in conditions:
+        names = [name for name in _FIELD_OPERATORS if name in condition]
+        if "field" not in condition or len(names) != 1:
+            raise ValueError(f"Unsupported condition: {condition}")
+        compiled.append((condition["field"], _FIELD_OPERATORS[names[0]], condition[names[0]]))
+    return compiled
+
+
+def _matches(conditions: List[Tuple[str, Callable, object]], event: Dict) -> bool:
+    for field, compare, expected in conditions:
+        actual = event.get(field)
+        if actual is None:
+            return False
+        try:
+            if not compare(actual, expected):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+class _CountRule(_Rule):
+    """Matching runs in the window (each run once) against `threshold`, default 1"""
+
+    def __init__(self, definition: Dict, buckets: int):
+        super().__init__(definition, buckets, float(definition["condition"].get("threshold", 1)))
+        self.conditions = _compile_conditions(definition["condition"]["allOf"])
+        self.counter = SlidingWindow(self.window, buckets)
+        self.seen = _Seen(self.window)
+
+    def observe(self, event: Dict, now: float) -> bool:
+        if not _matches(self.conditions, event) or not self.seen.first(event.get("id"), now):
+            return False
+        self.counter.add(now)
+        return True
+
+    def value(self, now: float) -> float:
+        self.counter.advance(now)
+        return self.counter.count
+
+    def breached(self, value: Optional[float]) -> bool:
+        return value is not None and value >= self.threshold
+
+
+class _RateRule(_Rule):
+    """
+    Share of finished runs matching every condition among those matching the conditions
+    that are not on status, e.g. failed activities over all finished activities
+    """
+
+    def __init__(self, definition: Dict, buckets: int, min_samples: int):
+        super().__init__(definition, buckets, float(definition["condition"]["failureRateThreshold"]))
+        conditions = definition["condition"]["allOf"]
+        self.conditions = _compile_conditions(conditions)
+        self.base = _compile_conditions([c for c in conditions if c.get("field") != "status"])
+        self.min_samples = min_samples
+        self.matched = SlidingWindow(self.window, buckets)
+        self.finished = SlidingWindow(self.window, buckets)
+        self.seen = _Seen(self.window)
+
+    def observe(self, event: Dict, now: float) -> bool:
+        if not is_terminal(event.get("status")) or not _matches(self.base, event):
+            return False
+        if not self.seen.first(event.get("id"), now):
+            return False
+        self.finished.add(now)
+        if _matches(self.conditions, event):
+            self.matched.add(now)
+        return True
+
+    def value(self, now: float) -> Optional[float]:
+        self.finished.advance(now)
+        self.matched.advance(now)
+        if self.finished.count < self.min_samples:
+            return None
+        return self.matched.count / self.finished.count
+
+    def breached(self, value: Optional[float]) -> bool:
+        return value is not None and value > self.threshold
+
+
+class _MetricRule(_Rule):
+    """Metric samples aggregated over the window (Average, Total, Count, Maximum, Minimum)"""
+
+    def __init__(self, definition: Dict, buckets: int):
+        criteria = definition["condition"]["allOf"]
+        if len(criteria) != 1:
+            raise ValueError(f"{definition['name']}: one metric criterion per rule is supported")
+        criterion = criteria[0]
+        super().__init__(definition, buckets, float(criterion["threshold"]))
+        self.metric = criterion["metricName"]
+        self.compare = _METRIC_OPERATORS[criterion["operator"]]
+        self.aggregation = criterion.get("timeAggregation", "Average")
+        if self.aggregation in ("Maximum", "Minimum"):
+            self.window_state = SlidingExtreme(self.window, self.aggregation == "Maximum")
+        elif self.aggregation in ("Average", "Total", "Count"):
+            self.window_state = SlidingWindow(self.window, buckets)
+        else:
+            raise ValueError(f"{self.name}: unsupported timeAggregation {self.aggregation}")
+
+    def observe(self, event: Dict, now: float) -> bool:
+        if event.get("category") != METRICS or event.get("metricName") != self.metric:
+            return False
+        self.window_state.add(now, float(event["value"]))
+        return True
+
+    def value(self, now: float) -> Optional[float]:
+        state = self.window_state
+        state.advance(now)
+        if isinstance(state, SlidingExtreme):
+            return state.value
+        if not state.count:
+            return None
+        return {"Average": state.total / state.count, "Total": state.total, "Count": state.count}[self.aggregation]
+
+    def breached(self, value: Optional[float]) -> bool:
+        return value is not None and self.compare(value, self.threshold)
+
+
+def compile_rule(definition: Dict, buckets: int = DEFAULT_BUCKETS,
+                 min_rate_samples: int = DEFAULT_MIN_RATE_SAMPLES) -> _Rule:
+    """Streaming form of one alert rule definition"""
+    condition = definition.get("condition", {})
+    criteria = condition.get("allOf", [])
+    if criteria and all("metricName" in criterion for criterion in criteria):
+        return _MetricRule(definition, buckets)
+    if "failureRateThreshold" in condition:
+        return _RateRule(definition, buckets, min_rate_samples)
+    return _CountRule(definition, buckets)
+
+
+def event_from_run(run: Dict, category: str, now: Optional[datetime] = None) -> Dict:
+    """
+    Log Analytics-style event for a pipeline or activity run record. Runs still in progress
+    carry their elapsed time as durationMs, so duration rules can fire before the run ends.
+    """
+    activity = category == ACTIVITY_RUNS
+    start = parse_timestamp(run.get("activityRunStart" if activity else "runStart"))
+    end = parse_timestamp(run.get("activityRunEnd" if activity else "runEnd"))
+    when = end or now or parse_timestamp(run.get("lastUpdated")) or datetime.utcnow()
+    duration = run.get("durationInMs")
+    if duration is None and start is not None and not is_terminal(run.get("status")):
+        duration = int((when - start).total_seconds() * 1000)
+    return {
+        "category": category,
+        "id": run.get("activityRunId" if activity else "runId"),
+        "status": run.get("status"),
+        "pipelineName": run.get("pipelineName"),
+        "activityName": run.get("activityName"),
+        "activityType": run.get("activityType"),
+        "runId": run.get("pipelineRunId" if activity else "runId"),
+        "durationMs": duration,
+        "time": _epoch(when),
+    }
+
+
+class AlertEvaluator:
+    """Evaluates alert rules on every event; each rule does O(1) work per event"""
+
+    def __init__(self, rules: Iterable[Dict], on_alert: Optional[Callable[[Alert], None]] = None,
+                 buckets: int = DEFAULT_BUCKETS, min_rate_samples: int = DEFAULT_MIN_RATE_SAMPLES,
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        rules: definitions in the alert_rules.json format; disabled rules are skipped
+        on_alert: called with every Fired and Resolved alert
+        """
+        self.rules = [compile_rule(rule, buckets, min_rate_samples) for rule in rules if rule.get("enabled", True)]
+        self.on_alert = on_alert
+        self.clock = clock
+        self.events = 0
+        self.alerts: List[Alert] = []
+
+    @classmethod
+    def from_file(cls, path: str = ALERT_RULES_PATH, **kwargs) -> "AlertEvaluator":
+        with open(path) as f:
+            return cls(json.load(f)["alertRules"], **kwargs)
+
+    @property
+    def firing(self) -> List[str]:
+        return [rule.name for rule in self.rules if rule.firing]
+
+    def _emit(self, alert: Optional[Alert], fired: List[Alert]):
+        if alert is None:
+            return
+        fired.append(alert)
+        self.alerts.append(alert)
+        if self.on_alert:
+            self.on_alert(alert)
+
+    def observe(self, event: Dict) -> List[Alert]:
+        """Apply one event (see event_from_run); returns alerts whose state changed"""
+        self.events += 1
+        now = event["time"]
+        changed: List[Alert] = []
+        for rule in self.rules:
+            if rule.observe(event, now):
+                self._emit(rule.evaluate(now, event), changed)
+        return changed
+
+    def observe_run(self, run: Dict) -> List[Alert]:
+        """Pipeline run record from queryPipelineRuns, RunWatcher or a webhook"""
+        return self.observe(event_from_run(run, PIPELINE_RUNS, self.clock()))
+
+    def observe_activity_run(self, activity_run: Dict) -> List[Alert]:
+        return self.observe(event_from_run(activity_run, ACTIVITY_RUNS, self.clock()))
+
+    def observe_metric(self, name: str, value: float, timestamp: Optional[datetime] = None) -> List[Alert]:
+        return self.observe({"category": METRICS, "metricName": name, "value": value,
+                             "time": _epoch(timestamp or self.clock())})
+
+    def advance(self, now: Optional[datetime] = None) -> List[Alert]:
+        """Re-evaluate every rule at `now` so alerts resolve once their window empties"""
+        seconds = _epoch(now or self.clock())
+        changed: List[Alert] = []
+        for rule in self.rules:
+            self._emit(rule.evaluate(seconds), changed)
+        return changed
+
+
+class AlertStream:
+    """Polls runs updated since the last poll and feeds them, and their activity runs, to an evaluator"""
+
+    def __init__(self, client, evaluator: AlertEvaluator, with_activities: bool = True,
+                 overlap: timedelta = timedelta(minutes=5), clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        client: anything with AzureDataFactoryClient.iter_pipeline_runs and get_activity_runs
+        overlap: re-read this much before the last poll so late-indexed updates are not missed;
+                 the evaluator counts each run once per rule
+        """
+        self.client = client
+        self.evaluator = evaluator
+        self.with_activities = with_activities
+        self.overlap = overlap
+        self.clock = clock
+        self.last_poll: Optional[datetime] = None
+        self._in_progress: Dict[str, Dict] = {}
+        self._activities_read: Dict[str, datetime] = {}
+
+    def poll_once(self) -> List[Alert]:
+        now = self.clock()
+        start = (self.last_poll or now - self.overlap) - self.overlap
+        changed: List[Alert] = []
+        refreshed = set()
+        for run in self.client.iter_pipeline_runs(start, now + self.overlap):
+            run_id = run["runId"]
+            refreshed.add(run_id)
+            changed.extend(self.evaluator.observe_run(run))
+            if not is_terminal(run.get("status")):
+                self._in_progress[run_id] = run
+                continue
+            self._in_progress.pop(run_id, None)
+            if self.with_activities and run_id not in self._activities_read:
+                self._activities_read[run_id] = now
+                for activity_run in self.client.get_activity_runs(run):
+                    changed.extend(self.evaluator.observe_activity_run(activity_run))
+        # An in-progress run's lastUpdated need not move while it runs; its elapsed time does
+        for run_id, run in self._in_progress.items():
+            if run_id not in refreshed:
+                changed.extend(self.evaluator.observe_run(run))
+        changed.extend(self.evaluator.advance(now))
+        self.last_poll = now
+        # Runs older than the overlap cannot be returned again
+        for run_id in [r for r, seen in self._activities_read.items() if seen < start]:
+            del self._activities_read[run_id]
+        return changed
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Size-aware batch planner for metadata-driven copies
+Orders MetadataControl rows longest-first (LPT) so ForEach slots finish together instead of waiting on a late giant
+"""
+
+import heapq
+import sqlite3
+import statistics
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sql_standin import CONTROL_QUERY, ensure_columns, fetch_rows, table_stats
+
+# Rough single-Copy rate with parallelCopies 4; calibrate_copy_rate() replaces it with observed history
+DEFAULT_COPY_BYTES_PER_SECOND = 20 * 1024 * 1024
+
+# Per-item fixed cost: queueing, source connection, LogSuccess
+DEFAULT_COPY_OVERHEAD_SECONDS = 30.0
+
+# What GetTableList should run once the plan is written back
+PLANNED_CONTROL_QUERY = "SELECT * FROM MetadataControl WHERE IsActive = 1 ORDER BY LoadOrder"
+
+
+class BatchPlan(NamedTuple):
+    rows: List[Dict]            # control rows in planned order, with LoadOrder, BatchGroup, EstimatedSeconds
+    batches: List[List[Dict]]   # the same rows grouped per ForEach slot
+    loads: List[float]          # estimated seconds per batch
+    makespan: float
+    lower_bound: float          # max(longest table, total / slots): no plan can beat this
+
+
+def calibrate_copy_rate(activity_runs: Iterable[Dict]) -> Optional[float]:
+    """Median bytes/second of succeeded Copy activities (output dataRead / copyDuration)"""
+    rates = []
+    for run in activity_runs:
+        if run.get("activityType") != "Copy" or run.get("status") != "Succeeded":
+            continue
+        output = run.get("output") or {}
+        if output.get("dataRead") and output.get("copyDuration"):
+            rates.append(output["dataRead"] / output["copyDuration"])
+    return statistics.median(rates) if rates else None
+
+
+def estimate_seconds(rows: Sequence[Dict], stats: Dict[Tuple[str, str], Dict],
+                     history: Optional[Dict[Tuple[str, str], float]] = None,
+                     bytes_per_second: float = DEFAULT_COPY_BYTES_PER_SECOND,
+                     overhead_seconds: float = DEFAULT_COPY_OVERHEAD_SECONDS) -> List[float]:
+    """
+    Expected copy seconds per control row: observed history first, then size statistics.
+    Tables with neither get the median of the others, so they are not assumed free.
+    """
+    history = history or {}
+    estimates: List[Optional[float]] = []
+    for row in rows:
+        key = (row["SourceSchema"], row["SourceTable"])
+        if key in history:
+            estimates.append(history[key])
+        elif key in stats:
+            estimates.append(overhead_seconds + stats[key]["SizeBytes"] / bytes_per_second)
+        else:
+            estimates.append(None)
+    known = [value for value in estimates if value is not None]
+    fallback = statistics.median(known) if known else overhead_seconds
+    return [fallback if value is None else value for value in estimates]
+
+
+def list_schedule(durations: Sequence[float], slots: int) -> Tuple[float, List[int]]:
+    """Makespan and slot per item when each item goes to the first free slot, in the given order"""
+    free = [(0.0, slot) for slot in range(max(slots, 1))]
+    assignment = []
+    for duration in durations:
+        start, slot = heapq.heappop(free)
+        assignment.append(slot)
+        heapq.heappush(free, (start + duration, slot))
+    return max(end for end, _ in free), assignment
+
+
+def plan_batches(rows: Sequence[Dict], durations: Sequence[float], slots: int) -> BatchPlan:
+    """
+    Longest-processing-time-first: sort by estimate descending and give each table to the
+    least-loaded slot. Dispatching the planned order to free slots reproduces the same
+    batches, and the makespan is within 4/3 of optimal.
+    """
+    slots = max(1, min(slots, len(rows))) if rows else 1
+    order = sorted(range(len(rows)), key=lambda i: (-durations[i], i))
+    loads = [(0.0, slot) for slot in range(slots)]
+    batches: List[List[Dict]] = [[] for _ in range(slots)]
+    planned = []
+    for position, index in enumerate(order, 1):
+        load, slot = heapq.heappop(loads)
+        row = dict(rows[index], LoadOrder=position, BatchGroup=slot + 1,
+                   EstimatedSeconds=round(durations[index], 3))
+        planned.append(row)
+        batches[slot].append(row)
+        heapq.heappush(loads, (load + durations[index], slot))
+    totals = [0.0] * slots
+    for load, slot in loads:
+        totals[slot] = load
+    total = sum(durations)
+    lower_bound = max(max(durations, default=0.0), total / slots)
+    return BatchPlan(planned, batches, totals, max(totals), lower_bound)
+
+
+def plan_from_database(connection: sqlite3.Connection, slots: int = 4,
+                       history: Optional[Dict[Tuple[str, str], float]] = None,
+                       bytes_per_second: float = DEFAULT_COPY_BYTES_PER_SECOND,
+                       control_query: str = CONTROL_QUERY) -> Tuple[BatchPlan, float]:
+    """Plan the active control rows; also returns the makespan of today's lookup order for comparison"""
+    rows = fetch_rows(connection, control_query)
+    durations = estimate_seconds(rows, table_stats(connection), history, bytes_per_second)
+    lookup_makespan, _ = list_schedule(durations, slots)
+    return plan_batches(rows, durations, slots), lookup_makespan
+
+
+def write_plan(connection: sqlite3.Connection, plan: BatchPlan):
+    """Store LoadOrder and BatchGroup on MetadataControl so GetTableList can ORDER BY LoadOrder"""
+    ensure_columns(connection, "MetadataControl", {"LoadOrder": "INTEGER", "BatchGroup": "INTEGER"})
+    connection.executemany("UPDATE MetadataControl SET LoadOrder = ?, BatchGroup = ? WHERE TableId = ?",
+                           [(row["LoadOrder"], row["BatchGroup"], row["TableId"]) for row in plan.rows])
+    connection.commit()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Alert Evaluator Benchmark
+Pushes a synthetic run and metric stream through the repo's alert rules: ring-bucket windows vs rescanning each window
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from alert_evaluator import (ACTIVITY_RUNS, METRICS, PIPELINE_RUNS, AlertEvaluator, _CountRule, _MetricRule,
+                             _RateRule, event_from_run)
+from run_utils import format_timestamp
+
+
+def make_events(count: int, rate: float, seed: int = 1):
+    """Pipeline runs, activity runs and IR CPU samples at `rate` events per second of event time"""
+    rng = random.Random(seed)
+    now = datetime(2024, 6, 1)
+    events = []
+    for i in range(count):
+        now += timedelta(seconds=rng.expovariate(rate))
+        kind = rng.random()
+        if kind < 0.2:
+            duration = rng.lognormvariate(7.5, 0.8)
+            run = {"runId": f"run-{i}", "pipelineName": "pl_copy", "status": "Failed" if rng.random() < 0.01
+                   else "Succeeded", "runStart": format_timestamp(now - timedelta(seconds=duration)),
+                   "runEnd": format_timestamp(now), "durationInMs": int(duration * 1000)}
+            events.append(event_from_run(run, PIPELINE_RUNS))
+        elif kind < 0.9:
+            run = {"activityRunId": f"act-{i}", "pipelineRunId": "p", "activityName": "CopyTableData",
+                   "activityType": "Copy", "status": "Failed" if rng.random() < 0.05 else "Succeeded",
+                   "activityRunEnd": format_timestamp(now), "durationInMs": 1000}
+            events.append(event_from_run(run, ACTIVITY_RUNS))
+        else:
+            events.append({"category": METRICS, "metricName": "IntegrationRuntimeCpuPercentage",
+                           "value": rng.uniform(20, 95), "time": (now - datetime(1970, 1, 1)).total_seconds()})
+    return events
+
+
+class RescanEvaluator:
+    """Baseline: keep every event in the longest window and recount each rule per event"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.window = max(rule.window for rule in rules)
+        self.events = deque()
+        self.firing = {rule.name: False for rule in rules}
+        self.fired = 0
+
+    def _value(self, rule, now):
+        inside = [e for e in self.events if e["time"] > now - rule.window]
+        if isinstance(rule, _MetricRule):
+            values = [e["value"] for e in inside if e.get("metricName") == rule.metric]
+            return sum(values) / len(values) if values else None
+        if isinstance(rule, _RateRule):
+            finished = {e["id"]: e for e in inside if e["category"] == ACTIVITY_RUNS
+                        and e["status"] in ("Succeeded", "Failed", "Cancelled")}
+            if len(finished) < rule.min_samples:
+                return None
+            return sum(e["status"] == "Failed" for e in finished.values()) / len(finished)
+        return len({e["id"] for e in inside if all(
+            e.get(field) is not None and compare(e[field], expected) for field, compare, expected in rule.conditions)})
+
+    def observe(self, event):
+        now = event["time"]
+        self.events.append(event)
+        while self.events[0]["time"] <= now - self.window:
+            self.events.popleft()
+        for rule in self.rules:
+            breached = rule.breached(self._value(rule, now))
+            if breached != self.firing[rule.name]:
+                self.firing[rule.name] = breached
+                self.fired += 1
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--rate", type=float, default=20.0, help="events per second of event time")
+    parser.add_argument("--baseline-events", type=int, default=5000, help="events fed to the rescan baseline")
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="run stream poll interval")
+    parser.add_argument("--ingestion-minutes", type=float, default=3.0,
+                        help="typical Log Analytics ingestion delay before Azure Monitor sees a run")
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.rate)
+    print("Alert Evaluator Benchmark")
+    print("=" * 50)
+    print(f"Stream: {len(events)} events at {args.rate:.0f}/s of event time "
+          f"({(events[-1]['time'] - events[0]['time']) / 3600:.1f} hours)\n")
+
+    evaluator = AlertEvaluator.from_file()
+    started = time.perf_counter()
+    for event in events:
+        evaluator.observe(event)
+    elapsed = time.perf_counter() - started
+    print(f"  ring-bucket windows: {len(events) / elapsed:12,.0f} events/s  "
+          f"({elapsed / len(events) * 1e6:.2f} us/event, {len(evaluator.alerts)} state changes)")
+
+    baseline = RescanEvaluator(AlertEvaluator.from_file().rules)
+    sample = events[:args.baseline_events]
+    started = time.perf_counter()
+    for event in sample:
+        baseline.observe(event)
+    rescan = time.perf_counter() - started
+    print(f"  rescan per event:    {len(sample) / rescan:12,.0f} events/s  "
+          f"({rescan / len(sample) * 1e6:.2f} us/event over the first {len(sample)} events)")
+    print(f"  speedup: {(rescan / len(sample)) / (elapsed / len(events)):.0f}x\n")
+
+    # Detection latency: time from a run failing to the alert being raised
+    received = []
+    evaluator = AlertEvaluator.from_file(on_alert=lambda alert: received.append(time.perf_counter()))
+    failed = {"runId": "failed", "pipelineName": "pl_copy", "status": "Failed",
+              "runStart": "2024-06-01T00:00:00Z", "runEnd": "2024-06-01T00:01:00Z", "durationInMs": 60000}
+    started = time.perf_counter()
+    evaluator.observe_run(failed)
+    in_process = (received[0] - started) * 1000
+    print("Detection latency for a failed run:")
+    print(f"  evaluation in process: {in_process:.3f} ms")
+    print(f"  local, polled every {args.poll_seconds:.0f}s:  {args.poll_seconds / 2:.1f} s on average")
+    for rule in evaluator.rules:
+        if isinstance(rule, (_CountRule, _RateRule)):
+            azure = args.ingestion_minutes * 60 + rule.frequency / 2
+            print(f"  Azure Monitor, {rule.name:28} ~{azure / 60:.1f} min (ingestion + half of "
+                  f"{rule.frequency / 60:.0f} min frequency)")
+
+
+if __name__ == "__main__":
+    main()
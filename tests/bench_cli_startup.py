@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Wall time of fresh processes for the CLI's offline subcommands, against the bare interpreter and the old eager imports
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGET_MS = 100.0
+
+CASES = (
+    ("python -c pass (interpreter)", ["-c", "pass"]),
+    ("adf_cli --help", ["adf_cli.py", "--help"]),
+    ("adf_cli validate", ["adf_cli.py", "validate"]),
+    ("adf_cli list pipelines --local", ["adf_cli.py", "list", "pipelines", "--local"]),
+    ("import test_adf_api (client module)", ["-c", "import test_adf_api"]),
+    ("import azure.identity + requests", ["-c", "import azure.identity, requests"]),
+)
+
+
+def wall_ms(argv, repeat: int) -> float:
+    """Median wall time of `repeat` fresh interpreters running argv"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=TESTS_DIR, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    print("CLI Startup Benchmark")
+    print("=" * 50)
+    print(f"Median of {args.repeat} fresh processes; target {TARGET_MS:.0f}ms for offline subcommands\n")
+
+    # Warm the OS file cache and the validation index first
+    wall_ms(["adf_cli.py", "validate"], 1)
+    baseline = None
+    for label, argv in CASES:
+        ms = wall_ms(argv, args.repeat)
+        if baseline is None:
+            baseline = ms
+            print(f"  {label:<38} {ms:7.1f}ms")
+            continue
+        flag = ""
+        if argv[0] == "adf_cli.py":
+            flag = "  ok" if ms <= TARGET_MS else "  over target"
+        print(f"  {label:<38} {ms:7.1f}ms  (+{ms - baseline:5.1f}ms over the interpreter){flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Client Load Benchmark
+Drives the ADF and Synapse clients against the local stand-in and reports throughput and p50/p99 per operation
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from activity_run_cache import ActivityRunCache
+from standin_server import StandInConfig, StandInServer
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of `samples`"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def measure(operation: Callable[[int], None], iterations: int, workers: int) -> Dict:
+    """Run `operation(i)` `iterations` times on `workers` threads, timing each call"""
+    def call(i):
+        start = time.perf_counter()
+        try:
+            operation(i)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(call, range(iterations)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, error in results if error is None]
+    return {
+        "calls": iterations,
+        "errors": sum(1 for _, error in results if error is not None),
+        "throughput": iterations / elapsed,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def build_operations(server: StandInServer, run_ids: List[str]) -> Dict[str, Callable[[int], None]]:
+    """One callable per client operation, each taking the iteration number"""
+    adf = server.adf_client(activity_run_cache=ActivityRunCache())
+    synapse = server.synapse_client()
+    pipelines = sorted(server.state.definitions["pipelines"])
+    datasets = sorted(server.state.definitions["datasets"])
+    linked_services = sorted(server.state.definitions["linkedservices"])
+    notebooks = sorted(server.state.definitions["notebooks"])
+    runs = [server.state.get_run(run_id) for run_id in run_ids[:50]]
+    end_time = datetime.utcnow() + timedelta(minutes=5)
+    start_time = end_time - timedelta(days=7)
+    triggered = []
+
+    def pick(items, i):
+        return items[i % len(items)]
+
+    def create_run(i):
+        triggered.append(adf.create_pipeline_run(pick(pipelines, i), {"iteration": i}))
+
+    def cancel_run(i):
+        adf.cancel_pipeline_run(pick(triggered or run_ids, i))
+
+    return {
+        "adf.list_pipelines": lambda i: adf.list_pipelines(),
+        "adf.get_pipeline": lambda i: adf.get_pipeline(pick(pipelines, i)),
+        "adf.get_dataset": lambda i: adf.get_dataset(pick(datasets, i)),
+        "adf.get_linked_service": lambda i: adf.get_linked_service(pick(linked_services, i)),
+        "adf.create_pipeline_run": create_run,
+        "adf.get_pipeline_run": lambda i: adf.get_pipeline_run(pick(run_ids, i)),
+        "adf.query_pipeline_runs": lambda i: adf.query_pipeline_run_page(start_time, end_time),
+        "adf.query_activity_runs": lambda i: adf.query_activity_runs(pick(run_ids, i), start_time, end_time),
+        "adf.get_activity_runs (cached)": lambda i: adf.get_activity_runs(pick(runs, i)),
+        "adf.cancel_pipeline_run": cancel_run,
+        "synapse.list_notebooks": lambda i: synapse.list_notebooks(),
+        "synapse.get_notebook": lambda i: synapse.get_notebook(pick(notebooks, i)),
+        "synapse.get_pipeline_run": lambda i: synapse.get_pipeline_run(pick(run_ids, i)),
+    }
+
+
+def measure_async_batch(server: StandInServer, run_ids: List[str], iterations: int) -> Dict:
+    """Fetch `iterations` runs in one batch through AsyncDataFactoryClient"""
+    async def batch():
+        async with server.async_adf_client() as client:
+            start = time.perf_counter()
+            results = await client.get_pipeline_runs(list(itertools.islice(itertools.cycle(run_ids), iterations)),
+                                                   return_exceptions=True)
+            return time.perf_counter() - start, results
+
+    elapsed, results = asyncio.run(batch())
+    return {
+        "calls": iterations,
+        "errors": sum(1 for result in results if isinstance(result, Exception)),
+        "throughput": iterations / elapsed,
+        "p50": float("nan"),
+        "p99": float("nan"),
+    }
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200, help="calls per operation")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--history", type=int, default=2000, help="seeded pipeline runs")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds added per response")
+    parser.add_argument("--jitter", type=float, default=0.005, help="uniform extra latency")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--only", default="", help="comma-separated operation name prefixes")
+    args = parser.parse_args()
+
+    config = StandInConfig(latency=args.latency, latency_jitter=args.jitter,
+                           throttle_rate=args.throttle_rate, failure_rate=args.failure_rate, seed=0)
+
+    print("Client Load Benchmark")
+    print("=" * 50)
+    print(f"Iterations: {args.iterations}, workers: {args.workers}, seeded runs: {args.history}")
+    print(f"Latency: {args.latency * 1000:.1f}ms (+{args.jitter * 1000:.1f}ms), "
+          f"throttle: {args.throttle_rate:.0%}, failures: {args.failure_rate:.0%}")
+
+    prefixes = [prefix for prefix in args.only.split(",") if prefix]
+    with StandInServer(config) as server:
+        run_ids = server.state.seed_history(args.history)
+        operations = build_operations(server, run_ids)
+
+        print(f"\n{'operation':34} {'calls':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        rows = [(name, lambda op=op: measure(op, args.iterations, args.workers))
+                for name, op in operations.items()]
+        rows.append(("async.get_pipeline_runs (batch)",
+                     lambda: measure_async_batch(server, run_ids, args.iterations)))
+        for name, run in rows:
+            if prefixes and not any(name.startswith(prefix) for prefix in prefixes):
+                continue
+            result = run()
+            print(f"{name:34} {result['calls']:>6} {result['errors']:>6} {result['throughput']:>9.0f} "
+                  f"{result['p50']:>8.1f} {result['p99']:>8.1f}")
+
+        print(f"\nServer requests (including retries): {server.requests}, TCP connections: {server.connections}")
+
+
+if __name__ == "__main__":
+    main()
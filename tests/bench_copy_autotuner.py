@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Copy Autotuner Benchmark
+Tunes pl_dynamic_copy_metadata from a synthetic Copy history and compares the nightly load at the current and recommended settings
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from copy_autotuner import CopyTuner, ScalabilityFit, observations_from_activity_runs, patch_pipeline
+from run_utils import format_timestamp
+
+PIPELINE = "pl_dynamic_copy_metadata"
+ACTIVITY = "CopyTableData"
+PIPELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pipelines")
+MB = 1024 * 1024
+
+# Hidden ground truth the tuner has to discover: source-side contention on streams per copy,
+# diminishing returns on DIU, and shared-sink contention across concurrent copies
+PARALLEL = ScalabilityFit(1.0, 0.04, 0.004, ())
+DIU = ScalabilityFit(1.0, 0.25, 0.001, ())
+FANOUT = ScalabilityFit(1.0, 0.08, 0.01, ())
+BASE_BYTES_PER_SECOND = 2 * MB
+
+
+def copy_rate(parallel: int, diu: int, fanout: int) -> float:
+    """True bytes/s of one copy under the hidden model"""
+    return (BASE_BYTES_PER_SECOND * PARALLEL.throughput(parallel) * DIU.throughput(diu)
+            * FANOUT.throughput(fanout) / fanout)
+
+
+def history(rng: random.Random, pipeline_runs: int, tables: int, noise: float):
+    """Runs at a spread of settings, as after a few weeks of deliberate experiments"""
+    runs = []
+    start = datetime(2024, 1, 1)
+    for run_index in range(pipeline_runs):
+        fanout = rng.choice((1, 2, 4, 8, 16))
+        parallel = rng.choice((1, 2, 4, 8, 16, 32))
+        diu = rng.choice((2, 4, 8, 16, 32, 64))
+        size = rng.randint(200, 2000) * MB
+        for table in rng.sample(range(tables), min(fanout, tables)):
+            seconds = size / (copy_rate(parallel, diu, fanout) * rng.lognormvariate(0, noise))
+            runs.append({
+                "activityName": ACTIVITY, "activityType": "Copy", "status": "Succeeded",
+                "pipelineName": PIPELINE, "pipelineRunId": f"run-{run_index}",
+                "activityRunStart": format_timestamp(start),
+                "activityRunEnd": format_timestamp(start + timedelta(seconds=seconds)),
+                "input": {"source": {"sqlReaderQuery": f"SELECT * FROM dbo.table_{table}"}},
+                "output": {"dataRead": size, "copyDuration": seconds,
+                           "usedParallelCopies": parallel, "usedDataIntegrationUnits": diu},
+            })
+        start += timedelta(hours=6)
+    return runs
+
+
+def nightly_seconds(sizes, parallel: int, diu: int, batch: int) -> float:
+    """Wall time of copying every table through a ForEach of `batch` slots under the true model"""
+    slots = [0.0] * batch
+    rate = copy_rate(parallel, diu, min(batch, len(sizes)))
+    for size in sorted(sizes, reverse=True):
+        slot = slots.index(min(slots))
+        slots[slot] += size / rate
+    return max(slots)
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=400, help="pipeline runs in the history")
+    parser.add_argument("--tables", type=int, default=40)
+    parser.add_argument("--noise", type=float, default=0.15, help="lognormal sigma of per-copy rate noise")
+    parser.add_argument("--output", help="write the patched pipeline JSON here")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    runs = history(rng, args.runs, args.tables, args.noise)
+    print("Copy Autotuner Benchmark")
+    print("=" * 50)
+    print(f"History: {len(runs)} Copy runs over {args.runs} pipeline runs, {args.tables} source tables\n")
+
+    started = time.perf_counter()
+    observations = observations_from_activity_runs(runs)
+    extracted = time.perf_counter()
+    recommendation = CopyTuner(observations).recommend(PIPELINE, ACTIVITY)
+    finished = time.perf_counter()
+    print(f"Extract observations: {(extracted - started) * 1000:7.1f}ms")
+    print(f"Fit and recommend:    {(finished - extracted) * 1000:7.1f}ms\n")
+
+    with open(os.path.join(PIPELINES_DIR, f"{PIPELINE}.json")) as f:
+        definition = json.load(f)
+    patched, changes = patch_pipeline(definition, recommendation)
+    for change in changes:
+        print(f"  {change}")
+
+    parallel = recommendation["parallelCopies"]["value"] or 4
+    diu = recommendation["dataIntegrationUnits"]["value"] or 4
+    batch = recommendation["batchCount"]["value"] or 4
+    sizes = [rng.randint(200, 2000) * MB for _ in range(args.tables)]
+    current = nightly_seconds(sizes, 4, 4, 4)
+    tuned = nightly_seconds(sizes, parallel, diu, batch)
+    best = min((nightly_seconds(sizes, p, d, b), p, d, b)
+               for p in range(1, 33) for d in (2, 4, 8, 16, 32, 64) for b in range(1, 21))
+    print(f"\nNightly load of {args.tables} tables, {sum(sizes) / MB / 1024:.1f} GB (true model):")
+    print(f"  current   parallelCopies  4  DIU  4  batchCount  4  {current / 60:7.1f} min")
+    print(f"  tuned     parallelCopies {parallel:2}  DIU {diu:2}  batchCount {batch:2}  {tuned / 60:7.1f} min  "
+          f"({current / tuned:.2f}x)")
+    print(f"  oracle    parallelCopies {best[1]:2}  DIU {best[2]:2}  batchCount {best[3]:2}  {best[0] / 60:7.1f} min  "
+          f"({current / best[0]:.2f}x)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(patched, f, indent=4)
+        print(f"\nPatched pipeline written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
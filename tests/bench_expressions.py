@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Expression Benchmark
+Evaluates the ForEach expressions of pl_dynamic_copy_metadata across many items, parsing per item vs compiled once
+"""
+
+import argparse
+import json
+import time
+
+from adf_expressions import ExpressionContext, compile_expression, iter_expressions
+from validation_engine import REPO_ROOT
+
+
+def foreach_expressions():
+    with open(REPO_ROOT / "pipelines" / "pl_dynamic_copy_metadata.json", 'r') as f:
+        pipeline = json.load(f)
+    foreach = next(a for a in pipeline["properties"]["activities"] if a["type"] == "ForEach")
+    return iter_expressions(foreach["typeProperties"]["activities"])
+
+
+def run(expressions, contexts, compile_fn) -> float:
+    start = time.perf_counter()
+    for context in contexts:
+        for text in expressions:
+            compile_fn(text)(context)
+    return time.perf_counter() - start
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10000, help="ForEach items to evaluate")
+    args = parser.parse_args()
+
+    expressions = foreach_expressions()
+    base = ExpressionContext("pl_dynamic_copy_metadata", activity_outputs={"CopyTableData": {"rowsCopied": 42}})
+    contexts = [base.with_item({"SourceSchema": "dbo", "SourceTable": f"table_{i}",
+                                "SourceQuery": f"SELECT * FROM dbo.table_{i}"}) for i in range(args.items)]
+
+    print("Expression Benchmark")
+    print("=" * 50)
+    print(f"Items: {args.items}, expressions per item: {len(expressions)}\n")
+
+    parse_each = run(expressions, contexts, compile_expression.__wrapped__)
+    compile_expression.cache_clear()
+    cached = run(expressions, contexts, compile_expression)
+    evaluations = args.items * len(expressions)
+    for label, elapsed in (("parse per evaluation", parse_each), ("compiled + cached", cached)):
+        print(f"  {label:24} {elapsed:8.3f}s  {elapsed / args.items * 1e6:8.1f} us/item  "
+              f"{elapsed / evaluations * 1e6:6.2f} us/expression")
+    print(f"\nSpeedup: {parse_each / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+KQL Executor Benchmark
+Runs the repo's ADF monitoring queries over a cached run history and compares with a row-by-row Python pass
+"""
+
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from kql_executor import KQL_QUERIES_PATH, KqlExecutor, compile_query, split_queries
+from run_history_store import RunHistoryStore
+from run_utils import parse_timestamp
+from standin_server import StandInConfig, StandInState
+
+NOW = datetime(2024, 6, 10, 12, 0, 0)
+
+
+def success_rate_by_name(runs, now: datetime):
+    """'Pipeline Success Rate by Name' over parsed JSON records, as a notebook would do it"""
+    counts = defaultdict(lambda: [0, 0, 0])
+    for run in runs:
+        if parse_timestamp(run["runStart"]) > now - timedelta(days=7):
+            total = counts[run["pipelineName"]]
+            total[0] += 1
+            total[1] += run["status"] == "Succeeded"
+            total[2] += run["status"] == "Failed"
+    rows = [{"PipelineName": name, "TotalRuns": t, "Succeeded": s, "Failed": f,
+             "SuccessRate": round(100.0 * s / t, 2)} for name, (t, s, f) in counts.items()]
+    return sorted(rows, key=lambda row: row["SuccessRate"])
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20000, help="pipeline runs in the history")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    state = StandInState(StandInConfig(seed=1))
+    state.seed_history(args.runs, days=args.days, now=NOW, failure_rate=0.1)
+    runs = [state.get_run(run_id, NOW) for run_id in state.runs]
+    activities = [activity for run in runs for activity in state.get_activity_runs(run["runId"], NOW)]
+
+    print("KQL Executor Benchmark")
+    print("=" * 50)
+    print(f"History: {len(runs)} pipeline runs, {len(activities)} activity runs over {args.days:g} days\n")
+
+    with open(KQL_QUERIES_PATH) as f:
+        queries = {title: text for title, text in split_queries(f.read()).items()
+                   if text.startswith(("ADFPipelineRun", "ADFActivityRun"))}
+
+    with tempfile.TemporaryDirectory() as root:
+        store = RunHistoryStore(root)
+        store.add_runs(runs, activities)
+        executor = KqlExecutor(store, clock=lambda: NOW)
+
+        started = time.perf_counter()
+        for text in queries.values():
+            compile_query(text)
+        print(f"Compile {len(queries)} queries: {(time.perf_counter() - started) * 1000:7.1f}ms\n")
+
+        for title, text in queries.items():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                result = executor.execute(text)
+            elapsed = (time.perf_counter() - started) / args.repeat
+            print(f"  {title[:44]:<44} {elapsed * 1000:8.1f}ms  {len(result):6} rows")
+
+        title = "Pipeline Success Rate by Name"
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            expected = success_rate_by_name(runs, NOW)
+        python = (time.perf_counter() - started) / args.repeat
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = executor.execute(queries[title])
+        kql = (time.perf_counter() - started) / args.repeat
+        assert len(result) == len(expected)
+        print(f"\n{title}:")
+        print(f"  row-by-row Python over JSON: {python * 1000:8.1f}ms")
+        print(f"  KQL executor over the store: {kql * 1000:8.1f}ms  ({python / kql:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
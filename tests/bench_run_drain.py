@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Emergency Drain Benchmark
+Drains a burst of pl_orchestration_master runs one cancel at a time and with the concurrent recursive drain
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from bulk_trigger import ArmWriteBudget
+from run_drain import RunDrain
+from standin_server import StandInConfig, StandInServer
+
+PIPELINE = "pl_orchestration_master"
+
+
+def start_burst(server: StandInServer, count: int):
+    now = datetime.utcnow()
+    for _ in range(count):
+        server.state._add_run(PIPELINE, now - timedelta(minutes=1), 4 * 3600, "Succeeded")
+
+
+def active(server: StandInServer) -> int:
+    now = datetime.utcnow()
+    return sum(server.state.get_run(run_id, now)["status"] == "InProgress" for run_id in list(server.state.runs))
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=300, help="runs started by the bad deploy")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request at the stand-in")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=50.0,
+                        help="write budget refill per second (ARM's subscription default is 10 with a burst of 200)")
+    args = parser.parse_args()
+
+    print("Emergency Drain Benchmark")
+    print("=" * 50)
+
+    with StandInServer(StandInConfig(latency=args.latency)) as server:
+        start_burst(server, args.runs)
+        print(f"{args.runs} {PIPELINE} runs, {active(server)} active runs including children, "
+              f"{args.latency * 1000:.0f}ms per request\n")
+        client = server.adf_client()
+        started = time.perf_counter()
+        # The old way: one cancel per selected run, children found and cancelled separately
+        runs = RunDrain(client).select()
+        for run in runs:
+            client.cancel_pipeline_run(run["runId"])
+        serial = time.perf_counter() - started
+        print(f"  serial cancel of {len(runs)} runs:        {serial:7.2f}s  ({active(server)} still active)")
+
+    with StandInServer(StandInConfig(latency=args.latency)) as server:
+        start_burst(server, args.runs)
+        drain = RunDrain(server.adf_client(), max_workers=args.workers,
+                         budget=ArmWriteBudget(rate=args.rate))
+        started = time.perf_counter()
+        report = drain.drain([PIPELINE])
+        elapsed = time.perf_counter() - started
+        print(f"  concurrent recursive drain:         {elapsed:7.2f}s  ({active(server)} still active)")
+        print(f"    cancels {report.seconds:.2f}s, outcomes {report.counts()}")
+        slowest = max(outcome.seconds for outcome in report.outcomes)
+        floor = max(0.0, (len(report.outcomes) - drain.budget.capacity) / args.rate)
+        print(f"    last cancel accepted after {slowest:.2f}s (write budget floor {floor:.2f}s); "
+              f"{serial / elapsed:.1f}x faster than serial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Run-History Store Benchmark
+Compares month-scale reports over dict-per-run lists with the columnar RunHistoryStore
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from run_history_store import RunHistoryStore
+from run_utils import format_timestamp
+
+PIPELINES = ["pl_copy_blob_to_datalake", "pl_dynamic_copy_metadata",
+             "pl_incremental_copy_sql", "pl_orchestration_master"]
+
+
+def synthetic_runs(count: int, days: int, seed: int = 0) -> List[Dict]:
+    """Finished runs shaped like queryPipelineRuns results"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    runs = []
+    for _ in range(count):
+        start = now - timedelta(seconds=rng.uniform(0, days * 86400))
+        duration = rng.lognormvariate(12, 0.7)
+        end = start + timedelta(milliseconds=duration)
+        runs.append({
+            "runId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "pipelineName": rng.choice(PIPELINES),
+            "status": "Failed" if rng.random() < 0.05 else "Succeeded",
+            "runStart": format_timestamp(start),
+            "runEnd": format_timestamp(end),
+            "durationInMs": int(duration),
+            "lastUpdated": format_timestamp(end),
+            "parameters": {},
+            "invokedBy": {"name": "Manual", "invokedByType": "Manual"},
+        })
+    return runs
+
+
+def report_from_dicts(runs: List[Dict]) -> int:
+    """Per-pipeline success rate and per-day p95 duration, the way the tests compute it today"""
+    by_pipeline: Dict[str, List[Dict]] = {}
+    for run in runs:
+        by_pipeline.setdefault(run["pipelineName"], []).append(run)
+    for name, pipeline_runs in by_pipeline.items():
+        succeeded = sum(1 for r in pipeline_runs if r["status"] == "Succeeded")
+        _ = succeeded / len(pipeline_runs) * 100
+    days: Dict[str, List[int]] = {}
+    for run in runs:
+        if run["status"] == "Succeeded":
+            days.setdefault(run["runStart"][:10], []).append(run["durationInMs"])
+    for durations in days.values():
+        statistics.quantiles(durations, n=20)
+    return len(days)
+
+
+def report_from_store(store: RunHistoryStore) -> int:
+    store.success_rate()
+    return len(store.duration_trend(percentiles=(95,)))
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    print("Run-History Store Benchmark")
+    print("=" * 50)
+    print(f"Runs: {args.runs}, days: {args.days}")
+
+    runs = synthetic_runs(args.runs, args.days)
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        RunHistoryStore(root).add_runs(runs)
+        print(f"\nStore build: {time.perf_counter() - start:.2f}s")
+
+        # Dict-per-run: the fetched run list has to be held to report on it
+        tracemalloc.start()
+        runs = synthetic_runs(args.runs, args.days)
+        days = report_from_dicts(runs)
+        dict_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        report_from_dicts(runs)
+        dict_seconds = time.perf_counter() - start
+        del runs
+
+        tracemalloc.start()
+        store_days = report_from_store(RunHistoryStore(root))
+        store_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        report_from_store(RunHistoryStore(root))
+        store_seconds = time.perf_counter() - start
+        assert store_days == days
+
+        print(f"\n{'':12} {'report s':>10} {'peak MB':>10}")
+        print(f"{'dict-per-run':12} {dict_seconds:>10.2f} {dict_peak / 1024 / 1024:>10.1f}")
+        print(f"{'columnar':12} {store_seconds:>10.2f} {store_peak / 1024 / 1024:>10.1f}")
+        print(f"\nSpeedup: {dict_seconds / store_seconds:.1f}x, memory: {dict_peak / store_peak:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
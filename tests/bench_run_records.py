@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Run Record Memory Benchmark
+Compares retained memory of activity runs held as parsed dicts versus compact ActivityRunRecords
+Records are built from the parsed pages, so their load time includes re-encoding payloads
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from run_records import ActivityRunRecord
+from run_utils import format_timestamp
+
+ACTIVITIES = [("LookupWatermark", "Lookup"), ("IncrementalCopyActivity", "Copy"),
+              ("UpdateWatermark", "SqlServerStoredProcedure"), ("TransformData", "SynapseNotebook")]
+
+
+def synthetic_page(rng: random.Random, size: int) -> bytes:
+    """One queryActivityruns response body, with Copy-sized input/output payloads"""
+    now = datetime.utcnow()
+    value = []
+    for _ in range(size):
+        name, activity_type = rng.choice(ACTIVITIES)
+        start = now - timedelta(seconds=rng.uniform(0, 7 * 86400))
+        rows = rng.randint(1000, 10_000_000)
+        value.append({
+            "activityRunId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "activityName": name,
+            "activityType": activity_type,
+            "pipelineName": "pl_incremental_copy_sql",
+            "pipelineRunId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "status": "Succeeded",
+            "activityRunStart": format_timestamp(start),
+            "activityRunEnd": format_timestamp(start + timedelta(seconds=90)),
+            "durationInMs": 90_000,
+            "input": {
+                "source": {"type": "AzureSqlSource", "sqlReaderQuery": f"SELECT * FROM dbo.Orders WHERE ModifiedDate > '{start}'",
+                           "queryTimeout": "02:00:00", "partitionOption": "None"},
+                "sink": {"type": "ParquetSink", "storeSettings": {"type": "AzureBlobFSWriteSettings"},
+                         "formatSettings": {"type": "ParquetWriteSettings"}},
+                "enableStaging": False, "parallelCopies": 4, "dataIntegrationUnits": 4,
+            },
+            "output": {
+                "dataRead": rows * 120, "dataWritten": rows * 40, "rowsRead": rows, "rowsCopied": rows,
+                "copyDuration": 85, "throughput": rows * 120 / 1024 / 85,
+                "sourcePeakConnections": 4, "sinkPeakConnections": 4,
+                "effectiveIntegrationRuntime": "AutoResolveIntegrationRuntime (West Europe)",
+                "usedDataIntegrationUnits": 4, "billingReference": {"activityType": "DataMovement",
+                                                                    "billableDuration": [{"meterType": "AzureIR", "duration": 0.0667, "unit": "DIUHours"}]},
+                "usedParallelCopies": 4,
+                "executionDetails": [{
+                    "source": {"type": "AzureSqlDatabase", "region": "West Europe"},
+                    "sink": {"type": "AzureBlobFS", "region": "West Europe"},
+                    "status": "Succeeded", "start": format_timestamp(start), "duration": 85,
+                    "usedDataIntegrationUnits": 4, "usedParallelCopies": 4,
+                    "profile": {"queue": {"status": "Completed", "duration": 3},
+                                "transfer": {"status": "Completed", "duration": 80,
+                                             "details": {"readingFromSource": {"type": "AzureSqlDatabase", "workingDuration": 60,
+                                                                               "timeToFirstByte": 2},
+                                                         "writingToSink": {"type": "AzureBlobFS", "workingDuration": 10}}}},
+                    "detailedDurations": {"queuingDuration": 3, "timeToFirstByte": 2, "transferDuration": 78},
+                }],
+            },
+            "error": {"errorCode": "", "message": "", "failureType": "", "target": name, "details": ""},
+            "userProperties": {}, "iterationHash": "", "linkedServiceName": "", "retryAttempt": None,
+        })
+    return json.dumps({"value": value}).encode()
+
+
+def retained(load: Callable[[], List]) -> Tuple[int, float, List]:
+    """(bytes still allocated after load, load seconds untraced, result)"""
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, elapsed, result
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [synthetic_page(rng, args.page_size) for _ in range(args.runs // args.page_size)]
+
+    print("Run Record Memory Benchmark")
+    print("=" * 50)
+    print(f"Activity runs: {args.runs}, page size: {args.page_size}, "
+          f"average JSON: {sum(map(len, pages)) / args.runs:.0f} bytes/run")
+
+    def as_dicts():
+        runs = []
+        for page in pages:
+            runs.extend(json.loads(page)["value"])
+        return runs
+
+    def as_records():
+        runs = []
+        for page in pages:
+            runs.extend(ActivityRunRecord.from_page(json.loads(page)["value"]))
+        return runs
+
+    dict_bytes, dict_seconds, dicts = retained(as_dicts)
+    record_bytes, record_seconds, records = retained(as_records)
+    assert records[0].to_dict() == dicts[0]
+
+    start = time.perf_counter()
+    dict_rows = sum(run["output"]["rowsCopied"] for run in dicts if run["activityType"] == "Copy")
+    dict_scan = time.perf_counter() - start
+    start = time.perf_counter()
+    record_rows = sum(run.output["rowsCopied"] for run in records if run.activity_type == "Copy")
+    record_scan = time.perf_counter() - start
+    assert dict_rows == record_rows
+
+    print(f"\n{'':10} {'retained MB':>12} {'bytes/run':>10} {'load s':>8} {'output scan s':>14}")
+    print(f"{'dicts':10} {dict_bytes / 1024 / 1024:>12.1f} {dict_bytes / args.runs:>10.0f} "
+          f"{dict_seconds:>8.2f} {dict_scan:>14.3f}")
+    print(f"{'records':10} {record_bytes / 1024 / 1024:>12.1f} {record_bytes / args.runs:>10.0f} "
+          f"{record_seconds:>8.2f} {record_scan:>14.3f}")
+    print(f"\nMemory: {dict_bytes / record_bytes:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
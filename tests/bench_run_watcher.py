@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Run Watcher Benchmark
+Counts API calls per tracked run: one polling loop per run vs. the multiplexed RunWatcher
+Runs in simulated time, so hours of pipeline activity take a fraction of a second
+"""
+
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from run_utils import format_timestamp, parse_timestamp
+from run_watcher import EPOCH, RunWatcher
+
+
+class VirtualClock:
+    """Clock that only moves when someone sleeps"""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class SimulatedFactory:
+    """In-memory stand-in for queryPipelineRuns / pipelineruns with scheduled run durations"""
+
+    def __init__(self, clock: VirtualClock, durations: Dict[str, float], pipeline_name: str = "pl_copy_blob_to_datalake"):
+        self.clock = clock
+        self.started = clock.time()
+        self.durations = durations
+        self.pipeline_name = pipeline_name
+        self.calls = 0
+
+    @property
+    def run_start(self) -> datetime:
+        return EPOCH + timedelta(seconds=self.started)
+
+    def _run(self, run_id: str) -> Dict:
+        elapsed = self.clock.time() - self.started
+        duration = self.durations[run_id]
+        done = elapsed >= duration
+        run = {
+            "runId": run_id,
+            "pipelineName": self.pipeline_name,
+            "status": "Succeeded" if done else "InProgress",
+            "runStart": format_timestamp(self.run_start),
+            # Finished runs stop updating at runEnd
+            "lastUpdated": format_timestamp(self.run_start + timedelta(seconds=min(elapsed, duration))),
+        }
+        if done:
+            run["durationInMs"] = int(duration * 1000)
+        return run
+
+    def get_pipeline_run(self, run_id: str) -> Dict:
+        self.calls += 1
+        return self._run(run_id)
+
+    def iter_pipeline_runs(self, start_time, end_time, filters: List[Dict]) -> Iterator[Dict]:
+        self.calls += 1
+        for condition in filters:
+            if condition["operand"] == "RunId":
+                for run_id in condition["values"]:
+                    run = self._run(run_id)
+                    if start_time <= parse_timestamp(run["lastUpdated"]) <= end_time:
+                        yield run
+
+
+def per_run_polling_calls(durations: Dict[str, float], interval: float) -> int:
+    """API calls made by the old approach: poll each run every `interval` seconds until it finishes"""
+    return sum(math.floor(duration / interval) + 1 for duration in durations.values())
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--mean-duration", type=float, default=900.0, help="seconds")
+    parser.add_argument("--poll-interval", type=float, default=10.0, help="per-run loop interval")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    durations = {f"run-{i}": rng.lognormvariate(math.log(args.mean_duration), 0.5) for i in range(args.runs)}
+
+    clock = VirtualClock()
+    factory = SimulatedFactory(clock, durations)
+    watcher = RunWatcher(factory, clock=clock.time, sleep=clock.sleep,
+                         expected_durations={factory.pipeline_name: args.mean_duration})
+    for run_id in durations:
+        watcher.add(run_id, run_start=factory.run_start)
+    results = watcher.wait()
+
+    baseline = per_run_polling_calls(durations, args.poll_interval)
+    finish = max(durations.values())
+    print("Run Watcher Benchmark")
+    print("=" * 50)
+    print(f"Tracked runs: {args.runs}, mean duration: {args.mean_duration:.0f}s, "
+          f"last finishes after {finish:.0f}s")
+    print(f"\nPer-run polling every {args.poll_interval:.0f}s:")
+    print(f"  API calls: {baseline}")
+    print(f"  Calls per tracked run: {baseline / args.runs:.1f}")
+    print("\nRunWatcher (bulk RunId In [...] queries):")
+    print(f"  API calls: {factory.calls}")
+    print(f"  Calls per tracked run: {factory.calls / args.runs:.2f}")
+    print(f"  Detection lag after last run: {clock.time() - factory.started - finish:.0f}s")
+    print(f"  Completed: {sum(1 for run in results.values() if run['status'] == 'Succeeded')}")
+    print(f"\nReduction: {baseline / factory.calls:.0f}x fewer API calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Simulator Benchmark
+Measures trial throughput and sweeps batchCount and retry settings for the repo pipelines
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+from pipeline_simulator import PipelineSimulator
+
+FOREACH = "pl_dynamic_copy_metadata/ForEachTable"
+NOTEBOOKS = ("TransformData", "CurateData", "DataQualityCheck")
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=40, help="tables returned by GetTableList")
+    parser.add_argument("--trials", type=int, default=200, help="trials per configuration")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = PipelineSimulator(item_counts={FOREACH: args.items})
+    print("Simulator Benchmark")
+    print("=" * 50)
+
+    for pipeline in sorted(simulator.graph.pipelines):
+        start = time.perf_counter()
+        summary = simulator.simulate(pipeline, trials=2000)
+        elapsed = time.perf_counter() - start
+        print(f"  {pipeline:28} {2000 / elapsed:9.0f} trials/s   p50 {summary['p50_makespan_seconds']:7.0f}s")
+
+    # batchCount sweep for the metadata-driven copy
+    print(f"\nbatchCount sweep ({args.items} tables, {args.trials} trials each)")
+    batch_counts = [1, 2, 4, 8, 12, 16, 20, 32, 50]
+    configurations = [{FOREACH: {"batch_count": b}} for b in batch_counts]
+    for batch_count, summary in zip(batch_counts, simulator.sweep("pl_dynamic_copy_metadata", configurations,
+                                                                  args.trials)):
+        print(f"  batchCount {batch_count:3}: p50 {summary['p50_makespan_seconds']:7.0f}s  "
+              f"p99 {summary['p99_makespan_seconds']:7.0f}s  peak {summary['max_peak_concurrency']:3}")
+
+    # Retry grid for the master's notebooks at a 20% attempt failure rate
+    retries = range(4)
+    intervals = (30, 60, 120, 300, 600)
+    configurations = [{f"pl_orchestration_master/{name}": {"retry": retry, "retry_interval": interval,
+                                                          "failure_rate": 0.2} for name in NOTEBOOKS}
+                      for retry, interval in itertools.product(retries, intervals)]
+    configurations *= 50  # enough configurations to make the sweep rate meaningful
+    start = time.perf_counter()
+    summaries = simulator.sweep("pl_orchestration_master", configurations, args.trials, max_workers=args.workers,
+                                track_concurrency=False)
+    elapsed = time.perf_counter() - start
+    workers = args.workers or 1
+    print(f"\nRetry sweep: {len(configurations)} configurations x {args.trials} trials in {elapsed:.2f}s "
+          f"({len(configurations) / elapsed:.0f} configurations/s, {workers} of {os.cpu_count()} CPUs)")
+    for (retry, interval), summary in zip(itertools.product(retries, intervals), summaries):
+        print(f"  retry {retry} every {interval:3}s: success {summary['success_rate']:6.1%}  "
+              f"p50 {summary['p50_makespan_seconds']:7.0f}s  p99 {summary['p99_makespan_seconds']:7.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Validation Benchmark
+Compares serial double-parse validation with the cached, parallel ValidationEngine on generated artifacts
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from validation_engine import KIND_FOLDERS, REPO_ROOT, ValidationEngine
+
+
+def generate_artifacts(root: Path, copies: int) -> int:
+    """Write `copies` renamed copies of every repo definition under root; returns the file count"""
+    count = 0
+    for folder in KIND_FOLDERS.values():
+        (root / folder).mkdir(parents=True)
+        for source in sorted((REPO_ROOT / folder).glob("*.json")):
+            with open(source, 'r') as f:
+                definition = json.load(f)
+            for i in range(copies):
+                definition["name"] = f"{source.stem}_{i:05d}"
+                with open(root / folder / f"{definition['name']}.json", 'w') as f:
+                    json.dump(definition, f, indent=2)
+                count += 1
+    return count
+
+
+def legacy_validation(root: Path):
+    """What test_validation.py did: json.load every file, then every pipeline again"""
+    for folder in KIND_FOLDERS.values():
+        for path in (root / folder).glob("*.json"):
+            with open(path, 'r') as f:
+                json.load(f)
+    for path in (root / "pipelines").glob("*.json"):
+        with open(path, 'r') as f:
+            pipeline = json.load(f)
+        assert "activities" in pipeline["properties"]
+
+
+def timed(label: str, action) -> float:
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:34} {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=300, help="copies of each repo definition")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        files = generate_artifacts(root, args.copies)
+        print("Validation Benchmark")
+        print("=" * 50)
+        print(f"Files: {files}, workers: {args.workers or os.cpu_count()}\n")
+
+        legacy = timed("serial json.load (legacy)", lambda: legacy_validation(root))
+        timed("engine, cold index, in-process", lambda: ValidationEngine(
+            root, index_path=root / "inline.json", min_parallel=files + 1).validate())
+        index = root / "index.json"
+        cold = timed("engine, cold index, process pool", lambda: ValidationEngine(
+            root, index_path=index, max_workers=args.workers, min_parallel=1).validate())
+        warm = timed("engine, nothing changed", lambda: ValidationEngine(root, index_path=index).validate())
+
+        changed = root / "pipelines" / "pl_copy_blob_to_datalake_00000.json"
+        with open(changed, 'a') as f:
+            f.write("\n")
+        engine = ValidationEngine(root, index_path=index)
+        one = timed("engine, one file changed", engine.validate)
+        assert engine.stats["validated"] == 1
+
+        print(f"\nCold speedup: {legacy / cold:.1f}x, warm: {legacy / warm:.0f}x, one change: {legacy / one:.0f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
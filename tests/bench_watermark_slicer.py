@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Watermark Slicing Benchmark
+Catches up a bursty post-outage backlog in the SQLite stand-in: one serial copy vs equal-width vs row-balanced slices
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sql_standin import connect, create_watermarked_table, sql_timestamp
+from watermark_slicer import SlicedWatermarkCopy, WatermarkSlice
+
+TABLE = "SalesData"
+
+
+def backlog(rng: random.Random, rows: int, days: int, start: datetime):
+    """Steady trickle over the outage plus a replay burst that lands within one hour"""
+    steady = [start + timedelta(seconds=rng.random() * days * 86400) for _ in range(rows // 4)]
+    burst_start = start + timedelta(days=days - 1)
+    burst = [burst_start + timedelta(seconds=rng.random() * 3600) for _ in range(rows - len(steady))]
+    return steady + burst
+
+
+def make_copier(path: str, per_row_seconds: float):
+    """Read the slice from the source and pay a per-row transfer cost, as a Copy activity would"""
+    def copy_slice(piece: WatermarkSlice) -> int:
+        connection = connect(path)
+        try:
+            rows = connection.execute(f"SELECT * FROM {TABLE} WHERE LastModifiedDate > ? AND LastModifiedDate <= ?",
+                                      (piece.start, piece.end)).fetchall()
+        finally:
+            connection.close()
+        time.sleep(len(rows) * per_row_seconds)
+        return len(rows)
+    return copy_slice
+
+
+def run(path: str, label: str, planner, workers: int, per_row_seconds: float, high: datetime, low: datetime):
+    connection = connect(path)
+    connection.execute("UPDATE WatermarkTable SET WatermarkValue = ?", (sql_timestamp(low),))
+    connection.commit()
+    job = SlicedWatermarkCopy(connection, TABLE)
+    slices = planner(job)
+    counts = [connection.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE LastModifiedDate > ? AND LastModifiedDate <= ?",
+                                 (s.start, s.end)).fetchone()[0] for s in slices]
+    result = job.run(make_copier(path, per_row_seconds), max_workers=workers)
+    assert result["advanced"] and not result["failed"]
+    skew = max(counts) / (sum(counts) / len(counts))
+    print(f"  {label:30} {len(slices):3} slices  {workers:2} workers  max/mean rows {skew:5.2f}  "
+          f"{result['seconds']:6.2f}s")
+    connection.close()
+    return result["seconds"], result["rows"]
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=3, help="outage length")
+    parser.add_argument("--per-row-us", type=float, default=20.0, help="simulated transfer cost per row")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "standin.sqlite")
+    try:
+        low = datetime(2024, 1, 1)
+        high = low + timedelta(days=args.days)
+        connection = connect(path)
+        create_watermarked_table(connection, TABLE, backlog(random.Random(3), args.rows, args.days, low), low)
+        connection.close()
+        per_row = args.per_row_us / 1e6
+
+        print("Watermark Slicing Benchmark")
+        print("=" * 50)
+        print(f"Backlog: {args.rows} rows over {args.days} days, 75% in one hour\n")
+
+        def equal_width(slices):
+            # Uniform histogram: equal time ranges regardless of density
+            return lambda job: job.plan(high, slices=slices, histogram=[1] * slices)
+
+        def balanced(slices):
+            return lambda job: job.plan(high, slices=slices)
+
+        serial, total = run(path, "single range (today)", balanced(1), 1, per_row, high, low)
+        for workers in (2, 4, 8):
+            run(path, "equal-width time slices", equal_width(workers), workers, per_row, high, low)
+            elapsed, rows = run(path, "row-balanced slices", balanced(workers), workers, per_row, high, low)
+            assert rows == total
+            print(f"  {'':30} speedup vs single range: {serial / elapsed:.1f}x\n")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Workspace Sync Benchmark
+Compares a serial list-then-get crawl of a large workspace with concurrent and incremental sync
+"""
+
+import argparse
+import tempfile
+import time
+
+from standin_server import StandInConfig, StandInServer, _notebook
+from workspace_sync import ARTIFACT_KINDS, WorkspaceSync
+
+
+def serial_crawl(client) -> int:
+    """What test_notebook_operations does, for every kind: one GET per artifact, one after another"""
+    count = 0
+    for list_method, get_method in ARTIFACT_KINDS.values():
+        for item in getattr(client, list_method)():
+            getattr(client, get_method)(item["name"])
+            count += 1
+    return count
+
+
+def timed(label: str, action):
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<40} {elapsed * 1000:8.1f}ms")
+    return result, elapsed
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notebooks", type=int, default=300, help="extra notebooks in the workspace")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per request at the stand-in")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--changed", type=int, default=5, help="artifacts republished before the re-sync")
+    args = parser.parse_args()
+
+    with StandInServer(StandInConfig(latency=args.latency)) as server:
+        notebooks = server.state.definitions["notebooks"]
+        for index in range(args.notebooks):
+            notebooks[f"nb_generated_{index:04}"] = _notebook(f"nb_generated_{index:04}")
+        total = sum(len(items) for items in server.state.definitions.values())
+
+        print("Workspace Sync Benchmark")
+        print("=" * 50)
+        print(f"Workspace: {total} artifacts, {args.latency * 1000:.0f}ms per request, {args.workers} workers\n")
+
+        _, serial = timed("serial list + get", lambda: serial_crawl(server.synapse_client()))
+        with tempfile.TemporaryDirectory() as directory:
+            result, _ = timed("concurrent sync, GET per artifact", lambda: WorkspaceSync(
+                server.synapse_client(), directory, max_workers=args.workers, use_listing=False).sync())
+            assert len(result.added) == total
+        with tempfile.TemporaryDirectory() as directory:
+            client = server.synapse_client()
+            result, first = timed("concurrent sync from listings", lambda: WorkspaceSync(
+                client, directory, max_workers=args.workers).sync())
+            _, unchanged = timed("re-sync, nothing changed", lambda: WorkspaceSync(
+                client, directory, max_workers=args.workers).sync())
+            for name in list(notebooks)[:args.changed]:
+                notebooks[name] = dict(_notebook(name), properties={"cells": []})
+            result, _ = timed(f"re-sync, {args.changed} changed", lambda: WorkspaceSync(
+                client, directory, max_workers=args.workers).sync())
+            assert len(result.updated) == args.changed
+            timed("diff against pipelines/", lambda: WorkspaceSync(client, directory).diff_repo())
+
+    print(f"\nFirst sync {serial / first:.1f}x faster than the serial crawl; "
+          f"no-change re-sync {serial / unchanged:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
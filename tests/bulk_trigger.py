@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Bulk pipeline triggering
+Fires many parameter sets at one pipeline with bounded concurrency, paced by ARM's write budget
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from rate_limit import TokenBucket
+
+# Remaining-request headers ARM returns on write operations
+ARM_REMAINING_WRITE_HEADERS = (
+    "x-ms-ratelimit-remaining-subscription-writes",
+    "x-ms-ratelimit-remaining-subscription-global-writes",
+    "x-ms-ratelimit-remaining-tenant-writes",
+)
+
+
+class ArmWriteBudget(TokenBucket):
+    """Token bucket whose level is pulled down to what ARM reports as remaining"""
+
+    def __init__(self, rate: float = 10.0, capacity: float = 200.0, reserved_writes: int = 20):
+        """
+        rate, capacity: defaults mirror ARM's per-subscription write bucket (200, refilling 10/s)
+        reserved_writes: remaining writes to leave for other callers of the subscription
+        """
+        super().__init__(rate, capacity)
+        self.reserved_writes = reserved_writes
+        self.last_remaining: Optional[int] = None
+
+    def observe(self, headers: Mapping[str, str]):
+        """Clamp the bucket to the smallest remaining-writes count in `headers`"""
+        remaining = []
+        for name in ARM_REMAINING_WRITE_HEADERS:
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    remaining.append(int(value))
+                except ValueError:
+                    pass
+        if not remaining:
+            return
+        with self._lock:
+            self.last_remaining = min(remaining)
+            # A negative level makes callers wait for the deficit to refill
+            self.tokens = min(self.tokens, float(self.last_remaining - self.reserved_writes))
+
+
+def idempotency_key(pipeline_name: str, parameters: Optional[Dict]) -> str:
+    """Stable key for one (pipeline, parameter set) trigger"""
+    canonical = json.dumps({"pipeline": pipeline_name, "parameters": parameters or {}},
+                           sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class TriggerJournal:
+    """Append-only record of idempotency key -> runId, so re-running a backfill skips finished triggers"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry["runId"]
+                    except (ValueError, KeyError):
+                        # Tolerate a torn last line from an interrupted run
+                        continue
+
+    def get(self, key: str) -> Optional[str]:
+        return self.entries.get(key)
+
+    def record(self, key: str, run_id: str):
+        with self._lock:
+            self.entries[key] = run_id
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({"key": key, "runId": run_id}) + "\n")
+
+
+class BulkTrigger:
+    """Trigger one pipeline for many parameter sets and stream back (parameters, runId)"""
+
+    def __init__(self, client, pipeline_name: str, max_workers: int = 8,
+                 budget: Optional[ArmWriteBudget] = None, journal_path: Optional[str] = None):
+        """
+        client: AzureDataFactoryClient (or anything whose create_pipeline_run takes observe_headers)
+        journal_path: optional JSON-lines file of completed triggers, used for safe re-runs
+        """
+        self.client = client
+        self.pipeline_name = pipeline_name
+        self.max_workers = max_workers
+        self.budget = budget or ArmWriteBudget()
+        self.journal = TriggerJournal(journal_path)
+        self.errors: Dict[str, BaseException] = {}
+
+    def _trigger(self, key: str, parameters: Dict) -> Optional[str]:
+        self.budget.acquire()
+        # A deterministic request id lets ARM activity logs be matched back to the key
+        request_id = str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+        run_id = self.client.create_pipeline_run(self.pipeline_name, parameters, client_request_id=request_id,
+                                                 observe_headers=self.budget.observe)
+        self.journal.record(key, run_id)
+        return run_id
+
+    def run(self, parameter_sets: Iterable[Dict]) -> Iterator[Tuple[Dict, Optional[str]]]:
+        """
+        Yield (parameters, runId) as triggers complete, once per input parameter set.
+        Parameter sets already in the journal are not triggered again, and a set repeated
+        in the input is triggered once and yields the first one's outcome again.
+        Failures yield (parameters, None) and are kept in self.errors.
+        """
+        # Submit lazily so a generator of millions of parameter sets is never materialised
+        max_in_flight = self.max_workers * 2
+        repeats: Dict[str, List[Dict]] = {}  # in-flight key -> later copies waiting for its outcome
+        failed: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            for parameters in parameter_sets:
+                key = idempotency_key(self.pipeline_name, parameters)
+                if key in repeats:
+                    repeats[key].append(parameters)
+                    continue
+                if key in failed:
+                    yield parameters, None
+                    continue
+                previous = self.journal.get(key)
+                if previous is not None:
+                    yield parameters, previous
+                    continue
+
+                repeats[key] = []
+                pending[executor.submit(self._trigger, key, parameters)] = (key, parameters)
+                if len(pending) >= max_in_flight:
+                    yield from self._drain(pending, repeats, failed)
+            while pending:
+                yield from self._drain(pending, repeats, failed)
+
+    def _drain(self, pending: Dict, repeats: Dict[str, List[Dict]],
+               failed: Set[str]) -> Iterator[Tuple[Dict, Optional[str]]]:
+        """Wait for at least one trigger to finish and yield its outcome for every copy of its parameters"""
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            key, parameters = pending.pop(future)
+            try:
+                run_id = future.result()
+            except Exception as e:
+                self.errors[key] = e
+                failed.add(key)
+                run_id = None
+            for copy in [parameters] + repeats.pop(key):
+                yield copy, run_id
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+pytest fixtures for the API test modules
+Runs against the local stand-in; set ADF_LIVE_TESTS=1 (with the service's environment variables)
+to run against the real factory and workspace, which triggers real pipeline runs
+"""
+
+import os
+
+import pytest
+
+from standin_server import StandInConfig, StandInServer
+
+
+def live_tests_enabled() -> bool:
+    return os.getenv("ADF_LIVE_TESTS") == "1"
+
+
+@pytest.fixture(scope="session")
+def standin():
+    """Local ADF / Synapse stand-in with a week of run history"""
+    with StandInServer(StandInConfig(seed=0)) as server:
+        server.state.seed_history(200)
+        yield server
+
+
+def _live_client(module_name: str):
+    """Client for the real service when opted in and configured, else None"""
+    if not live_tests_enabled():
+        return None
+    from http_transport import HttpTransport
+    if module_name.endswith("synapse_api"):
+        workspace = os.getenv("SYNAPSE_WORKSPACE_NAME")
+        if not workspace:
+            return None
+        from test_synapse_api import SynapseWorkspaceClient
+        return SynapseWorkspaceClient(workspace, transport=HttpTransport())
+    if not (os.getenv("AZURE_SUBSCRIPTION_ID") and os.getenv("AZURE_DATA_FACTORY_NAME")):
+        return None
+    from test_adf_api import AzureDataFactoryClient
+    return AzureDataFactoryClient(os.environ["AZURE_SUBSCRIPTION_ID"], os.getenv("AZURE_RESOURCE_GROUP", ""),
+                                  os.environ["AZURE_DATA_FACTORY_NAME"], transport=HttpTransport())
+
+
+@pytest.fixture
+def client(request):
+    """Client for the module under test: stand-in by default, live with ADF_LIVE_TESTS=1"""
+    module_name = request.module.__name__
+    client = _live_client(module_name)
+    if client is None:
+        standin = request.getfixturevalue("standin")
+        client = standin.synapse_client() if module_name.endswith("synapse_api") else standin.adf_client()
+    try:
+        yield client
+    finally:
+        # Each client gets its own pooled transport; release its connections
+        client.transport.close()
+
+
+@pytest.fixture
+def pipeline_name() -> str:
+    return os.getenv("TEST_PIPELINE_NAME", "pl_copy_blob_to_datalake")
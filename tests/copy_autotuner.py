@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Copy-throughput autotuner
+Fits throughput against parallelCopies, ForEach concurrency and DIU from Copy activity runs and recommends settings
+"""
+
+import bisect
+import copy
+import math
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from run_utils import parse_timestamp
+from pipeline_walk import nested_scopes
+
+# Values the service accepts for dataIntegrationUnits
+DIU_LEVELS = (2, 4, 8, 16, 32, 64, 128, 256)
+MAX_PARALLEL_COPIES = 50
+MAX_BATCH_COUNT = 50
+
+# Levels proposed for exploration when the history has too few distinct settings to fit
+CONCURRENCY_LADDER = (1, 2, 4, 8, 16, 32, 50)
+
+# Settle for the smallest setting reaching this share of the modelled peak: past the knee, extra
+# concurrency mostly adds load on the source and cost
+DEFAULT_KNEE = 0.9
+
+# Distinct levels needed before a curve is fitted
+MIN_LEVELS = 3
+
+_TABLE_PATTERN = re.compile(r"\bFROM\s+([\[\]\w.]+)", re.IGNORECASE)
+
+
+class CopyObservation(NamedTuple):
+    pipeline: str
+    activity: str
+    source: str                 # table or dataset the copy read
+    parallel_copies: int
+    diu: int
+    concurrency: int            # copies of the same activity running at the same time in the run
+    bytes_per_second: float
+    data_read: int
+
+
+class ScalabilityFit(NamedTuple):
+    """Universal Scalability Law: X(n) = lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))"""
+    lam: float
+    sigma: float
+    kappa: float
+    levels: Tuple[int, ...]
+
+    def throughput(self, n: float) -> float:
+        return self.lam * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+
+    def knee(self, limit: int, fraction: float = DEFAULT_KNEE, candidates: Optional[Sequence[int]] = None) -> int:
+        """Smallest level reaching `fraction` of the best throughput among candidates (1..limit)"""
+        candidates = list(candidates or range(1, limit + 1))
+        best = max(self.throughput(n) for n in candidates)
+        return next(n for n in candidates if self.throughput(n) >= fraction * best)
+
+
+def fit_scalability(levels: Sequence[float], throughputs: Sequence[float]) -> Optional[ScalabilityFit]:
+    """
+    Least-squares USL fit. Samples are first reduced to the geometric mean per level, so
+    settings that vary independently between runs scale the curve without bending it.
+    n / X(n) is then quadratic in n: a polynomial fit gives the coefficients, sigma and
+    kappa are clamped to their physical range and lam refitted.
+    Returns None with fewer than MIN_LEVELS distinct levels.
+    """
+    logs: Dict[int, List[float]] = {}
+    for level, throughput in zip(levels, throughputs):
+        if level > 0 and throughput > 0:
+            logs.setdefault(int(level), []).append(math.log(throughput))
+    distinct = tuple(sorted(logs))
+    if len(distinct) < MIN_LEVELS:
+        return None
+    n = np.asarray(distinct, dtype=np.float64)
+    x = np.exp([np.mean(logs[level]) for level in distinct])
+    c, b, a = np.polyfit(n, n / x, 2)
+    lam = 1.0 / (a + b + c) if a + b + c > 0 else float(np.max(x / n))
+    sigma = min(max(1 - a * lam, 0.0), 1.0)
+    kappa = max(c * lam, 0.0)
+    shape = n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+    lam = float(np.dot(x, shape) / np.dot(shape, shape))
+    return ScalabilityFit(lam, sigma, kappa, distinct)
+
+
+def source_of(run: Dict) -> str:
+    """The table a Copy read: from its source query, else its input dataset, else the activity name"""
+    source = (run.get("input") or {}).get("source") or {}
+    query = source.get("sqlReaderQuery")
+    if isinstance(query, dict):
+        query = query.get("value")
+    if isinstance(query, str):
+        match = _TABLE_PATTERN.search(query)
+        if match:
+            return match.group(1).replace("[", "").replace("]", "")
+    for dataset in (run.get("input") or {}).get("inputs") or []:
+        if dataset.get("referenceName"):
+            parameters = dataset.get("parameters") or {}
+            return ".".join(str(value) for value in parameters.values()) or dataset["referenceName"]
+    return run.get("activityName") or "?"
+
+
+def observations_from_activity_runs(activity_runs: Iterable[Dict],
+                                    source: Callable[[Dict], str] = source_of) -> List[CopyObservation]:
+    """
+    Succeeded Copy runs as observations, in input order. Concurrency is the number of copies
+    of the same activity in the same pipeline run running when each copy started: the
+    occupied ForEach slots. Unlike an average over the copy's span, it does not depend on
+    how long the copy itself took.
+    """
+    groups: Dict[Tuple[str, str], List] = {}
+    for index, run in enumerate(activity_runs):
+        if run.get("activityType") != "Copy" or run.get("status") != "Succeeded":
+            continue
+        output = run.get("output") or {}
+        seconds = output.get("copyDuration") or (run.get("durationInMs") or 0) / 1000
+        start, end = parse_timestamp(run.get("activityRunStart")), parse_timestamp(run.get("activityRunEnd"))
+        if not output.get("dataRead") or not seconds or start is None or end is None or end <= start:
+            continue
+        groups.setdefault((run.get("pipelineRunId"), run.get("activityName")), []).append(
+            (start.timestamp(), end.timestamp(), index, run, output, seconds))
+
+    observations = []
+    for copies in groups.values():
+        starts = sorted(c[0] for c in copies)
+        ends = sorted(c[1] for c in copies)
+        for start, end, index, run, output, seconds in copies:
+            running = bisect.bisect_right(starts, start) - bisect.bisect_right(ends, start)
+            observations.append((index, CopyObservation(
+                run.get("pipelineName"), run.get("activityName"), source(run),
+                int(output.get("usedParallelCopies") or 1), int(output.get("usedDataIntegrationUnits") or 4),
+                max(1, running), output["dataRead"] / seconds, int(output["dataRead"]))))
+    return [observation for _, observation in sorted(observations)]
+
+
+def main_effects(factors: Sequence[Sequence], log_values: Sequence[float]) -> List[Dict]:
+    """
+    Least-squares fit of log throughput as a sum of one effect per factor level
+    (source, parallelCopies, DIU, fan-out). Effects are relative within a factor; they
+    separate settings that changed together in the history.
+    """
+    columns = {}
+    for row in factors:
+        for index, level in enumerate(row):
+            columns.setdefault((index, level), len(columns))
+    design = np.zeros((len(factors), len(columns)))
+    for i, row in enumerate(factors):
+        for index, level in enumerate(row):
+            design[i, columns[(index, level)]] = 1.0
+    solution = np.linalg.lstsq(design, np.asarray(log_values, dtype=np.float64), rcond=None)[0]
+    effects: List[Dict] = [{} for _ in range(len(factors[0]) if factors else 0)]
+    for (index, level), column in columns.items():
+        effects[index][level] = float(solution[column])
+    return effects
+
+
+class CopyTuner:
+    """Per-source and per-activity throughput curves with recommended settings"""
+
+    def __init__(self, observations: Iterable[CopyObservation], knee: float = DEFAULT_KNEE):
+        self.observations = list(observations)
+        self.knee = knee
+
+    def _select(self, pipeline: str, activity: str) -> List[CopyObservation]:
+        return [o for o in self.observations if o.pipeline == pipeline and o.activity == activity]
+
+    @staticmethod
+    def _effects(observations: Sequence[CopyObservation]) -> List[Dict]:
+        """Level effects for (source, parallel copies, DIU, concurrency)"""
+        return main_effects([(o.source, o.parallel_copies, o.diu, o.concurrency) for o in observations],
+                            [math.log(o.bytes_per_second) for o in observations])
+
+    @staticmethod
+    def _explore(levels: Sequence[int], ladder: Sequence[int]) -> List[int]:
+        """The ladder steps just below and above what has been tried, to widen the history"""
+        if not levels:
+            return []
+        below = [level for level in ladder if level < min(levels)]
+        above = [level for level in ladder if level > max(levels)]
+        return below[-1:] + above[:1]
+
+    def parallel_copies(self, pipeline: str, activity: str) -> Dict:
+        """
+        One parallelCopies value for every source the activity reads. Each source gets its
+        own curve over rates adjusted for DIU and fan-out; the value is the knee of the
+        curves combined by data volume.
+        """
+        observations = self._select(pipeline, activity)
+        if not observations:
+            return {"value": None, "fitted_sources": 0, "explore": []}
+        _, _, diu_effect, fanout_effect = self._effects(observations)
+        fits, weights = {}, {}
+        for source in sorted({o.source for o in observations}):
+            rows = [o for o in observations if o.source == source]
+            fit = fit_scalability([o.parallel_copies for o in rows],
+                                  [o.bytes_per_second / math.exp(diu_effect[o.diu] + fanout_effect[o.concurrency])
+                                   for o in rows])
+            if fit is not None:
+                fits[source] = fit
+                weights[source] = sum(o.data_read for o in rows)
+        if not fits:
+            levels = [o.parallel_copies for o in observations]
+            return {"value": None, "fitted_sources": 0, "explore": self._explore(levels, CONCURRENCY_LADDER)}
+
+        total_weight = sum(weights.values())
+        candidates = range(1, MAX_PARALLEL_COPIES + 1)
+        combined = [sum(weights[s] / total_weight * fits[s].throughput(p) for s in fits) for p in candidates]
+        best = max(combined)
+        value = next(p for p, x in zip(candidates, combined) if x >= self.knee * best)
+        return {"value": value, "fitted_sources": len(fits), "fits": {s: fit._asdict() for s, fit in fits.items()}}
+
+    def batch_count(self, pipeline: str, activity: str) -> Dict:
+        """ForEach batchCount from aggregate throughput: adjusted per-copy rate x concurrent copies"""
+        observations = self._select(pipeline, activity)
+        fanout_effect = self._effects(observations)[3] if observations else {}
+        levels = sorted(fanout_effect)
+        fit = fit_scalability(levels, [n * math.exp(fanout_effect[n]) for n in levels])
+        if fit is None:
+            return {"value": None, "explore": self._explore(levels, CONCURRENCY_LADDER)}
+        return {"value": fit.knee(MAX_BATCH_COUNT, self.knee), "fit": fit._asdict()}
+
+    def data_integration_units(self, pipeline: str, activity: str) -> Dict:
+        """Smallest allowed DIU reaching the knee of the adjusted per-copy throughput curve"""
+        observations = self._select(pipeline, activity)
+        diu_effect = self._effects(observations)[2] if observations else {}
+        levels = sorted(diu_effect)
+        fit = fit_scalability(levels, [math.exp(diu_effect[d]) for d in levels])
+        if fit is None:
+            return {"value": None, "explore": self._explore(levels, DIU_LEVELS)}
+        return {"value": fit.knee(DIU_LEVELS[-1], self.knee, DIU_LEVELS), "fit": fit._asdict()}
+
+    def recommend(self, pipeline: str, activity: str) -> Dict:
+        return {
+            "pipeline": pipeline,
+            "activity": activity,
+            "samples": len(self._select(pipeline, activity)),
+            "parallelCopies": self.parallel_copies(pipeline, activity),
+            "batchCount": self.batch_count(pipeline, activity),
+            "dataIntegrationUnits": self.data_integration_units(pipeline, activity),
+        }
+
+
+def patch_pipeline(definition: Dict, recommendation: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Copy of a pipeline definition with the recommended values applied to the Copy activity
+    (parallelCopies, dataIntegrationUnits) and its enclosing ForEach (batchCount).
+    Settings without a fitted value are left alone. Returns (patched definition, changes).
+    """
+    patched = copy.deepcopy(definition)
+    changes = []
+
+    def apply(activity: Dict, key: str, value):
+        current = (activity.get("typeProperties") or {}).get(key)
+        if value is not None and current != value:
+            changes.append(f"{activity['name']}.{key}: {current} -> {value}")
+            if activity.get("typeProperties") is None:
+                activity["typeProperties"] = {}
+            activity["typeProperties"][key] = value
+
+    def visit(activities: List[Dict], parent: Optional[Dict]):
+        for activity in activities:
+            if activity.get("name") == recommendation["activity"] and activity.get("type") == "Copy":
+                apply(activity, "parallelCopies", recommendation["parallelCopies"]["value"])
+                apply(activity, "dataIntegrationUnits", recommendation["dataIntegrationUnits"]["value"])
+                if parent is not None:
+                    apply(parent, "batchCount", recommendation["batchCount"]["value"])
+            for _, scope in nested_scopes(activity):
+                visit(scope, activity if activity.get("type") == "ForEach" else parent)
+
+    visit(patched.get("properties", {}).get("activities", []), None)
+    return patched, changes
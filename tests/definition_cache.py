@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Conditional-GET cache for pipeline, dataset, linked service and notebook definitions
+Revalidates with ETag / If-None-Match; definitions served without an ETag are re-downloaded
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class _Entry:
+    __slots__ = ("payload", "etag", "validated_at")
+
+    def __init__(self, payload: Any, etag: Optional[str], validated_at: float):
+        self.payload = payload
+        self.etag = etag
+        self.validated_at = validated_at
+
+
+class DefinitionCache:
+    """LRU cache of definition GETs with a freshness TTL and conditional revalidation"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        max_entries: least recently used definitions are evicted beyond this
+        ttl: seconds a definition is served without asking the service; 0 revalidates every call
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"fresh": 0, "not_modified": 0, "downloaded": 0}
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, url: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def _store(self, url: str, entry: _Entry):
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def get(self, transport, url: str, headers: Dict[str, str]) -> Any:
+        """GET `url` through `transport`, reusing the cached copy whenever the service says it is current"""
+        entry = self._lookup(url)
+        now = self.clock()
+        if entry is not None and now - entry.validated_at < self.ttl:
+            self._count("fresh")
+            return copy.deepcopy(entry.payload)
+
+        request_headers = dict(headers)
+        if entry is not None and entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+
+        response = transport.get(url, headers=request_headers)
+        if response.status_code == 304 and entry is not None:
+            entry.validated_at = now
+            self._count("not_modified")
+            return copy.deepcopy(entry.payload)
+
+        response.raise_for_status()
+        payload = response.json()
+        etag = response.headers.get("ETag") or (payload.get("etag") if isinstance(payload, dict) else None)
+        self._store(url, _Entry(payload, etag, now))
+        self._count("downloaded")
+        return copy.deepcopy(payload)
+
+    def invalidate(self, url: Optional[str] = None):
+        """Forget one URL, or everything"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the Data Factory and Synapse REST clients
+Keeps per-host keep-alive connection pools and retries throttled requests
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Status codes that mean "not processed, try again later"
+RETRY_STATUS_CODES = (429, 503)
+
+# Azure services may report the retry delay in any of these headers
+RETRY_AFTER_MS_HEADERS = ("retry-after-ms", "x-ms-retry-after-ms")
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the server-requested retry delay in seconds, if any"""
+    for name in RETRY_AFTER_MS_HEADERS:
+        value = headers.get(name)
+        if value:
+            try:
+                return max(float(value) / 1000.0, 0.0)
+            except ValueError:
+                pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def retry_delay(headers: Mapping[str, str], attempt: int,
+                backoff_base: float = 0.5, backoff_max: float = 60.0) -> float:
+    """Compute a jittered delay before retry number `attempt` (0-based)"""
+    retry_after = parse_retry_after(headers)
+    if retry_after is not None:
+        # Honour the server hint, spreading callers so they don't return in lockstep
+        return min(retry_after * (1.0 + random.uniform(0.0, 0.2)), backoff_max)
+    # Full-jitter exponential backoff
+    return random.uniform(0.0, min(backoff_max, backoff_base * (2 ** attempt)))
+
+
+class HttpTransport:
+    """Pooled, keep-alive HTTP transport with Retry-After aware retries"""
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32,
+                 max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 60.0, timeout: Optional[float] = 60.0):
+        """
+        pool_connections: number of hosts to keep a connection pool for
+        pool_maxsize: keep-alive connections kept per host
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                **kwargs) -> requests.Response:
+        """Send a request, retrying 429/503 responses with jittered backoff"""
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+
+            delay = retry_delay(response.headers, attempt, self.backoff_base, self.backoff_max)
+            # Drain the body so the connection goes back to the pool
+            response.content
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request"""
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """Return the process-wide transport shared by all clients"""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Local KQL executor
+Runs the monitoring/kql_queries.kql subset (where, project, extend, summarize, bin, order by) as NumPy operations over a RunHistoryStore
+"""
+
+import math
+import os
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from run_history_store import EPOCH, RunHistoryStore
+
+KQL_QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "monitoring", "kql_queries.kql")
+
+LONG, REAL, BOOL, DATETIME, TIMESPAN, STRING = "long", "real", "bool", "datetime", "timespan", "string"
+
+# Log Analytics column -> (store column, kind). TimeGenerated is the run start, the store's
+# partition key, so time filters prune whole days.
+TABLE_SCHEMAS: Dict[str, Tuple[str, Dict[str, Tuple[Optional[str], str]]]] = {
+    "ADFPipelineRun": ("pipeline_runs", {
+        "TimeGenerated": ("run_start", DATETIME),
+        "Start": ("run_start", DATETIME),
+        "End": ("run_end", DATETIME),
+        "PipelineName": ("pipeline", STRING),
+        "RunId": ("run_id", STRING),
+        "Status": ("status", STRING),
+        "DurationMs": ("duration_ms", LONG),
+        "FailureMessage": (None, STRING),
+    }),
+    "ADFActivityRun": ("activity_runs", {
+        "TimeGenerated": ("start", DATETIME),
+        "Start": ("start", DATETIME),
+        "End": ("end", DATETIME),
+        "PipelineName": ("pipeline", STRING),
+        "PipelineRunId": ("pipeline_run_id", STRING),
+        "ActivityName": ("activity", STRING),
+        "ActivityType": ("activity_type", STRING),
+        "Status": ("status", STRING),
+        "DurationMs": ("duration_ms", LONG),
+        "Output.rowsCopied": ("rows_copied", LONG),
+        "Output.dataRead": ("data_read", LONG),
+        "Output.dataWritten": ("data_written", LONG),
+        "Output.copyDuration": ("copy_duration_s", REAL),
+        "Output.usedDataIntegrationUnits": ("data_integration_units", REAL),
+        "Output.usedParallelCopies": ("parallel_copies", LONG),
+        "ErrorCode": (None, STRING),
+        "FailureMessage": (None, STRING),
+        "Input.source.type": (None, STRING),
+    }),
+}
+
+_TIMESPAN_MS = {"d": 86_400_000, "h": 3_600_000, "m": 60_000, "s": 1000, "ms": 1}
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*)
+  | (?P<timespan>\d+(?:\.\d+)?(?:ms|d|h|m|s)\b)
+  | (?P<number>\d+\.\d*|\.\d+|\d+)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+  | (?P<op>==|!=|<=|>=|=~|!~|\.\.|[-+*/%<>=(),|])
+""", re.VERBOSE)
+
+
+class Strings:
+    """Dictionary-encoded string column: codes index `values`; -1 is null"""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes: np.ndarray, values: np.ndarray):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_objects(cls, items: Sequence) -> "Strings":
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter((-1 if item is None else lookup.setdefault(item, len(lookup)) for item in items),
+                            dtype=np.int64, count=len(items))
+        return cls(codes, np.array(list(lookup), dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index) -> "Strings":
+        return Strings(self.codes[index], self.values)
+
+    def decode(self) -> np.ndarray:
+        return np.append(self.values, None)[self.codes]
+
+    def where(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Rows whose value satisfies predicate, testing each distinct value once"""
+        hits = np.fromiter((predicate(value) for value in self.values), dtype=bool, count=len(self.values))
+        return np.append(hits, False)[self.codes]
+
+
+class Value(NamedTuple):
+    data: object        # ndarray (numbers as float64, NaN = null; datetimes/timespans in ms), Strings or scalar
+    kind: str
+
+
+def _is_column(value: Value) -> bool:
+    return isinstance(value.data, (np.ndarray, Strings))
+
+
+def _broadcast(value: Value, rows: int) -> Value:
+    if _is_column(value):
+        return value
+    if value.kind == STRING:
+        return Value(Strings.from_objects([value.data] * rows), STRING)
+    return Value(np.full(rows, np.nan if value.data is None else value.data, dtype=np.float64), value.kind)
+
+
+# Expression tree
+class Literal(NamedTuple):
+    value: object
+    kind: str
+
+
+class Column(NamedTuple):
+    name: str
+
+
+class Call(NamedTuple):
+    name: str
+    args: Tuple
+
+
+class Binary(NamedTuple):
+    op: str
+    left: object
+    right: object
+
+
+class Negate(NamedTuple):
+    operand: object
+
+
+class InList(NamedTuple):
+    operand: object
+    values: Tuple
+
+
+AGGREGATES = {"count", "countif", "sum", "avg", "max", "min", "dcount"}
+
+
+def _columns_in(node) -> set:
+    if isinstance(node, Column):
+        return {node.name}
+    if isinstance(node, Call):
+        return set().union(*(_columns_in(arg) for arg in node.args)) if node.args else set()
+    if isinstance(node, Binary):
+        return _columns_in(node.left) | _columns_in(node.right)
+    if isinstance(node, Negate):
+        return _columns_in(node.operand)
+    if isinstance(node, InList):
+        return _columns_in(node.operand)
+    return set()
+
+
+def _default_name(node, index: int) -> str:
+    if isinstance(node, Column):
+        return node.name
+    if isinstance(node, Call):
+        if node.name == "bin" and isinstance(node.args[0], Column):
+            return node.args[0].name
+        if node.name in AGGREGATES:
+            if not node.args:
+                return f"{node.name}_"
+            if isinstance(node.args[0], Column):
+                return f"{node.name}_{node.args[0].name}"
+    return f"Column{index + 1}"
+
+
+class _Parser:
+    """Recursive descent over one pipe segment"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ("end", "")
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, text: str) -> bool:
+        if self.peek()[1] == text:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text: str):
+        if not self.accept(text):
+            raise ValueError(f"Expected {text!r} but found {self.peek()[1] or 'end of query'!r}")
+
+    def at_end(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    def name(self) -> str:
+        kind, text = self.take()
+        if kind != "name":
+            raise ValueError(f"Expected a name but found {text or 'end of query'!r}")
+        return text
+
+    # Expressions, loosest binding first
+    def expression(self):
+        node = self.conjunction()
+        while self.accept("or"):
+            node = Binary("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.comparison()
+        while self.accept("and"):
+            node = Binary("and", node, self.comparison())
+        return node
+
+    def comparison(self):
+        node = self.additive()
+        kind, text = self.peek()
+        if text in ("==", "!=", "<", "<=", ">", ">=", "=~", "!~") or \
+                (kind == "name" and text in ("contains", "has", "startswith", "endswith")):
+            self.take()
+            return Binary(text, node, self.additive())
+        if text == "in":
+            self.take()
+            self.expect("(")
+            values = [self.additive()]
+            while self.accept(","):
+                values.append(self.additive())
+            self.expect(")")
+            if not all(isinstance(v, Literal) for v in values):
+                raise ValueError("'in' takes a list of literals")
+            return InList(node, tuple(v.value for v in values))
+        if text == "between":
+            self.take()
+            self.expect("(")
+            low = self.additive()
+            self.expect("..")
+            high = self.additive()
+            self.expect(")")
+            return Binary("and", Binary(">=", node, low), Binary("<=", node, high))
+        return node
+
+    def additive(self):
+        node = self.multiplicative()
+        while self.peek()[1] in ("+", "-"):
+            node = Binary(self.take()[1], node, self.multiplicative())
+        return node
+
+    def multiplicative(self):
+        node = self.unary()
+        while self.peek()[1] in ("*", "/", "%"):
+            node = Binary(self.take()[1], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.accept("-"):
+            return Negate(self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "number":
+            return Literal(float(text), REAL if "." in text else LONG)
+        if kind == "timespan":
+            unit = "ms" if text.endswith("ms") else text[-1]
+            return Literal(float(text[:-len(unit)]) * _TIMESPAN_MS[unit], TIMESPAN)
+        if kind == "string":
+            return Literal(bytes(text[1:-1], "utf-8").decode("unicode_escape"), STRING)
+        if text == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        if kind == "name":
+            if text in ("true", "false"):
+                return Literal(text == "true", BOOL)
+            if self.accept("("):
+                args = []
+                if not self.accept(")"):
+                    args.append(self.expression())
+                    while self.accept(","):
+                        args.append(self.expression())
+                    self.expect(")")
+                return Call(text, tuple(args))
+            return Column(text)
+        raise ValueError(f"Unexpected {text or 'end of query'!r}")
+
+    def assignments(self, stop: Sequence[str] = ()) -> List[Tuple[str, object]]:
+        """`[Name =] expr, ...` until the end or a stop keyword"""
+        items = []
+        while True:
+            if self.peek()[0] == "name" and self.peek(1)[1] == "=":
+                name = self.take()[1]
+                self.take()
+                node = self.expression()
+            else:
+                node = self.expression()
+                name = _default_name(node, len(items))
+            items.append((name, node))
+            if not self.accept(","):
+                break
+        if not self.at_end() and self.peek()[1] not in stop:
+            raise ValueError(f"Unexpected {self.peek()[1]!r}")
+        return items
+
+    def sort_keys(self) -> List[Tuple[object, bool]]:
+        keys = []
+        while True:
+            node = self.expression()
+            descending = True           # KQL sorts descending unless told otherwise
+            if self.accept("asc"):
+                descending = False
+            else:
+                self.accept("desc")
+            if self.accept("nulls"):
+                self.name()
+            keys.append((node, descending))
+            if not self.accept(","):
+                return keys
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"Unexpected character {text[position]!r} at {position}")
+        position = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+class Operator(NamedTuple):
+    name: str       # where, project, extend, summarize, sort, take, render
+    args: tuple
+
+
+class Query(NamedTuple):
+    table: str
+    operators: Tuple[Operator, ...]
+    columns: Optional[frozenset]        # columns to load; None = every column
+    time_floor: Optional[object]        # expression bounding TimeGenerated from below, for partition pruning
+
+
+@lru_cache(maxsize=256)
+def compile_query(text: str) -> Query:
+    """Parse a query (cached by text). Raises ValueError for anything outside the subset."""
+    tokens = _tokenize(text)
+    if tokens and tokens[0][1] == "let":
+        raise ValueError("Unsupported statement: let")
+    segments: List[List[Tuple[str, str]]] = [[]]
+    depth = 0
+    for token in tokens:
+        if token[1] == "|" and depth == 0:
+            segments.append([])
+            continue
+        depth += {"(": 1, ")": -1}.get(token[1], 0)
+        segments[-1].append(token)
+    if len(segments[0]) != 1 or segments[0][0][0] != "name":
+        raise ValueError("A query starts with a table name")
+    table = segments[0][0][1]
+    if table not in TABLE_SCHEMAS:
+        raise KeyError(f"Table not stored locally: {table}")
+
+    operators = []
+    for segment in segments[1:]:
+        parser = _Parser(segment)
+        keyword = parser.name()
+        if keyword == "where":
+            operators.append(Operator("where", (parser.expression(),)))
+        elif keyword in ("project", "extend"):
+            operators.append(Operator(keyword, (parser.assignments(),)))
+        elif keyword == "summarize":
+            aggregates = parser.assignments(stop=("by",))
+            groups = parser.assignments() if parser.accept("by") else []
+            operators.append(Operator("summarize", (aggregates, groups)))
+        elif keyword in ("order", "sort"):
+            parser.expect("by")
+            operators.append(Operator("sort", (parser.sort_keys(),)))
+        elif keyword in ("take", "limit"):
+            operators.append(Operator("take", (int(parser.take()[1]),)))
+        elif keyword == "top":
+            count = int(parser.take()[1])
+            parser.expect("by")
+            operators += [Operator("sort", (parser.sort_keys(),)), Operator("take", (count,))]
+        elif keyword == "render":
+            operators.append(Operator("render", (segment[1][1] if len(segment) > 1 else None,)))
+            continue
+        else:
+            raise ValueError(f"Unsupported operator: {keyword}")
+        if not parser.at_end():
+            raise ValueError(f"Unexpected {parser.peek()[1]!r} after {keyword}")
+
+    # Load only what the query reads up to its first projection
+    referenced = set()
+    columns: Optional[frozenset] = None
+    for op in operators:
+        referenced |= _operator_columns(op)
+        if op.name in ("project", "summarize"):
+            columns = frozenset(referenced)
+            break
+
+    time_floor = None
+    for op in operators:
+        if op.name != "where":
+            break
+        time_floor = _time_floor(op.args[0]) or time_floor
+    return Query(table, tuple(operators), columns, time_floor)
+
+
+def _operator_columns(op: Operator) -> set:
+    if op.name == "where":
+        return _columns_in(op.args[0])
+    if op.name in ("project", "extend"):
+        return set().union(*(_columns_in(node) for _, node in op.args[0]))
+    if op.name == "summarize":
+        return set().union(*(_columns_in(node) for _, node in op.args[0] + op.args[1]))
+    if op.name == "sort":
+        return set().union(*(_columns_in(node) for node, _ in op.args[0]))
+    return set()
+
+
+def _time_floor(node) -> Optional[object]:
+    """`TimeGenerated > X` (or >=, between) in a conjunction, with X free of columns"""
+    if isinstance(node, Binary) and node.op == "and":
+        return _time_floor(node.left) or _time_floor(node.right)
+    if isinstance(node, Binary) and node.op in (">", ">=") and node.left == Column("TimeGenerated") \
+            and not _columns_in(node.right):
+        return node.right
+    return None
+
+
+def split_queries(text: str) -> Dict[str, str]:
+    """Queries in a .kql file keyed by the comment line above each"""
+    queries: Dict[str, str] = {}
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n")):
+        lines = block.strip().splitlines()
+        titles = [line[2:].strip() for line in lines if line.startswith("//") and not line.startswith("// ==")]
+        body = "\n".join(line for line in lines if not line.startswith("//")).strip()
+        if titles and body:
+            queries[titles[-1]] = body
+    return queries
+
+
+class KqlResult:
+    """Columns of a query result"""
+
+    def __init__(self, columns: Dict[str, Value], render: Optional[str] = None):
+        self.columns = columns
+        self.render = render
+
+    def __len__(self) -> int:
+        for value in self.columns.values():
+            return len(value.data)
+        return 0
+
+    def column(self, name: str) -> List:
+        value = self.columns[name]
+        data = value.data
+        if value.kind == STRING:
+            return list(data.decode())
+        if value.kind == BOOL:
+            return [bool(x) for x in data]
+        out = []
+        for x in data.tolist():
+            if x is None or (isinstance(x, float) and math.isnan(x)):
+                out.append(None)
+            elif value.kind == DATETIME:
+                out.append(EPOCH + timedelta(milliseconds=x))
+            elif value.kind == TIMESPAN:
+                out.append(timedelta(milliseconds=x))
+            elif value.kind == LONG:
+                out.append(int(x))
+            else:
+                out.append(x)
+        return out
+
+    def rows(self) -> List[Dict]:
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*(self.column(name) for name in names))]
+
+
+def _numeric(value: Value, context: str) -> object:
+    if value.kind == STRING:
+        raise ValueError(f"{context} needs a number, not a string")
+    data = value.data
+    return np.nan if data is None else data
+
+
+def _arithmetic(op: str, left: Value, right: Value) -> Value:
+    a, b = _numeric(left, op), _numeric(right, op)
+    kinds = (left.kind, right.kind)
+    if op == "+":
+        kind = DATETIME if DATETIME in kinds else TIMESPAN if kinds == (TIMESPAN, TIMESPAN) else None
+        return Value(a + b, kind or _number_kind(kinds))
+    if op == "-":
+        if kinds == (DATETIME, DATETIME):
+            return Value(a - b, TIMESPAN)
+        kind = DATETIME if left.kind == DATETIME else TIMESPAN if TIMESPAN in kinds else None
+        return Value(a - b, kind or _number_kind(kinds))
+    if op == "*":
+        return Value(a * b, TIMESPAN if TIMESPAN in kinds else _number_kind(kinds))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if op == "/":
+            if kinds == (TIMESPAN, TIMESPAN):
+                return Value(np.divide(a, b), REAL)
+            if kinds == (LONG, LONG):
+                # long / long stays long, truncated toward zero; dividing by zero gives null
+                return Value(np.where(b == 0, np.nan, np.trunc(np.divide(a, b))), LONG)
+            return Value(np.divide(a, b), TIMESPAN if left.kind == TIMESPAN else REAL)
+        return Value(np.fmod(a, b), _number_kind(kinds))
+
+
+def _number_kind(kinds: Tuple[str, str]) -> str:
+    return LONG if all(kind in (LONG, BOOL) for kind in kinds) else REAL
+
+
+def _string_compare(op: str, left: Value, right: Value) -> np.ndarray:
+    if isinstance(left.data, Strings) and not _is_column(right):
+        target = right.data
+        if op == "==":
+            return left.data.where(lambda value: value == target)
+        if op == "!=":
+            return ~left.data.where(lambda value: value == target) & (left.data.codes >= 0)
+        lowered = (target or "").lower()
+        predicates = {
+            "=~": lambda value: value.lower() == lowered,
+            "!~": lambda value: value.lower() != lowered,
+            "contains": lambda value: lowered in value.lower(),
+            "has": lambda value: lowered in value.lower(),
+            "startswith": lambda value: value.lower().startswith(lowered),
+            "endswith": lambda value: value.lower().endswith(lowered),
+        }
+        return left.data.where(predicates[op])
+    if not _is_column(left) and isinstance(right.data, Strings):
+        return _string_compare({"==": "==", "!=": "!="}[op], right, left)
+    a = left.data.decode() if isinstance(left.data, Strings) else left.data
+    b = right.data.decode() if isinstance(right.data, Strings) else right.data
+    if op not in ("==", "!="):
+        raise ValueError(f"Unsupported string comparison: {op}")
+    equal = np.asarray(a == b, dtype=bool)
+    return equal if op == "==" else ~equal
+
+
+_COMPARE = {"==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal,
+            ">": np.greater, ">=": np.greater_equal}
+
+
+class KqlExecutor:
+    """Compiles and runs KQL queries against a RunHistoryStore"""
+
+    def __init__(self, store: RunHistoryStore, clock: Callable[[], datetime] = datetime.utcnow):
+        self.store = store
+        self.clock = clock
+
+    # Loading
+    def _load(self, query: Query, now_ms: float) -> Dict[str, Value]:
+        table, schema = TABLE_SCHEMAS[query.table]
+        wanted = [name for name in schema if query.columns is None or name in query.columns]
+        start = None
+        if query.time_floor is not None:
+            floor = self._evaluate(query.time_floor, {}, now_ms)
+            if floor.kind == DATETIME and floor.data is not None and not _is_column(floor):
+                start = EPOCH + timedelta(milliseconds=float(floor.data))
+        # The time column always comes along so row counts survive queries that read no columns
+        stored = sorted({schema[name][0] for name in wanted if schema[name][0] is not None}
+                        | {schema["TimeGenerated"][0]})
+        data = self.store.load(table, start=start, columns=stored)
+        rows = len(data[schema["TimeGenerated"][0]])
+        strings = np.array(self.store.strings.strings, dtype=object)
+
+        frame: Dict[str, Value] = {}
+        for name in wanted:
+            column, kind = schema[name]
+            if column is None:
+                frame[name] = Value(Strings(np.full(rows, -1, dtype=np.int64), np.empty(0, dtype=object)), STRING)
+            elif kind == STRING and data[column].dtype.kind == "S":
+                frame[name] = Value(Strings.from_objects([raw.decode() for raw in data[column].tolist()]), STRING)
+            elif kind == STRING:
+                frame[name] = Value(Strings(data[column].astype(np.int64), strings), STRING)
+            else:
+                values = data[column].astype(np.float64)
+                if data[column].dtype.kind == "i":
+                    values[data[column] < 0] = np.nan
+                frame[name] = Value(values, kind)
+        return frame
+
+    # Expressions
+    def _evaluate(self, node, frame: Dict[str, Value], now_ms: float) -> Value:
+        if isinstance(node, Literal):
+            return Value(node.value, node.kind)
+        if isinstance(node, Column):
+            if node.name not in frame:
+                raise ValueError(f"Unknown column: {node.name}")
+            return frame[node.name]
+        if isinstance(node, Negate):
+            value = self._evaluate(node.operand, frame, now_ms)
+            return Value(-_numeric(value, "-"), value.kind)
+        if isinstance(node, InList):
+            value = self._evaluate(node.operand, frame, now_ms)
+            if isinstance(value.data, Strings):
+                allowed = set(node.values)
+                return Value(value.data.where(lambda item: item in allowed), BOOL)
+            return Value(np.isin(value.data, np.asarray(node.values, dtype=np.float64)), BOOL)
+        if isinstance(node, Binary):
+            left = self._evaluate(node.left, frame, now_ms)
+            right = self._evaluate(node.right, frame, now_ms)
+            return self._binary(node.op, left, right)
+        if isinstance(node, Call):
+            if node.name in AGGREGATES:
+                raise ValueError(f"{node.name}() is only valid in summarize")
+            return self._call(node.name, [self._evaluate(arg, frame, now_ms) for arg in node.args], now_ms)
+        raise ValueError(f"Unsupported expression: {node}")
+
+    @staticmethod
+    def _binary(op: str, left: Value, right: Value) -> Value:
+        if op in ("and", "or"):
+            combine = np.logical_and if op == "and" else np.logical_or
+            return Value(combine(left.data, right.data), BOOL)
+        if op in ("+", "-", "*", "/", "%"):
+            return _arithmetic(op, left, right)
+        if STRING in (left.kind, right.kind):
+            return Value(_string_compare(op, left, right), BOOL)
+        a = np.asarray(_numeric(left, op), dtype=np.float64)
+        b = np.asarray(_numeric(right, op), dtype=np.float64)
+        # Comparisons with null are false, != included
+        return Value(_COMPARE[op](a, b) & ~(np.isnan(a) | np.isnan(b)), BOOL)
+
+    def _call(self, name: str, args: List[Value], now_ms: float) -> Value:
+        if name == "now":
+            return Value(now_ms, DATETIME)
+        if name == "ago":
+            return Value(now_ms - _numeric(args[0], name), DATETIME)
+        if name in ("bin", "floor"):
+            value, size = args
+            return Value(np.floor(_numeric(value, name) / size.data) * size.data, value.kind)
+        if name == "round":
+            digits = int(args[1].data) if len(args) > 1 else 0
+            return Value(np.round(_numeric(args[0], name), digits), args[0].kind)
+        if name in ("todouble", "toreal"):
+            return Value(np.asarray(_numeric(args[0], name), dtype=np.float64), REAL)
+        if name in ("toint", "tolong"):
+            return Value(np.trunc(_numeric(args[0], name)), LONG)
+        if name == "tostring":
+            value = args[0]
+            if value.kind == STRING:
+                return value
+            data = np.atleast_1d(value.data)
+            return Value(Strings.from_objects([None if math.isnan(x) else f"{x:g}" for x in data.tolist()]),
+                         STRING)
+        if name in ("isnull", "isempty", "isnotnull", "isnotempty"):
+            value = args[0]
+            missing = value.data.codes < 0 if isinstance(value.data, Strings) else np.isnan(value.data)
+            return Value(missing if name in ("isnull", "isempty") else ~missing, BOOL)
+        if name == "not":
+            return Value(np.logical_not(args[0].data), BOOL)
+        if name == "iff":
+            condition, when_true, when_false = args
+            return Value(np.where(condition.data, _numeric(when_true, name), _numeric(when_false, name)),
+                         when_true.kind)
+        raise ValueError(f"Unsupported function: {name}()")
+
+    def _aggregate(self, node, frame: Dict[str, Value], inverse: np.ndarray, groups: int, now_ms: float) -> Value:
+        """Evaluate a summarize expression to one value per group"""
+        if isinstance(node, Call) and node.name in AGGREGATES:
+            args = [self._evaluate(arg, frame, now_ms) for arg in node.args]
+            if node.name == "count":
+                return Value(np.bincount(inverse, minlength=groups).astype(np.float64), LONG)
+            if node.name == "countif":
+                return Value(np.bincount(inverse, weights=np.asarray(args[0].data, dtype=np.float64),
+                                         minlength=groups), LONG)
+            value = args[0]
+            if node.name == "dcount":
+                codes = value.data.codes if isinstance(value.data, Strings) else value.data
+                pairs = np.unique(np.stack([inverse, np.asarray(codes, dtype=np.float64)]), axis=1)
+                return Value(np.bincount(pairs[0].astype(np.int64), minlength=groups).astype(np.float64), LONG)
+            data = np.asarray(_numeric(value, node.name), dtype=np.float64)
+            valid = ~np.isnan(data)
+            if node.name in ("sum", "avg"):
+                total = np.bincount(inverse[valid], weights=data[valid], minlength=groups)
+                if node.name == "sum":
+                    return Value(total, value.kind)
+                count = np.bincount(inverse[valid], minlength=groups)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    return Value(total / count, TIMESPAN if value.kind == TIMESPAN else REAL)
+            result = np.full(groups, np.nan)
+            (np.fmax if node.name == "max" else np.fmin).at(result, inverse[valid], data[valid])
+            return Value(result, value.kind)
+        if isinstance(node, Literal):
+            return Value(node.value, node.kind)
+        if isinstance(node, Binary):
+            return self._binary(node.op, self._aggregate(node.left, frame, inverse, groups, now_ms),
+                                self._aggregate(node.right, frame, inverse, groups, now_ms))
+        if isinstance(node, Negate):
+            value = self._aggregate(node.operand, frame, inverse, groups, now_ms)
+            return Value(-_numeric(value, "-"), value.kind)
+        if isinstance(node, Call):
+            return self._call(node.name, [self._aggregate(arg, frame, inverse, groups, now_ms)
+                                          for arg in node.args], now_ms)
+        raise ValueError("summarize expressions must aggregate their columns")
+
+    # Operators
+    @staticmethod
+    def _rows(frame: Dict[str, Value]) -> int:
+        for value in frame.values():
+            return len(value.data)
+        return 0
+
+    def _summarize(self, frame: Dict[str, Value], aggregates, groups, now_ms: float) -> Dict[str, Value]:
+        rows = self._rows(frame)
+        keys = [(name, _broadcast(self._evaluate(node, frame, now_ms), rows)) for name, node in groups]
+        if keys:
+            combined = np.zeros(rows, dtype=np.int64)
+            for _, key in keys:
+                codes = key.data.codes if isinstance(key.data, Strings) else key.data
+                unique, inverse = np.unique(codes, return_inverse=True)
+                combined = combined * len(unique) + inverse.reshape(-1)
+            _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            count = len(first)
+        else:
+            first, inverse, count = np.zeros(1, dtype=np.int64), np.zeros(rows, dtype=np.int64), 1
+
+        result = {name: Value(key.data[first], key.kind) for name, key in keys}
+        for name, node in aggregates:
+            result[name] = _broadcast(self._aggregate(node, frame, inverse, count, now_ms), count)
+        return result
+
+    @staticmethod
+    def _sort_key(value: Value, descending: bool) -> np.ndarray:
+        if isinstance(value.data, Strings):
+            order = np.argsort(value.data.values.astype(str), kind="stable")
+            ranks = np.empty(len(order) + 1, dtype=np.float64)
+            ranks[order] = np.arange(len(order))
+            ranks[-1] = -1                      # null sorts lowest
+            key = ranks[value.data.codes]
+        else:
+            key = np.where(np.isnan(value.data), -np.inf, value.data.astype(np.float64))
+        return -key if descending else key
+
+    def execute(self, query: str) -> KqlResult:
+        """Run a query; ValueError/KeyError for anything outside the supported subset"""
+        compiled = compile_query(query)
+        now_ms = (self.clock() - EPOCH) / timedelta(milliseconds=1)
+        frame = self._load(compiled, now_ms)
+        render = None
+        for op in compiled.operators:
+            rows = self._rows(frame)
+            if op.name == "where":
+                mask = np.asarray(self._evaluate(op.args[0], frame, now_ms).data, dtype=bool)
+                mask = np.broadcast_to(mask, (rows,))
+                frame = {name: Value(value.data[mask], value.kind) for name, value in frame.items()}
+            elif op.name in ("project", "extend"):
+                computed = {name: _broadcast(self._evaluate(node, frame, now_ms), rows) for name, node in op.args[0]}
+                frame = computed if op.name == "project" else {**frame, **computed}
+            elif op.name == "summarize":
+                frame = self._summarize(frame, *op.args, now_ms)
+            elif op.name == "sort":
+                keys = [self._sort_key(_broadcast(self._evaluate(node, frame, now_ms), rows), descending)
+                        for node, descending in op.args[0]]
+                order = np.lexsort(keys[::-1]) if keys else np.arange(rows)
+                frame = {name: Value(value.data[order], value.kind) for name, value in frame.items()}
+            elif op.name == "take":
+                frame = {name: Value(value.data[:op.args[0]], value.kind) for name, value in frame.items()}
+            elif op.name == "render":
+                render = op.args[0]
+        return KqlResult(frame, render)
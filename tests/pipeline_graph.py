@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Cross-pipeline dependency graph
+Builds the activity DAG from dependsOn and ExecutePipeline references and analyses cycles,
+reachability, critical path and parallelism headroom
+"""
+
+import json
+import math
+import statistics
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pipeline_walk import nested_scopes
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Typical durations (seconds) used when no history is available
+DEFAULT_DURATIONS = {
+    "Copy": 300.0,
+    "SynapseNotebook": 600.0,
+    "DatabricksNotebook": 600.0,
+    "SparkJob": 600.0,
+    "Lookup": 15.0,
+    "GetMetadata": 10.0,
+    "SqlServerStoredProcedure": 10.0,
+    "Script": 30.0,
+    "WebActivity": 5.0,
+    "WebHook": 5.0,
+    "SetVariable": 1.0,
+    "AppendVariable": 1.0,
+    "Filter": 1.0,
+    "Validation": 30.0,
+}
+DEFAULT_ACTIVITY_DURATION = 60.0
+
+# Fire-and-forget ExecutePipeline returns once the child run is queued
+EXECUTE_PIPELINE_NO_WAIT_DURATION = 5.0
+
+# Dependency conditions that are met on the happy path
+SUCCESS_CONDITIONS = ("Succeeded", "Completed")
+
+
+def parse_timespan(value: Optional[str]) -> Optional[float]:
+    """ADF timespan such as 0.12:00:00 (d.hh:mm:ss) -> seconds"""
+    if not value or not isinstance(value, str):
+        return None
+    days = 0
+    if "." in value.split(":")[0]:
+        day_part, value = value.split(".", 1)
+        days = int(day_part)
+    hours, minutes, seconds = (float(part) for part in value.split(":"))
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+class ActivityNode:
+    """One activity with the properties the analyses need"""
+
+    __slots__ = ("pipeline", "name", "key", "type", "depends_on", "scopes", "executes", "wait_on_completion",
+                 "batch_count", "is_sequential", "retry", "retry_interval", "timeout", "wait_seconds")
+
+    def __init__(self, pipeline: str, definition: Dict):
+        self.pipeline = pipeline
+        self.name = definition["name"]
+        self.key = f"{pipeline}/{self.name}"
+        self.type = definition.get("type")
+        self.depends_on: List[Tuple[str, List[str]]] = [
+            (dependency.get("activity"), dependency.get("dependencyConditions") or ["Succeeded"])
+            for dependency in definition.get("dependsOn") or []]
+
+        type_properties = definition.get("typeProperties") or {}
+        # Nested activity lists: ForEach/Until "activities", If branches, Switch cases
+        self.scopes: Dict[str, List["ActivityNode"]] = {
+            label: [ActivityNode(pipeline, child) for child in scope] for label, scope in nested_scopes(definition)}
+
+        reference = type_properties.get("pipeline") if self.type == "ExecutePipeline" else None
+        self.executes: Optional[str] = (reference or {}).get("referenceName")
+        self.wait_on_completion = bool(type_properties.get("waitOnCompletion", False))
+        self.batch_count = int(type_properties.get("batchCount") or 20)
+        self.is_sequential = bool(type_properties.get("isSequential", False))
+        self.wait_seconds = float(type_properties.get("waitTimeInSeconds") or 0) if self.type == "Wait" else None
+
+        policy = definition.get("policy") or {}
+        self.retry = int(policy.get("retry") or 0)
+        self.retry_interval = float(policy.get("retryIntervalInSeconds") or 30)
+        self.timeout = parse_timespan(policy.get("timeout"))
+
+    def __repr__(self) -> str:
+        return f"ActivityNode({self.key!r}, {self.type!r})"
+
+
+class PipelineSchedule(NamedTuple):
+    """Earliest-start schedule of one pipeline under given durations"""
+    pipeline: str
+    makespan: float
+    total_work: float
+    critical_path: List[str]
+    start: Dict[str, float]
+    finish: Dict[str, float]
+
+    @property
+    def parallelism(self) -> float:
+        """Average number of activities busy at once (total work / makespan)"""
+        return self.total_work / self.makespan if self.makespan else 1.0
+
+
+def durations_from_activity_runs(activity_runs: Iterable[Dict], statistic: str = "median") -> Dict[str, float]:
+    """Historical seconds per "pipeline/activity" from succeeded activity runs (median or mean)"""
+    samples: Dict[str, List[float]] = {}
+    for run in activity_runs:
+        if run.get("status") != "Succeeded" or run.get("durationInMs") is None:
+            continue
+        key = f"{run.get('pipelineName')}/{run.get('activityName')}"
+        samples.setdefault(key, []).append(run["durationInMs"] / 1000)
+    reduce = statistics.median if statistic == "median" else statistics.fmean
+    return {key: reduce(values) for key, values in samples.items()}
+
+
+def _find_cycles(successors: Dict[str, List[str]]) -> List[List[str]]:
+    """Elementary cycles found by DFS back edges (each reported once, as a node list)"""
+    cycles, seen = [], set()
+    state: Dict[str, int] = {}  # 1 = on stack, 2 = done
+    for root in successors:
+        if root in state:
+            continue
+        stack = [(root, iter(successors.get(root, ())))]
+        path = [root]
+        state[root] = 1
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node] = 2
+                stack.pop()
+                path.pop()
+            elif state.get(child) == 1:
+                cycle = path[path.index(child):]
+                signature = frozenset(cycle)
+                if signature not in seen:
+                    seen.add(signature)
+                    cycles.append(cycle + [child])
+            elif child not in state and child in successors:
+                state[child] = 1
+                stack.append((child, iter(successors.get(child, ()))))
+                path.append(child)
+    return cycles
+
+
+class PipelineGraph:
+    """Activity DAG across every pipeline in a folder"""
+
+    def __init__(self, definitions: Iterable[Dict]):
+        self.pipelines: Dict[str, List[ActivityNode]] = {}
+        self.parameters: Dict[str, Dict] = {}
+        for definition in definitions:
+            name = definition["name"]
+            properties = definition.get("properties") or {}
+            self.pipelines[name] = [ActivityNode(name, activity) for activity in properties.get("activities") or []]
+            self.parameters[name] = properties.get("parameters") or {}
+
+    @classmethod
+    def from_directory(cls, path: Optional[str] = None) -> "PipelineGraph":
+        folder = Path(path) if path else REPO_ROOT / "pipelines"
+        definitions = []
+        for file in sorted(folder.glob("*.json")):
+            with open(file, 'r') as f:
+                definitions.append(json.load(f))
+        return cls(definitions)
+
+    # Structure
+    def scopes(self, pipeline: str) -> Iterable[List[ActivityNode]]:
+        """Every sibling list of a pipeline: the top level and each container's nested activities"""
+        pending = [self.pipelines[pipeline]]
+        while pending:
+            scope = pending.pop()
+            yield scope
+            for node in scope:
+                pending.extend(node.scopes.values())
+
+    def activities(self, pipeline: Optional[str] = None) -> Iterable[ActivityNode]:
+        for name in ([pipeline] if pipeline else self.pipelines):
+            for scope in self.scopes(name):
+                yield from scope
+
+    def edges(self) -> List[Tuple[str, str, str, List[str]]]:
+        """(from, to, kind, conditions): dependsOn between activities, contains, and executePipeline"""
+        edges = []
+        for pipeline in self.pipelines:
+            for scope in self.scopes(pipeline):
+                for node in scope:
+                    for upstream, conditions in node.depends_on:
+                        edges.append((f"{pipeline}/{upstream}", node.key, "dependsOn", conditions))
+                    for children in node.scopes.values():
+                        edges.extend((node.key, child.key, "contains", []) for child in children)
+                    if node.executes:
+                        edges.append((node.key, node.executes, "executePipeline", []))
+        return edges
+
+    def pipeline_calls(self) -> Dict[str, Set[str]]:
+        """Pipeline -> pipelines it runs through ExecutePipeline"""
+        return {name: {node.executes for node in self.activities(name) if node.executes}
+                for name in self.pipelines}
+
+    def entry_pipelines(self) -> List[str]:
+        """Pipelines no other pipeline executes (run by triggers or by hand)"""
+        called = set().union(*self.pipeline_calls().values()) if self.pipelines else set()
+        return sorted(name for name in self.pipelines if name not in called)
+
+    def missing_references(self) -> List[Tuple[str, str]]:
+        """(activity, pipeline) for ExecutePipeline activities pointing at unknown pipelines"""
+        return [(node.key, node.executes) for node in self.activities()
+                if node.executes and node.executes not in self.pipelines]
+
+    def cycles(self) -> List[List[str]]:
+        """dependsOn cycles (activity keys) and ExecutePipeline call cycles (pipeline names)"""
+        cycles = []
+        for pipeline in self.pipelines:
+            for scope in self.scopes(pipeline):
+                names = {node.name for node in scope}
+                successors: Dict[str, List[str]] = {node.key: [] for node in scope}
+                for node in scope:
+                    for upstream, _ in node.depends_on:
+                        if upstream in names:
+                            successors[f"{pipeline}/{upstream}"].append(node.key)
+                cycles.extend(_find_cycles(successors))
+        calls = {name: sorted(children) for name, children in self.pipeline_calls().items()}
+        cycles.extend(_find_cycles(calls))
+        return cycles
+
+    def unreachable_activities(self) -> List[str]:
+        """Activities that can never start: depending on missing activities or caught in a cycle"""
+        unreachable = []
+        for pipeline in self.pipelines:
+            for scope in self.scopes(pipeline):
+                order = self._topological(scope, include=lambda node: True)
+                reached = {node.name for node in order}
+                unreachable.extend(node.key for node in scope if node.name not in reached)
+        return unreachable
+
+    @staticmethod
+    def _topological(scope: List[ActivityNode], include) -> List[ActivityNode]:
+        """Kahn order of the included activities whose dependencies all resolve within the scope"""
+        by_name = {node.name: node for node in scope if include(node)}
+        blocked = {name: len(node.depends_on) for name, node in by_name.items()}
+        dependents: Dict[str, List[str]] = {}
+        for node in by_name.values():
+            for upstream, _ in node.depends_on:
+                dependents.setdefault(upstream, []).append(node.name)
+        ready = [name for name, count in blocked.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(by_name[name])
+            for dependent in dependents.get(name, ()):
+                blocked[dependent] -= 1
+                if blocked[dependent] == 0:
+                    ready.append(dependent)
+        return order
+
+    # Timing
+    def schedule(self, pipeline: str, durations: Optional[Dict[str, float]] = None,
+                 item_counts: Optional[Dict[str, int]] = None, scenario: str = "success") -> PipelineSchedule:
+        """
+        Earliest-start schedule with unlimited parallelism.
+        durations: seconds per "pipeline/activity" (e.g. durations_from_activity_runs); missing
+          activities use DEFAULT_DURATIONS by type, containers are derived from their contents
+        item_counts: ForEach item count per "pipeline/activity" (default 1)
+        scenario: "success" follows only Succeeded/Completed dependencies, "all" ignores conditions
+        """
+        return self._schedule_scope(pipeline, self.pipelines[pipeline], durations or {}, item_counts or {},
+                                    scenario, (pipeline,))
+
+    def _schedule_scope(self, pipeline: str, scope: List[ActivityNode], durations: Dict[str, float],
+                        item_counts: Dict[str, int], scenario: str, stack: Tuple[str, ...]) -> PipelineSchedule:
+        # An activity runs in the scenario only if each dependency can be met by a running upstream
+        active: Set[str] = set()
+        for node in self._topological(scope, include=lambda node: True):
+            if all(upstream in active and (scenario == "all" or any(c in SUCCESS_CONDITIONS for c in conditions))
+                   for upstream, conditions in node.depends_on):
+                active.add(node.name)
+
+        start: Dict[str, float] = {}
+        finish: Dict[str, float] = {}
+        critical_upstream: Dict[str, Optional[str]] = {}
+        inner_paths: Dict[str, List[str]] = {}
+        total_work = 0.0
+        for node in self._topological(scope, include=lambda node: node.name in active):
+            upstream = max(((finish[f"{pipeline}/{up}"], up) for up, _ in node.depends_on), default=(0.0, None))
+            duration, work, inner = self._duration(node, durations, item_counts, scenario, stack)
+            start[node.key] = upstream[0]
+            finish[node.key] = upstream[0] + duration
+            critical_upstream[node.name] = upstream[1]
+            inner_paths[node.name] = inner
+            total_work += work
+
+        if not finish:
+            return PipelineSchedule(pipeline, 0.0, 0.0, [], start, finish)
+        makespan, last = max((value, key.rsplit("/", 1)[1]) for key, value in finish.items())
+        chain = []
+        while last is not None:
+            chain.append(last)
+            last = critical_upstream[last]
+        path = []
+        for name in reversed(chain):
+            path.append(f"{pipeline}/{name}")
+            path.extend(inner_paths[name])
+        return PipelineSchedule(pipeline, makespan, total_work, path, start, finish)
+
+    def _duration(self, node: ActivityNode, durations: Dict[str, float], item_counts: Dict[str, int],
+                  scenario: str, stack: Tuple[str, ...]) -> Tuple[float, float, List[str]]:
+        """(elapsed seconds, busy seconds, nested critical path) of one activity"""
+        if node.key in durations:
+            return durations[node.key], durations[node.key], []
+
+        if node.executes:
+            if not node.wait_on_completion:
+                return EXECUTE_PIPELINE_NO_WAIT_DURATION, EXECUTE_PIPELINE_NO_WAIT_DURATION, []
+            if node.executes not in self.pipelines or node.executes in stack:
+                # Unknown or recursive child: fall back to a flat estimate
+                return DEFAULT_ACTIVITY_DURATION, DEFAULT_ACTIVITY_DURATION, []
+            child = self._schedule_scope(node.executes, self.pipelines[node.executes], durations,
+                                         item_counts, scenario, stack + (node.executes,))
+            return child.makespan, child.total_work, child.critical_path
+
+        if node.scopes:
+            branches = [self._schedule_scope(node.pipeline, scope, durations, item_counts, scenario, stack)
+                        for scope in node.scopes.values()]
+            if node.type == "ForEach":
+                body = branches[0]
+                items = item_counts.get(node.key, 1)
+                waves = items if node.is_sequential else math.ceil(items / max(node.batch_count, 1))
+                return body.makespan * waves, body.total_work * items, body.critical_path
+            # If/Switch run one branch; Until runs its body at least once
+            longest = max(branches, key=lambda branch: branch.makespan)
+            return longest.makespan, longest.total_work, longest.critical_path
+
+        if node.wait_seconds is not None:
+            return node.wait_seconds, 0.0, []
+        duration = DEFAULT_DURATIONS.get(node.type, DEFAULT_ACTIVITY_DURATION)
+        return duration, duration, []
+
+    # Headroom
+    def serial_chains(self, pipeline: str, scenario: str = "success") -> List[List[str]]:
+        """
+        Maximal runs of activities where each step is the only dependency of the next and
+        the next is its only dependent, in every scope of the pipeline. These chains add up
+        their durations end to end.
+        """
+        chains = []
+        for scope in self.scopes(pipeline):
+            by_name = {node.name: node for node in scope}
+            edges = [(upstream, node.name) for node in scope for upstream, conditions in node.depends_on
+                     if upstream in by_name and (scenario == "all" or any(c in SUCCESS_CONDITIONS for c in conditions))]
+            successors: Dict[str, List[str]] = {}
+            predecessors: Dict[str, List[str]] = {}
+            for upstream, downstream in edges:
+                successors.setdefault(upstream, []).append(downstream)
+                predecessors.setdefault(downstream, []).append(upstream)
+
+            def linked(a: str, b: str) -> bool:
+                return successors.get(a) == [b] and len(by_name[b].depends_on) == 1
+
+            for node in scope:
+                previous = predecessors.get(node.name, [])
+                if len(previous) == 1 and linked(previous[0], node.name):
+                    continue  # not the head of a chain
+                chain = [node.name]
+                while len(successors.get(chain[-1], [])) == 1 and linked(chain[-1], successors[chain[-1]][0]):
+                    chain.append(successors[chain[-1]][0])
+                if len(chain) > 1:
+                    chains.append([f"{pipeline}/{name}" for name in chain])
+        return chains
+
+    def parallelism_report(self, pipeline: str, durations: Optional[Dict[str, float]] = None,
+                           item_counts: Optional[Dict[str, int]] = None) -> Dict:
+        """Makespan, critical path and the serial chains that bound end-to-end latency"""
+        schedule = self.schedule(pipeline, durations, item_counts)
+        critical = set(schedule.critical_path)
+        chains = []
+        for chain in self.serial_chains(pipeline):
+            steps = [schedule.finish[key] - schedule.start[key] for key in chain if key in schedule.finish]
+            if len(steps) < 2:
+                continue
+            seconds = sum(steps)
+            chains.append({
+                "activities": chain,
+                "seconds": seconds,
+                "share_of_makespan": seconds / schedule.makespan if schedule.makespan else 0.0,
+                "on_critical_path": all(key in critical for key in chain),
+                # Upper bound on the saving if the steps could overlap completely
+                "max_saving_seconds": seconds - max(steps),
+            })
+        chains.sort(key=lambda chain: chain["seconds"], reverse=True)
+        return {
+            "pipeline": pipeline,
+            "makespan_seconds": schedule.makespan,
+            "total_work_seconds": schedule.total_work,
+            "parallelism": schedule.parallelism,
+            "critical_path": schedule.critical_path,
+            "serial_chains": chains,
+        }
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Pipeline execution simulator
+Monte Carlo replay of pipeline definitions with ForEach slots, dependency conditions, retries and timeouts
+"""
+
+import heapq
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pipeline_graph import (DEFAULT_ACTIVITY_DURATION, DEFAULT_DURATIONS, EXECUTE_PIPELINE_NO_WAIT_DURATION,
+                            ActivityNode, PipelineGraph)
+
+SUCCEEDED, FAILED, SKIPPED = "Succeeded", "Failed", "Skipped"
+
+# ADF runs at most 50 ForEach iterations in parallel
+MAX_BATCH_COUNT = 50
+
+_NO_OVERRIDES: Dict[str, Dict] = {}
+
+
+def _freeze(overrides: Dict[str, Dict]) -> Tuple:
+    """Hashable snapshot of an overrides dict, so in-place edits are noticed"""
+    return tuple(sorted((key, tuple(sorted(settings.items()))) for key, settings in overrides.items()))
+
+
+class DurationModel:
+    """Per-activity duration samples and failure rates, from history or type defaults"""
+
+    def __init__(self, samples: Optional[Dict[str, Sequence[float]]] = None,
+                 failure_rates: Optional[Dict[str, float]] = None, default_spread: float = 0.25):
+        """
+        samples: seconds per "pipeline/activity", drawn from uniformly
+        failure_rates: probability that one attempt fails, per "pipeline/activity"
+        default_spread: lognormal sigma applied to DEFAULT_DURATIONS for activities without samples
+        """
+        self.samples = {key: list(values) for key, values in (samples or {}).items() if values}
+        self.failure_rates = dict(failure_rates or {})
+        self.default_spread = default_spread
+
+    @classmethod
+    def from_activity_runs(cls, activity_runs: Iterable[Dict], **kwargs) -> "DurationModel":
+        """Succeeded durations and per-attempt failure rates (each retry is its own activity run)"""
+        samples: Dict[str, List[float]] = {}
+        attempts: Dict[str, List[int]] = {}
+        for run in activity_runs:
+            status = run.get("status")
+            if status not in (SUCCEEDED, FAILED):
+                continue
+            key = f"{run.get('pipelineName')}/{run.get('activityName')}"
+            counts = attempts.setdefault(key, [0, 0])
+            counts[0] += 1
+            if status == FAILED:
+                counts[1] += 1
+            elif run.get("durationInMs") is not None:
+                samples.setdefault(key, []).append(run["durationInMs"] / 1000)
+        return cls(samples, {key: failed / total for key, (total, failed) in attempts.items()}, **kwargs)
+
+    def sample(self, node: ActivityNode, rng: random.Random) -> float:
+        values = self.samples.get(node.key)
+        if values:
+            return values[int(rng.random() * len(values))]
+        if node.wait_seconds is not None:
+            return node.wait_seconds
+        base = DEFAULT_DURATIONS.get(node.type, DEFAULT_ACTIVITY_DURATION)
+        return base * rng.lognormvariate(0.0, self.default_spread) if self.default_spread else base
+
+
+class _Settings(NamedTuple):
+    batch_count: int
+    is_sequential: bool
+    retry: int
+    retry_interval: float
+    timeout: Optional[float]
+    wait_on_completion: bool
+    failure_rate: float
+
+
+class TrialResult(NamedTuple):
+    makespan: float
+    status: str
+    peak_concurrency: int
+    attempts: int
+
+
+class _Scope:
+    """A sibling list compiled once: topological order and dependency specs"""
+
+    __slots__ = ("order", "leaves", "by_name")
+
+    def __init__(self, scope: List[ActivityNode]):
+        names = {node.name for node in scope}
+        order = PipelineGraph._topological(scope, include=lambda node: True)
+        # Nodes caught in a cycle or waiting on missing activities never start
+        self.order = [(node, [(upstream, tuple(conditions)) for upstream, conditions in node.depends_on])
+                      for node in order]
+        depended_on = {upstream for node in scope for upstream, _ in node.depends_on if upstream in names}
+        self.leaves = [node.name for node in order if node.name not in depended_on]
+        self.by_name = {node.name: node for node in order}
+
+
+def _condition_met(status: str, conditions: Tuple[str, ...]) -> bool:
+    for condition in conditions:
+        if condition == status or (condition == "Completed" and status != SKIPPED):
+            return True
+    return False
+
+
+def _failed(compiled: _Scope, status: Dict[str, str], name: str) -> bool:
+    """ADF outcome: a failed leaf fails the scope; a skipped leaf defers to its upstream"""
+    if status.get(name) == SKIPPED:
+        return any(_failed(compiled, status, upstream) for upstream, _ in compiled.by_name[name].depends_on)
+    return status.get(name) == FAILED
+
+
+class PipelineSimulator:
+    """
+    Simulate pipeline runs from their definitions. Activities start as soon as their
+    dependency conditions resolve; ForEach iterations queue for batchCount slots
+    (one slot when isSequential); failed or timed-out attempts wait retryIntervalInSeconds
+    and retry up to policy.retry times; ExecutePipeline with waitOnCompletion runs the
+    child pipeline inline. If/Switch pick a branch uniformly at random.
+    """
+
+    def __init__(self, graph: Optional[PipelineGraph] = None, durations: Optional[DurationModel] = None,
+                 item_counts: Optional[Dict[str, Union[int, Sequence[int]]]] = None):
+        """item_counts: ForEach item count per "pipeline/activity", fixed or a list to sample from (default 1)"""
+        self.graph = graph or PipelineGraph.from_directory()
+        self.durations = durations or DurationModel()
+        self.item_counts = item_counts or {}
+        self._scopes: Dict[int, Tuple[List[ActivityNode], _Scope]] = {}
+        self._overrides = _NO_OVERRIDES
+        self._overrides_key: Tuple = ()
+        self._resolved: Dict[str, _Settings] = {}
+
+    def __getstate__(self) -> Dict:
+        # Caches are per process: scope ids mean nothing in a pool worker
+        state = dict(self.__dict__)
+        state.update(_scopes={}, _overrides=_NO_OVERRIDES, _overrides_key=(), _resolved={})
+        return state
+
+    def _scope(self, scope: List[ActivityNode]) -> _Scope:
+        # The entry holds the list itself, so its id cannot be reused while cached
+        entry = self._scopes.get(id(scope))
+        if entry is None or entry[0] is not scope:
+            entry = self._scopes[id(scope)] = (scope, _Scope(scope))
+        return entry[1]
+
+    def _settings(self, node: ActivityNode) -> "_Settings":
+        """Definition values with the current overrides applied, resolved once per configuration"""
+        settings = self._resolved.get(node.key)
+        if settings is None:
+            override = self._overrides.get(node.key, {})
+            defaults = {"failure_rate": self.durations.failure_rates.get(node.key, 0.0)}
+            settings = self._resolved[node.key] = _Settings(*(
+                override.get(name, defaults[name] if name in defaults else getattr(node, name))
+                for name in _Settings._fields))
+        return settings
+
+    # One trial
+    def run_trial(self, pipeline: str, rng: random.Random, overrides: Optional[Dict[str, Dict]] = None,
+                  track_concurrency: bool = True) -> TrialResult:
+        """Simulate one run of `pipeline` starting at t=0"""
+        overrides = overrides or _NO_OVERRIDES
+        key = _freeze(overrides)
+        if key != self._overrides_key:
+            self._overrides_key, self._resolved = key, {}
+        self._overrides = overrides
+        self._attempts = 0
+        self._events: Optional[List[Tuple[float, int]]] = [] if track_concurrency else None
+        end, ok = self._run_scope(self.graph.pipelines[pipeline], 0.0, rng, (pipeline,))
+
+        peak = 0
+        if self._events:
+            running = 0
+            # Ends sort before starts at the same instant
+            for _, delta in sorted(self._events):
+                running += delta
+                peak = max(peak, running)
+        return TrialResult(end, SUCCEEDED if ok else FAILED, peak, self._attempts)
+
+    def _run_scope(self, scope: List[ActivityNode], start: float, rng: random.Random,
+                   stack: Tuple[str, ...]) -> Tuple[float, bool]:
+        """(end time, succeeded) of a sibling list started at `start`"""
+        compiled = self._scope(scope)
+        finish: Dict[str, float] = {}
+        status: Dict[str, str] = {}
+        end = start
+        for node, dependencies in compiled.order:
+            ready = start
+            runs = True
+            for upstream, conditions in dependencies:
+                if finish[upstream] > ready:
+                    ready = finish[upstream]
+                if runs and not _condition_met(status[upstream], conditions):
+                    runs = False
+            if runs:
+                finish[node.name], ok = self._run_activity(node, ready, rng, stack)
+                status[node.name] = SUCCEEDED if ok else FAILED
+            else:
+                finish[node.name], status[node.name] = ready, SKIPPED
+            if finish[node.name] > end:
+                end = finish[node.name]
+
+        if FAILED not in status.values():
+            return end, True
+        return end, not any(_failed(compiled, status, name) for name in compiled.leaves)
+
+    def _run_activity(self, node: ActivityNode, start: float, rng: random.Random,
+                      stack: Tuple[str, ...]) -> Tuple[float, bool]:
+        if node.type == "ForEach" and node.scopes:
+            return self._run_foreach(node, start, rng, stack)
+        if node.scopes:
+            branches = list(node.scopes.values())
+            if node.type in ("IfCondition", "Switch"):
+                return self._run_scope(branches[int(rng.random() * len(branches))], start, rng, stack)
+            return self._run_scope(branches[0], start, rng, stack)
+        settings = self._settings(node)
+        child = None
+        if node.executes and node.executes in self.graph.pipelines and node.executes not in stack:
+            child = self.graph.pipelines[node.executes]
+            stack = stack + (node.executes,)
+            if not settings.wait_on_completion:
+                # Fire and forget: the child still runs and counts towards concurrency
+                self._run_scope(child, start, rng, stack)
+                return start + EXECUTE_PIPELINE_NO_WAIT_DURATION, True
+
+        # Attempts: failed or timed-out tries wait retry_interval and go again
+        t = start
+        for remaining in range(settings.retry, -1, -1):
+            self._attempts += 1
+            if child is not None:
+                end, ok = self._run_scope(child, t, rng, stack)
+            else:
+                end = t + self.durations.sample(node, rng)
+                ok = rng.random() >= settings.failure_rate
+            if settings.timeout is not None and end - t > settings.timeout:
+                end, ok = t + settings.timeout, False
+            if child is None and self._events is not None:
+                self._events.append((t, 1))
+                self._events.append((end, -1))
+            if ok or not remaining:
+                return end, ok
+            t = end + settings.retry_interval
+        return t, False
+
+    def _run_foreach(self, node: ActivityNode, start: float, rng: random.Random,
+                     stack: Tuple[str, ...]) -> Tuple[float, bool]:
+        items = self.item_counts.get(node.key, 1)
+        if not isinstance(items, int):
+            items = items[int(rng.random() * len(items))]
+        settings = self._settings(node)
+        slots = 1 if settings.is_sequential else min(max(settings.batch_count, 1), MAX_BATCH_COUNT, max(items, 1))
+        body = node.scopes["activities"]
+        free = [start] * slots
+        end, ok = start, True
+        for _ in range(items):
+            slot_start = heapq.heappop(free)
+            item_end, item_ok = self._run_scope(body, slot_start, rng, stack)
+            heapq.heappush(free, item_end)
+            end = max(end, item_end)
+            ok = ok and item_ok
+        return end, ok
+
+    # Many trials
+    def simulate(self, pipeline: str, trials: int = 1000, seed: int = 0, overrides: Optional[Dict[str, Dict]] = None,
+                 percentiles: Iterable[float] = (50, 90, 99), track_concurrency: bool = True) -> Dict:
+        """Makespan distribution, success rate and peak concurrency over `trials` runs"""
+        for key, settings in (overrides or {}).items():
+            unknown = set(settings) - set(_Settings._fields)
+            if unknown:
+                raise ValueError(f"Unknown settings for {key}: {sorted(unknown)}")
+        rng = random.Random(seed)
+        results = [self.run_trial(pipeline, rng, overrides, track_concurrency) for _ in range(trials)]
+        makespans = np.fromiter((r.makespan for r in results), dtype=np.float64, count=trials)
+        summary = {
+            "pipeline": pipeline,
+            "trials": trials,
+            "mean_makespan_seconds": float(makespans.mean()),
+            "success_rate": sum(r.status == SUCCEEDED for r in results) / trials,
+            "mean_attempts": sum(r.attempts for r in results) / trials,
+        }
+        for p, value in zip(percentiles, np.percentile(makespans, list(percentiles))):
+            summary[f"p{p:g}_makespan_seconds"] = float(value)
+        if track_concurrency:
+            peaks = [r.peak_concurrency for r in results]
+            summary["max_peak_concurrency"] = max(peaks)
+            summary["mean_peak_concurrency"] = sum(peaks) / trials
+        return summary
+
+    def sweep(self, pipeline: str, configurations: List[Dict[str, Dict]], trials: int = 200, seed: int = 0,
+              max_workers: Optional[int] = None, **kwargs) -> List[Dict]:
+        """
+        simulate() for each overrides dict, e.g. {"pl_x/ForEach": {"batch_count": 8}}.
+        Every configuration replays the same seed so differences come from the settings,
+        not the draw. Runs in a process pool when max_workers > 1.
+        """
+        workers = max_workers or 1
+        if workers <= 1 or len(configurations) < 2:
+            return [self.simulate(pipeline, trials, seed, overrides, **kwargs) for overrides in configurations]
+        size = max(1, len(configurations) // (workers * 4))
+        batches = [configurations[i:i + size] for i in range(0, len(configurations), size)]
+        with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_simulate_batch, self, pipeline, batch, trials, seed, kwargs)
+                       for batch in batches]
+            return [summary for future in futures for summary in future.result()]
+
+
+def _simulate_batch(simulator: PipelineSimulator, pipeline: str, configurations: List[Dict[str, Dict]],
+                    trials: int, seed: int, kwargs: Dict) -> List[Dict]:
+    return [simulator.simulate(pipeline, trials, seed, overrides, **kwargs) for overrides in configurations]
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Walk the activities nested inside ForEach, Until, If and Switch containers
+Shared by the validation engine, the pipeline graph and the copy autotuner
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+# typeProperties keys holding a nested activity list (Switch cases are handled separately)
+NESTED_ACTIVITY_KEYS = ("activities", "ifTrueActivities", "ifFalseActivities", "defaultActivities")
+
+
+def nested_scopes(activity: Dict) -> Iterator[Tuple[str, List[Dict]]]:
+    """(label, activity list) of each container directly inside `activity`; Switch cases are 'case:<value>'"""
+    type_properties = activity.get("typeProperties") or {}
+    for key in NESTED_ACTIVITY_KEYS:
+        if isinstance(type_properties.get(key), list):
+            yield key, type_properties[key]
+    for case in type_properties.get("cases") or []:
+        yield f"case:{case.get('value')}", case.get("activities") or []
+
+
+def activity_scopes(activities: List[Dict]) -> Iterator[List[Dict]]:
+    """Every list of sibling activities, the top level first, then those nested at any depth"""
+    yield activities
+    for activity in activities:
+        for _, scope in nested_scopes(activity):
+            yield from activity_scopes(scope)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiting shared by the threaded and asyncio clients
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve tokens and sleep off any deficit"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        rate: tokens added per second
+        capacity: burst size (defaults to one second worth of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` now and return how long the caller must wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait (without blocking the event loop) until `tokens` are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class EndpointRateLimiter:
+    """One token bucket per REST endpoint (createRun, queryPipelineRuns, ...)"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default_rate: float = 50.0):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        """Return the bucket for `endpoint`, creating it on first use"""
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    rate = self.rates.get(endpoint, self.default_rate)
+                    bucket = self._buckets[endpoint] = TokenBucket(rate)
+        return bucket
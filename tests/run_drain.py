@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Bulk emergency drain
+Cancels every queued or in-progress run matching a filter, concurrently and paced by ARM's write budget
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from bulk_trigger import ArmWriteBudget
+
+# Runs a drain cancels by default
+ACTIVE_STATUSES = ("Queued", "InProgress")
+
+# Per-run outcomes
+CANCEL_REQUESTED = "CancelRequested"
+CASCADED = "Cascaded"
+NOT_FOUND = "NotFound"
+FAILED = "Failed"
+
+# In-progress runs report lastUpdated as the service's now, which may be ahead of ours
+CLOCK_SKEW = timedelta(minutes=5)
+
+# RunId values per confirmation query
+CONFIRM_BATCH = 100
+
+
+class DrainOutcome(NamedTuple):
+    run_id: str
+    pipeline_name: str
+    outcome: str
+    seconds: float
+    error: Optional[str] = None
+    status: Optional[str] = None
+
+
+class DrainReport(NamedTuple):
+    outcomes: List[DrainOutcome]
+    seconds: float
+
+    def counts(self) -> Dict[str, int]:
+        """Runs per outcome"""
+        counts: Dict[str, int] = {}
+        for outcome in self.outcomes:
+            counts[outcome.outcome] = counts.get(outcome.outcome, 0) + 1
+        return counts
+
+
+def _parent(run: Dict) -> Optional[str]:
+    return (run.get("invokedBy") or {}).get("pipelineRunId")
+
+
+def split_cascaded(runs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """(runs to cancel, runs a recursive cancel of another selected run will reach anyway)"""
+    selected = {run["runId"] for run in runs}
+    roots, cascaded = [], []
+    for run in runs:
+        (cascaded if _parent(run) in selected else roots).append(run)
+    return roots, cascaded
+
+
+class RunDrain:
+    """Select runs with queryPipelineRuns filters and cancel them concurrently"""
+
+    def __init__(self, client, max_workers: int = 8, budget: Optional[ArmWriteBudget] = None,
+                 recursive: bool = True, clock: Callable[[], datetime] = datetime.utcnow):
+        """
+        client: AzureDataFactoryClient (or anything with query_pipeline_runs and cancel_pipeline_run)
+        recursive: cancel with isRecursive=true so ExecutePipeline children stop too; selected
+                   children of selected runs are then left to the cascade instead of cancelled again,
+                   unless their parent's cancel did not go through
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.budget = budget or ArmWriteBudget()
+        self.recursive = recursive
+        self.clock = clock
+
+    def select(self, pipeline_names: Optional[Iterable[str]] = None, statuses: Iterable[str] = ACTIVE_STATUSES,
+               lookback: timedelta = timedelta(days=1)) -> List[Dict]:
+        """Runs of the given pipelines (all if None) in the given statuses, updated within `lookback`"""
+        filters = [{"operand": "Status", "operator": "In", "values": list(statuses)}]
+        if pipeline_names is not None:
+            filters.append({"operand": "PipelineName", "operator": "In", "values": list(pipeline_names)})
+        now = self.clock()
+        return self.client.query_pipeline_runs(now - lookback, now + CLOCK_SKEW, filters)
+
+    def _cancel(self, run: Dict, started: float) -> DrainOutcome:
+        self.budget.acquire()
+        try:
+            self.client.cancel_pipeline_run(run["runId"], is_recursive=self.recursive,
+                                            observe_headers=self.budget.observe)
+            outcome, error = CANCEL_REQUESTED, None
+        except Exception as e:
+            status_code = getattr(getattr(e, "response", None), "status_code", None)
+            outcome, error = (NOT_FOUND if status_code == 404 else FAILED), str(e)
+        return DrainOutcome(run["runId"], run.get("pipelineName", ""), outcome,
+                            time.monotonic() - started, error)
+
+    def cancel(self, runs: List[Dict]) -> DrainReport:
+        """
+        Cancel `runs` concurrently; returns per-run outcomes and the wall time of the drain.
+        Children left to the cascade are reported Cascaded once their parent's cancel was
+        requested (or itself cascaded); otherwise they are cancelled in their own right.
+        """
+        started = time.monotonic()
+        roots, cascaded = split_cascaded(runs) if self.recursive else (runs, [])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            outcomes = list(executor.map(lambda run: self._cancel(run, started), roots))
+            results = {outcome.run_id: outcome.outcome for outcome in outcomes}
+            while cascaded:
+                # One generation per round: a child is settled once its parent's outcome is known
+                ready = [run for run in cascaded if _parent(run) in results] or cascaded
+                ready_ids = {run["runId"] for run in ready}
+                cascaded = [run for run in cascaded if run["runId"] not in ready_ids]
+                seconds = time.monotonic() - started
+                settled, orphaned = [], []
+                for run in ready:
+                    if results.get(_parent(run)) in (CANCEL_REQUESTED, CASCADED):
+                        settled.append(DrainOutcome(run["runId"], run.get("pipelineName", ""), CASCADED, seconds))
+                    else:
+                        orphaned.append(run)
+                settled.extend(executor.map(lambda run: self._cancel(run, started), orphaned))
+                results.update((outcome.run_id, outcome.outcome) for outcome in settled)
+                outcomes.extend(settled)
+
+        return DrainReport(outcomes, time.monotonic() - started)
+
+    def confirm(self, report: DrainReport, lookback: timedelta = timedelta(days=1)) -> DrainReport:
+        """Re-read the status of every drained run (Cancelling, Cancelled, or finished before the cancel)"""
+        run_ids = [outcome.run_id for outcome in report.outcomes]
+        now = self.clock()
+        statuses = {}
+        for offset in range(0, len(run_ids), CONFIRM_BATCH):
+            filters = [{"operand": "RunId", "operator": "In", "values": run_ids[offset:offset + CONFIRM_BATCH]}]
+            for run in self.client.query_pipeline_runs(now - lookback, now + CLOCK_SKEW, filters):
+                statuses[run["runId"]] = run.get("status")
+        return report._replace(outcomes=[outcome._replace(status=statuses.get(outcome.run_id))
+                                         for outcome in report.outcomes])
+
+    def drain(self, pipeline_names: Optional[Iterable[str]] = None, statuses: Iterable[str] = ACTIVE_STATUSES,
+              lookback: timedelta = timedelta(days=1), confirm: bool = True) -> DrainReport:
+        """Select, cancel and (optionally) confirm in one call"""
+        report = self.cancel(self.select(pipeline_names, statuses, lookback))
+        return self.confirm(report, lookback) if confirm and report.outcomes else report
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Columnar local run-history store
+Keeps pipeline and activity runs as NumPy column files partitioned by day, synced incrementally
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from run_utils import format_timestamp, is_terminal, parse_timestamp
+
+EPOCH = datetime(1970, 1, 1)
+DAY_MS = 86_400_000
+
+# Column name -> dtype. Strings are dictionary-encoded into int32 codes (-1 = missing);
+# missing integers are -1 and missing floats NaN.
+PIPELINE_RUN_COLUMNS = {
+    "run_id": "S36",
+    "pipeline": "int32",
+    "status": "int32",
+    "run_start": "int64",
+    "run_end": "int64",
+    "duration_ms": "int64",
+    "last_updated": "int64",
+}
+
+ACTIVITY_RUN_COLUMNS = {
+    "pipeline_run_id": "S36",
+    "pipeline": "int32",
+    "activity": "int32",
+    "activity_type": "int32",
+    "status": "int32",
+    "start": "int64",
+    "end": "int64",
+    "duration_ms": "int64",
+    "rows_copied": "int64",
+    "data_read": "int64",
+    "data_written": "int64",
+    "copy_duration_s": "float64",
+    "data_integration_units": "float64",
+    "parallel_copies": "int32",
+}
+
+TABLES = {"pipeline_runs": PIPELINE_RUN_COLUMNS, "activity_runs": ACTIVITY_RUN_COLUMNS}
+
+
+def to_epoch_ms(value: Optional[str]) -> int:
+    """API timestamp -> milliseconds since the epoch (-1 when missing)"""
+    parsed = parse_timestamp(value)
+    return -1 if parsed is None else (parsed - EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_ms(value: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=int(value))
+
+
+class StringDictionary:
+    """Append-only string table shared by every partition, so codes compare across days"""
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = list(strings or [])
+        self._codes = {s: i for i, s in enumerate(self.strings)}
+        self._lock = threading.Lock()
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = self._codes[value] = len(self.strings)
+                    self.strings.append(value)
+        return code
+
+    def code(self, value: str) -> int:
+        """Code of an existing string, or -2 (matches nothing) if unseen"""
+        return self._codes.get(value, -2)
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.strings[code] if code >= 0 else None
+
+
+def _int(value, default: int = -1) -> int:
+    return default if value is None else int(value)
+
+
+def _float(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class RunHistoryStore:
+    """Day-partitioned NumPy column store of pipeline and activity runs"""
+
+    def __init__(self, root: str):
+        """root: directory holding the manifest, string dictionary and partitions"""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        manifest = self._read_json("manifest.json") or {}
+        self.watermark: Optional[datetime] = parse_timestamp(manifest.get("watermark"))
+        self.strings = StringDictionary(self._read_json("strings.json") or [])
+        self._saved_strings = len(self.strings.strings)
+
+    # Files
+    def _read_json(self, name: str):
+        path = self.root / name
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_json(self, name: str, payload):
+        tmp = self.root / f".{name}.{uuid.uuid4().hex}"
+        with open(tmp, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.root / name)
+
+    def _save_strings(self):
+        """Persist codes added since the last save; must precede any partition that uses them"""
+        strings = list(self.strings.strings)
+        if len(strings) != self._saved_strings:
+            self._write_json("strings.json", strings)
+            self._saved_strings = len(strings)
+
+    def partitions(self, table: str) -> List[str]:
+        """Day partitions (YYYY-MM-DD) present for a table, oldest first"""
+        folder = self.root / table
+        if not folder.exists():
+            return []
+        return sorted(p.name for p in folder.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def _read_partition(self, table: str, day: str, columns: Iterable[str]) -> Dict[str, np.ndarray]:
+        folder = self.root / table / day
+        # Memory-mapped: reports touch only the pages of the columns they use
+        return {name: np.load(folder / f"{name}.npy", mmap_mode="r") for name in columns}
+
+    def _write_partition(self, table: str, day: str, data: Dict[str, np.ndarray]):
+        """Replace a partition directory with new column files"""
+        folder = self.root / table
+        folder.mkdir(exist_ok=True)
+        staging = folder / f".{day}.{uuid.uuid4().hex}"
+        staging.mkdir()
+        for name, values in data.items():
+            np.save(staging / f"{name}.npy", values)
+        target = folder / day
+        retired = None
+        if target.exists():
+            retired = folder / f".{day}.old.{uuid.uuid4().hex}"
+            os.replace(target, retired)
+        os.replace(staging, target)
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def append(self, table: str, rows: Dict[str, List], key_column: Optional[str] = None) -> np.ndarray:
+        """
+        Append column lists to their day partitions (by the table's start column).
+        Rows whose `key_column` value is already stored in the partition are skipped.
+        Returns a boolean mask of the input rows that were written.
+        """
+        spec = TABLES[table]
+        start_column = "run_start" if table == "pipeline_runs" else "start"
+        arrays = {name: np.asarray(rows[name], dtype=dtype) for name, dtype in spec.items()}
+        written = np.zeros(len(arrays[start_column]), dtype=bool)
+        if not len(written):
+            return written
+
+        days = arrays[start_column] // DAY_MS
+        with self._lock:
+            # A crash after this leaves unused strings; the other order would leave undecodable codes
+            self._save_strings()
+            for day_number in np.unique(days):
+                selected = np.flatnonzero(days == day_number)
+                day = from_epoch_ms(int(day_number) * DAY_MS).strftime("%Y-%m-%d")
+                existing = None
+                if day in self.partitions(table):
+                    existing = {name: np.array(values) for name, values in
+                                self._read_partition(table, day, spec).items()}
+                    if key_column is not None:
+                        selected = selected[~np.isin(arrays[key_column][selected], existing[key_column])]
+                    if not len(selected):
+                        continue
+                new = {name: values[selected] for name, values in arrays.items()}
+                if existing is not None:
+                    new = {name: np.concatenate([existing[name], new[name]]) for name in spec}
+                self._write_partition(table, day, new)
+                written[selected] = True
+        return written
+
+    def load(self, table: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Columns of every row whose start falls in [start, end), concatenated across partitions"""
+        spec = TABLES[table]
+        columns = list(columns or spec)
+        start_column = "run_start" if table == "pipeline_runs" else "start"
+        wanted = list(dict.fromkeys(columns + [start_column]))
+        first = start.strftime("%Y-%m-%d") if start else None
+        last = end.strftime("%Y-%m-%d") if end else None
+
+        chunks = [self._read_partition(table, day, wanted) for day in self.partitions(table)
+                  if (first is None or day >= first) and (last is None or day <= last)]
+        if not chunks:
+            return {name: np.empty(0, dtype=spec[name]) for name in columns}
+        data = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in wanted}
+
+        mask = np.ones(len(data[start_column]), dtype=bool)
+        if start is not None:
+            mask &= data[start_column] >= (start - EPOCH) // timedelta(milliseconds=1)
+        if end is not None:
+            mask &= data[start_column] < (end - EPOCH) // timedelta(milliseconds=1)
+        return {name: data[name][mask] for name in columns}
+
+    # Row encoding
+    def _pipeline_row(self, run: Dict) -> Tuple:
+        return (run["runId"], self.strings.encode(run.get("pipelineName")),
+                self.strings.encode(run.get("status")), to_epoch_ms(run.get("runStart")),
+                to_epoch_ms(run.get("runEnd")), _int(run.get("durationInMs")),
+                to_epoch_ms(run.get("lastUpdated")))
+
+    def _activity_row(self, activity: Dict) -> Tuple:
+        output = activity.get("output") or {}
+        if not isinstance(output, dict):
+            output = {}
+        return (activity.get("pipelineRunId", ""), self.strings.encode(activity.get("pipelineName")),
+                self.strings.encode(activity.get("activityName")),
+                self.strings.encode(activity.get("activityType")),
+                self.strings.encode(activity.get("status")), to_epoch_ms(activity.get("activityRunStart")),
+                to_epoch_ms(activity.get("activityRunEnd")), _int(activity.get("durationInMs")),
+                _int(output.get("rowsCopied")), _int(output.get("dataRead")), _int(output.get("dataWritten")),
+                _float(output.get("copyDuration")), _float(output.get("usedDataIntegrationUnits")),
+                _int(output.get("usedParallelCopies")))
+
+    @staticmethod
+    def _columns(spec: Dict[str, str], rows: List[Tuple]) -> Dict[str, List]:
+        return {name: [row[i] for row in rows] for i, name in enumerate(spec)}
+
+    def _flush(self, pipeline_rows: List[Tuple], activity_rows: List[Tuple]) -> int:
+        written = self.append("pipeline_runs", self._columns(PIPELINE_RUN_COLUMNS, pipeline_rows), "run_id")
+        if not written.all():
+            # A pipeline run already stored has its activity runs stored as well
+            added = {row[0] for row, new in zip(pipeline_rows, written) if new}
+            activity_rows = [row for row in activity_rows if row[0] in added]
+        self.append("activity_runs", self._columns(ACTIVITY_RUN_COLUMNS, activity_rows))
+        return int(written.sum())
+
+    def add_runs(self, runs: Iterable[Dict], activity_runs: Iterable[Dict] = ()) -> int:
+        """Store finished pipeline runs (and their activity runs); returns pipeline runs written"""
+        pipeline_rows = [self._pipeline_row(run) for run in runs if is_terminal(run.get("status"))]
+        activity_rows = [self._activity_row(activity) for activity in activity_runs]
+        return self._flush(pipeline_rows, activity_rows)
+
+    # Sync
+    def sync(self, client, end_time: Optional[datetime] = None, initial_start: Optional[datetime] = None,
+             lag: timedelta = timedelta(minutes=5), with_activities: bool = True,
+             max_workers: int = 8, flush_rows: int = 100_000) -> int:
+        """
+        Fetch runs updated since the watermark and append the finished ones.
+        Runs still in progress are left for a later sync: their lastUpdated moves past the
+        new watermark when they finish. `lag` keeps clear of the service's indexing delay.
+        Returns the number of pipeline runs added.
+        """
+        end_time = end_time or datetime.utcnow() - lag
+        start_time = self.watermark or initial_start or end_time - timedelta(days=45)
+        if end_time <= start_time:
+            return 0
+
+        added = 0
+        pipeline_rows: List[Tuple] = []
+        activity_rows: List[Tuple] = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in client.iter_pipeline_run_pages(start_time, end_time, prefetch=True):
+                finished = [run for run in page if is_terminal(run.get("status"))]
+                pipeline_rows.extend(self._pipeline_row(run) for run in finished)
+                if with_activities and finished:
+                    for activities in executor.map(client.get_activity_runs, finished):
+                        activity_rows.extend(self._activity_row(activity) for activity in activities)
+                # Pages are encoded as they arrive; partitions are rewritten in large batches
+                if len(pipeline_rows) + len(activity_rows) >= flush_rows:
+                    added += self._flush(pipeline_rows, activity_rows)
+                    pipeline_rows, activity_rows = [], []
+            added += self._flush(pipeline_rows, activity_rows)
+
+        # Only advance once everything up to end_time is on disk
+        self.watermark = end_time
+        self._write_json("manifest.json", {"watermark": format_timestamp(end_time)})
+        return added
+
+    # Vectorized reports
+    def _grouped(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(unique codes, inverse index) for group-by over dictionary codes"""
+        return np.unique(codes, return_inverse=True)
+
+    def success_rate(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     by: str = "pipeline") -> Dict[Optional[str], Dict]:
+        """Runs, successes and success rate (percent) per pipeline (or per status with by='status')"""
+        data = self.load("pipeline_runs", start, end, ["pipeline", "status"])
+        succeeded = data["status"] == self.strings.code("Succeeded")
+        groups, inverse = self._grouped(data[by])
+        runs = np.bincount(inverse, minlength=len(groups))
+        wins = np.bincount(inverse, weights=succeeded, minlength=len(groups))
+        return {self.strings.decode(int(code)): {"runs": int(n), "succeeded": int(w),
+                                                 "success_rate": float(w / n * 100)}
+                for code, n, w in zip(groups, runs, wins)}
+
+    def duration_trend(self, pipeline_name: Optional[str] = None, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, status: str = "Succeeded",
+                       percentiles: Iterable[float] = (50, 95)) -> List[Dict]:
+        """Per-day run count, mean and percentiles of durationInMs, oldest day first"""
+        data = self.load("pipeline_runs", start, end, ["pipeline", "status", "duration_ms", "run_start"])
+        mask = (data["status"] == self.strings.code(status)) & (data["duration_ms"] >= 0)
+        if pipeline_name is not None:
+            mask &= data["pipeline"] == self.strings.code(pipeline_name)
+        days = data["run_start"][mask] // DAY_MS
+        durations = data["duration_ms"][mask]
+
+        order = np.argsort(days, kind="stable")
+        days, durations = days[order], durations[order]
+        unique_days, first = np.unique(days, return_index=True)
+        percentiles = list(percentiles)
+        trend = []
+        for day, chunk in zip(unique_days, np.split(durations, first[1:])):
+            point = {"day": from_epoch_ms(int(day) * DAY_MS).strftime("%Y-%m-%d"),
+                     "runs": int(len(chunk)), "mean_duration_ms": float(chunk.mean())}
+            for p, value in zip(percentiles, np.percentile(chunk, percentiles)):
+                point[f"p{p:g}_duration_ms"] = float(value)
+            trend.append(point)
+        return trend
+
+    def copy_throughput(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        by: str = "pipeline") -> Dict[Optional[str], Dict]:
+        """Copy activity volume and throughput per pipeline (or per activity with by='activity')"""
+        data = self.load("activity_runs", start, end,
+                         [by, "activity_type", "rows_copied", "data_read", "copy_duration_s", "duration_ms"])
+        mask = (data["activity_type"] == self.strings.code("Copy")) & (data["data_read"] >= 0)
+        seconds = np.where(np.isnan(data["copy_duration_s"]), data["duration_ms"] / 1000.0,
+                           data["copy_duration_s"])[mask]
+        rows = np.clip(data["rows_copied"][mask], 0, None)
+        volume = data["data_read"][mask]
+
+        groups, inverse = self._grouped(data[by][mask])
+        totals = {
+            "copies": np.bincount(inverse, minlength=len(groups)),
+            "rows": np.bincount(inverse, weights=rows, minlength=len(groups)),
+            "bytes": np.bincount(inverse, weights=volume, minlength=len(groups)),
+            "seconds": np.bincount(inverse, weights=seconds, minlength=len(groups)),
+        }
+        result = {}
+        for i, code in enumerate(groups):
+            elapsed = totals["seconds"][i]
+            result[self.strings.decode(int(code))] = {
+                "copies": int(totals["copies"][i]),
+                "rows_copied": int(totals["rows"][i]),
+                "bytes_read": int(totals["bytes"][i]),
+                "rows_per_second": float(totals["rows"][i] / elapsed) if elapsed else None,
+                "mb_per_second": float(totals["bytes"][i] / 1024 / 1024 / elapsed) if elapsed else None,
+            }
+        return result
+
+    def __len__(self) -> int:
+        return sum(len(self._read_partition("pipeline_runs", day, ["run_id"])["run_id"])
+                   for day in self.partitions("pipeline_runs"))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Streaming pipeline-run metrics
+Aggregates run pages into per-pipeline, per-status counts and mergeable duration sketches
+"""
+
+import bisect
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from run_query_sharding import split_window
+from run_utils import parse_timestamp
+
+
+class TDigest:
+    """Merging t-digest: approximate quantiles in bounded memory, mergeable across workers"""
+
+    def __init__(self, compression: float = 100.0):
+        """compression: roughly the number of centroids kept; higher is more accurate"""
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._centroids: List[Tuple[float, float]] = []
+        self._buffer: List[Tuple[float, float]] = []
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 8 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest into this one"""
+        if not other.count:
+            return
+        other._compress()
+        self._buffer.extend(other._centroids)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _k(self, q: float) -> float:
+        # k1 scale function: small centroids at the tails, large ones in the middle
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in items)
+
+        merged = []
+        mean, weight = items[0]
+        so_far = 0.0
+        limit = total * self._k_inverse(self._k(0.0) + 1)
+        for item_mean, item_weight in items[1:]:
+            if so_far + weight + item_weight <= limit:
+                weight += item_weight
+                mean += (item_mean - mean) * item_weight / weight
+            else:
+                merged.append((mean, weight))
+                so_far += weight
+                limit = total * self._k_inverse(self._k(so_far / total) + 1)
+                mean, weight = item_mean, item_weight
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile q (0..1); None when empty"""
+        if not self.count:
+            return None
+        self._compress()
+        centroids = self._centroids
+        if len(centroids) == 1 or q <= 0:
+            return self.min if q <= 0 else centroids[0][0]
+        if q >= 1:
+            return self.max
+
+        # Each centroid's mass is centred on its mean; interpolate between neighbours
+        target = q * self.count
+        centers = []
+        cumulative = 0.0
+        for _, weight in centroids:
+            centers.append(cumulative + weight / 2)
+            cumulative += weight
+        if target <= centers[0]:
+            return self.min + (centroids[0][0] - self.min) * target / centers[0]
+        if target >= centers[-1]:
+            span = self.count - centers[-1]
+            return centroids[-1][0] + (self.max - centroids[-1][0]) * (target - centers[-1]) / span
+        i = bisect.bisect_right(centers, target)
+        low, high = centroids[i - 1][0], centroids[i][0]
+        return low + (high - low) * (target - centers[i - 1]) / (centers[i] - centers[i - 1])
+
+    def __len__(self) -> int:
+        self._compress()
+        return len(self._centroids)
+
+
+class GroupStats:
+    """Run count and duration sketch for one group of runs"""
+
+    def __init__(self, compression: float = 100.0):
+        self.runs = 0
+        self.total_duration_ms = 0.0
+        self.durations = TDigest(compression)
+
+    def add(self, run: Dict):
+        self.runs += 1
+        duration = run.get("durationInMs")
+        if duration is not None:
+            self.total_duration_ms += duration
+            self.durations.add(float(duration))
+
+    def merge(self, other: "GroupStats"):
+        self.runs += other.runs
+        self.total_duration_ms += other.total_duration_ms
+        self.durations.merge(other.durations)
+
+    @property
+    def mean_duration_ms(self) -> Optional[float]:
+        timed = self.durations.count
+        return self.total_duration_ms / timed if timed else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Duration in ms at percentile p (0..100)"""
+        return self.durations.quantile(p / 100)
+
+
+class RunMetrics:
+    """Incremental run metrics grouped by (pipelineName, status)"""
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.groups: Dict[Tuple[str, str], GroupStats] = {}
+
+    def add(self, run: Dict):
+        key = (run.get("pipelineName"), run.get("status"))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats(self.compression)
+        group.add(run)
+
+    def add_page(self, runs: Iterable[Dict]):
+        """Fold one page of runs in; the page can be dropped afterwards"""
+        for run in runs:
+            self.add(run)
+
+    def merge(self, other: "RunMetrics") -> "RunMetrics":
+        """Fold in a partial aggregate from another fetcher; returns self"""
+        for key, stats in other.groups.items():
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = GroupStats(self.compression)
+            group.merge(stats)
+        return self
+
+    @property
+    def pipelines(self) -> List[str]:
+        return sorted({name for name, _ in self.groups if name is not None})
+
+    def select(self, pipeline_name: Optional[str] = None, status: Optional[str] = None) -> GroupStats:
+        """Combined stats of every group matching the given pipeline and/or status"""
+        combined = GroupStats(self.compression)
+        for (name, run_status), stats in self.groups.items():
+            if (pipeline_name is None or name == pipeline_name) and (status is None or run_status == status):
+                combined.merge(stats)
+        return combined
+
+    def count(self, pipeline_name: Optional[str] = None, status: Optional[str] = None) -> int:
+        return sum(stats.runs for (name, run_status), stats in self.groups.items()
+                   if (pipeline_name is None or name == pipeline_name)
+                   and (status is None or run_status == status))
+
+    def success_rate(self, pipeline_name: Optional[str] = None) -> Optional[float]:
+        """Share of runs that succeeded, in percent"""
+        total = self.count(pipeline_name)
+        return self.count(pipeline_name, "Succeeded") / total * 100 if total else None
+
+    def summary(self, percentiles: Iterable[float] = (50, 95, 99)) -> Dict[str, Dict]:
+        """Per-pipeline counts, success rate and percentiles of succeeded-run durations (ms)"""
+        percentiles = list(percentiles)
+        result = {}
+        for name in self.pipelines:
+            succeeded = self.select(name, "Succeeded")
+            result[name] = {
+                "runs": self.count(name),
+                "succeeded": succeeded.runs,
+                "failed": self.count(name, "Failed"),
+                "success_rate": self.success_rate(name),
+                "mean_duration_ms": succeeded.mean_duration_ms,
+                **{f"p{p:g}_duration_ms": succeeded.percentile(p) for p in percentiles},
+            }
+        return result
+
+
+def collect_run_metrics(client, start_time: datetime, end_time: datetime,
+                        filters: Optional[List[Dict]] = None, slices: int = 8,
+                        max_workers: int = 8, compression: float = 100.0) -> RunMetrics:
+    """
+    Aggregate every run in a lastUpdated window without holding the runs in memory.
+    The window is split into slices fetched in parallel, page by page, each into its
+    own RunMetrics; the partial aggregates are merged at the end.
+    """
+    windows = split_window(start_time, end_time, slices)
+    # split_window overlaps neighbours slightly; each slice counts only the runs it owns
+    owned_from = [start_time] + [window_end for _, window_end in windows[:-1]]
+
+    def aggregate(index: int) -> RunMetrics:
+        window_start, window_end = windows[index]
+        last = index == len(windows) - 1
+        metrics = RunMetrics(compression)
+        for page in client.iter_pipeline_run_pages(window_start, window_end, filters):
+            for run in page:
+                updated = parse_timestamp(run.get("lastUpdated"))
+                if updated is not None and (updated < owned_from[index] or (updated >= window_end and not last)):
+                    continue
+                metrics.add(run)
+        return metrics
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(aggregate, range(len(windows))))
+    total = RunMetrics(compression)
+    for partial in partials:
+        total.merge(partial)
+    return total
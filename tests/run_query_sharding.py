@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Time-sliced parallel querying of pipeline-run history
+Splits a lastUpdated window into sub-windows sized from observed page density
+"""
+
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from run_utils import parse_timestamp
+
+# fetch_page(start, end, continuation_token) -> (runs, next_continuation_token)
+PageFetcher = Callable[[datetime, datetime, Optional[str]], Tuple[List[Dict], Optional[str]]]
+
+# Sharded queries ask for runs in start order so the first page is a prefix of the window
+RUN_START_ORDER = [{"orderBy": "RunStart", "order": "ASC"}]
+
+# Neighbouring slices overlap slightly so no run falls between two windows
+SLICE_OVERLAP = timedelta(milliseconds=1)
+
+
+def split_window(start: datetime, end: datetime, slices: int) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into `slices` equal, slightly overlapping sub-windows"""
+    slices = max(slices, 1)
+    step = (end - start) / slices
+    bounds = [start + step * i for i in range(slices)] + [end]
+    return [(max(bounds[i] - SLICE_OVERLAP, start), bounds[i + 1]) for i in range(slices)]
+
+
+def page_density(page: List[Dict], start: datetime, end: datetime) -> Optional[Tuple[datetime, float]]:
+    """
+    Read (rest_start, runs_per_second) from the first page of a window queried in
+    ascending runStart order (RUN_START_ORDER). Every run not on the page started at or
+    after the page's last runStart, and a run's lastUpdated is never before its runStart,
+    so the rest of the window begins there.
+
+    Returns None when the page gives no usable signal, e.g. the service ignored the
+    ordering and the page is spread across most of the window.
+    """
+    stamps = sorted(filter(None, (parse_timestamp(run.get("runStart")) for run in page)))
+    window = (end - start).total_seconds()
+    if len(stamps) < 2 or window <= 0 or stamps[-1] <= start:
+        return None
+    span = (stamps[-1] - start).total_seconds()
+    if span > window / 2:
+        return None
+    return stamps[-1], len(page) / span
+
+
+def merge_runs(pages: Iterable[List[Dict]]) -> List[Dict]:
+    """Merge run lists, keeping the most recently updated copy of each runId"""
+    # Compared as datetimes: the service varies the fractional digits, so strings misorder
+    merged: Dict[str, Tuple[datetime, Dict]] = {}
+    for page in pages:
+        for run in page:
+            run_id = run.get("runId")
+            updated = parse_timestamp(run.get("lastUpdated")) or datetime.min
+            current = merged.get(run_id)
+            if current is None or updated >= current[0]:
+                merged[run_id] = (updated, run)
+    return [run for _, run in merged.values()]
+
+
+class ShardedRunQuery:
+    """Fetch a run window as concurrently queried, adaptively sized slices"""
+
+    def __init__(self, fetch_page: PageFetcher, max_workers: int = 8,
+                 target_runs_per_slice: int = 500, max_slices: int = 64,
+                 min_slice: timedelta = timedelta(minutes=1)):
+        """
+        fetch_page: should return runs ordered by RUN_START_ORDER
+        target_runs_per_slice: aim for slices that finish in about this many runs
+        max_slices: upper bound on the total number of sub-windows queried
+        min_slice: never split a window shorter than this
+        """
+        self.fetch_page = fetch_page
+        self.max_workers = max_workers
+        self.target_runs_per_slice = target_runs_per_slice
+        self.max_slices = max_slices
+        self.min_slice = min_slice
+        self.slices_queried = 0
+        self._lock = threading.Lock()
+
+    def _reserve_slices(self, wanted: int) -> int:
+        """Take up to `wanted` slices from the budget"""
+        with self._lock:
+            granted = max(min(wanted, self.max_slices - self.slices_queried), 0)
+            self.slices_queried += granted
+            return granted
+
+    def _plan_split(self, page: List[Dict], start: datetime,
+                    end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Decide how to split the rest of a window whose first page came back with more to follow"""
+        density = page_density(page, start, end)
+        if density is None:
+            # No usable density signal: halve and let each half measure itself
+            rest_start, pieces = start, 2
+        else:
+            rest_start, runs_per_second = density
+            remaining = runs_per_second * (end - rest_start).total_seconds()
+            pieces = math.ceil(remaining / self.target_runs_per_slice)
+
+        pieces = min(pieces, int((end - rest_start) / self.min_slice))
+        if pieces < 2:
+            return []
+        pieces = self._reserve_slices(pieces)
+        if pieces < 2:
+            # Give back a lone reservation: this slice will just be drained
+            self._reserve_slices(-pieces)
+            return []
+        return split_window(rest_start, end, pieces)
+
+    def _fetch_slice(self, start: datetime, end: datetime) -> Tuple[List[Dict], List[Tuple[datetime, datetime]]]:
+        """Fetch one slice; a dense slice returns its first page plus sub-windows for the rest"""
+        runs, continuation_token = self.fetch_page(start, end, None)
+
+        if continuation_token:
+            sub_windows = self._plan_split(runs, start, end)
+            if sub_windows:
+                return runs, sub_windows
+
+        while continuation_token:
+            page, continuation_token = self.fetch_page(start, end, continuation_token)
+            runs.extend(page)
+        return runs, []
+
+    def run(self, start: datetime, end: datetime) -> List[Dict]:
+        """Query [start, end) and return de-duplicated runs"""
+        results: List[List[Dict]] = []
+        self.slices_queried = 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._fetch_slice, start, end)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    runs, sub_windows = future.result()
+                    results.append(runs)
+                    pending |= {executor.submit(self._fetch_slice, s, e) for s, e in sub_windows}
+
+        return merge_runs(results)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Compact pipeline-run and activity-run records
+__slots__ classes with interned names and input/output payloads kept as raw JSON bytes until read
+"""
+
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# How a field is held on the record
+INTERNED, PLAIN, RAW = range(3)
+
+
+# Built once: json.dumps with non-default options constructs a new encoder per call
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _pack(value: Any) -> Optional[bytes]:
+    """Serialise a nested payload to compact JSON bytes"""
+    if value is None:
+        return None
+    return _ENCODER.encode(value).encode()
+
+
+def _unpack(raw: Optional[bytes]) -> Any:
+    return None if raw is None else json.loads(raw)
+
+
+class RunRecord:
+    """
+    Base for compact run records. Records answer dict-style reads (record["status"],
+    record.get("output"), "durationInMs" in record) with the REST API's key names, so
+    code written against the JSON dicts keeps working.
+    """
+
+    __slots__ = ("_extra", "_nulls")
+
+    # (API key, slot, INTERNED | PLAIN | RAW)
+    FIELDS: Tuple[Tuple[str, str, int], ...] = ()
+    _BY_KEY: Dict[str, Tuple[str, int]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._BY_KEY = {key: (slot, kind) for key, slot, kind in cls.FIELDS}
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> "RunRecord":
+        record = cls.__new__(cls)
+        nulls = []
+        for key, slot, kind in cls.FIELDS:
+            value = payload.get(key)
+            if value is None:
+                if key in payload:
+                    nulls.append(key)
+            elif kind == INTERNED:
+                value = sys.intern(value)
+            elif kind == RAW:
+                value = _pack(value)
+            setattr(record, slot, value)
+        # Slotted keys the API sent as null, so they read back as present
+        record._nulls = tuple(nulls) if nulls else None
+        # Fields without a slot are kept, serialised, so to_dict() loses nothing
+        extra = {key: value for key, value in payload.items() if key not in cls._BY_KEY}
+        record._extra = _pack(extra) if extra else None
+        return record
+
+    @classmethod
+    def from_page(cls, page: Iterable[Dict]) -> List["RunRecord"]:
+        """
+        Records for a page the caller has already parsed (response.json()["value"]).
+        Input/output payloads are re-encoded to bytes here, so loading costs more CPU than
+        keeping the dicts; the saving is in what stays resident after the page is dropped.
+        """
+        return [cls.from_dict(item) for item in page]
+
+    def _value(self, key: str) -> Any:
+        spec = self._BY_KEY.get(key)
+        if spec is None:
+            return (_unpack(self._extra) or {}).get(key)
+        slot, kind = spec
+        value = getattr(self, slot)
+        return _unpack(value) if kind == RAW else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._value(key)
+        if value is None and key not in self:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._value(key)
+        return default if value is None and key not in self else value
+
+    def __contains__(self, key: str) -> bool:
+        spec = self._BY_KEY.get(key)
+        if spec is None:
+            return key in (_unpack(self._extra) or {})
+        return getattr(self, spec[0]) is not None or key in (self._nulls or ())
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        """The record as the API's JSON dict"""
+        payload = {}
+        nulls = self._nulls or ()
+        for key, slot, kind in self.FIELDS:
+            value = getattr(self, slot)
+            if value is not None:
+                payload[key] = _unpack(value) if kind == RAW else value
+            elif key in nulls:
+                payload[key] = None
+        payload.update(_unpack(self._extra) or {})
+        return payload
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RunRecord):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({getattr(self, self.FIELDS[0][1])!r})"
+
+
+class PipelineRunRecord(RunRecord):
+    """One queryPipelineRuns / pipelineruns result"""
+
+    __slots__ = ("run_id", "pipeline_name", "status", "run_start", "run_end", "duration_ms",
+                 "last_updated", "message", "run_group_id", "is_latest", "_parameters", "_invoked_by")
+
+    FIELDS = (
+        ("runId", "run_id", PLAIN),
+        ("pipelineName", "pipeline_name", INTERNED),
+        ("status", "status", INTERNED),
+        ("runStart", "run_start", PLAIN),
+        ("runEnd", "run_end", PLAIN),
+        ("durationInMs", "duration_ms", PLAIN),
+        ("lastUpdated", "last_updated", PLAIN),
+        ("message", "message", PLAIN),
+        ("runGroupId", "run_group_id", PLAIN),
+        ("isLatest", "is_latest", PLAIN),
+        ("parameters", "_parameters", RAW),
+        ("invokedBy", "_invoked_by", RAW),
+    )
+
+    @property
+    def parameters(self) -> Optional[Dict]:
+        """Parsed on every access; hold on to the result if it is read repeatedly"""
+        return _unpack(self._parameters)
+
+    @property
+    def invoked_by(self) -> Optional[Dict]:
+        return _unpack(self._invoked_by)
+
+
+class ActivityRunRecord(RunRecord):
+    """One queryActivityruns result"""
+
+    __slots__ = ("activity_run_id", "pipeline_run_id", "pipeline_name", "activity_name", "activity_type",
+                 "status", "activity_run_start", "activity_run_end", "duration_ms",
+                 "_input", "_output", "_error")
+
+    FIELDS = (
+        ("activityRunId", "activity_run_id", PLAIN),
+        ("pipelineRunId", "pipeline_run_id", PLAIN),
+        ("pipelineName", "pipeline_name", INTERNED),
+        ("activityName", "activity_name", INTERNED),
+        ("activityType", "activity_type", INTERNED),
+        ("status", "status", INTERNED),
+        ("activityRunStart", "activity_run_start", PLAIN),
+        ("activityRunEnd", "activity_run_end", PLAIN),
+        ("durationInMs", "duration_ms", PLAIN),
+        ("input", "_input", RAW),
+        ("output", "_output", RAW),
+        ("error", "_error", RAW),
+    )
+
+    @property
+    def input(self) -> Any:
+        """Parsed on every access; hold on to the result if it is read repeatedly"""
+        return _unpack(self._input)
+
+    @property
+    def output(self) -> Any:
+        """Parsed on every access; hold on to the result if it is read repeatedly"""
+        return _unpack(self._output)
+
+    @property
+    def error(self) -> Any:
+        return _unpack(self._error)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the pipeline-run tooling
+"""
+
+from datetime import datetime
+from typing import Optional
+
+# Run states that never change once reached
+TERMINAL_STATUSES = ("Succeeded", "Failed", "Cancelled")
+
+
+def is_terminal(status: Optional[str]) -> bool:
+    """True if a run in `status` is finished"""
+    return status in TERMINAL_STATUSES
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format a naive UTC datetime the way the REST API expects"""
+    return value.isoformat() + "Z"
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an API timestamp such as 2024-01-01T10:00:00.1234567Z into a naive UTC datetime"""
+    if not value:
+        return None
+    value = value.rstrip("Z")
+    if "+" in value[10:]:
+        value = value[:10] + value[10:].split("+", 1)[0]
+    if "." in value:
+        # The service emits up to 7 fractional digits; datetime accepts 6
+        head, fraction = value.split(".", 1)
+        value = f"{head}.{fraction[:6].ljust(6, '0')}"
+    return datetime.fromisoformat(value)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Multiplexed pipeline-run watcher
+Tracks many run IDs with bulk queryPipelineRuns polls instead of one polling loop per run
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+from run_utils import is_terminal, parse_timestamp
+
+# queryPipelineRuns accepts a bounded number of values per RunId filter
+MAX_RUN_IDS_PER_QUERY = 100
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _utc(seconds: float) -> datetime:
+    """Naive UTC datetime of a POSIX timestamp"""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _as_datetime(value: Union[datetime, str, None]) -> Optional[datetime]:
+    return parse_timestamp(value) if isinstance(value, str) else value
+
+
+class _WatchedRun:
+    __slots__ = ("run_id", "pipeline_name", "added_at", "started_at", "updated_since")
+
+    def __init__(self, run_id: str, pipeline_name: Optional[str], added_at: float):
+        self.run_id = run_id
+        self.pipeline_name = pipeline_name
+        self.added_at = added_at
+        self.started_at: Optional[float] = None
+        # Earliest lastUpdated the run can still have; None until known
+        self.updated_since: Optional[datetime] = None
+
+
+class RunWatcher:
+    """Watch many pipeline runs at once and report them as they finish"""
+
+    def __init__(self, client, on_complete: Optional[Callable[[Dict], None]] = None,
+                 min_interval: float = 5.0, max_interval: float = 120.0,
+                 expected_durations: Optional[Dict[str, float]] = None,
+                 default_expected_duration: float = 300.0,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        client: anything with AzureDataFactoryClient.iter_pipeline_runs
+        on_complete: called with the final run record of each finished run
+        expected_durations: seconds a run of each pipeline usually takes; refined as runs finish
+        """
+        self.client = client
+        self.on_complete = on_complete
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.expected_durations = dict(expected_durations or {})
+        self.default_expected_duration = default_expected_duration
+        self.clock = clock
+        self.sleep = sleep
+
+        self.latest: Dict[str, Dict] = {}
+        self.api_calls = 0
+        self._watched: Dict[str, _WatchedRun] = {}
+        self._idle_polls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of runs not yet finished"""
+        return len(self._watched)
+
+    def add(self, run_id: str, pipeline_name: Optional[str] = None,
+            run_start: Union[datetime, str, None] = None, last_updated: Union[datetime, str, None] = None):
+        """
+        Start tracking a run. run_start / last_updated (naive UTC or ISO strings) bound the
+        query window; without them the first poll reads the run once with get_pipeline_run.
+        """
+        run_start, last_updated = _as_datetime(run_start), _as_datetime(last_updated)
+        with self._lock:
+            if run_id in self._watched or is_terminal(self.latest.get(run_id, {}).get("status")):
+                return
+            watched = self._watched[run_id] = _WatchedRun(run_id, pipeline_name, self.clock())
+            watched.updated_since = last_updated or run_start
+            if run_start is not None:
+                watched.started_at = (run_start - EPOCH).total_seconds()
+
+    def _expected_duration(self, pipeline_name: Optional[str]) -> float:
+        return self.expected_durations.get(pipeline_name, self.default_expected_duration)
+
+    def _learn_duration(self, run: Dict):
+        """Fold a finished run's duration into the pipeline's expectation (EWMA)"""
+        duration_ms = run.get("durationInMs")
+        name = run.get("pipelineName")
+        if duration_ms is None or name is None:
+            return
+        observed = duration_ms / 1000.0
+        previous = self.expected_durations.get(name)
+        self.expected_durations[name] = observed if previous is None else 0.7 * previous + 0.3 * observed
+
+    def poll_once(self) -> List[Dict]:
+        """Query every watched run in bulk; returns the runs that finished since the last poll"""
+        with self._lock:
+            watched = list(self._watched.values())
+        if not watched:
+            return []
+
+        completed = []
+        for w in watched:
+            if w.updated_since is None:
+                completed.extend(self._seed(w))
+        with self._lock:
+            watched = list(self._watched.values())
+
+        now = self.clock()
+        # lastUpdated only moves forward, so no watched run can have updated before this
+        start_time = min(w.updated_since for w in watched) - timedelta(minutes=5) if watched else None
+        end_time = _utc(now) + timedelta(minutes=5)
+
+        for offset in range(0, len(watched), MAX_RUN_IDS_PER_QUERY):
+            chunk = [w.run_id for w in watched[offset:offset + MAX_RUN_IDS_PER_QUERY]]
+            filters = [{"operand": "RunId", "operator": "In", "values": chunk}]
+            self.api_calls += 1
+            for run in self.client.iter_pipeline_runs(start_time, end_time, filters):
+                completed.extend(self._update(run))
+
+        self._idle_polls = 0 if completed else self._idle_polls + 1
+        for run in completed:
+            self._learn_duration(run)
+            if self.on_complete:
+                self.on_complete(run)
+        return completed
+
+    def _seed(self, watched: _WatchedRun) -> List[Dict]:
+        """Read a run added without a time hint once, so the bulk query window can cover it"""
+        self.api_calls += 1
+        try:
+            run = self.client.get_pipeline_run(watched.run_id)
+        except Exception as e:
+            # A just-triggered run can 404 briefly; anything else (auth, throttling, bugs) is the caller's
+            if getattr(getattr(e, "response", None), "status_code", None) != 404:
+                raise
+            run = None
+        completed = self._update(run) if run else []
+        if watched.updated_since is None:
+            # Not visible yet (or no timestamps): assume it was triggered just before add()
+            watched.updated_since = _utc(watched.added_at)
+        return completed
+
+    def _update(self, run: Dict) -> List[Dict]:
+        run_id = run.get("runId")
+        with self._lock:
+            watched = self._watched.get(run_id)
+            if watched is None:
+                return []
+            self.latest[run_id] = run
+            watched.pipeline_name = watched.pipeline_name or run.get("pipelineName")
+            if watched.started_at is None and run.get("runStart"):
+                started = parse_timestamp(run["runStart"])
+                watched.started_at = (started - EPOCH).total_seconds()
+            updated = parse_timestamp(run.get("lastUpdated") or run.get("runStart"))
+            if updated is not None:
+                watched.updated_since = updated
+            if not is_terminal(run.get("status")):
+                return []
+            del self._watched[run_id]
+        return [run]
+
+    def next_interval(self) -> float:
+        """Seconds until the next poll, based on when the soonest run is expected to finish"""
+        with self._lock:
+            watched = list(self._watched.values())
+        if not watched:
+            return self.min_interval
+
+        now = self.clock()
+        soonest = min(self._expected_duration(w.pipeline_name) - (now - (w.started_at or w.added_at))
+                      for w in watched)
+        if soonest > 0:
+            # Poll about halfway to the expected finish, tightening as it approaches
+            interval = soonest / 2
+        else:
+            # Overdue: back off geometrically while nothing changes
+            interval = self.min_interval * (1.5 ** self._idle_polls)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """Poll until every watched run finishes (or `timeout`); returns the latest record per run"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            self.poll_once()
+            if not self._watched:
+                break
+            delay = self.next_interval()
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            self.sleep(delay)
+        return dict(self.latest)
+
+    async def completions(self) -> AsyncIterator[Dict]:
+        """Yield runs as they finish, polling off the event loop"""
+        while self._watched:
+            for run in await asyncio.to_thread(self.poll_once):
+                yield run
+            if self._watched:
+                await asyncio.sleep(self.next_interval())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+SQLite stand-in for the Azure SQL control database
+Creates MetadataControl with table-size statistics and watermarked source tables so planners can be exercised offline
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# SQLite has no schemas, so dbo.<name> becomes <name>
+CONTROL_QUERY = "SELECT * FROM MetadataControl WHERE IsActive = 1"
+
+# Size statistics as the planner expects them; on Azure SQL the same shape comes from AZURE_SQL_STATS_QUERY
+STATS_QUERY = "SELECT SourceSchema, SourceTable, RowCount, SizeBytes FROM TableStats"
+
+AZURE_SQL_STATS_QUERY = """
+SELECT s.name AS SourceSchema, t.name AS SourceTable,
+       SUM(CASE WHEN p.index_id IN (0, 1) THEN p.row_count ELSE 0 END) AS RowCount,
+       SUM(p.used_page_count) * 8192 AS SizeBytes
+FROM sys.dm_db_partition_stats p
+JOIN sys.tables t ON t.object_id = p.object_id
+JOIN sys.schemas s ON s.schema_id = t.schema_id
+GROUP BY s.name, t.name
+"""
+
+
+def connect(path: str = ":memory:", check_same_thread: bool = True) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=check_same_thread)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def create_metadata_control(connection: sqlite3.Connection,
+                            tables: Iterable[Tuple[str, str, int, int]], inactive: Iterable[str] = ()):
+    """
+    tables: (schema, table, row count, size in bytes) in lookup order
+    inactive: table names to store with IsActive = 0
+    """
+    inactive = set(inactive)
+    connection.executescript("""
+        DROP TABLE IF EXISTS MetadataControl;
+        DROP TABLE IF EXISTS TableStats;
+        CREATE TABLE MetadataControl (
+            TableId INTEGER PRIMARY KEY,
+            SourceSchema TEXT NOT NULL,
+            SourceTable TEXT NOT NULL,
+            SourceQuery TEXT NOT NULL,
+            IsActive INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE TABLE TableStats (
+            SourceSchema TEXT NOT NULL,
+            SourceTable TEXT NOT NULL,
+            RowCount INTEGER NOT NULL,
+            SizeBytes INTEGER NOT NULL,
+            PRIMARY KEY (SourceSchema, SourceTable)
+        );
+    """)
+    for table_id, (schema, table, rows, size) in enumerate(tables, 1):
+        connection.execute(
+            "INSERT INTO MetadataControl (TableId, SourceSchema, SourceTable, SourceQuery, IsActive) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (table_id, schema, table, f"SELECT * FROM {schema}.{table}", 0 if table in inactive else 1))
+        connection.execute("INSERT INTO TableStats VALUES (?, ?, ?, ?)", (schema, table, rows, size))
+    connection.commit()
+
+
+def fetch_rows(connection: sqlite3.Connection, query: str, parameters: Tuple = ()) -> List[Dict]:
+    """Query results as dicts, the shape a Lookup activity returns in output.value"""
+    return [dict(row) for row in connection.execute(query, parameters)]
+
+
+def table_stats(connection: sqlite3.Connection, query: str = STATS_QUERY) -> Dict[Tuple[str, str], Dict]:
+    """(schema, table) -> {"RowCount", "SizeBytes"}"""
+    return {(row["SourceSchema"], row["SourceTable"]): {"RowCount": row["RowCount"], "SizeBytes": row["SizeBytes"]}
+            for row in fetch_rows(connection, query)}
+
+
+def ensure_columns(connection: sqlite3.Connection, table: str, columns: Dict[str, str]):
+    """Add any missing columns (name -> SQL type) to a table"""
+    existing = {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+    for name, sql_type in columns.items():
+        if name not in existing:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+
+def lookup_output(connection: sqlite3.Connection, query: Optional[str] = None) -> Dict:
+    """GetTableList's activity output for the given control query"""
+    rows = fetch_rows(connection, query or CONTROL_QUERY)
+    return {"count": len(rows), "value": rows}
+
+
+def sql_timestamp(value: datetime) -> str:
+    """Millisecond text timestamp: sorts correctly in SQLite and converts to SQL Server datetime"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+
+
+def create_watermarked_table(connection: sqlite3.Connection, table: str, modified: Iterable[datetime],
+                             watermark: datetime):
+    """
+    Source table with an indexed LastModifiedDate column, plus its row in WatermarkTable
+    (what LookupOldWatermark reads and usp_write_watermark updates)
+    """
+    connection.executescript(f"""
+        DROP TABLE IF EXISTS {table};
+        CREATE TABLE {table} (Id INTEGER PRIMARY KEY, LastModifiedDate TEXT NOT NULL, Payload TEXT);
+        CREATE INDEX IX_{table}_LastModifiedDate ON {table} (LastModifiedDate);
+        CREATE TABLE IF NOT EXISTS WatermarkTable (TableName TEXT PRIMARY KEY, WatermarkValue TEXT NOT NULL);
+    """)
+    connection.executemany(f"INSERT INTO {table} (LastModifiedDate, Payload) VALUES (?, ?)",
+                           ((sql_timestamp(value), f"row-{i}") for i, value in enumerate(modified)))
+    connection.execute("INSERT OR REPLACE INTO WatermarkTable VALUES (?, ?)", (table, sql_timestamp(watermark)))
+    connection.commit()
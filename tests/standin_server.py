@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Local ADF / Synapse REST stand-in server
+Emulates the endpoints used by the clients, seeded from the repo's definitions,
+with configurable latency, throttling and failure injection
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from run_utils import format_timestamp, is_terminal, parse_timestamp
+from stub_server import StubCredential, StubServer
+
+REPO_ROOT = Path(__file__).parent.parent
+
+FACTORY_PATH = "/subscriptions/sub/resourceGroups/rg/providers/Microsoft.DataFactory/factories/adf"
+WORKSPACE_PATH = "/synapse"
+
+# Notebooks referenced by pl_orchestration_master
+DEFAULT_NOTEBOOKS = ("nb_transform_raw_to_processed", "nb_curate_processed_data", "nb_data_quality_checks")
+
+# Stored run fields returned as-is; status, runEnd, durationInMs and lastUpdated are derived
+RUN_FIELDS = ("runId", "pipelineName", "parameters", "invokedBy", "runStart")
+
+
+class StandInConfig:
+    """Knobs for latency, throttling and failure injection"""
+
+    def __init__(self, latency: float = 0.0, latency_jitter: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 0.0,
+                 failure_rate: float = 0.0, run_duration: float = 0.0,
+                 run_failure_rate: float = 0.0, page_size: int = 100,
+                 definition_page_size: Optional[int] = None, seed: Optional[int] = None):
+        """
+        latency, latency_jitter: seconds added to every response (uniform jitter on top)
+        throttle_rate: share of requests answered 429 with Retry-After: retry_after
+        failure_rate: share of requests answered 500
+        run_duration: seconds a triggered run stays InProgress
+        run_failure_rate: share of triggered runs that end Failed
+        page_size: runs per queryPipelineRuns / queryActivityruns page
+        definition_page_size: definitions per list page, linked with nextLink (None: one page)
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.failure_rate = failure_rate
+        self.run_duration = run_duration
+        self.run_failure_rate = run_failure_rate
+        self.page_size = page_size
+        self.definition_page_size = definition_page_size
+        self.seed = seed
+
+
+def _load_definitions(folder: str) -> Dict[str, Dict]:
+    definitions = {}
+    for path in sorted((REPO_ROOT / folder).glob("*.json")):
+        with open(path, 'r') as f:
+            definition = json.load(f)
+        definition.setdefault("etag", f'"{uuid.uuid4()}"')
+        definitions[definition["name"]] = definition
+    return definitions
+
+
+def _notebook(name: str) -> Dict:
+    return {
+        "name": name,
+        "etag": f'"{uuid.uuid4()}"',
+        "type": "Microsoft.Synapse/workspaces/notebooks",
+        "properties": {
+            "metadata": {"language": "python"},
+            "cells": [{"cell_type": "code", "source": [f"# {name}\n", "df = spark.read.parquet(inputPath)\n"]}],
+        },
+    }
+
+
+def _error(status: int, code: str, message: str) -> Tuple[int, Dict[str, str], Dict]:
+    return status, {}, {"error": {"code": code, "message": message}}
+
+
+class StandInState:
+    """In-memory factory/workspace: definitions, pipeline runs and activity runs"""
+
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self.rng = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+
+        self.definitions: Dict[str, Dict[str, Dict]] = {
+            "pipelines": _load_definitions("pipelines"),
+            "datasets": _load_definitions("datasets"),
+            "linkedservices": _load_definitions("linkedservices"),
+            "notebooks": {name: _notebook(name) for name in DEFAULT_NOTEBOOKS},
+        }
+        self.runs: Dict[str, Dict] = {}
+        self.cancel_requests: List[Tuple[str, bool]] = []
+        self.request_counts: Dict[str, int] = {}
+
+    # Run bookkeeping
+    def _add_run(self, pipeline_name: str, run_start: datetime, duration: float,
+                 final_status: str, parameters: Optional[Dict] = None,
+                 invoked_by: Optional[Dict] = None) -> Dict:
+        run_id = str(uuid.uuid4())
+        run = {
+            "runId": run_id,
+            "pipelineName": pipeline_name,
+            "parameters": parameters or {},
+            "invokedBy": invoked_by or {"name": "Manual", "id": str(uuid.uuid4()), "invokedByType": "Manual"},
+            "runStart": format_timestamp(run_start),
+            "_start": run_start,
+            "_duration": duration,
+            "_final_status": final_status,
+        }
+        self.runs[run_id] = run
+
+        # ExecutePipeline activities start child runs that end with their parent
+        definition = self.definitions["pipelines"].get(pipeline_name, {})
+        for activity in definition.get("properties", {}).get("activities", []):
+            if activity.get("type") == "ExecutePipeline":
+                child = activity["typeProperties"]["pipeline"]["referenceName"]
+                self._add_run(child, run_start, duration, final_status, invoked_by={
+                    "name": activity["name"], "id": str(uuid.uuid4()),
+                    "invokedByType": "PipelineActivity",
+                    "pipelineName": pipeline_name, "pipelineRunId": run_id,
+                })
+        return run
+
+    def seed_history(self, count: int, days: float = 7.0, now: Optional[datetime] = None,
+                     failure_rate: float = 0.05) -> List[str]:
+        """Add `count` finished runs of the repo's pipelines spread over the last `days`"""
+        now = now or datetime.utcnow()
+        names = sorted(self.definitions["pipelines"])
+        run_ids = []
+        with self.lock:
+            for _ in range(count):
+                duration = self.rng.lognormvariate(5.5, 0.6)
+                start = now - timedelta(seconds=self.rng.uniform(duration, days * 86400))
+                status = "Failed" if self.rng.random() < failure_rate else "Succeeded"
+                run_ids.append(self._add_run(self.rng.choice(names), start, duration, status)["runId"])
+        return run_ids
+
+    @staticmethod
+    def _state_at(run: Dict, now: datetime) -> Tuple[str, Optional[datetime], datetime]:
+        """(status, runEnd, lastUpdated) of a run as of `now`"""
+        if run.get("_cancelled_at") is not None:
+            return "Cancelled", run["_cancelled_at"], run["_cancelled_at"]
+        end = run["_start"] + timedelta(seconds=run["_duration"])
+        if end <= now:
+            return run["_final_status"], end, end
+        return "InProgress", None, now
+
+    def _view(self, run: Dict, now: datetime) -> Dict:
+        """Public JSON for a run as of `now`"""
+        cached = run.get("_view")
+        if cached is not None:
+            return cached
+        view = {field: run[field] for field in RUN_FIELDS}
+        view["status"], end, _ = self._state_at(run, now)
+        if end is not None:
+            view["runEnd"] = format_timestamp(end)
+            view["durationInMs"] = int((end - run["_start"]).total_seconds() * 1000)
+            view["lastUpdated"] = format_timestamp(end)
+        else:
+            view["lastUpdated"] = format_timestamp(now)
+        view["message"] = "Operation on target failed" if view["status"] == "Failed" else ""
+        if is_terminal(view["status"]):
+            # Finished runs never change again
+            run["_view"] = view
+        return view
+
+    def _activity_runs(self, run: Dict, now: datetime) -> List[Dict]:
+        parent = self._view(run, now)
+        definition = self.definitions["pipelines"].get(run["pipelineName"], {})
+        activities = definition.get("properties", {}).get("activities", [])
+        rng = random.Random(run["runId"])
+        result = []
+        for index, activity in enumerate(activities):
+            share = run["_duration"] / max(len(activities), 1)
+            start = run["_start"] + timedelta(seconds=share * index)
+            if start > now:
+                break
+            status = parent["status"] if index == len(activities) - 1 else "Succeeded"
+            record = {
+                "activityRunId": str(uuid.UUID(int=rng.getrandbits(128))),
+                "activityName": activity["name"],
+                "activityType": activity["type"],
+                "pipelineName": run["pipelineName"],
+                "pipelineRunId": run["runId"],
+                "status": status if is_terminal(parent["status"]) else "InProgress",
+                "activityRunStart": format_timestamp(start),
+                "activityRunEnd": format_timestamp(start + timedelta(seconds=share)),
+                "durationInMs": int(share * 1000),
+                "input": {"source": activity.get("typeProperties", {}).get("source", {})},
+                "output": {},
+            }
+            if activity["type"] == "Copy":
+                rows = rng.randint(10_000, 5_000_000)
+                record["output"] = {
+                    "rowsRead": rows, "rowsCopied": rows,
+                    "dataRead": rows * 120, "dataWritten": rows * 40,
+                    "copyDuration": int(share), "throughput": rows * 120 / 1024 / max(share, 1),
+                    "usedDataIntegrationUnits": 4, "usedParallelCopies": 4,
+                }
+            result.append(record)
+        return result
+
+    def get_run(self, run_id: str, now: Optional[datetime] = None) -> Dict:
+        """Current JSON of a run, read directly (no latency or failure injection)"""
+        return self._view(self.runs[run_id], now or datetime.utcnow())
+
+    def get_activity_runs(self, run_id: str, now: Optional[datetime] = None) -> List[Dict]:
+        """Activity runs of a pipeline run, read directly"""
+        return self._activity_runs(self.runs[run_id], now or datetime.utcnow())
+
+    # Query helpers
+    @staticmethod
+    def _matches(view: Dict, filters: List[Dict]) -> bool:
+        fields = {"PipelineName": "pipelineName", "Status": "status", "RunId": "runId"}
+        for condition in filters:
+            field = fields.get(condition.get("operand"))
+            if field is None:
+                continue
+            value, values = view.get(field), condition.get("values", [])
+            operator = condition.get("operator")
+            if operator in ("Equals", "In") and value not in values:
+                return False
+            if operator in ("NotEquals", "NotIn") and value in values:
+                return False
+        return True
+
+    def _page(self, items: List[Dict], token: Optional[str]) -> Dict:
+        offset = json.loads(base64.b64decode(token))["offset"] if token else 0
+        page_size = self.config.page_size
+        payload = {"value": items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            payload["continuationToken"] = base64.b64encode(
+                json.dumps({"offset": offset + page_size}).encode()).decode()
+        return payload
+
+    def _list_page(self, items: List[Dict], base: str, query: str) -> Dict:
+        """One page of a definition listing; later pages are linked by an absolute nextLink"""
+        page_size = self.config.definition_page_size
+        if not page_size:
+            return {"value": items}
+        parameters = [p for p in query.split("&") if p and not p.startswith("$skipToken=")]
+        offset = next((int(p.split("=", 1)[1]) for p in query.split("&") if p.startswith("$skipToken=")), 0)
+        payload = {"value": items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            payload["nextLink"] = f"{base}?{'&'.join(parameters + [f'$skipToken={offset + page_size}'])}"
+        return payload
+
+    def _query_runs(self, body: Dict, now: datetime) -> Dict:
+        after = parse_timestamp(body.get("lastUpdatedAfter"))
+        before = parse_timestamp(body.get("lastUpdatedBefore"))
+        filters = body.get("filters") or []
+        matches = []
+        # list() snapshots the dict atomically, so queries don't block triggers
+        for run in list(self.runs.values()):
+            _, end, updated = self._state_at(run, now)
+            if (after is not None and updated < after) or (before is not None and updated > before):
+                continue
+            view = self._view(run, now)
+            if self._matches(view, filters):
+                matches.append((run["_start"], end or datetime.max, view))
+        for order in reversed(body.get("orderBy") or []):
+            field = order.get("orderBy", "RunStart")
+            if field == "RunStart":
+                key = lambda match: match[0]
+            elif field == "RunEnd":
+                key = lambda match: match[1]
+            else:
+                key = lambda match: match[2].get(field[0].lower() + field[1:]) or ""
+            matches.sort(key=key, reverse=order.get("order") == "DESC")
+        return self._page([view for _, _, view in matches], body.get("continuationToken"))
+
+    def _cancel(self, run_id: str, recursive: bool, now: datetime):
+        run = self.runs[run_id]
+        if not is_terminal(self._state_at(run, now)[0]):
+            run["_cancelled_at"] = now
+        if recursive:
+            for child in self.runs.values():
+                if child["invokedBy"].get("pipelineRunId") == run_id:
+                    self._cancel(child["runId"], True, now)
+
+    # Request handling
+    def handle(self, method: str, path: str, headers: Dict[str, str],
+               body: Optional[Dict]) -> Tuple[int, Dict[str, str], Optional[Dict]]:
+        config = self.config
+        with self.lock:
+            delay = config.latency + self.rng.uniform(0, config.latency_jitter)
+            roll = self.rng.random()
+        if delay:
+            time.sleep(delay)
+        if roll < config.throttle_rate:
+            return 429, {"Retry-After": str(config.retry_after)}, {"error": {"code": "TooManyRequests"}}
+        if roll < config.throttle_rate + config.failure_rate:
+            return _error(500, "InternalServerError", "Injected failure")
+
+        route, _, query = path.partition("?")
+        for prefix in (FACTORY_PATH, WORKSPACE_PATH):
+            if route.startswith(prefix):
+                route = route[len(prefix):]
+                break
+        else:
+            return _error(404, "NotFound", f"Unknown resource {route}")
+        segments = [segment for segment in route.split("/") if segment]
+        # Count per operation, e.g. "POST pipelineruns/{id}/cancel"
+        operation = f'{method} {"/".join(segments[:1] + ["{id}"] * (len(segments) > 1) + segments[2:3])}'
+        with self.lock:
+            self.request_counts[operation] = self.request_counts.get(operation, 0) + 1
+        base = f"http://{headers.get('host', '')}{prefix}/{'/'.join(segments)}"
+        return self._route(method, segments, query, headers, body or {}, datetime.utcnow(), base)
+
+    def _route(self, method, segments, query, headers, body, now, base=""):
+        if not segments:
+            return _error(404, "NotFound", "No resource")
+        kind = segments[0]
+
+        if kind in self.definitions and method == "GET":
+            items = self.definitions[kind]
+            if len(segments) == 1:
+                return 200, {}, self._list_page(list(items.values()), base, query)
+            definition = items.get(segments[1])
+            if definition is None:
+                return _error(404, "NotFound", f"{kind} {segments[1]} not found")
+            if headers.get("if-none-match") == definition["etag"]:
+                return 304, {}, None
+            return 200, {"ETag": definition["etag"]}, definition
+
+        if kind == "pipelines" and len(segments) == 3 and segments[2] == "createRun" and method == "POST":
+            if segments[1] not in self.definitions["pipelines"]:
+                return _error(404, "PipelineNotFound", f"Pipeline {segments[1]} not found")
+            with self.lock:
+                final_status = "Failed" if self.rng.random() < self.config.run_failure_rate else "Succeeded"
+                run = self._add_run(segments[1], now, self.config.run_duration, final_status,
+                                    body.get("parameters", body))
+            return 200, {"x-ms-ratelimit-remaining-subscription-writes": "1199"}, {"runId": run["runId"]}
+
+        if kind == "queryPipelineRuns" and method == "POST":
+            return 200, {}, self._query_runs(body, now)
+
+        if kind == "pipelineruns" and len(segments) >= 2:
+            run = self.runs.get(segments[1])
+            if run is None:
+                return _error(404, "PipelineRunNotFound", f"Run {segments[1]} not found")
+            if len(segments) == 2 and method == "GET":
+                return 200, {}, self._view(run, now)
+            if segments[2:] == ["queryActivityruns"] and method == "POST":
+                return 200, {}, self._page(self._activity_runs(run, now), body.get("continuationToken"))
+            if segments[2:] == ["cancel"] and method == "POST":
+                recursive = "isrecursive=true" in query.lower()
+                with self.lock:
+                    self.cancel_requests.append((run["runId"], recursive))
+                    self._cancel(run["runId"], recursive, now)
+                return 200, {}, None
+
+        return _error(404, "NotFound", f"Unsupported {method} /{'/'.join(segments)}")
+
+
+class StandInServer(StubServer):
+    """StubServer serving a StandInState; hands out clients already pointed at it"""
+
+    def __init__(self, config: Optional[StandInConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.state = StandInState(config)
+        super().__init__(self.state.handle, host, port)
+
+    @property
+    def factory_url(self) -> str:
+        return self.url + FACTORY_PATH
+
+    @property
+    def workspace_url(self) -> str:
+        return self.url + WORKSPACE_PATH
+
+    def adf_client(self, **kwargs):
+        """AzureDataFactoryClient for this stand-in"""
+        from http_transport import HttpTransport
+        from test_adf_api import AzureDataFactoryClient
+        kwargs.setdefault("transport", HttpTransport())
+        client = AzureDataFactoryClient("sub", "rg", "adf", credential=StubCredential(), **kwargs)
+        client.base_url = self.factory_url
+        return client
+
+    def async_adf_client(self, **kwargs):
+        """AsyncDataFactoryClient for this stand-in"""
+        from adf_async_client import AsyncDataFactoryClient
+        client = AsyncDataFactoryClient("sub", "rg", "adf", credential=StubCredential(), **kwargs)
+        client.base_url = self.factory_url
+        return client
+
+    def synapse_client(self, **kwargs):
+        """SynapseWorkspaceClient for this stand-in"""
+        from http_transport import HttpTransport
+        from test_synapse_api import SynapseWorkspaceClient
+        kwargs.setdefault("transport", HttpTransport())
+        client = SynapseWorkspaceClient("ws", credential=StubCredential(), **kwargs)
+        client.dev_endpoint = self.workspace_url
+        return client
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Minimal local HTTP stub server for offline client tests and benchmarks
+Serves canned JSON over keep-alive HTTP/1.1 and counts TCP connections
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+from azure.core.credentials import AccessToken
+
+# handler(method, path, headers, body) -> (status, headers, payload)
+StubHandler = Callable[[str, str, Dict[str, str], Optional[Dict]], Tuple[int, Dict[str, str], Optional[Dict]]]
+
+
+def default_handler(method: str, path: str, headers: Dict[str, str],
+                    body: Optional[Dict]) -> Tuple[int, Dict[str, str], Optional[Dict]]:
+    """Answer every request with an empty ARM-style list"""
+    return 200, {}, {"value": []}
+
+
+class StubCredential:
+    """Credential that issues fake tokens without contacting Azure AD"""
+
+    def __init__(self, lifetime: float = 3600.0):
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        return AccessToken(f"stub-token-{self.calls}", int(time.time() + self.lifetime))
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle stall keep-alive clients
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        body = json.loads(raw) if raw else None
+        with self.server.lock:
+            self.server.requests += 1
+
+        status, headers, payload = self.server.handler(
+            self.command, self.path, {k.lower(): v for k, v in self.headers.items()}, body)
+
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_PUT = _dispatch
+    do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for hundreds of concurrent client connections
+    request_queue_size = 512
+
+
+class StubServer:
+    """Threaded local HTTP server, usable as a context manager"""
+
+    def __init__(self, handler: StubHandler = default_handler, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = _StubHTTPServer((host, port), _StubRequestHandler)
+        self.httpd.handler = handler
+        self.httpd.lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        """Number of TCP connections accepted so far"""
+        return self.httpd.connections
+
+    @property
+    def requests(self) -> int:
+        """Number of HTTP requests served so far"""
+        return self.httpd.requests
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Activity run cache tests
+Runs offline with a fake clock and the local stub server
+"""
+
+import os
+import tempfile
+
+from activity_run_cache import ActivityRunCache
+from http_transport import HttpTransport
+from stub_server import StubCredential, StubServer
+from test_adf_api import AzureDataFactoryClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+ACTIVITIES = [{"activityName": "CopyBlobToDataLake", "status": "Succeeded"}]
+
+
+def test_terminal_runs_are_cached_permanently():
+    """Test: Activity runs of a finished pipeline run are never re-fetched"""
+    print("\n=== Test: Terminal Runs ===")
+    clock = FakeClock()
+    cache = ActivityRunCache(in_progress_ttl=60.0, clock=clock)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return ACTIVITIES
+
+    run = {"runId": "run-1", "status": "Succeeded"}
+    assert cache.get_or_fetch(run, fetch) == ACTIVITIES
+    clock.now += 86400 * 30
+    assert cache.get_or_fetch(run, fetch) == ACTIVITIES
+    assert len(fetches) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    print("✓ Test passed")
+
+
+def test_in_progress_runs_expire():
+    """Test: Activity runs of a moving pipeline run are reused only within the TTL"""
+    print("\n=== Test: In-Progress TTL ===")
+    clock = FakeClock()
+    cache = ActivityRunCache(in_progress_ttl=60.0, clock=clock)
+    cache.put("run-2", "InProgress", ACTIVITIES)
+
+    clock.now += 30
+    assert cache.get("run-2") == ACTIVITIES
+    clock.now += 31
+    assert cache.get("run-2") is None
+    assert cache.purge_stale() == 1
+    print("✓ Test passed")
+
+
+def test_cache_persists_across_instances():
+    """Test: A second process sees terminal entries written by the first"""
+    print("\n=== Test: Persistent Cache ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "activity_runs.sqlite")
+        first = ActivityRunCache(path)
+        first.put("run-3", "Failed", ACTIVITIES)
+        first.close()
+
+        second = ActivityRunCache(path)
+        assert second.get("run-3") == ACTIVITIES
+        second.close()
+    print("✓ Test passed")
+
+
+def test_client_uses_cache():
+    """Test: Repeated get_activity_runs calls only hit the API for moving runs"""
+    print("\n=== Test: Client Integration ===")
+
+    def handler(method, path, headers, body):
+        return 200, {}, {"value": ACTIVITIES}
+
+    with StubServer(handler) as server:
+        client = AzureDataFactoryClient("sub", "rg", "adf", transport=HttpTransport(),
+                                        credential=StubCredential(),
+                                        activity_run_cache=ActivityRunCache())
+        client.base_url = f"{server.url}/factories/adf"
+        finished = {"runId": "run-4", "status": "Succeeded",
+                    "runStart": "2024-01-01T00:00:00.1234567Z", "runEnd": "2024-01-01T00:10:00Z"}
+        for _ in range(5):
+            assert client.get_activity_runs(finished) == ACTIVITIES
+        assert server.requests == 1
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Activity Run Cache Tests")
+    print("=" * 50)
+
+    test_terminal_runs_are_cached_permanently()
+    test_in_progress_runs_expire()
+    test_cache_persists_across_instances()
+    test_client_uses_cache()
+
+    print("\n" + "=" * 50)
+    print("All activity run cache tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
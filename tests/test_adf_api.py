@@ -4,32 +4,66 @@ Azure Data Factory REST API Tests
 Tests pipeline operations, monitoring, and management using ADF REST API
 """
 
-import requests
 import json
 import os
 from datetime import datetime, timedelta
-from azure.identity import DefaultAzureCredential, ClientSecretCredential
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from activity_run_cache import ActivityRunCache
+from bulk_trigger import BulkTrigger
+from definition_cache import DefinitionCache
+from http_transport import HttpTransport, get_default_transport
+from run_drain import DrainReport, RunDrain
+from run_metrics import RunMetrics, collect_run_metrics
+from run_query_sharding import RUN_START_ORDER, ShardedRunQuery
+from run_records import ActivityRunRecord, PipelineRunRecord
+from run_utils import parse_timestamp
+from run_watcher import RunWatcher
+from token_cache import TokenCache, default_credential
+
+# Run listings yield API dicts, or compact records when called with as_records=True
+PipelineRun = Union[Dict, PipelineRunRecord]
+ActivityRun = Union[Dict, ActivityRunRecord]
 
 
 class AzureDataFactoryClient:
     """Client for Azure Data Factory REST API operations"""
 
-    def __init__(self, subscription_id: str, resource_group: str, factory_name: str):
+    def __init__(self, subscription_id: str, resource_group: str, factory_name: str,
+                 transport: Optional[HttpTransport] = None,
+                 credential=None, token_cache: Optional[TokenCache] = None,
+                 definition_cache: Optional[DefinitionCache] = None,
+                 activity_run_cache: Optional[ActivityRunCache] = None):
         self.subscription_id = subscription_id
         self.resource_group = resource_group
         self.factory_name = factory_name
         self.api_version = "2018-06-01"
         self.base_url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.DataFactory/factories/{factory_name}"
 
-        # Authenticate using DefaultAzureCredential
-        self.credential = DefaultAzureCredential()
-        self.token = self._get_access_token()
+        # Pooled keep-alive connections, shared with other clients by default
+        self.transport = transport or get_default_transport()
+
+        # Authenticate using DefaultAzureCredential; tokens are cached per scope and refreshed before expiry
+        self.credential = credential or default_credential()
+        self.token_cache = token_cache or TokenCache(
+            self.credential, cache_path=os.getenv("AZURE_TOKEN_CACHE_FILE"))
+
+        # Definitions are revalidated with conditional GETs instead of re-downloaded
+        self.definition_cache = definition_cache if definition_cache is not None else DefinitionCache()
+
+        # Optional persistent cache of activity runs (permanent once the parent run is terminal)
+        cache_file = os.getenv("ADF_ACTIVITY_RUN_CACHE_FILE")
+        self.activity_run_cache = activity_run_cache or (ActivityRunCache(cache_file) if cache_file else None)
+
+    @property
+    def token(self) -> str:
+        """Current access token, refreshed transparently"""
+        return self._get_access_token()
 
     def _get_access_token(self) -> str:
         """Get Azure AD access token"""
-        token = self.credential.get_token("https://management.azure.com/.default")
-        return token.token
+        return self.token_cache.get_token("https://management.azure.com/.default")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get HTTP headers with authentication"""
@@ -41,36 +75,78 @@ class AzureDataFactoryClient:
     def get_pipeline(self, pipeline_name: str) -> Dict:
         """Get pipeline definition"""
         url = f"{self.base_url}/pipelines/{pipeline_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
     def list_pipelines(self) -> List[Dict]:
         """List all pipelines"""
         url = f"{self.base_url}/pipelines?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json().get("value", [])
+        return self.definition_cache.get(self.transport, url, self._get_headers()).get("value", [])
 
-    def create_pipeline_run(self, pipeline_name: str, parameters: Optional[Dict] = None) -> str:
-        """Trigger a pipeline run"""
+    def create_pipeline_run(self, pipeline_name: str, parameters: Optional[Dict] = None,
+                            client_request_id: Optional[str] = None,
+                            observe_headers: Optional[Callable[[Mapping[str, str]], None]] = None) -> str:
+        """Trigger a pipeline run; observe_headers sees the response headers (e.g. ARM's remaining writes)"""
         url = f"{self.base_url}/pipelines/{pipeline_name}/createRun?api-version={self.api_version}"
         body = {"parameters": parameters} if parameters else {}
 
-        response = requests.post(url, headers=self._get_headers(), json=body)
+        headers = self._get_headers()
+        if client_request_id:
+            headers["x-ms-client-request-id"] = client_request_id
+
+        response = self.transport.post(url, headers=headers, json=body)
+        if observe_headers:
+            observe_headers(response.headers)
         response.raise_for_status()
         return response.json().get("runId")
 
+    def trigger_pipeline_runs(self, pipeline_name: str, parameter_sets: Iterable[Dict],
+                              max_workers: int = 8,
+                              journal_path: Optional[str] = None) -> Iterator[Tuple[Dict, Optional[str]]]:
+        """Trigger a pipeline once per parameter set; yields (parameters, runId) as runs are created"""
+        return BulkTrigger(self, pipeline_name, max_workers=max_workers,
+                           journal_path=journal_path).run(parameter_sets)
+
     def get_pipeline_run(self, run_id: str) -> Dict:
         """Get pipeline run details"""
         url = f"{self.base_url}/pipelineruns/{run_id}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
+        response = self.transport.get(url, headers=self._get_headers())
         response.raise_for_status()
         return response.json()
 
-    def query_pipeline_runs(self, start_time: datetime, end_time: datetime,
-                           filters: Optional[List[Dict]] = None) -> List[Dict]:
-        """Query pipeline runs in a time range"""
+    def _query_page(self, url: str, body: Dict,
+                    continuation_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Fetch one page of query results and the token for the next page"""
+        page_body = dict(body, continuationToken=continuation_token) if continuation_token else body
+        response = self.transport.post(url, headers=self._get_headers(), json=page_body)
+        response.raise_for_status()
+        payload = response.json()
+        return payload.get("value", []), payload.get("continuationToken")
+
+    def _iter_query_pages(self, url: str, body: Dict, prefetch: bool = False) -> Iterator[List[Dict]]:
+        """Yield query result pages, following continuationToken until exhausted"""
+        def fetch(continuation_token: Optional[str]):
+            return self._query_page(url, body, continuation_token)
+
+        if not prefetch:
+            continuation_token = None
+            while True:
+                page, continuation_token = fetch(continuation_token)
+                yield page
+                if not continuation_token:
+                    return
+
+        # Fetch the next page in the background while the caller works on this one
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(fetch, None)
+            while pending is not None:
+                page, continuation_token = pending.result()
+                pending = executor.submit(fetch, continuation_token) if continuation_token else None
+                yield page
+
+    def _pipeline_runs_query(self, start_time: datetime, end_time: datetime,
+                             filters: Optional[List[Dict]] = None,
+                             order_by: Optional[List[Dict]] = None) -> Tuple[str, Dict]:
+        """Build the queryPipelineRuns URL and request body"""
         url = f"{self.base_url}/queryPipelineRuns?api-version={self.api_version}"
 
         body = {
@@ -78,13 +154,61 @@ class AzureDataFactoryClient:
             "lastUpdatedBefore": end_time.isoformat() + "Z",
             "filters": filters or []
         }
+        if order_by:
+            body["orderBy"] = order_by
+
+        return url, body
+
+    def query_pipeline_run_page(self, start_time: datetime, end_time: datetime,
+                                filters: Optional[List[Dict]] = None,
+                                continuation_token: Optional[str] = None,
+                                order_by: Optional[List[Dict]] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Query a single page of pipeline runs; returns (runs, continuationToken)"""
+        url, body = self._pipeline_runs_query(start_time, end_time, filters, order_by)
+        return self._query_page(url, body, continuation_token)
+
+    def iter_pipeline_run_pages(self, start_time: datetime, end_time: datetime,
+                                filters: Optional[List[Dict]] = None, prefetch: bool = False,
+                                as_records: bool = False) -> Iterator[List[PipelineRun]]:
+        """Yield pipeline runs in a time range, one page at a time (as PipelineRunRecords if as_records)"""
+        url, body = self._pipeline_runs_query(start_time, end_time, filters)
+        pages = self._iter_query_pages(url, body, prefetch)
+        return map(PipelineRunRecord.from_page, pages) if as_records else pages
+
+    def iter_pipeline_runs(self, start_time: datetime, end_time: datetime,
+                           filters: Optional[List[Dict]] = None, prefetch: bool = False,
+                           as_records: bool = False) -> Iterator[PipelineRun]:
+        """Yield pipeline runs in a time range, fetching pages lazily"""
+        for page in self.iter_pipeline_run_pages(start_time, end_time, filters, prefetch, as_records):
+            yield from page
 
-        response = requests.post(url, headers=self._get_headers(), json=body)
-        response.raise_for_status()
-        return response.json().get("value", [])
-
-    def query_activity_runs(self, run_id: str, start_time: datetime, end_time: datetime) -> List[Dict]:
-        """Query activity runs for a pipeline run"""
+    def query_pipeline_runs(self, start_time: datetime, end_time: datetime,
+                            filters: Optional[List[Dict]] = None,
+                            as_records: bool = False) -> List[PipelineRun]:
+        """Query pipeline runs in a time range"""
+        return list(self.iter_pipeline_runs(start_time, end_time, filters, as_records=as_records))
+
+    def query_pipeline_runs_sharded(self, start_time: datetime, end_time: datetime,
+                                    filters: Optional[List[Dict]] = None, max_workers: int = 8,
+                                    target_runs_per_slice: int = 500, max_slices: int = 64) -> List[Dict]:
+        """Query pipeline runs as concurrently fetched time slices, de-duplicated by runId"""
+        def fetch_page(slice_start, slice_end, continuation_token):
+            return self.query_pipeline_run_page(slice_start, slice_end, filters, continuation_token,
+                                                order_by=RUN_START_ORDER)
+
+        query = ShardedRunQuery(fetch_page, max_workers=max_workers,
+                                target_runs_per_slice=target_runs_per_slice, max_slices=max_slices)
+        return query.run(start_time, end_time)
+
+    def pipeline_run_metrics(self, start_time: datetime, end_time: datetime,
+                             filters: Optional[List[Dict]] = None, slices: int = 8,
+                             max_workers: int = 8) -> RunMetrics:
+        """Aggregate run counts and duration percentiles per pipeline and status, page by page"""
+        return collect_run_metrics(self, start_time, end_time, filters, slices=slices, max_workers=max_workers)
+
+    def iter_activity_run_pages(self, run_id: str, start_time: datetime, end_time: datetime,
+                                prefetch: bool = False, as_records: bool = False) -> Iterator[List[ActivityRun]]:
+        """Yield activity runs for a pipeline run, one page at a time (as ActivityRunRecords if as_records)"""
         url = f"{self.base_url}/pipelineruns/{run_id}/queryActivityruns?api-version={self.api_version}"
 
         body = {
@@ -92,30 +216,70 @@ class AzureDataFactoryClient:
             "lastUpdatedBefore": end_time.isoformat() + "Z"
         }
 
-        response = requests.post(url, headers=self._get_headers(), json=body)
-        response.raise_for_status()
-        return response.json().get("value", [])
+        pages = self._iter_query_pages(url, body, prefetch)
+        return map(ActivityRunRecord.from_page, pages) if as_records else pages
 
-    def cancel_pipeline_run(self, run_id: str) -> Dict:
-        """Cancel a running pipeline"""
+    def iter_activity_runs(self, run_id: str, start_time: datetime, end_time: datetime,
+                           prefetch: bool = False, as_records: bool = False) -> Iterator[ActivityRun]:
+        """Yield activity runs for a pipeline run, fetching pages lazily"""
+        for page in self.iter_activity_run_pages(run_id, start_time, end_time, prefetch, as_records):
+            yield from page
+
+    def query_activity_runs(self, run_id: str, start_time: datetime, end_time: datetime,
+                            as_records: bool = False) -> List[ActivityRun]:
+        """Query activity runs for a pipeline run"""
+        return list(self.iter_activity_runs(run_id, start_time, end_time, as_records=as_records))
+
+    def get_activity_runs(self, pipeline_run: Dict) -> List[Dict]:
+        """Get activity runs for a pipeline run record, served from the activity run cache when possible"""
+        run_id = pipeline_run["runId"]
+        # Activity runs are updated between the parent's start and shortly after its end
+        start_time = parse_timestamp(pipeline_run.get("runStart")) or datetime.utcnow() - timedelta(days=1)
+        end_time = (parse_timestamp(pipeline_run.get("runEnd")) or datetime.utcnow()) + timedelta(hours=1)
+
+        def fetch():
+            return self.query_activity_runs(run_id, start_time - timedelta(minutes=5), end_time)
+
+        if self.activity_run_cache is None:
+            return fetch()
+        return self.activity_run_cache.get_or_fetch(pipeline_run, fetch)
+
+    def cancel_pipeline_run(self, run_id: str, is_recursive: bool = False,
+                            observe_headers: Optional[Callable[[Mapping[str, str]], None]] = None) -> Dict:
+        """Cancel a running pipeline (and the runs its ExecutePipeline activities started, if is_recursive)"""
         url = f"{self.base_url}/pipelineruns/{run_id}/cancel?api-version={self.api_version}"
-        response = requests.post(url, headers=self._get_headers())
+        if is_recursive:
+            url += "&isRecursive=true"
+        response = self.transport.post(url, headers=self._get_headers())
+        if observe_headers:
+            observe_headers(response.headers)
         response.raise_for_status()
         return response.json() if response.text else {}
 
+    def drain_pipeline_runs(self, pipeline_names: Optional[Iterable[str]] = None,
+                            lookback: timedelta = timedelta(days=1), max_workers: int = 8) -> DrainReport:
+        """Cancel every queued or in-progress run of the given pipelines (all if None), children included"""
+        return RunDrain(self, max_workers=max_workers).drain(pipeline_names, lookback=lookback)
+
     def get_linked_service(self, linked_service_name: str) -> Dict:
         """Get linked service definition"""
         url = f"{self.base_url}/linkedservices/{linked_service_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
     def get_dataset(self, dataset_name: str) -> Dict:
         """Get dataset definition"""
         url = f"{self.base_url}/datasets/{dataset_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
+
+    def get_definitions(self, kind: str, names: Iterable[str], max_workers: int = 8) -> Dict[str, Dict]:
+        """Fetch many definitions of one kind ("pipelines", "datasets", "linkedservices") concurrently"""
+        def fetch(name: str) -> Dict:
+            url = f"{self.base_url}/{kind}/{name}?api-version={self.api_version}"
+            return self.definition_cache.get(self.transport, url, self._get_headers())
+
+        names = list(names)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(names, executor.map(fetch, names)))
 
 
 def test_list_pipelines(client: AzureDataFactoryClient):
@@ -156,19 +320,11 @@ def test_trigger_pipeline(client: AzureDataFactoryClient, pipeline_name: str):
     print(f"Pipeline run triggered: {run_id}")
 
     # Check run status
-    import time
     max_wait = 300  # 5 minutes
-    start_time = time.time()
-
-    while time.time() - start_time < max_wait:
-        run_details = client.get_pipeline_run(run_id)
-        status = run_details['status']
-        print(f"Status: {status}")
-
-        if status in ['Succeeded', 'Failed', 'Cancelled']:
-            break
-
-        time.sleep(10)
+    watcher = RunWatcher(client, on_complete=lambda run: print(f"Status: {run['status']}"))
+    watcher.add(run_id, pipeline_name)
+    run_details = watcher.wait(timeout=max_wait).get(run_id) or client.get_pipeline_run(run_id)
+    print(f"Status: {run_details['status']}")
 
     assert run_details['status'] in ['Succeeded', 'InProgress'], f"Pipeline run failed: {run_details.get('message', '')}"
     print("✓ Test passed")
@@ -181,7 +337,7 @@ def test_query_pipeline_runs(client: AzureDataFactoryClient):
     end_time = datetime.utcnow()
     start_time = end_time - timedelta(days=7)
 
-    runs = client.query_pipeline_runs(start_time, end_time)
+    runs = client.query_pipeline_runs_sharded(start_time, end_time)
     print(f"Found {len(runs)} pipeline runs in the last 7 days")
 
     # Group by status
@@ -211,7 +367,7 @@ def test_query_activity_runs(client: AzureDataFactoryClient):
         run_id = pipeline_runs[0]['runId']
         print(f"Querying activities for run: {run_id}")
 
-        activities = client.query_activity_runs(run_id, start_time, end_time)
+        activities = client.get_activity_runs(pipeline_runs[0])
         print(f"Found {len(activities)} activities")
 
         for activity in activities:
@@ -245,24 +401,26 @@ def test_pipeline_metrics(client: AzureDataFactoryClient):
     end_time = datetime.utcnow()
     start_time = end_time - timedelta(days=7)
 
-    runs = client.query_pipeline_runs(start_time, end_time)
+    # Runs are aggregated page by page; only the per-group sketches are kept
+    metrics = client.pipeline_run_metrics(start_time, end_time)
+    total_runs = metrics.count()
 
-    if len(runs) > 0:
+    if total_runs > 0:
         # Calculate metrics
-        total_runs = len(runs)
-        succeeded = sum(1 for r in runs if r['status'] == 'Succeeded')
-        failed = sum(1 for r in runs if r['status'] == 'Failed')
-        success_rate = (succeeded / total_runs * 100) if total_runs > 0 else 0
-
-        # Calculate average duration for succeeded runs
-        durations = [r['durationInMs'] for r in runs if r['status'] == 'Succeeded' and 'durationInMs' in r]
-        avg_duration_minutes = (sum(durations) / len(durations) / 1000 / 60) if durations else 0
+        succeeded = metrics.select(status='Succeeded')
+        avg_duration_minutes = (succeeded.mean_duration_ms or 0) / 1000 / 60
 
         print(f"Total runs: {total_runs}")
-        print(f"Succeeded: {succeeded}")
-        print(f"Failed: {failed}")
-        print(f"Success rate: {success_rate:.2f}%")
+        print(f"Succeeded: {succeeded.runs}")
+        print(f"Failed: {metrics.count(status='Failed')}")
+        print(f"Success rate: {metrics.success_rate():.2f}%")
         print(f"Average duration: {avg_duration_minutes:.2f} minutes")
+
+        print("Succeeded-run duration by pipeline (minutes):")
+        for name, stats in metrics.summary().items():
+            percentiles = [stats[f"p{p}_duration_ms"] for p in (50, 95, 99)]
+            p50, p95, p99 = (value / 1000 / 60 if value is not None else 0 for value in percentiles)
+            print(f"  {name}: {stats['runs']} runs, p50 {p50:.2f}, p95 {p95:.2f}, p99 {p99:.2f}")
     else:
         print("No pipeline runs found in the last 7 days")
 
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Asyncio Data Factory client tests
+Runs offline against the local stub server
+"""
+
+import asyncio
+import threading
+import time
+
+from adf_async_client import AsyncDataFactoryClient
+from stub_server import StubCredential, StubServer
+
+
+def make_client(server: StubServer, **kwargs) -> AsyncDataFactoryClient:
+    client = AsyncDataFactoryClient("sub", "rg", "adf", credential=StubCredential(), **kwargs)
+    client.base_url = f"{server.url}/factories/adf"
+    return client
+
+
+def slow_run_handler(latency: float):
+    """Answer pipelineruns/<id> after `latency` seconds and track peak concurrency"""
+    state = {"in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def handler(method, path, headers, body):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(latency)
+        with lock:
+            state["in_flight"] -= 1
+        run_id = path.split("?")[0].rsplit("/", 1)[-1]
+        return 200, {}, {"runId": run_id, "status": "Succeeded"}
+
+    return handler, state
+
+
+def test_batch_runs_concurrently():
+    """Test: A batch of run lookups overlaps instead of running one at a time"""
+    print("\n=== Test: Concurrent Batch ===")
+    handler, state = slow_run_handler(latency=0.05)
+    run_ids = [f"run-{i}" for i in range(200)]
+
+    async def scenario(server):
+        async with make_client(server) as client:
+            return await client.get_pipeline_runs(run_ids)
+
+    with StubServer(handler) as server:
+        start = time.perf_counter()
+        runs = asyncio.run(scenario(server))
+        elapsed = time.perf_counter() - start
+
+    print(f"  200 lookups in {elapsed:.2f}s (serial would take ~10s), peak in flight: {state['peak']}")
+    assert [run["runId"] for run in runs] == run_ids
+    assert elapsed < 5.0
+    assert state["peak"] > 50
+    print("✓ Test passed")
+
+
+def test_concurrency_is_bounded():
+    """Test: The semaphore caps requests in flight"""
+    print("\n=== Test: Bounded Concurrency ===")
+    handler, state = slow_run_handler(latency=0.02)
+
+    async def scenario(server):
+        async with make_client(server, max_concurrency=5) as client:
+            await client.get_pipeline_runs(f"run-{i}" for i in range(40))
+
+    with StubServer(handler) as server:
+        asyncio.run(scenario(server))
+
+    assert state["peak"] <= 5, f"Peak concurrency {state['peak']} exceeds limit"
+    print("✓ Test passed")
+
+
+def test_endpoint_rate_limit():
+    """Test: Per-endpoint rate limits hold regardless of concurrency"""
+    print("\n=== Test: Endpoint Rate Limit ===")
+
+    def handler(method, path, headers, body):
+        return 200, {}, {"runId": "run"}
+
+    async def scenario(server):
+        async with make_client(server, rate_limits={"createRun": 100}) as client:
+            start = time.perf_counter()
+            await client.gather(client.create_pipeline_run("pl") for _ in range(150))
+            create_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await client.get_pipeline_runs(f"run-{i}" for i in range(150))
+            get_elapsed = time.perf_counter() - start
+            return create_elapsed, get_elapsed
+
+    with StubServer(handler) as server:
+        create_elapsed, get_elapsed = asyncio.run(scenario(server))
+
+    print(f"  createRun: {create_elapsed:.2f}s, pipelineruns: {get_elapsed:.2f}s")
+    # 100 burst + 50 more at 100/s
+    assert create_elapsed >= 0.45
+    assert get_elapsed < create_elapsed
+    print("✓ Test passed")
+
+
+def test_throttled_requests_are_retried():
+    """Test: 429 responses are retried with backoff"""
+    print("\n=== Test: Throttle Retry ===")
+    statuses = [429, 429, 200]
+
+    def handler(method, path, headers, body):
+        status = statuses.pop(0)
+        return status, {"Retry-After": "0"}, {"runId": "run-1"} if status == 200 else None
+
+    async def scenario(server):
+        async with make_client(server) as client:
+            return await client.create_pipeline_run("pl")
+
+    with StubServer(handler) as server:
+        assert asyncio.run(scenario(server)) == "run-1"
+        assert server.requests == 3
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Async Data Factory Client Tests")
+    print("=" * 50)
+
+    test_batch_runs_concurrently()
+    test_concurrency_is_bounded()
+    test_endpoint_rate_limit()
+    test_throttled_requests_are_retried()
+
+    print("\n" + "=" * 50)
+    print("All async client tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+CLI tests
+Runs each subcommand in-process against the repo and the local stand-in, and checks offline startup stays light
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+import pytest
+
+import adf_cli
+from standin_server import StandInServer
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules the offline subcommands must not load
+HEAVY_MODULES = ("requests", "azure.identity", "aiohttp", "numpy", "multiprocessing", "asyncio")
+
+
+def run_cli(*argv):
+    """(exit code, stdout) of one CLI invocation"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        code = adf_cli.main(list(argv))
+    return code, output.getvalue()
+
+
+def test_validate_and_local_list():
+    """Test: validate reports the repo as valid; a broken definition exits 1; list --local reads file names"""
+    print("\n=== Test: Validate ===")
+    code, output = run_cli("validate")
+    assert code == 0 and "definitions valid" in output
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "pipelines"))
+        with open(os.path.join(root, "pipelines", "pl_ok.json"), "w") as f:
+            json.dump({"name": "pl_ok", "properties": {"activities": []}}, f)
+        with open(os.path.join(root, "pipelines", "pl_broken.json"), "w") as f:
+            f.write("{not json")
+        code, output = run_cli("validate", "--root", root)
+        assert code == 1 and "pl_broken.json" in output and "1/2 definitions valid" in output
+        code, output = run_cli("validate", "--root", root, "--json")
+        assert not json.loads(output)["pipelines/pl_broken.json"]["parsed"]
+
+    code, output = run_cli("list", "pipelines", "--local", "--json")
+    assert json.loads(output) == sorted(name[:-5] for name in os.listdir(os.path.join(TESTS_DIR, "..", "pipelines")))
+    print("✓ Test passed")
+
+
+def test_offline_startup_skips_heavy_imports():
+    """Test: validate and --help load neither the HTTP stack, azure.identity nor multiprocessing"""
+    print("\n=== Test: Lazy Imports ===")
+    probe = ("import sys, io, contextlib, adf_cli\n"
+             "with contextlib.redirect_stdout(io.StringIO()):\n"
+             "    adf_cli.main(['validate'])\n"
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=TESTS_DIR, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
+
+    # The service subcommands still resolve their client lazily
+    probe = "import sys, adf_cli; print('test_adf_api' in sys.modules)"
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=TESTS_DIR, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == "False"
+    print("✓ Test passed")
+
+
+def test_service_commands_against_standin():
+    """Test: list, trigger --wait, watch and metrics work end to end against the stand-in"""
+    print("\n=== Test: Service Commands ===")
+    code, output = run_cli("--standin", "list", "notebooks")
+    assert code == 0 and "nb_transform_raw_to_processed" in output.split()
+
+    code, output = run_cli("--standin", "trigger", "pl_copy_blob_to_datalake", "-p", "sourceContainer=raw",
+                           "-p", "retries=3", "--wait", "--interval", "0.1")
+    run_id = output.split()[0]
+    assert code == 0 and f"{run_id}  pl_copy_blob_to_datalake  Succeeded" in output
+
+    code, output = run_cli("--standin", "watch", "no-such-run", "--timeout", "0.2", "--interval", "0.1")
+    assert code == 1 and "no-such-run" in output
+
+    code, output = run_cli("--standin", "metrics", "--json", "--pipeline", "pl_orchestration_master")
+    summary = json.loads(output)
+    assert list(summary) == ["pl_orchestration_master"] and summary["pl_orchestration_master"]["runs"] > 0
+    code, output = run_cli("--standin", "metrics")
+    assert code == 0 and "pl_incremental_copy_sql" in output
+
+    with pytest.raises(SystemExit):
+        run_cli("trigger", "pl_x", "-p", "novalue")
+    env = {key: value for key, value in os.environ.items() if not key.startswith("AZURE_")}
+    missing = subprocess.run([sys.executable, "adf_cli.py", "metrics"], cwd=TESTS_DIR, env=env,
+                             capture_output=True, text=True)
+    assert missing.returncode == 1 and "AZURE_SUBSCRIPTION_ID" in missing.stderr
+    print("✓ Test passed")
+
+
+def test_watch_finished_and_unknown_runs():
+    """Test: watch reports runs that finished long ago at once and does not wait on unknown ones"""
+    print("\n=== Test: Watch Finished Runs ===")
+    with StandInServer() as server:
+        now = datetime.utcnow()
+        finished = server.state._add_run("pl_copy_blob_to_datalake", now - timedelta(days=3), 600, "Succeeded")
+        failed = server.state._add_run("pl_incremental_copy_sql", now - timedelta(days=2), 60, "Failed")
+        running = server.state._add_run("pl_copy_blob_to_datalake", now - timedelta(hours=6), 6 * 3600 + 0.3,
+                                        "Succeeded")
+        client = server.adf_client()
+
+        started = time.monotonic()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = adf_cli._watch(client, [(finished["runId"], None)], timeout=3600, interval=0.1)
+        assert code == 0 and time.monotonic() - started < 5
+        assert f"{finished['runId']}  pl_copy_blob_to_datalake  Succeeded" in output.getvalue()
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = adf_cli._watch(client, [(run["runId"], None) for run in (failed, running)] + [("missing", None)],
+                                  timeout=3600, interval=0.1)
+        lines = output.getvalue().splitlines()
+        assert code == 1 and time.monotonic() - started < 30
+        assert lines[0] == f"{failed['runId']}  pl_incremental_copy_sql  Failed"
+        assert "missing  not found" in lines
+        assert f"{running['runId']}  pl_copy_blob_to_datalake  Succeeded" in lines
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("CLI Tests")
+    print("=" * 50)
+
+    test_validate_and_local_list()
+    test_offline_startup_skips_heavy_imports()
+    test_service_commands_against_standin()
+    test_watch_finished_and_unknown_runs()
+
+    print("\n" + "=" * 50)
+    print("All CLI tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ADF expression tests
+Evaluates the expressions used by the repo pipelines against a fixed context
+"""
+
+import json
+from datetime import datetime
+
+from adf_expressions import ExpressionContext, compile_expression, evaluate, iter_expressions, resolve
+from validation_engine import REPO_ROOT, check_expressions
+
+
+def make_context(**kwargs) -> ExpressionContext:
+    kwargs.setdefault("activity_outputs", {
+        "LookupNewWatermark": {"firstRow": {"NewWatermarkValue": "2024-03-05T00:00:00Z"}},
+        "GetTableList": {"count": 2, "value": [{"SourceTable": "a"}, {"SourceTable": "b"}]}})
+    return ExpressionContext("pl_incremental_copy_sql", run_id="run-1", parameters={"tableName": "Sales"},
+                             clock=lambda: datetime(2024, 3, 5, 7, 8, 9, 123456), **kwargs)
+
+
+def test_repo_expressions():
+    """Test: The expression forms used in the pipelines evaluate as the service would"""
+    print("\n=== Test: Repo Expressions ===")
+    context = make_context()
+    cases = {
+        "@concat('raw/data/', formatDateTime(utcNow(), 'yyyy-MM-dd'))": "raw/data/2024-03-05",
+        "@concat(pipeline().parameters.tableName, '/', formatDateTime(utcNow(), 'yyyy-MM-dd'))": "Sales/2024-03-05",
+        "@pipeline().RunId": "run-1",
+        "@pipeline().Pipeline": "pl_incremental_copy_sql",
+        "@activity('LookupNewWatermark').output.firstRow.NewWatermarkValue": "2024-03-05T00:00:00Z",
+        "@activity('GetTableList').output.value[1].SourceTable": "b",
+        "WHERE ts <= '@{activity('LookupNewWatermark').output.firstRow.NewWatermarkValue}'":
+            "WHERE ts <= '2024-03-05T00:00:00Z'",
+        "@{utcNow()}": "2024-03-05T07:08:09.1234560Z",
+        "plain text": "plain text",
+    }
+    for text, expected in cases.items():
+        assert evaluate(text, context) == expected, text
+    assert evaluate("@activity('GetTableList').output.count", context) == 2
+    assert evaluate({"value": "@pipeline().parameters.tableName", "type": "Expression"}, context) == "Sales"
+
+    item = context.with_item({"SourceSchema": "dbo", "SourceTable": "Orders"})
+    assert evaluate("@concat(item().SourceSchema, '/', item().SourceTable)", item) == "dbo/Orders"
+    assert context.item is None
+    print("✓ Test passed")
+
+
+def test_escapes_functions_and_errors():
+    """Test: @@ escapes, literal folding, helper functions and clear errors"""
+    print("\n=== Test: Escapes and Errors ===")
+    context = make_context()
+    assert evaluate("@@concat('a')", context) == "@concat('a')"
+    assert evaluate("mail me @@ home, id @{pipeline().RunId}", context) == "mail me @ home, id run-1"
+    assert evaluate("@concat('it''s ', string(add(1, 2)), '}')", context) == "it's 3}"
+    assert evaluate("@formatDateTime(addDays('2024-02-28T00:00:00Z', 1), 'dddd dd MMM yyyy')", context) \
+        == "Thursday 29 Feb 2024"
+    assert evaluate("@if(greater(length(activity('GetTableList').output.value), 1), 'many', 'one')",
+                    context) == "many"
+    assert evaluate("@pipeline()?.parameters?.missing?.deeper", context) is None
+    assert evaluate("@toUpper(pipeline().parameters.TABLENAME)", context) == "SALES"
+
+    for bad, message in [("@concat('a'", "Unexpected end"), ("@getPastTime(1, 'Day'", "Unexpected end"),
+                         ("@concat('a',)", "Missing argument"), ("x @{pipeline()", "Unterminated")]:
+        try:
+            compile_expression(bad)
+            assert False, f"{bad} should not compile"
+        except ValueError as e:
+            assert message in str(e), e
+    try:
+        evaluate("@base64(pipeline().RunId)", context)
+        assert False, "base64() is not implemented"
+    except ValueError as e:
+        assert "Unknown function 'base64'" in str(e)
+    try:
+        evaluate("@item().SourceTable", context)
+        assert False, "item() outside a ForEach should fail"
+    except ValueError as e:
+        assert "ForEach" in str(e)
+    print("✓ Test passed")
+
+
+def test_compiled_once():
+    """Test: Each distinct expression is parsed once; literal-only expressions fold to constants"""
+    print("\n=== Test: Compile Cache ===")
+    compile_expression.cache_clear()
+    context = make_context()
+    for i in range(1000):
+        evaluate("@concat(item().SourceTable, '_', pipeline().RunId)", context.with_item({"SourceTable": str(i)}))
+    info = compile_expression.cache_info()
+    assert info.misses == 1 and info.hits == 999
+    assert compile_expression("@concat('a', 'b')")(None) == "ab"
+    print("✓ Test passed")
+
+
+def test_resolve_and_validation():
+    """Test: resolve() dry-runs a definition; malformed expressions fail validation"""
+    print("\n=== Test: Resolve and Validation ===")
+    with open(REPO_ROOT / "pipelines" / "pl_incremental_copy_sql.json", 'r') as f:
+        pipeline = json.load(f)
+    expressions = iter_expressions(pipeline)
+    assert expressions and all(compile_expression(text) for text in expressions)
+    resolved = resolve(pipeline["properties"]["activities"], make_context(
+        activity_outputs={"LookupOldWatermark": {"firstRow": {"WatermarkValue": "2024-01-01"}},
+                          "LookupNewWatermark": {"firstRow": {"NewWatermarkValue": "2024-03-05"}}}))
+    assert not iter_expressions(resolved)
+
+    broken = {"name": "pl_broken", "properties": {"activities": [
+        {"name": "Bad", "type": "Copy", "typeProperties": {"folderPath": "@concat('raw/', utcNow("}}]}}
+    issues = check_expressions(broken)
+    assert len(issues) == 1 and issues[0].startswith("invalid expression")
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("ADF Expression Tests")
+    print("=" * 50)
+
+    test_repo_expressions()
+    test_escapes_functions_and_errors()
+    test_compiled_once()
+    test_resolve_and_validation()
+
+    print("\n" + "=" * 50)
+    print("All ADF expression tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
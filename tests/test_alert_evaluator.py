@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Alert evaluator tests
+Feeds run records and metric samples through the repo's alert rules and checks when they fire and resolve
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from alert_evaluator import (FIRED, RESOLVED, AlertEvaluator, AlertStream, SlidingExtreme, SlidingWindow,
+                             compile_rule, parse_duration)
+from run_utils import format_timestamp
+from standin_server import StandInServer
+
+T0 = datetime(2024, 6, 1, 12, 0, 0)
+
+
+class Clock:
+    def __init__(self, now: datetime = T0):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def pipeline_run(run_id: str, status: str, start: datetime, end: datetime = None, name: str = "pl_copy"):
+    run = {"runId": run_id, "pipelineName": name, "status": status, "runStart": format_timestamp(start)}
+    if end is not None:
+        run.update(runEnd=format_timestamp(end), durationInMs=int((end - start).total_seconds() * 1000))
+    return run
+
+
+def activity_run(activity_run_id: str, status: str, end: datetime):
+    return {"activityRunId": activity_run_id, "pipelineRunId": "p", "activityName": "CopyTableData",
+            "activityType": "Copy", "status": status, "activityRunStart": format_timestamp(end - timedelta(minutes=1)),
+            "activityRunEnd": format_timestamp(end), "durationInMs": 60000}
+
+
+def test_rules_load_from_repo():
+    """Test: The four repo rules compile with their windows"""
+    print("\n=== Test: Load Rules ===")
+    assert parse_duration("PT5M") == 300 and parse_duration("PT1H30M") == 5400
+    assert parse_duration("P1DT0.5S") == 86400.5
+    with pytest.raises(ValueError):
+        parse_duration("5 minutes")
+    evaluator = AlertEvaluator.from_file()
+    windows = {rule.name: (type(rule).__name__, rule.window) for rule in evaluator.rules}
+    assert windows == {
+        "Pipeline Failure Alert": ("_CountRule", 300),
+        "Long Running Pipeline Alert": ("_CountRule", 900),
+        "High DIU Consumption Alert": ("_MetricRule", 900),
+        "Activity Failure Rate Alert": ("_RateRule", 1800),
+    }
+    with pytest.raises(ValueError):
+        compile_rule({"name": "bad", "condition": {"allOf": [{"field": "status", "like": "Fail*"}]}})
+    print("✓ Test passed")
+
+
+def test_failure_fires_once_and_resolves():
+    """Test: A failed run fires at once; re-polled records do not recount; the alert resolves with its window"""
+    print("\n=== Test: Pipeline Failure ===")
+    clock = Clock()
+    received = []
+    evaluator = AlertEvaluator.from_file(on_alert=received.append, clock=clock)
+    evaluator.observe_run(pipeline_run("ok", "Succeeded", T0 - timedelta(minutes=3), T0))
+    assert received == []
+
+    failed = pipeline_run("bad", "Failed", T0 - timedelta(minutes=3), T0)
+    alerts = evaluator.observe_run(failed)
+    assert [(a.rule, a.state, a.value) for a in alerts] == [("Pipeline Failure Alert", FIRED, 1)]
+    assert alerts[0].event["runId"] == "bad" and alerts[0].severity == "2"
+    assert alerts[0].actions[0].endswith("DataEngineering-Alerts")
+    assert evaluator.observe_run(failed) == []
+    assert evaluator.firing == ["Pipeline Failure Alert"]
+
+    assert evaluator.advance(T0 + timedelta(minutes=4)) == []
+    resolved = evaluator.advance(T0 + timedelta(minutes=5, seconds=5))
+    assert [(a.rule, a.state, a.value) for a in resolved] == [("Pipeline Failure Alert", RESOLVED, 0)]
+    assert received == alerts + resolved and evaluator.firing == []
+    print("✓ Test passed")
+
+
+def test_long_running_fires_before_the_run_ends():
+    """Test: An in-progress run past two hours fires on the next poll, not when it finally ends"""
+    print("\n=== Test: Long Running ===")
+    clock = Clock()
+    evaluator = AlertEvaluator.from_file(clock=clock)
+    start = T0 - timedelta(hours=1, minutes=59)
+    run = pipeline_run("slow", "InProgress", start)
+    assert evaluator.observe_run(run) == []
+    clock.now = T0 + timedelta(minutes=2)
+    alerts = evaluator.observe_run(run)
+    assert [a.rule for a in alerts] == ["Long Running Pipeline Alert"]
+    # The finished record is the same run: counted once
+    clock.now = T0 + timedelta(minutes=30)
+    assert evaluator.observe_run(pipeline_run("slow", "Succeeded", start, start + timedelta(hours=2, minutes=20))) == []
+    print("✓ Test passed")
+
+
+def test_activity_failure_rate():
+    """Test: The rate rule waits for enough finished activities and compares failed over finished"""
+    print("\n=== Test: Activity Failure Rate ===")
+    evaluator = AlertEvaluator.from_file(clock=Clock())
+    end = T0
+    for i in range(9):
+        evaluator.observe_activity_run(activity_run(f"a{i}", "Failed" if i < 2 else "Succeeded", end))
+    assert evaluator.firing == []          # 2 of 9: below the sample floor
+    alerts = evaluator.observe_activity_run(activity_run("a9", "Succeeded", end))
+    assert [(a.rule, a.value) for a in alerts] == [("Activity Failure Rate Alert", 0.2)]
+    assert evaluator.observe_activity_run(activity_run("in-flight", "InProgress", end)) == []
+
+    for i in range(10, 20):
+        evaluator.observe_activity_run(activity_run(f"a{i}", "Succeeded", end + timedelta(seconds=i)))
+    assert evaluator.firing == []          # 2 of 20 = 10%, not above the threshold
+    assert evaluator.alerts[-1].state == RESOLVED
+    print("✓ Test passed")
+
+
+def test_metric_average():
+    """Test: CPU average over the window fires above 80 and clears as high samples age out"""
+    print("\n=== Test: Metric Rule ===")
+    evaluator = AlertEvaluator.from_file(clock=Clock())
+    for minute, value in enumerate([70, 75, 90, 95]):
+        alerts = evaluator.observe_metric("IntegrationRuntimeCpuPercentage", value, T0 + timedelta(minutes=minute))
+    assert [(a.rule, a.value) for a in alerts] == [("High DIU Consumption Alert", 82.5)]
+    evaluator.observe_metric("OtherMetric", 100, T0 + timedelta(minutes=4))
+    alerts = evaluator.observe_metric("IntegrationRuntimeCpuPercentage", 40, T0 + timedelta(minutes=16))
+    assert [(a.state, a.value) for a in alerts] == [(RESOLVED, (90 + 95 + 40) / 3)]
+
+    peak = AlertEvaluator([{"name": "Peak", "windowSize": "PT1M", "condition": {"allOf": [
+        {"metricName": "cpu", "operator": "GreaterThanOrEqual", "threshold": 99, "timeAggregation": "Maximum"}]}}])
+    assert peak.observe_metric("cpu", 99, T0)[0].state == FIRED
+    peak.observe_metric("cpu", 10, T0 + timedelta(seconds=30))
+    assert peak.advance(T0 + timedelta(seconds=61))[0].state == RESOLVED
+    print("✓ Test passed")
+
+
+def test_windows_match_brute_force():
+    """Test: Ring-bucket sums and monotonic-deque maxima agree with a rescan at bucket granularity"""
+    print("\n=== Test: Sliding Windows ===")
+    rng = random.Random(3)
+    window, buckets = 60.0, 12
+    counter, maximum = SlidingWindow(window, buckets), SlidingExtreme(window)
+    events = []
+    now = 0.0
+    for _ in range(2000):
+        now += rng.expovariate(1 / 3) if rng.random() < 0.95 else 200
+        value = rng.random()
+        events.append((now, value))
+        counter.add(now, value)
+        maximum.add(now, value)
+        width = window / buckets
+        oldest = (int(now // width) - buckets + 1) * width
+        inside = [v for t, v in events if t >= oldest]
+        assert counter.count == len(inside) and abs(counter.total - sum(inside)) < 1e-9
+        assert maximum.value == max(v for t, v in events if t > now - window)
+    print("✓ Test passed")
+
+
+def test_stream_from_standin():
+    """Test: Polling the stand-in fires on a fresh failure and a run that has gone long"""
+    print("\n=== Test: Alert Stream ===")
+    with StandInServer() as server:
+        now = datetime.utcnow()
+        state = server.state
+        state._add_run("pl_copy_blob_to_datalake", now - timedelta(minutes=2), 60, "Failed")
+        state._add_run("pl_incremental_copy_sql", now - timedelta(hours=2, minutes=5), 4 * 3600, "Succeeded")
+        state._add_run("pl_copy_blob_to_datalake", now - timedelta(days=1), 60, "Failed")
+
+        evaluator = AlertEvaluator.from_file()
+        stream = AlertStream(server.adf_client(), evaluator)
+        fired = {alert.rule for alert in stream.poll_once()}
+        assert fired == {"Pipeline Failure Alert", "Long Running Pipeline Alert"}
+        assert stream.poll_once() == []
+        assert evaluator.events >= 3
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Alert Evaluator Tests")
+    print("=" * 50)
+
+    test_rules_load_from_repo()
+    test_failure_fires_once_and_resolves()
+    test_long_running_fires_before_the_run_ends()
+    test_activity_failure_rate()
+    test_metric_average()
+    test_windows_match_brute_force()
+    test_stream_from_standin()
+
+    print("\n" + "=" * 50)
+    print("All alert evaluator tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Batch planner tests
+Plans MetadataControl rows held in the SQLite stand-in
+"""
+
+from batch_planner import (PLANNED_CONTROL_QUERY, calibrate_copy_rate, estimate_seconds, list_schedule,
+                           plan_batches, plan_from_database, write_plan)
+from sql_standin import connect, create_metadata_control, fetch_rows, lookup_output
+
+MB = 1024 * 1024
+
+
+def test_lpt_beats_lookup_order():
+    """Test: A giant table looked up last no longer stretches the run"""
+    print("\n=== Test: LPT vs Lookup Order ===")
+    connection = connect()
+    tables = [("dbo", f"small_{i}", 1000, 100 * MB) for i in range(8)] + [("dbo", "giant", 10 ** 7, 2000 * MB)]
+    create_metadata_control(connection, tables, inactive=["small_7"])
+    plan, lookup = plan_from_database(connection, slots=4, bytes_per_second=10 * MB)
+
+    # Lookup order: the 230s giant waits for a slot behind seven 40s tables
+    assert lookup == 40 + 230
+    assert plan.rows[0]["SourceTable"] == "giant" and plan.rows[0]["LoadOrder"] == 1
+    assert plan.makespan == plan.lower_bound == 230
+    assert len(plan.rows) == 8 and "small_7" not in {row["SourceTable"] for row in plan.rows}
+    assert sorted(len(batch) for batch in plan.batches) == [1, 2, 2, 3]
+    assert abs(sum(plan.loads) - (230 + 7 * 40)) < 1e-9
+    print(f"  lookup order {lookup:.0f}s -> planned {plan.makespan:.0f}s")
+    print("✓ Test passed")
+
+
+def test_write_back_order():
+    """Test: The written LoadOrder, dispatched to free slots, reproduces the plan"""
+    print("\n=== Test: Write Back ===")
+    connection = connect()
+    sizes = [300, 20, 500, 80, 80, 1000, 10, 250, 600, 40]
+    create_metadata_control(connection, [("sales", f"t{i}", size, size * MB) for i, size in enumerate(sizes)])
+    plan, _ = plan_from_database(connection, slots=3)
+    write_plan(connection, plan)
+    write_plan(connection, plan)  # columns are only added once
+
+    ordered = fetch_rows(connection, PLANNED_CONTROL_QUERY)
+    assert [row["SourceTable"] for row in ordered] == [row["SourceTable"] for row in plan.rows]
+    replay, slots = list_schedule([row["EstimatedSeconds"] for row in plan.rows], 3)
+    assert abs(replay - plan.makespan) < 1e-3
+    assert [slot + 1 for slot in slots] == [row["BatchGroup"] for row in ordered]
+    assert lookup_output(connection, PLANNED_CONTROL_QUERY)["count"] == len(sizes)
+    print("✓ Test passed")
+
+
+def test_estimates():
+    """Test: History wins over size stats; unknown tables get the median; copy rate calibrates"""
+    print("\n=== Test: Estimates ===")
+    rows = [{"SourceSchema": "dbo", "SourceTable": name} for name in ("a", "b", "c", "d")]
+    stats = {("dbo", "a"): {"SizeBytes": 100}, ("dbo", "b"): {"SizeBytes": 300},
+             ("dbo", "c"): {"SizeBytes": 999}}
+    estimates = estimate_seconds(rows, stats, {("dbo", "c"): 7.0}, bytes_per_second=10, overhead_seconds=0)
+    assert estimates == [10.0, 30.0, 7.0, 10.0]
+
+    runs = [{"activityType": "Copy", "status": "Succeeded", "output": {"dataRead": size, "copyDuration": 10}}
+            for size in (100, 200, 900)]
+    runs.append({"activityType": "Lookup", "status": "Succeeded", "output": {"count": 3}})
+    assert calibrate_copy_rate(runs) == 20
+    assert calibrate_copy_rate([]) is None
+
+    plan = plan_batches([], [], 4)
+    assert plan.rows == [] and plan.makespan == 0
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Batch Planner Tests")
+    print("=" * 50)
+
+    test_lpt_beats_lookup_order()
+    test_write_back_order()
+    test_estimates()
+
+    print("\n" + "=" * 50)
+    print("All batch planner tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Bulk pipeline trigger tests
+Runs offline against the local stub server
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from bulk_trigger import ArmWriteBudget, BulkTrigger, idempotency_key
+from http_transport import HttpTransport
+from stub_server import StubCredential, StubServer
+from test_adf_api import AzureDataFactoryClient
+
+
+def create_run_handler(remaining_writes=None, latency: float = 0.0):
+    """createRun handler that counts requests, tracks concurrency and reports ARM budget headers"""
+    state = {"created": 0, "in_flight": 0, "peak": 0, "request_ids": set()}
+    lock = threading.Lock()
+
+    def handler(method, path, headers, body):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(latency)
+        with lock:
+            state["in_flight"] -= 1
+            state["created"] += 1
+            state["request_ids"].add(headers.get("x-ms-client-request-id"))
+            run_id = f"run-{state['created']}"
+        response_headers = {}
+        if remaining_writes is not None:
+            response_headers["x-ms-ratelimit-remaining-subscription-writes"] = str(remaining_writes)
+        return 200, response_headers, {"runId": run_id}
+
+    return handler, state
+
+
+def make_client(server: StubServer) -> AzureDataFactoryClient:
+    client = AzureDataFactoryClient("sub", "rg", "adf", transport=HttpTransport(),
+                                    credential=StubCredential())
+    client.base_url = f"{server.url}/factories/adf"
+    return client
+
+
+def parameter_sets(count: int):
+    for i in range(count):
+        yield {"sourcePath": f"backfill/{i:05d}", "sinkPath": f"out/{i:05d}"}
+
+
+def test_bulk_trigger_streams_all_runs():
+    """Test: Every parameter set is triggered once, with bounded concurrency"""
+    print("\n=== Test: Bulk Trigger ===")
+    handler, state = create_run_handler(latency=0.01)
+    with StubServer(handler) as server:
+        client = make_client(server)
+        results = list(client.trigger_pipeline_runs("pl_copy_blob_to_datalake", parameter_sets(200),
+                                                    max_workers=8))
+
+    assert len(results) == 200
+    assert len({run_id for _, run_id in results}) == 200
+    assert state["created"] == 200
+    assert state["peak"] <= 8
+    assert len(state["request_ids"]) == 200, "Each trigger should carry its own client request id"
+    print(f"  200 runs created, peak concurrency {state['peak']}")
+    print("✓ Test passed")
+
+
+def test_duplicates_and_journal_are_not_retriggered():
+    """Test: Repeated parameter sets share one trigger; journaled triggers are skipped on re-run"""
+    print("\n=== Test: Idempotent Re-run ===")
+    handler, state = create_run_handler(latency=0.005)
+    with tempfile.TemporaryDirectory() as tmp, StubServer(handler) as server:
+        journal = os.path.join(tmp, "journal.jsonl")
+        client = make_client(server)
+
+        first = list(client.trigger_pipeline_runs("pl", list(parameter_sets(30)) * 2, journal_path=journal))
+        assert len(first) == 60, "Every input parameter set should be answered"
+        assert state["created"] == 30
+        by_path = {}
+        for params, run_id in first:
+            assert by_path.setdefault(params["sourcePath"], run_id) == run_id, "Repeats report the first run"
+        assert len(set(by_path.values())) == 30
+
+        second = dict((params["sourcePath"], run_id) for params, run_id in
+                      client.trigger_pipeline_runs("pl", parameter_sets(40), journal_path=journal))
+        assert state["created"] == 40, "Only the 10 new parameter sets should be triggered"
+        for params, run_id in first:
+            assert second[params["sourcePath"]] == run_id, "Journaled runs should be reported, not re-created"
+    print("✓ Test passed")
+
+
+def test_budget_follows_remaining_writes_header():
+    """Test: A low remaining-writes header slows triggering to the refill rate"""
+    print("\n=== Test: ARM Write Budget ===")
+    handler, _ = create_run_handler(remaining_writes=5)
+    budget = ArmWriteBudget(rate=50.0, capacity=50.0, reserved_writes=10)
+    with StubServer(handler) as server:
+        trigger = BulkTrigger(make_client(server), "pl", max_workers=4, budget=budget)
+        start = time.perf_counter()
+        results = list(trigger.run(parameter_sets(20)))
+        elapsed = time.perf_counter() - start
+
+    print(f"  20 triggers with 5 writes remaining took {elapsed:.2f}s")
+    assert len(results) == 20
+    assert budget.last_remaining == 5
+    assert trigger.client.transport.session.hooks["response"] == [], "The shared session is left alone"
+    # After the first response the bucket sits 5 below zero, so every further trigger waits
+    assert elapsed >= 0.3
+    print("✓ Test passed")
+
+
+def test_failures_are_reported():
+    """Test: A rejected trigger yields (parameters, None) and keeps the error"""
+    print("\n=== Test: Trigger Failures ===")
+
+    def handler(method, path, headers, body):
+        if body["parameters"]["sourcePath"].endswith("3"):
+            return 400, {}, {"error": {"code": "BadRequest"}}
+        return 200, {}, {"runId": "ok"}
+
+    with StubServer(handler) as server:
+        trigger = BulkTrigger(make_client(server), "pl")
+        results = list(trigger.run(parameter_sets(10)))
+
+    failed = [params for params, run_id in results if run_id is None]
+    assert [params["sourcePath"] for params in failed] == ["backfill/00003"]
+    assert idempotency_key("pl", failed[0]) in trigger.errors
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Bulk Trigger Tests")
+    print("=" * 50)
+
+    test_bulk_trigger_streams_all_runs()
+    test_duplicates_and_journal_are_not_retriggered()
+    test_budget_follows_remaining_writes_header()
+    test_failures_are_reported()
+
+    print("\n" + "=" * 50)
+    print("All bulk trigger tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
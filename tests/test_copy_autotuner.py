@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Copy autotuner tests
+Recovers known scalability curves from synthetic Copy history and patches the metadata-driven pipeline
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from copy_autotuner import (DIU_LEVELS, CopyTuner, ScalabilityFit, fit_scalability,
+                            observations_from_activity_runs, patch_pipeline, source_of)
+from run_utils import format_timestamp
+
+PIPELINE = "pl_dynamic_copy_metadata"
+ACTIVITY = "CopyTableData"
+PIPELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pipelines")
+
+# Ground truth: per-copy scaling in parallelCopies and DIU, aggregate scaling in ForEach fan-out
+PARALLEL_TRUTH = ScalabilityFit(1.0, 0.05, 0.01, ())
+DIU_TRUTH = ScalabilityFit(1.0, 0.3, 0.002, ())
+FANOUT_TRUTH = ScalabilityFit(1.0, 0.1, 0.02, ())
+
+
+def synthetic_runs(pipeline_runs: int = 120, seed: int = 5, noise: float = 0.05):
+    """Copy activity runs where each ForEach batch of n equally sized tables runs together"""
+    rng = random.Random(seed)
+    runs = []
+    start = datetime(2024, 1, 1)
+    for run_index in range(pipeline_runs):
+        fanout = rng.choice((1, 2, 4, 8, 12))
+        parallel = rng.choice((1, 2, 4, 8, 16, 32))
+        diu = rng.choice((2, 4, 8, 16, 32))
+        per_copy = (50e6 * PARALLEL_TRUTH.throughput(parallel) * DIU_TRUTH.throughput(diu)
+                    * FANOUT_TRUTH.throughput(fanout) / fanout / 10)
+        data_read = rng.randint(1, 4) * 10 ** 9
+        for table in range(fanout):
+            rate = per_copy * rng.uniform(1 - noise, 1 + noise)
+            seconds = data_read / rate
+            runs.append({
+                "activityName": ACTIVITY, "activityType": "Copy", "status": "Succeeded",
+                "pipelineName": PIPELINE, "pipelineRunId": f"run-{run_index}",
+                "activityRunStart": format_timestamp(start),
+                "activityRunEnd": format_timestamp(start + timedelta(seconds=seconds)),
+                "input": {"source": {"sqlReaderQuery": f"SELECT * FROM [dbo].[t{table}]"}},
+                "output": {"dataRead": data_read, "copyDuration": seconds,
+                           "usedParallelCopies": parallel, "usedDataIntegrationUnits": diu},
+            })
+        start += timedelta(hours=1)
+    return runs
+
+
+def test_fit_recovers_parameters():
+    """Test: The USL fit recovers noiseless parameters and refuses too few levels"""
+    print("\n=== Test: Scalability Fit ===")
+    levels = [1, 2, 4, 8, 16, 32]
+    fit = fit_scalability(levels, [PARALLEL_TRUTH.throughput(n) * 3 for n in levels])
+    assert abs(fit.lam - 3) < 1e-6 and abs(fit.sigma - 0.05) < 1e-6 and abs(fit.kappa - 0.01) < 1e-6
+    assert fit.levels == tuple(levels)
+    assert fit.knee(50) == PARALLEL_TRUTH.knee(50) < 10
+
+    # Linear scaling: no contention, so the knee is the limit
+    linear = fit_scalability([1, 2, 3, 4], [2, 4, 6, 8])
+    assert linear.sigma < 1e-9 and linear.kappa < 1e-9 and linear.knee(20, fraction=1.0) == 20
+    assert fit_scalability([4, 4, 8], [1, 1, 2]) is None
+    print("✓ Test passed")
+
+
+def test_observations():
+    """Test: Concurrency comes from overlapping copies in a run; failed and non-Copy runs are skipped"""
+    print("\n=== Test: Observations ===")
+    runs = synthetic_runs(pipeline_runs=20)
+    observations = observations_from_activity_runs(runs + [
+        dict(runs[0], status="Failed"), dict(runs[0], activityType="Lookup")])
+    assert len(observations) == len(runs)
+    fanout = {}
+    for run in runs:
+        fanout[run["pipelineRunId"]] = fanout.get(run["pipelineRunId"], 0) + 1
+    for run, observation in zip(runs, observations):
+        assert observation.source == "dbo." + run["input"]["source"]["sqlReaderQuery"].split("[")[-1][:-1]
+        assert observation.concurrency <= fanout[run["pipelineRunId"]]
+
+    staggered = [dict(runs[0], activityRunStart=format_timestamp(datetime(2024, 1, 1, 0, i)),
+                      activityRunEnd=format_timestamp(datetime(2024, 1, 1, 0, i, 30))) for i in range(3)]
+    assert [o.concurrency for o in observations_from_activity_runs(staggered)] == [1, 1, 1]
+    assert source_of({"activityName": "x", "input": {"inputs": [
+        {"referenceName": "ds", "parameters": {"schemaName": "sales", "tableName": "Orders"}}]}}) == "sales.Orders"
+    assert source_of({"activityName": "x", "input": {"source": {"sqlReaderQuery": "@item().SourceQuery"}}}) == "x"
+    print("✓ Test passed")
+
+
+def test_recommendations():
+    """Test: Recommendations land on the knees of the generating curves"""
+    print("\n=== Test: Recommendations ===")
+    tuner = CopyTuner(observations_from_activity_runs(synthetic_runs()))
+    result = tuner.recommend(PIPELINE, ACTIVITY)
+    print(f"  parallelCopies {result['parallelCopies']['value']} (truth {PARALLEL_TRUTH.knee(50)}), "
+          f"batchCount {result['batchCount']['value']} (truth {FANOUT_TRUTH.knee(50)}), "
+          f"DIU {result['dataIntegrationUnits']['value']} (truth {DIU_TRUTH.knee(256, candidates=DIU_LEVELS)})")
+    assert abs(result["parallelCopies"]["value"] - PARALLEL_TRUTH.knee(50)) <= 1
+    assert result["parallelCopies"]["fitted_sources"] >= 8
+    assert abs(result["batchCount"]["value"] - FANOUT_TRUTH.knee(50)) <= 1
+    assert result["dataIntegrationUnits"]["value"] == DIU_TRUTH.knee(256, candidates=DIU_LEVELS)
+
+    # History at a single setting (the stand-in always reports 4 and 4) only proposes experiments
+    flat = [dict(run, output=dict(run["output"], usedParallelCopies=4, usedDataIntegrationUnits=4))
+            for run in synthetic_runs(pipeline_runs=10)]
+    unfitted = CopyTuner(observations_from_activity_runs(flat)).recommend(PIPELINE, ACTIVITY)
+    assert unfitted["parallelCopies"] == {"value": None, "fitted_sources": 0, "explore": [2, 8]}
+    assert unfitted["dataIntegrationUnits"] == {"value": None, "explore": [2, 8]}
+    print("✓ Test passed")
+
+
+def test_patch_pipeline():
+    """Test: Fitted values land on the Copy and its ForEach; the source definition is untouched"""
+    print("\n=== Test: Patch Pipeline ===")
+    with open(os.path.join(PIPELINES_DIR, f"{PIPELINE}.json")) as f:
+        definition = json.load(f)
+    original = json.dumps(definition, sort_keys=True)
+    recommendation = {"activity": ACTIVITY, "parallelCopies": {"value": 8}, "batchCount": {"value": 6},
+                      "dataIntegrationUnits": {"value": None}}
+    patched, changes = patch_pipeline(definition, recommendation)
+    assert json.dumps(definition, sort_keys=True) == original
+    for_each = patched["properties"]["activities"][1]
+    copy_activity = for_each["typeProperties"]["activities"][0]
+    assert for_each["typeProperties"]["batchCount"] == 6
+    assert copy_activity["typeProperties"]["parallelCopies"] == 8
+    assert "dataIntegrationUnits" not in copy_activity["typeProperties"]
+    assert changes == ["CopyTableData.parallelCopies: 4 -> 8", "ForEachTable.batchCount: 4 -> 6"]
+    assert patch_pipeline(patched, recommendation)[1] == []
+
+    # Copies inside Switch cases are found; activities without typeProperties are not given one
+    switch = {"name": "RouteBySource", "type": "Switch", "typeProperties": {
+        "cases": [{"value": "sql", "activities": [copy_activity]}], "defaultActivities": []}}
+    wait = {"name": "Pause", "type": "Wait"}
+    nested = {"name": PIPELINE, "properties": {"activities": [wait, {
+        "name": "ForEachTable", "type": "ForEach", "typeProperties": {"batchCount": 2, "activities": [switch]}}]}}
+    patched, changes = patch_pipeline(nested, dict(recommendation, parallelCopies={"value": 16}))
+    assert changes == ["CopyTableData.parallelCopies: 8 -> 16", "ForEachTable.batchCount: 2 -> 6"]
+    assert patched["properties"]["activities"][0] == wait
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Copy Autotuner Tests")
+    print("=" * 50)
+
+    test_fit_recovers_parameters()
+    test_observations()
+    test_recommendations()
+    test_patch_pipeline()
+
+    print("\n" + "=" * 50)
+    print("All copy autotuner tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
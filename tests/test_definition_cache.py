@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Definition cache tests
+Runs offline against the local stub server
+"""
+
+import json
+from pathlib import Path
+
+from definition_cache import DefinitionCache
+from http_transport import HttpTransport
+from stub_server import StubCredential, StubServer
+from test_adf_api import AzureDataFactoryClient
+from test_synapse_api import SynapseWorkspaceClient
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def load_definitions():
+    """Repo pipeline, dataset and linked service JSON keyed by (kind, name)"""
+    definitions = {}
+    for kind, folder in (("pipelines", "pipelines"), ("datasets", "datasets"),
+                         ("linkedservices", "linkedservices")):
+        for path in (REPO_ROOT / folder).glob("*.json"):
+            with open(path, 'r') as f:
+                definition = json.load(f)
+            definition["etag"] = f'"{kind}-{path.stem}-1"'
+            definitions[(kind, definition["name"])] = definition
+    return definitions
+
+
+def definitions_handler(definitions, send_etag_header: bool = True):
+    """Serve definitions, answering If-None-Match with 304 when the etag matches"""
+    state = {"200": 0, "304": 0}
+
+    def handler(method, path, headers, body):
+        kind, name = path.split("?")[0].split("/")[-2:]
+        definition = definitions.get((kind, name))
+        if definition is None:
+            return 404, {}, {"error": {"code": "NotFound"}}
+        if send_etag_header and headers.get("if-none-match") == definition["etag"]:
+            state["304"] += 1
+            return 304, {}, None
+        state["200"] += 1
+        return 200, {"ETag": definition["etag"]} if send_etag_header else {}, definition
+
+    return handler, state
+
+
+def make_adf_client(server: StubServer, cache: DefinitionCache) -> AzureDataFactoryClient:
+    client = AzureDataFactoryClient("sub", "rg", "adf", transport=HttpTransport(),
+                                    credential=StubCredential(), definition_cache=cache)
+    client.base_url = f"{server.url}/factories/adf"
+    return client
+
+
+def test_factory_sync_is_mostly_not_modified():
+    """Test: Re-syncing every definition costs 304s, not full payloads"""
+    print("\n=== Test: Conditional Sync ===")
+    definitions = load_definitions()
+    handler, state = definitions_handler(definitions)
+    cache = DefinitionCache()
+
+    with StubServer(handler) as server:
+        client = make_adf_client(server, cache)
+        for _ in range(3):
+            for kind in ("pipelines", "datasets", "linkedservices"):
+                names = [name for k, name in definitions if k == kind]
+                synced = client.get_definitions(kind, names)
+                assert sorted(synced) == sorted(names)
+
+    print(f"  Full downloads: {state['200']}, not modified: {state['304']}")
+    assert state["200"] == len(definitions)
+    assert state["304"] == 2 * len(definitions)
+    print("✓ Test passed")
+
+
+def test_changed_definition_is_downloaded():
+    """Test: A new etag on the service replaces the cached definition"""
+    print("\n=== Test: Changed Definition ===")
+    definitions = load_definitions()
+    handler, state = definitions_handler(definitions)
+
+    with StubServer(handler) as server:
+        client = make_adf_client(server, DefinitionCache())
+        first = client.get_pipeline("pl_copy_blob_to_datalake")
+
+        updated = dict(definitions[("pipelines", "pl_copy_blob_to_datalake")], etag='"changed"')
+        updated["properties"] = dict(updated["properties"], description="updated")
+        definitions[("pipelines", "pl_copy_blob_to_datalake")] = updated
+
+        second = client.get_pipeline("pl_copy_blob_to_datalake")
+    assert "description" not in first["properties"]
+    assert second["properties"]["description"] == "updated"
+    print("✓ Test passed")
+
+
+def test_ttl_and_servers_without_etags():
+    """Test: Within the TTL no request is made; after it, a server without 304 support re-sends the payload"""
+    print("\n=== Test: TTL Without ETags ===")
+    definitions = load_definitions()
+    handler, state = definitions_handler(definitions, send_etag_header=False)
+    clock = [0.0]
+    cache = DefinitionCache(ttl=60.0, clock=lambda: clock[0])
+
+    with StubServer(handler) as server:
+        client = make_adf_client(server, cache)
+        client.get_pipeline("pl_copy_blob_to_datalake")
+        client.get_pipeline("pl_copy_blob_to_datalake")
+        assert server.requests == 1
+        clock[0] = 120.0
+        client.get_pipeline("pl_copy_blob_to_datalake")
+        assert server.requests == 2
+    assert cache.stats == {"fresh": 1, "not_modified": 0, "downloaded": 2}
+    print("✓ Test passed")
+
+
+def test_cached_definitions_are_isolated():
+    """Test: Mutating a returned definition does not corrupt the cache"""
+    print("\n=== Test: Copy Isolation ===")
+    handler, _ = definitions_handler(load_definitions())
+    with StubServer(handler) as server:
+        client = make_adf_client(server, DefinitionCache())
+        client.get_dataset("ds_source_blob")["properties"]["type"] = "Mutated"
+        assert client.get_dataset("ds_source_blob")["properties"]["type"] != "Mutated"
+    print("✓ Test passed")
+
+
+def test_lru_eviction():
+    """Test: The least recently used definition is evicted first"""
+    print("\n=== Test: LRU Eviction ===")
+    handler, _ = definitions_handler(load_definitions())
+    cache = DefinitionCache(max_entries=2)
+    with StubServer(handler) as server:
+        client = make_adf_client(server, cache)
+        client.get_dataset("ds_source_blob")
+        client.get_dataset("ds_sink_adls")
+        client.get_dataset("ds_source_blob")
+        client.get_dataset("ds_source_sql")
+        assert len(cache) == 2
+        assert not any("ds_sink_adls" in url for url in cache._entries)
+    print("✓ Test passed")
+
+
+def test_synapse_lists_are_cached():
+    """Test: Synapse list_* calls revalidate through the same cache"""
+    print("\n=== Test: Synapse Lists ===")
+
+    def handler(method, path, headers, body):
+        if headers.get("if-none-match") == '"list-1"':
+            return 304, {}, None
+        return 200, {"ETag": '"list-1"'}, {"value": [{"name": "nb_transform_raw_to_processed"}]}
+
+    with StubServer(handler) as server:
+        client = SynapseWorkspaceClient("ws", transport=HttpTransport(), credential=StubCredential())
+        client.dev_endpoint = server.url
+        for _ in range(3):
+            assert client.list_notebooks()[0]["name"] == "nb_transform_raw_to_processed"
+    assert client.definition_cache.stats["not_modified"] == 2
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Definition Cache Tests")
+    print("=" * 50)
+
+    test_factory_sync_is_mostly_not_modified()
+    test_changed_definition_is_downloaded()
+    test_ttl_and_servers_without_etags()
+    test_cached_definitions_are_isolated()
+    test_lru_eviction()
+    test_synapse_lists_are_cached()
+
+    print("\n" + "=" * 50)
+    print("All definition cache tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport tests
+Runs offline against the local stub server
+"""
+
+from http_transport import HttpTransport, parse_retry_after, retry_delay
+from stub_server import StubServer
+
+
+def test_connections_are_reused():
+    """Test: Sequential requests share one keep-alive connection"""
+    print("\n=== Test: Connection Reuse ===")
+    with StubServer() as server, HttpTransport() as transport:
+        for _ in range(20):
+            response = transport.get(f"{server.url}/pipelines")
+            assert response.status_code == 200
+
+        print(f"  Requests: {server.requests}, connections: {server.connections}")
+        assert server.requests == 20
+        assert server.connections == 1, "Transport opened more than one connection"
+    print("✓ Test passed")
+
+
+def test_throttled_requests_are_retried():
+    """Test: 429 and 503 responses are retried until the server accepts"""
+    print("\n=== Test: Throttle Retry ===")
+    statuses = [429, 503, 200]
+
+    def handler(method, path, headers, body):
+        status = statuses.pop(0)
+        if status == 200:
+            return 200, {}, {"runId": "run-1"}
+        return status, {"Retry-After": "0"}, {"error": {"code": "TooManyRequests"}}
+
+    with StubServer(handler) as server, HttpTransport() as transport:
+        response = transport.post(f"{server.url}/pipelines/pl/createRun", json={})
+        assert response.status_code == 200
+        assert response.json()["runId"] == "run-1"
+        assert server.requests == 3
+    print("✓ Test passed")
+
+
+def test_retries_are_bounded():
+    """Test: The last throttled response is returned once retries run out"""
+    print("\n=== Test: Bounded Retries ===")
+
+    def handler(method, path, headers, body):
+        return 429, {"Retry-After": "0"}, None
+
+    with StubServer(handler) as server, HttpTransport(max_retries=2) as transport:
+        response = transport.get(f"{server.url}/pipelines")
+        assert response.status_code == 429
+        assert server.requests == 3
+    print("✓ Test passed")
+
+
+def test_retry_delay():
+    """Test: Retry-After headers drive the backoff, with bounded jitter"""
+    print("\n=== Test: Retry Delay ===")
+    assert parse_retry_after({"retry-after": "5"}) == 5.0
+    assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+    assert parse_retry_after({}) is None
+
+    for attempt in range(5):
+        delay = retry_delay({"retry-after": "10"}, attempt)
+        assert 10.0 <= delay <= 12.0
+        delay = retry_delay({}, attempt, backoff_base=0.5, backoff_max=4.0)
+        assert 0.0 <= delay <= min(4.0, 0.5 * 2 ** attempt)
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("HTTP Transport Tests")
+    print("=" * 50)
+
+    test_connections_are_reused()
+    test_throttled_requests_are_retried()
+    test_retries_are_bounded()
+    test_retry_delay()
+
+    print("\n" + "=" * 50)
+    print("All transport tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
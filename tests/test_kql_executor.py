@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+KQL executor tests
+Runs the repo's monitoring queries over a run-history store filled from the stand-in and checks them against plain Python
+"""
+
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from kql_executor import KQL_QUERIES_PATH, KqlExecutor, compile_query, split_queries
+from run_history_store import RunHistoryStore
+from run_utils import parse_timestamp
+from standin_server import StandInConfig, StandInState
+
+NOW = datetime(2024, 6, 10, 12, 0, 0)
+
+
+def make_store(root: str, runs: int = 400, days: float = 10):
+    """Store holding finished stand-in runs and their activity runs; returns (store, runs, activity runs)"""
+    state = StandInState(StandInConfig(seed=12))
+    state.seed_history(runs, days=days, now=NOW, failure_rate=0.2)
+    pipeline_runs = [state.get_run(run_id, NOW) for run_id in state.runs]
+    activity_runs = [activity for run in pipeline_runs for activity in state.get_activity_runs(run["runId"], NOW)]
+    store = RunHistoryStore(root)
+    store.add_runs(pipeline_runs, activity_runs)
+    return store, pipeline_runs, activity_runs
+
+
+def repo_queries():
+    with open(KQL_QUERIES_PATH) as f:
+        return split_queries(f.read())
+
+
+def since(run: dict, key: str, delta: timedelta) -> bool:
+    return parse_timestamp(run[key]) > NOW - delta
+
+
+def test_repo_queries_compile_or_are_rejected():
+    """Test: Every ADF query in the repo file runs; other tables and let/join are rejected clearly"""
+    print("\n=== Test: Repo Queries ===")
+    queries = repo_queries()
+    assert "Failed Pipelines in Last 24 Hours" in queries and len(queries) >= 18
+    with tempfile.TemporaryDirectory() as root:
+        executor = KqlExecutor(make_store(root)[0], clock=lambda: NOW)
+        ran = []
+        for title, query in queries.items():
+            if query.startswith(("ADFPipelineRun", "ADFActivityRun")):
+                executor.execute(query)
+                ran.append(title)
+            elif query.startswith("let"):
+                with pytest.raises(ValueError):
+                    compile_query(query)
+            else:
+                with pytest.raises(KeyError):
+                    compile_query(query)
+        print(f"  ran {len(ran)} of {len(queries)} queries")
+        assert len(ran) == 12
+    print("✓ Test passed")
+
+
+def test_success_rate_and_failures():
+    """Test: Success rate by name and failed runs match a row-by-row count"""
+    print("\n=== Test: Success Rate ===")
+    queries = repo_queries()
+    with tempfile.TemporaryDirectory() as root:
+        store, runs, _ = make_store(root)
+        executor = KqlExecutor(store, clock=lambda: NOW)
+
+        result = executor.execute(queries["Pipeline Success Rate by Name"])
+        rows = result.rows()
+        recent = [run for run in runs if since(run, "runStart", timedelta(days=7))]
+        for row in rows:
+            mine = [run for run in recent if run["pipelineName"] == row["PipelineName"]]
+            succeeded = sum(run["status"] == "Succeeded" for run in mine)
+            assert row["TotalRuns"] == len(mine) and row["Succeeded"] == succeeded
+            assert row["Failed"] == sum(run["status"] == "Failed" for run in mine)
+            assert row["SuccessRate"] == pytest.approx(100.0 * succeeded / len(mine), abs=0.0051)
+        assert sorted(row["PipelineName"] for row in rows) == sorted({run["pipelineName"] for run in recent})
+        assert [row["SuccessRate"] for row in rows] == sorted(row["SuccessRate"] for row in rows)
+
+        failed = executor.execute(queries["Failed Pipelines in Last 24 Hours"])
+        assert list(failed.columns) == ["TimeGenerated", "PipelineName", "RunId", "Status", "ErrorMessage"]
+        expected = [run["runId"] for run in runs if run["status"] == "Failed"
+                    and since(run, "runStart", timedelta(hours=24))]
+        assert sorted(failed.column("RunId")) == sorted(expected)
+        times = failed.column("TimeGenerated")
+        assert times == sorted(times, reverse=True)
+        assert set(failed.column("ErrorMessage")) <= {None}
+    print("✓ Test passed")
+
+
+def test_binned_duration_trend():
+    """Test: bin(TimeGenerated, 1d) groups with avg/max/min per pipeline and day"""
+    print("\n=== Test: Duration Trend ===")
+    with tempfile.TemporaryDirectory() as root:
+        store, runs, _ = make_store(root)
+        result = KqlExecutor(store, clock=lambda: NOW).execute(repo_queries()["Pipeline Duration Trends"])
+        expected = defaultdict(list)
+        for run in runs:
+            if run["status"] == "Succeeded" and since(run, "runStart", timedelta(days=7)):
+                day = parse_timestamp(run["runStart"]).replace(hour=0, minute=0, second=0, microsecond=0)
+                expected[(run["pipelineName"], day)].append(run["durationInMs"])
+        rows = result.rows()
+        assert len(rows) == len(expected)
+        for row in rows:
+            durations = expected[(row["PipelineName"], row["TimeGenerated"])]
+            # Kusto rounds halves away from zero, Python's round() does not: compare to the cent
+            assert row["AvgDuration"] == pytest.approx(sum(durations) / len(durations) / 60000, abs=0.0051)
+            assert row["MaxDuration"] == pytest.approx(max(durations) / 60000, abs=0.0051)
+            assert row["MinDuration"] == pytest.approx(min(durations) / 60000, abs=0.0051)
+    print("✓ Test passed")
+
+
+def test_copy_performance_and_integer_division():
+    """Test: Copy performance uses Output columns; long / long truncates like Kusto"""
+    print("\n=== Test: Copy Performance ===")
+    queries = repo_queries()
+    with tempfile.TemporaryDirectory() as root:
+        store, runs, activities = make_store(root, days=2)
+        executor = KqlExecutor(store, clock=lambda: NOW)
+        result = executor.execute(queries["Copy Activity Performance"])
+        copies = [a for a in activities if a["activityType"] == "Copy" and a["status"] == "Succeeded"
+                  and since(a, "activityRunStart", timedelta(hours=24))]
+        assert len(result) == len(copies) > 0
+        by_rows = {a["output"]["rowsCopied"]: a for a in copies}
+        for row in result.rows():
+            copy = by_rows[row["RowsCopied"]]
+            read_mb = copy["output"]["dataRead"] / 1024 / 1024
+            minutes = copy["durationInMs"] // 1000 // 60
+            assert row["DataReadMB"] == pytest.approx(read_mb, abs=0.0051)
+            assert row["DurationMinutes"] == minutes
+            assert row["ThroughputMBPerMin"] == (pytest.approx(read_mb / minutes, abs=0.0051) if minutes else float("inf"))
+
+        long_running = executor.execute(queries["Long Running Pipelines"])
+        assert all(isinstance(m, int) for m in long_running.column("DurationMinutes"))
+        expected = sorted((run["durationInMs"] // 60000 for run in runs
+                           if run["durationInMs"] > 3600000 and since(run, "runStart", timedelta(hours=24))),
+                          reverse=True)
+        assert long_running.column("DurationMinutes") == expected
+    print("✓ Test passed")
+
+
+def test_operators_and_errors():
+    """Test: Default descending sort, take/top, in, =~, between, count naming, pruning and errors"""
+    print("\n=== Test: Operators ===")
+    with tempfile.TemporaryDirectory() as root:
+        store, runs, _ = make_store(root, runs=200)
+        loads = []
+
+        class RecordingStore(RunHistoryStore):
+            def load(self, table, start=None, end=None, columns=None):
+                loads.append((start, sorted(columns)))
+                return super().load(table, start, end, columns)
+
+        executor = KqlExecutor(RecordingStore(root), clock=lambda: NOW)
+        result = executor.execute("ADFPipelineRun | summarize count() by Status | order by count_")
+        counts = result.column("count_")
+        assert counts == sorted(counts, reverse=True) and sum(counts) == len(runs)
+        assert loads[-1] == (None, ["run_start", "status"])
+
+        top = executor.execute("ADFPipelineRun | where TimeGenerated > ago(2d) | top 3 by DurationMs asc")
+        floor = NOW - timedelta(days=2)
+        assert loads[-1][0] == floor
+        assert top.column("DurationMs") == sorted(run["durationInMs"] for run in runs
+                                                  if parse_timestamp(run["runStart"]) > floor)[:3]
+
+        query = ("ADFPipelineRun | where Status in ('Failed', 'Cancelled') and PipelineName =~ 'PL_COPY_BLOB_TO_DATALAKE'"
+                 " | where DurationMs between (60000 .. 600000) | take 5")
+        expected = [run for run in runs if run["status"] in ("Failed", "Cancelled")
+                    and run["pipelineName"] == "pl_copy_blob_to_datalake" and 60000 <= run["durationInMs"] <= 600000]
+        assert len(executor.execute(query)) == min(5, len(expected))
+        assert executor.execute("ADFActivityRun | where ActivityType == 'Missing' | summarize n = count()").rows() \
+            == [{"n": 0}]
+
+        for bad in ("ADFPipelineRun | join kind=inner X on RunId", "ADFPipelineRun | where count() > 1",
+                    "ADFPipelineRun | extend x = strcat(Status)", "ADFPipelineRun | project Nope"):
+            with pytest.raises(ValueError):
+                executor.execute(bad)
+        hits = compile_query.cache_info().hits
+        executor.execute("ADFPipelineRun | summarize count() by Status | order by count_")
+        assert compile_query.cache_info().hits == hits + 1
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("KQL Executor Tests")
+    print("=" * 50)
+
+    test_repo_queries_compile_or_are_rejected()
+    test_success_rate_and_failures()
+    test_binned_duration_trend()
+    test_copy_performance_and_integer_division()
+    test_operators_and_errors()
+
+    print("\n" + "=" * 50)
+    print("All KQL executor tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Pipeline graph tests
+Checks graph construction, cycle and reachability detection and critical-path analysis
+"""
+
+from pipeline_graph import (DEFAULT_DURATIONS, PipelineGraph, durations_from_activity_runs,
+                            parse_timespan)
+
+
+def activity(name, activity_type="Wait", depends_on=(), conditions=("Succeeded",), **type_properties):
+    return {"name": name, "type": activity_type,
+            "dependsOn": [{"activity": upstream, "dependencyConditions": list(conditions)}
+                          for upstream in depends_on],
+            "typeProperties": type_properties}
+
+
+def pipeline(name, *activities):
+    return {"name": name, "properties": {"activities": list(activities)}}
+
+
+def test_repo_graph():
+    """Test: The repo pipelines form an acyclic graph with the master calling the blob copy"""
+    print("\n=== Test: Repo Graph ===")
+    graph = PipelineGraph.from_directory()
+    assert graph.cycles() == []
+    assert graph.unreachable_activities() == []
+    assert graph.missing_references() == []
+    assert graph.pipeline_calls()["pl_orchestration_master"] == {"pl_copy_blob_to_datalake"}
+    assert "pl_copy_blob_to_datalake" not in graph.entry_pipelines()
+
+    edges = graph.edges()
+    assert ("pl_orchestration_master/IngestRawData", "pl_copy_blob_to_datalake", "executePipeline", []) in edges
+    assert ("pl_dynamic_copy_metadata/ForEachTable", "pl_dynamic_copy_metadata/CopyTableData",
+            "contains", []) in edges
+    print(f"  {len(graph.pipelines)} pipelines, {len(edges)} edges")
+    print("✓ Test passed")
+
+
+def test_master_critical_path():
+    """Test: The master's critical path runs through the child pipeline and the notebook chain"""
+    print("\n=== Test: Master Critical Path ===")
+    graph = PipelineGraph.from_directory()
+    report = graph.parallelism_report("pl_orchestration_master")
+    assert report["critical_path"] == [
+        "pl_orchestration_master/IngestRawData",
+        "pl_copy_blob_to_datalake/CopyBlobToDataLake",
+        "pl_orchestration_master/TransformData",
+        "pl_orchestration_master/CurateData",
+        "pl_orchestration_master/DataQualityCheck",
+        "pl_orchestration_master/SendSuccessEmail",
+    ]
+    expected = DEFAULT_DURATIONS["Copy"] + 3 * DEFAULT_DURATIONS["SynapseNotebook"] + DEFAULT_DURATIONS["WebActivity"]
+    assert report["makespan_seconds"] == expected
+    assert report["parallelism"] == 1.0
+
+    chain = report["serial_chains"][0]
+    assert chain["on_critical_path"] and chain["share_of_makespan"] == 1.0
+    assert "pl_orchestration_master/CurateData" in chain["activities"]
+    for key in report["critical_path"]:
+        print(f"  {key}")
+    print("✓ Test passed")
+
+
+def test_historical_durations_and_foreach():
+    """Test: History overrides defaults and ForEach duration scales with batchCount waves"""
+    print("\n=== Test: Durations ===")
+    graph = PipelineGraph.from_directory()
+    runs = [{"pipelineName": "pl_dynamic_copy_metadata", "activityName": "CopyTableData",
+             "status": "Succeeded", "durationInMs": ms} for ms in (40_000, 60_000, 500_000)]
+    runs.append({"pipelineName": "pl_dynamic_copy_metadata", "activityName": "CopyTableData",
+                 "status": "Failed", "durationInMs": 1})
+    durations = durations_from_activity_runs(runs)
+    assert durations == {"pl_dynamic_copy_metadata/CopyTableData": 60.0}
+
+    key = "pl_dynamic_copy_metadata/ForEachTable"
+    body = 60.0 + DEFAULT_DURATIONS["SqlServerStoredProcedure"]
+    schedule = graph.schedule("pl_dynamic_copy_metadata", durations, {key: 10})
+    # batchCount 4: ten items run in three waves
+    assert schedule.finish[key] - schedule.start[key] == 3 * body
+    assert schedule.total_work == DEFAULT_DURATIONS["Lookup"] + 10 * body
+    assert schedule.parallelism > 1
+    print("✓ Test passed")
+
+
+def test_cycles_and_unreachable():
+    """Test: dependsOn cycles, dangling dependencies and recursive ExecutePipeline are reported"""
+    print("\n=== Test: Cycles and Reachability ===")
+    graph = PipelineGraph([
+        pipeline("pl_a",
+                 activity("Start"),
+                 activity("Loop1", depends_on=["Loop2"]),
+                 activity("Loop2", depends_on=["Loop1"]),
+                 activity("Orphan", depends_on=["Missing"]),
+                 activity("CallB", "ExecutePipeline", pipeline={"referenceName": "pl_b"}, waitOnCompletion=True)),
+        pipeline("pl_b",
+                 activity("CallA", "ExecutePipeline", pipeline={"referenceName": "pl_a"}, waitOnCompletion=True),
+                 activity("CallGone", "ExecutePipeline", pipeline={"referenceName": "pl_gone"})),
+    ])
+    cycles = graph.cycles()
+    assert ["pl_a/Loop1", "pl_a/Loop2", "pl_a/Loop1"] in cycles
+    assert ["pl_a", "pl_b", "pl_a"] in cycles
+    assert sorted(graph.unreachable_activities()) == ["pl_a/Loop1", "pl_a/Loop2", "pl_a/Orphan"]
+    assert graph.missing_references() == [("pl_b/CallGone", "pl_gone")]
+    # Recursion is cut off rather than looping forever
+    assert graph.schedule("pl_a").makespan > 0
+    print("✓ Test passed")
+
+
+def test_failure_branches_and_chains():
+    """Test: Failure-only branches are left out of the success schedule and split serial chains"""
+    print("\n=== Test: Dependency Conditions ===")
+    graph = PipelineGraph([
+        pipeline("pl_c",
+                 activity("A", waitTimeInSeconds=10),
+                 activity("B", depends_on=["A"], waitTimeInSeconds=20),
+                 activity("C", depends_on=["B"], waitTimeInSeconds=30),
+                 activity("OnFail", depends_on=["B"], conditions=["Failed"], waitTimeInSeconds=100),
+                 activity("Side", waitTimeInSeconds=5)),
+    ])
+    schedule = graph.schedule("pl_c")
+    assert schedule.makespan == 60
+    assert "pl_c/OnFail" not in schedule.finish
+    assert schedule.critical_path == ["pl_c/A", "pl_c/B", "pl_c/C"]
+    assert graph.schedule("pl_c", scenario="all").makespan == 130
+
+    assert graph.serial_chains("pl_c") == [["pl_c/A", "pl_c/B", "pl_c/C"]]
+    assert graph.serial_chains("pl_c", scenario="all") == [["pl_c/A", "pl_c/B"]]
+    assert parse_timespan("0.12:00:00") == 43200
+    assert parse_timespan("1.00:00:30") == 86430
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Pipeline Graph Tests")
+    print("=" * 50)
+
+    test_repo_graph()
+    test_master_critical_path()
+    test_historical_durations_and_foreach()
+    test_cycles_and_unreachable()
+    test_failure_branches_and_chains()
+
+    print("\n" + "=" * 50)
+    print("All pipeline graph tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Pipeline simulator tests
+Checks ForEach slots, retries, timeouts, dependency conditions and ExecutePipeline nesting
+"""
+
+import pickle
+import random
+
+from pipeline_graph import PipelineGraph
+from pipeline_simulator import DurationModel, PipelineSimulator
+
+FOREACH = "pl_dynamic_copy_metadata/ForEachTable"
+
+
+def fixed(durations, failure_rates=None):
+    """Deterministic model: every activity takes exactly its listed seconds"""
+    return DurationModel({key: [seconds] for key, seconds in durations.items()}, failure_rates, default_spread=0)
+
+
+def test_foreach_batch_count():
+    """Test: ForEach iterations queue for batchCount slots, or one slot when isSequential"""
+    print("\n=== Test: ForEach Slots ===")
+    durations = fixed({"pl_dynamic_copy_metadata/GetTableList": 10,
+                       "pl_dynamic_copy_metadata/CopyTableData": 100,
+                       "pl_dynamic_copy_metadata/LogSuccess": 20})
+    simulator = PipelineSimulator(durations=durations, item_counts={FOREACH: 10})
+    rng = random.Random(0)
+
+    trial = simulator.run_trial("pl_dynamic_copy_metadata", rng)
+    # batchCount 4 -> ceil(10 / 4) = 3 waves of 120s after the lookup
+    assert trial.makespan == 10 + 3 * 120
+    assert trial.peak_concurrency == 4
+    assert trial.attempts == 1 + 10 * 2
+
+    wider = simulator.run_trial("pl_dynamic_copy_metadata", rng, {FOREACH: {"batch_count": 10}})
+    assert wider.makespan == 130 and wider.peak_concurrency == 10
+    sequential = simulator.run_trial("pl_dynamic_copy_metadata", rng, {FOREACH: {"is_sequential": True}})
+    assert sequential.makespan == 10 + 10 * 120 and sequential.peak_concurrency == 1
+    print("✓ Test passed")
+
+
+def test_retries_and_failure_branch():
+    """Test: Retries recover transient failures; exhausted retries route to the failure branch"""
+    print("\n=== Test: Retries ===")
+    master = "pl_orchestration_master/TransformData"
+    simulator = PipelineSimulator(durations=DurationModel(failure_rates={master: 0.3}))
+    summary = simulator.simulate("pl_orchestration_master", trials=4000, seed=1)
+    # retry 2: a run fails only if all three attempts fail (0.3 ** 3)
+    assert abs(summary["success_rate"] - (1 - 0.3 ** 3)) < 0.01
+    assert summary["mean_attempts"] > 6
+
+    no_retry = simulator.simulate("pl_orchestration_master", trials=4000, seed=1,
+                                  overrides={master: {"retry": 0}})
+    assert abs(no_retry["success_rate"] - 0.7) < 0.03
+    # Failing early skips the remaining notebooks, so failed runs are shorter
+    assert no_retry["mean_makespan_seconds"] < summary["mean_makespan_seconds"]
+
+    try:
+        simulator.simulate("pl_orchestration_master", trials=1, overrides={master: {"retries": 1}})
+        assert False, "unknown setting should be rejected"
+    except ValueError as e:
+        assert "retries" in str(e)
+    print(f"  success {summary['success_rate']:.1%} with retry 2, {no_retry['success_rate']:.1%} without")
+    print("✓ Test passed")
+
+
+def test_timeout_and_execute_pipeline():
+    """Test: Timeouts cut attempts short and waitOnCompletion includes the child pipeline"""
+    print("\n=== Test: Timeouts and Nesting ===")
+    wait = {"type": "ExecutePipeline",
+            "typeProperties": {"pipeline": {"referenceName": "pl_child"}, "waitOnCompletion": True}}
+    graph = PipelineGraph([
+        {"name": "pl_child", "properties": {"activities": [
+            {"name": "Slow", "type": "Copy", "policy": {"timeout": "0.00:01:00", "retry": 1,
+                                                        "retryIntervalInSeconds": 10}}]}},
+        {"name": "pl_parent", "properties": {"activities": [
+            dict(wait, name="RunChild"),
+            {"name": "Cleanup", "type": "Script",
+             "dependsOn": [{"activity": "RunChild", "dependencyConditions": ["Completed"]}]}]}},
+    ])
+    simulator = PipelineSimulator(graph, fixed({"pl_child/Slow": 300, "pl_parent/Cleanup": 5}))
+    trial = simulator.run_trial("pl_parent", random.Random(0))
+    # Two 60s timed-out attempts with a 10s pause, then Cleanup runs on Completed;
+    # the succeeded leaf decides the outcome, as in ADF's try/finally pattern
+    assert trial.makespan == 60 + 10 + 60 + 5
+    assert trial.status == "Succeeded" and trial.attempts == 1 + 2 + 1
+
+    relaxed = simulator.run_trial("pl_parent", random.Random(0), {"pl_child/Slow": {"timeout": None}})
+    assert relaxed.makespan == 305 and relaxed.status == "Succeeded"
+    print("✓ Test passed")
+
+
+def test_history_and_sweep():
+    """Test: Durations and failure rates come from activity runs; sweeps replay the same seed"""
+    print("\n=== Test: History and Sweep ===")
+    runs = [{"pipelineName": "pl_copy_blob_to_datalake", "activityName": "CopyBlobToDataLake",
+             "status": status, "durationInMs": ms}
+            for status, ms in [("Succeeded", 100_000), ("Succeeded", 200_000), ("Failed", 5_000),
+                               ("Succeeded", 300_000), ("InProgress", None)]]
+    model = DurationModel.from_activity_runs(runs)
+    assert model.samples == {"pl_copy_blob_to_datalake/CopyBlobToDataLake": [100.0, 200.0, 300.0]}
+    assert model.failure_rates == {"pl_copy_blob_to_datalake/CopyBlobToDataLake": 0.25}
+
+    simulator = PipelineSimulator(durations=model)
+    summary = simulator.simulate("pl_copy_blob_to_datalake", trials=500)
+    assert 100 <= summary["p50_makespan_seconds"] <= 1000
+    assert summary["success_rate"] > 0.99
+
+    configurations = [{}, {"pl_copy_blob_to_datalake/CopyBlobToDataLake": {"failure_rate": 0.0}}]
+    first, second = simulator.sweep("pl_copy_blob_to_datalake", configurations, trials=200)
+    assert first == simulator.simulate("pl_copy_blob_to_datalake", trials=200)
+    assert second["mean_attempts"] == 1.0 and second["success_rate"] == 1.0
+
+    # Pool workers get a simulator without this process's caches and agree with the serial sweep
+    assert simulator._scopes and pickle.loads(pickle.dumps(simulator))._scopes == {}
+    assert simulator.sweep("pl_copy_blob_to_datalake", configurations * 2, trials=200, max_workers=2) == \
+        [first, second] * 2
+
+    # Editing the same overrides dict in place takes effect on the next call
+    overrides = {"pl_copy_blob_to_datalake/CopyBlobToDataLake": {"failure_rate": 0.0}}
+    assert simulator.simulate("pl_copy_blob_to_datalake", trials=200, overrides=overrides) == second
+    overrides["pl_copy_blob_to_datalake/CopyBlobToDataLake"]["failure_rate"] = 1.0
+    assert simulator.simulate("pl_copy_blob_to_datalake", trials=200, overrides=overrides)["success_rate"] == 0.0
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Pipeline Simulator Tests")
+    print("=" * 50)
+
+    test_foreach_batch_count()
+    test_retries_and_failure_branch()
+    test_timeout_and_execute_pipeline()
+    test_history_and_sweep()
+
+    print("\n" + "=" * 50)
+    print("All pipeline simulator tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
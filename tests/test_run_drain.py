@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Emergency drain tests
+Starts runs on the local stand-in and drains them, checking cascades, pacing and per-run outcomes
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from bulk_trigger import ArmWriteBudget
+from run_drain import CANCEL_REQUESTED, CASCADED, FAILED, NOT_FOUND, RunDrain, split_cascaded
+from standin_server import StandInServer
+
+
+def start_runs(server: StandInServer, pipeline_name: str, count: int, hours: float = 2) -> list:
+    """`count` runs started a minute ago that keep going for `hours`"""
+    now = datetime.utcnow()
+    return [server.state._add_run(pipeline_name, now - timedelta(minutes=1), hours * 3600, "Succeeded")["runId"]
+            for _ in range(count)]
+
+
+def children_of(server: StandInServer, run_ids) -> list:
+    run_ids = set(run_ids)
+    return [run for run in server.state.runs.values() if run["invokedBy"].get("pipelineRunId") in run_ids]
+
+
+def test_drain_master_runs_cascades_to_children():
+    """Test: Draining pl_orchestration_master cancels each run once, recursively, children included"""
+    print("\n=== Test: Drain With Cascade ===")
+    with StandInServer() as server:
+        masters = start_runs(server, "pl_orchestration_master", 40)
+        others = start_runs(server, "pl_copy_blob_to_datalake", 5)
+        finished = server.state._add_run("pl_orchestration_master", datetime.utcnow() - timedelta(hours=1),
+                                         60, "Succeeded")["runId"]
+        children = children_of(server, masters)
+        assert children
+
+        client = server.adf_client()
+        report = client.drain_pipeline_runs(["pl_orchestration_master"], max_workers=8)
+        assert report.counts() == {CANCEL_REQUESTED: 40}
+        assert sorted(outcome.run_id for outcome in report.outcomes) == sorted(masters)
+        assert all(outcome.status == "Cancelled" for outcome in report.outcomes)
+        assert sorted(server.state.cancel_requests) == sorted((run_id, True) for run_id in masters)
+        assert all(outcome.seconds <= report.seconds for outcome in report.outcomes)
+
+        assert all(client.get_pipeline_run(child["runId"])["status"] == "Cancelled" for child in children)
+        assert all(client.get_pipeline_run(run_id)["status"] == "InProgress" for run_id in others)
+        assert client.get_pipeline_run(finished)["status"] == "Succeeded"
+        print(f"  drained {len(masters)} runs and {len(children)} children in {report.seconds * 1000:.0f}ms")
+    print("✓ Test passed")
+
+
+def test_children_left_to_the_cascade():
+    """Test: Selected children of selected parents are not cancelled twice unless recursion is off"""
+    print("\n=== Test: Cascaded Children ===")
+    with StandInServer() as server:
+        masters = start_runs(server, "pl_orchestration_master", 3)
+        children = children_of(server, masters)
+        roots, cascaded = split_cascaded([server.state.get_run(run_id)
+                                          for run_id in server.state.runs])
+        assert sorted(run["runId"] for run in roots) == sorted(masters)
+        assert len(cascaded) == len(children)
+
+        report = RunDrain(server.adf_client()).drain()
+        counts = report.counts()
+        assert counts == {CANCEL_REQUESTED: 3, CASCADED: len(children)}
+        assert all(outcome.status == "Cancelled" for outcome in report.outcomes)
+        assert len(server.state.cancel_requests) == 3
+
+    with StandInServer() as server:
+        masters = start_runs(server, "pl_orchestration_master", 3)
+        report = RunDrain(server.adf_client(), recursive=False).drain()
+        assert report.counts() == {CANCEL_REQUESTED: 3 + len(children_of(server, masters))}
+        assert all(not recursive for _, recursive in server.state.cancel_requests)
+    print("✓ Test passed")
+
+
+def test_rate_limit_and_failures():
+    """Test: Cancels are paced by the write budget; unknown runs and errors are reported per run"""
+    print("\n=== Test: Rate Limit and Failures ===")
+    with StandInServer() as server:
+        start_runs(server, "pl_copy_blob_to_datalake", 30)
+        drain = RunDrain(server.adf_client(), max_workers=8, budget=ArmWriteBudget(rate=100, capacity=10,
+                                                                                    reserved_writes=0))
+        runs = drain.select(["pl_copy_blob_to_datalake"])
+        assert len(runs) == 30
+        started = time.monotonic()
+        report = drain.cancel(runs + [{"runId": "missing", "pipelineName": "pl_copy_blob_to_datalake"}])
+        # 31 cancels with a burst of 10 need at least 21 refills at 100/s
+        assert time.monotonic() - started >= 0.2
+        assert report.counts() == {CANCEL_REQUESTED: 30, NOT_FOUND: 1}
+        assert next(o for o in report.outcomes if o.outcome == NOT_FOUND).error
+
+        class BrokenClient:
+            def cancel_pipeline_run(self, run_id, is_recursive=False, observe_headers=None):
+                raise RuntimeError("connection reset")
+
+        report = RunDrain(BrokenClient()).cancel(runs[:2])
+        assert report.counts() == {FAILED: 2} and report.outcomes[0].error == "connection reset"
+        assert RunDrain(server.adf_client()).drain(["pl_copy_blob_to_datalake"]).outcomes == []
+    print("✓ Test passed")
+
+
+def test_children_of_failed_cancels_are_cancelled():
+    """Test: When a parent's cancel fails, its children are cancelled and reported on their own"""
+    print("\n=== Test: Orphaned Children ===")
+    with StandInServer() as server:
+        masters = start_runs(server, "pl_orchestration_master", 3)
+        client = server.adf_client()
+
+        class FlakyClient:
+            def __getattr__(self, name):
+                return getattr(client, name)
+
+            def cancel_pipeline_run(self, run_id, is_recursive=False, observe_headers=None):
+                if run_id == masters[0]:
+                    raise RuntimeError("500 Internal Server Error")
+                return client.cancel_pipeline_run(run_id, is_recursive, observe_headers)
+
+        orphans = {child["runId"] for child in children_of(server, masters[:1])}
+        cascaded = {child["runId"] for child in children_of(server, masters[1:])}
+        report = RunDrain(FlakyClient()).drain()
+        outcomes = {outcome.run_id: outcome for outcome in report.outcomes}
+        assert outcomes[masters[0]].outcome == FAILED and outcomes[masters[0]].status == "InProgress"
+        assert {outcomes[run_id].outcome for run_id in orphans} == {CANCEL_REQUESTED}
+        assert {outcomes[run_id].outcome for run_id in cascaded} == {CASCADED}
+        assert all(outcomes[run_id].status == "Cancelled" for run_id in orphans | cascaded)
+        assert sorted(run_id for run_id, _ in server.state.cancel_requests) == sorted(masters[1:] + list(orphans))
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Emergency Drain Tests")
+    print("=" * 50)
+
+    test_drain_master_runs_cascades_to_children()
+    test_children_left_to_the_cascade()
+    test_rate_limit_and_failures()
+    test_children_of_failed_cancels_are_cancelled()
+
+    print("\n" + "=" * 50)
+    print("All emergency drain tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Streaming run-metrics tests
+Checks t-digest accuracy and merging, and sliced aggregation against the local stand-in
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from run_metrics import RunMetrics, TDigest
+from standin_server import StandInConfig, StandInServer
+
+
+def exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def test_tdigest_quantiles_are_close():
+    """Test: p50/p95/p99 of a skewed distribution are within a few percent"""
+    print("\n=== Test: T-Digest Accuracy ===")
+    rng = random.Random(7)
+    values = [rng.lognormvariate(11, 0.8) for _ in range(50_000)]
+    digest = TDigest()
+    for value in values:
+        digest.add(value)
+
+    for p in (50, 95, 99):
+        expected = exact_percentile(values, p)
+        assert abs(digest.quantile(p / 100) - expected) / expected < 0.03, p
+    assert digest.quantile(0) == min(values) and digest.quantile(1) == max(values)
+    assert len(digest) < 200, "Digest should stay bounded"
+    print("✓ Test passed")
+
+
+def test_merged_partials_match_single_aggregate():
+    """Test: Aggregates built by parallel fetchers merge into the same answer"""
+    print("\n=== Test: Merge Partial Aggregates ===")
+    rng = random.Random(3)
+    runs = [{"pipelineName": rng.choice(["pl_a", "pl_b"]),
+             "status": "Failed" if rng.random() < 0.1 else "Succeeded",
+             "durationInMs": int(rng.expovariate(1 / 60000))} for _ in range(20_000)]
+
+    single = RunMetrics()
+    single.add_page(runs)
+    partials = [RunMetrics() for _ in range(4)]
+    for i in range(0, len(runs), 100):
+        partials[(i // 100) % 4].add_page(runs[i:i + 100])
+    merged = RunMetrics()
+    for partial in partials:
+        merged.merge(partial)
+
+    assert merged.count() == single.count() == len(runs)
+    for name in ("pl_a", "pl_b"):
+        assert merged.count(name, "Failed") == single.count(name, "Failed")
+        durations = [r["durationInMs"] for r in runs if r["pipelineName"] == name and r["status"] == "Succeeded"]
+        p95 = merged.select(name, "Succeeded").percentile(95)
+        assert abs(p95 - exact_percentile(durations, 95)) / exact_percentile(durations, 95) < 0.03
+    print("✓ Test passed")
+
+
+def test_sliced_collection_counts_each_run_once():
+    """Test: Parallel slices neither drop nor double-count runs at their boundaries"""
+    print("\n=== Test: Sliced Collection ===")
+    with StandInServer(StandInConfig(page_size=40, seed=5)) as server:
+        server.state.seed_history(600, days=7)
+        client = server.adf_client()
+        end_time = datetime.utcnow() + timedelta(minutes=1)
+        start_time = end_time - timedelta(days=8)
+
+        runs = client.query_pipeline_runs(start_time, end_time)
+        metrics = client.pipeline_run_metrics(start_time, end_time, slices=16)
+
+        assert metrics.count() == len(runs)
+        summary = metrics.summary()
+        for name in {run["pipelineName"] for run in runs}:
+            assert summary[name]["runs"] == sum(1 for run in runs if run["pipelineName"] == name)
+            assert summary[name]["p50_duration_ms"] is not None
+        expected_rate = sum(1 for run in runs if run["status"] == "Succeeded") / len(runs) * 100
+        assert abs(metrics.success_rate() - expected_rate) < 1e-9
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Run Metrics Tests")
+    print("=" * 50)
+
+    test_tdigest_quantiles_are_close()
+    test_merged_partials_match_single_aggregate()
+    test_sliced_collection_counts_each_run_once()
+
+    print("\n" + "=" * 50)
+    print("All run metrics tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
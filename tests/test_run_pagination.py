@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Run query pagination tests
+Checks continuationToken handling against the local stub server
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from adf_async_client import AsyncDataFactoryClient
+from http_transport import HttpTransport
+from stub_server import StubCredential, StubServer
+from test_adf_api import AzureDataFactoryClient
+
+PAGE_SIZE = 100
+
+
+def paged_handler(total_runs: int):
+    """Serve `total_runs` runs in pages of PAGE_SIZE with continuation tokens"""
+    def handler(method, path, headers, body):
+        offset = int(body.get("continuationToken") or 0)
+        page = [{"runId": f"run-{i}", "status": "Succeeded"}
+                for i in range(offset, min(offset + PAGE_SIZE, total_runs))]
+        payload = {"value": page}
+        if offset + PAGE_SIZE < total_runs:
+            payload["continuationToken"] = str(offset + PAGE_SIZE)
+        return 200, {}, payload
+    return handler
+
+
+def make_client(server: StubServer) -> AzureDataFactoryClient:
+    client = AzureDataFactoryClient("sub", "rg", "adf", transport=HttpTransport(),
+                                    credential=StubCredential())
+    client.base_url = f"{server.url}/factories/adf"
+    return client
+
+
+def time_window():
+    end_time = datetime.utcnow()
+    return end_time - timedelta(days=7), end_time
+
+
+def test_query_follows_continuation_tokens():
+    """Test: query_pipeline_runs returns runs from every page"""
+    print("\n=== Test: Continuation Tokens ===")
+    with StubServer(paged_handler(250)) as server:
+        runs = make_client(server).query_pipeline_runs(*time_window())
+        assert [run["runId"] for run in runs] == [f"run-{i}" for i in range(250)]
+        assert server.requests == 3
+    print("✓ Test passed")
+
+
+def test_pages_are_fetched_lazily():
+    """Test: Pages are only requested as the caller consumes them"""
+    print("\n=== Test: Lazy Pages ===")
+    with StubServer(paged_handler(1000)) as server:
+        pages = make_client(server).iter_pipeline_run_pages(*time_window())
+        assert len(next(pages)) == PAGE_SIZE
+        assert server.requests == 1
+        assert len(next(pages)) == PAGE_SIZE
+        assert server.requests == 2
+        pages.close()
+    print("✓ Test passed")
+
+
+def test_prefetch_requests_next_page():
+    """Test: With prefetch the next page is requested while the caller holds the current one"""
+    print("\n=== Test: Prefetch ===")
+    with StubServer(paged_handler(1000)) as server:
+        pages = make_client(server).iter_pipeline_run_pages(*time_window(), prefetch=True)
+        next(pages)
+        deadline = time.time() + 5
+        while server.requests < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert server.requests == 2
+        total = PAGE_SIZE + sum(len(page) for page in pages)
+        assert total == 1000
+    print("✓ Test passed")
+
+
+def test_activity_runs_follow_continuation_tokens():
+    """Test: query_activity_runs returns activities from every page"""
+    print("\n=== Test: Activity Run Pages ===")
+    with StubServer(paged_handler(130)) as server:
+        activities = make_client(server).query_activity_runs("run-1", *time_window())
+        assert len(activities) == 130
+    print("✓ Test passed")
+
+
+def test_async_query_follows_continuation_tokens():
+    """Test: The asyncio client also reads every page"""
+    print("\n=== Test: Async Continuation Tokens ===")
+
+    async def scenario(server):
+        async with AsyncDataFactoryClient("sub", "rg", "adf", credential=StubCredential()) as client:
+            client.base_url = f"{server.url}/factories/adf"
+            return await client.query_pipeline_runs(*time_window())
+
+    with StubServer(paged_handler(250)) as server:
+        assert len(asyncio.run(scenario(server))) == 250
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Run Query Pagination Tests")
+    print("=" * 50)
+
+    test_query_follows_continuation_tokens()
+    test_pages_are_fetched_lazily()
+    test_prefetch_requests_next_page()
+    test_activity_runs_follow_continuation_tokens()
+    test_async_query_follows_continuation_tokens()
+
+    print("\n" + "=" * 50)
+    print("All pagination tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
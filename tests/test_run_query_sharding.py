@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Sharded pipeline-run query tests
+Uses an in-memory run history, plus the stub server for the client integration
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from http_transport import HttpTransport
+from run_query_sharding import RUN_START_ORDER, ShardedRunQuery, merge_runs, split_window
+from run_utils import format_timestamp, parse_timestamp
+from stub_server import StubCredential, StubServer
+from test_adf_api import AzureDataFactoryClient
+
+PAGE_SIZE = 100
+END = datetime(2024, 3, 1)
+START = END - timedelta(days=30)
+
+
+def make_history(count: int, seed: int = 7):
+    """Runs with lastUpdated spread over the 30-day window, busier in the last week"""
+    rng = random.Random(seed)
+    runs = []
+    for i in range(count):
+        offset = rng.random() ** 0.5 * (END - START).total_seconds()
+        updated = START + timedelta(seconds=offset)
+        started = updated - timedelta(seconds=rng.uniform(0, 7200))
+        runs.append({"runId": f"run-{i}", "status": "Succeeded",
+                     "runStart": format_timestamp(started),
+                     "lastUpdated": format_timestamp(updated)})
+    return runs
+
+
+class FakeRunService:
+    """Pages through an in-memory history like queryPipelineRuns does"""
+
+    def __init__(self, runs, latency: float = 0.0, ordered: bool = True):
+        # ordered=True honours the RunStart ordering the sharded query asks for
+        self.runs = sorted(runs, key=lambda run: run["runStart"]) if ordered else runs
+        self.latency = latency
+        self.pages_served = 0
+
+    def fetch_page(self, start, end, continuation_token):
+        time.sleep(self.latency)
+        self.pages_served += 1
+        matching = [run for run in self.runs if start <= parse_timestamp(run["lastUpdated"]) < end]
+        offset = int(continuation_token or 0)
+        token = str(offset + PAGE_SIZE) if offset + PAGE_SIZE < len(matching) else None
+        return matching[offset:offset + PAGE_SIZE], token
+
+
+def test_split_window_covers_range():
+    """Test: Sub-windows cover the whole range without gaps"""
+    print("\n=== Test: Split Window ===")
+    windows = split_window(START, END, 7)
+    assert len(windows) == 7
+    assert windows[0][0] == START and windows[-1][1] == END
+    for (_, previous_end), (next_start, _) in zip(windows, windows[1:]):
+        assert next_start <= previous_end
+    print("✓ Test passed")
+
+
+def test_merge_keeps_latest_copy():
+    """Test: Duplicate runIds keep the most recently updated copy"""
+    print("\n=== Test: Merge Runs ===")
+    merged = merge_runs([
+        [{"runId": "a", "status": "InProgress", "lastUpdated": "2024-01-01T00:00:00Z"}],
+        [{"runId": "a", "status": "Succeeded", "lastUpdated": "2024-01-01T00:05:00Z"},
+         {"runId": "b", "status": "Failed", "lastUpdated": "2024-01-01T00:01:00Z"}],
+    ])
+    assert {run["runId"]: run["status"] for run in merged} == {"a": "Succeeded", "b": "Failed"}
+
+    # "...:00Z" sorts after "...:00.5Z" as text; the later copy must still win
+    merged = merge_runs([
+        [{"runId": "a", "status": "Succeeded", "lastUpdated": "2024-01-01T00:05:00.5Z"}],
+        [{"runId": "a", "status": "InProgress", "lastUpdated": "2024-01-01T00:05:00Z"},
+         {"runId": "b", "status": "Queued"}],
+        [{"runId": "b", "status": "InProgress", "lastUpdated": "2024-01-01T00:01:00.1234567Z"}],
+    ])
+    assert {run["runId"]: run["status"] for run in merged} == {"a": "Succeeded", "b": "InProgress"}
+    print("✓ Test passed")
+
+
+def test_sharded_query_matches_serial_query():
+    """Test: Sharded results equal a full serial query, in less wall-clock time"""
+    print("\n=== Test: Sharded vs Serial ===")
+    service = FakeRunService(make_history(6000), latency=0.01)
+
+    start = time.perf_counter()
+    serial, token = [], None
+    while True:
+        page, token = service.fetch_page(START, END, token)
+        serial.extend(page)
+        if not token:
+            break
+    serial_elapsed = time.perf_counter() - start
+    serial_pages = service.pages_served
+
+    service.pages_served = 0
+    query = ShardedRunQuery(service.fetch_page, max_workers=16, target_runs_per_slice=500)
+    start = time.perf_counter()
+    sharded = query.run(START, END)
+    sharded_elapsed = time.perf_counter() - start
+
+    print(f"  Serial: {serial_pages} pages in {serial_elapsed:.2f}s")
+    print(f"  Sharded: {query.slices_queried} slices, {service.pages_served} pages in {sharded_elapsed:.2f}s")
+    assert sorted(run["runId"] for run in sharded) == sorted(run["runId"] for run in serial)
+    assert query.slices_queried > 1
+    assert query.slices_queried <= query.max_slices
+    assert sharded_elapsed < serial_elapsed
+    print("✓ Test passed")
+
+
+def test_unordered_service_still_returns_every_run():
+    """Test: Without a usable ordering the query falls back to halving and stays complete"""
+    print("\n=== Test: Unordered Fallback ===")
+    history = make_history(3000)
+    service = FakeRunService(history, ordered=False)
+    query = ShardedRunQuery(service.fetch_page, target_runs_per_slice=500, max_slices=16)
+    runs = query.run(START, END)
+    assert sorted(run["runId"] for run in runs) == sorted(run["runId"] for run in history)
+    assert query.slices_queried <= 16
+    print("✓ Test passed")
+
+
+def test_sparse_window_is_not_split():
+    """Test: A window that fits in one page costs a single request"""
+    print("\n=== Test: Sparse Window ===")
+    service = FakeRunService(make_history(40))
+    runs = ShardedRunQuery(service.fetch_page).run(START, END)
+    assert len(runs) == 40
+    assert service.pages_served == 1
+    print("✓ Test passed")
+
+
+def test_client_sharded_query():
+    """Test: AzureDataFactoryClient.query_pipeline_runs_sharded against the stub server"""
+    print("\n=== Test: Client Sharded Query ===")
+    service = FakeRunService(make_history(1500))
+
+    def handler(method, path, headers, body):
+        assert body["orderBy"] == RUN_START_ORDER
+        page, token = service.fetch_page(parse_timestamp(body["lastUpdatedAfter"]),
+                                         parse_timestamp(body["lastUpdatedBefore"]),
+                                         body.get("continuationToken"))
+        payload = {"value": page}
+        if token:
+            payload["continuationToken"] = token
+        return 200, {}, payload
+
+    with StubServer(handler) as server:
+        client = AzureDataFactoryClient("sub", "rg", "adf", transport=HttpTransport(),
+                                        credential=StubCredential())
+        client.base_url = f"{server.url}/factories/adf"
+        runs = client.query_pipeline_runs_sharded(START, END, target_runs_per_slice=300)
+    assert len(runs) == 1500
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Sharded Run Query Tests")
+    print("=" * 50)
+
+    test_split_window_covers_range()
+    test_merge_keeps_latest_copy()
+    test_sharded_query_matches_serial_query()
+    test_unordered_service_still_returns_every_run()
+    test_sparse_window_is_not_split()
+    test_client_sharded_query()
+
+    print("\n" + "=" * 50)
+    print("All sharded query tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
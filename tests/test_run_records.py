@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compact run record tests
+Checks records round-trip the API JSON, behave like the dicts for reads, and use less memory
+"""
+
+import gc
+import json
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+from bench_run_records import synthetic_page
+from run_metrics import RunMetrics
+from run_records import ActivityRunRecord, PipelineRunRecord
+from standin_server import StandInConfig, StandInServer
+
+
+def test_records_round_trip_and_read_like_dicts():
+    """Test: to_dict() is lossless and dict-style reads match the JSON"""
+    print("\n=== Test: Round Trip ===")
+    activities = json.loads(synthetic_page(random.Random(1), 20))["value"]
+    for activity in activities:
+        record = ActivityRunRecord.from_dict(activity)
+        assert record.to_dict() == activity
+        assert record["activityName"] == activity["activityName"] == record.activity_name
+        assert record.output == activity["output"] and record.get("output") == activity["output"]
+        assert record.get("userProperties") == {}
+        assert "durationInMs" in record and "retryAttempt" in record and record["retryAttempt"] is None
+        assert "recoveryStatus" not in record
+        with pytest.raises(KeyError):
+            record["recoveryStatus"]
+
+    names = {id(ActivityRunRecord.from_dict(a).activity_name) for a in activities
+             if a["activityName"] == "LookupWatermark"}
+    assert len(names) == 1, "Activity names should be interned"
+    print("✓ Test passed")
+
+
+def test_null_fields_are_present():
+    """Test: Keys the API sent as null read as None; only absent keys raise KeyError"""
+    print("\n=== Test: Null Fields ===")
+    payload = {"runId": "r1", "pipelineName": "pl", "status": "InProgress", "runEnd": None,
+               "durationInMs": None, "parameters": None, "annotations": None}
+    record = PipelineRunRecord.from_dict(payload)
+    for key in ("runEnd", "durationInMs", "parameters", "annotations"):
+        assert key in record and record[key] is None and record.get(key, "default") is None
+    for key in ("message", "invokedBy", "missing"):
+        assert key not in record and record.get(key, "default") == "default"
+        with pytest.raises(KeyError):
+            record[key]
+    assert record.to_dict() == payload and record.parameters is None
+    assert PipelineRunRecord.from_dict({"runId": "r2"})._nulls is None
+    print("✓ Test passed")
+
+
+def test_query_methods_return_records_on_request():
+    """Test: as_records=True yields records that existing consumers accept"""
+    print("\n=== Test: Opt-in Records ===")
+    with StandInServer(StandInConfig(page_size=30, seed=2)) as server:
+        server.state.seed_history(100, days=2)
+        client = server.adf_client()
+        end_time = datetime.utcnow() + timedelta(minutes=1)
+        start_time = end_time - timedelta(days=3)
+
+        dicts = client.query_pipeline_runs(start_time, end_time)
+        records = client.query_pipeline_runs(start_time, end_time, as_records=True)
+        assert all(isinstance(r, PipelineRunRecord) for r in records)
+        assert [r.to_dict() for r in records] == dicts
+
+        from_dicts, from_records = RunMetrics(), RunMetrics()
+        from_dicts.add_page(dicts)
+        from_records.add_page(records)
+        assert from_records.summary() == from_dicts.summary()
+
+        activities = client.query_activity_runs(dicts[0]["runId"], start_time, end_time, as_records=True)
+        assert [a.to_dict() for a in activities] == client.query_activity_runs(dicts[0]["runId"], start_time, end_time)
+    print("✓ Test passed")
+
+
+def test_records_retain_less_memory():
+    """Test: Records of Copy-sized activity runs retain well under half the memory of dicts"""
+    print("\n=== Test: Memory ===")
+    pages = [synthetic_page(random.Random(i), 100) for i in range(10)]
+
+    def retained(convert):
+        gc.collect()
+        tracemalloc.start()
+        runs = [run for page in pages for run in convert(json.loads(page)["value"])]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size, runs
+
+    dict_bytes, _ = retained(list)
+    record_bytes, _ = retained(ActivityRunRecord.from_page)
+    print(f"dicts: {dict_bytes / 1000:.0f} KB, records: {record_bytes / 1000:.0f} KB")
+    assert record_bytes < dict_bytes / 2
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Run Record Tests")
+    print("=" * 50)
+
+    test_records_round_trip_and_read_like_dicts()
+    test_null_fields_are_present()
+    test_query_methods_return_records_on_request()
+    test_records_retain_less_memory()
+
+    print("\n" + "=" * 50)
+    print("All run record tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
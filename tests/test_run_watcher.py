@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Run watcher tests
+Runs in simulated time against the in-memory factory from the watcher benchmark
+"""
+
+import asyncio
+
+import requests
+
+from bench_run_watcher import SimulatedFactory, VirtualClock
+from run_utils import format_timestamp
+from run_watcher import MAX_RUN_IDS_PER_QUERY, RunWatcher
+
+
+def make_watcher(durations, **kwargs):
+    clock = VirtualClock()
+    factory = SimulatedFactory(clock, durations)
+    watcher = RunWatcher(factory, clock=clock.time, sleep=clock.sleep, **kwargs)
+    for run_id in durations:
+        watcher.add(run_id, run_start=factory.run_start)
+    return watcher, factory, clock
+
+
+def test_all_runs_complete_with_bulk_polls():
+    """Test: Every run is reported once, using far fewer calls than runs"""
+    print("\n=== Test: Bulk Polling ===")
+    durations = {f"run-{i}": 60.0 + i for i in range(300)}
+    completed = []
+    watcher, factory, _ = make_watcher(durations, on_complete=completed.append)
+
+    results = watcher.wait()
+    print(f"  {len(durations)} runs, {factory.calls} API calls")
+    assert sorted(run["runId"] for run in completed) == sorted(durations)
+    assert all(run["status"] == "Succeeded" for run in results.values())
+    assert watcher.pending == 0
+    assert factory.calls < len(durations)
+    print("✓ Test passed")
+
+
+def test_run_ids_are_chunked():
+    """Test: One poll issues one query per chunk of run IDs"""
+    print("\n=== Test: Run ID Chunks ===")
+    durations = {f"run-{i}": 600.0 for i in range(250)}
+    watcher, factory, _ = make_watcher(durations)
+    watcher.poll_once()
+    assert factory.calls == -(-250 // MAX_RUN_IDS_PER_QUERY)
+    print("✓ Test passed")
+
+
+def test_interval_follows_expected_duration():
+    """Test: Polls are sparse early, tighter near the expected finish, and back off when overdue"""
+    print("\n=== Test: Adaptive Interval ===")
+    watcher, factory, clock = make_watcher({"run-1": 10_000.0}, min_interval=5.0, max_interval=120.0,
+                                           expected_durations={"pl_copy_blob_to_datalake": 600.0})
+    watcher.poll_once()
+    early = watcher.next_interval()
+    clock.sleep(560)
+    near = watcher.next_interval()
+    clock.sleep(100)
+    overdue = [watcher.next_interval()]
+    for _ in range(5):
+        watcher.poll_once()
+        overdue.append(watcher.next_interval())
+
+    print(f"  early={early:.0f}s near={near:.0f}s overdue={[round(i) for i in overdue]}")
+    assert early == 120.0
+    assert near < early
+    assert overdue == sorted(overdue) and overdue[-1] > overdue[0]
+    assert max(overdue) <= 120.0
+    print("✓ Test passed")
+
+
+def test_async_completions():
+    """Test: Completions can be consumed as an async iterator"""
+    print("\n=== Test: Async Completions ===")
+    durations = {f"run-{i}": 0.0 for i in range(10)}
+    watcher, _, _ = make_watcher(durations)
+
+    async def consume():
+        return [run["runId"] async for run in watcher.completions()]
+
+    assert sorted(asyncio.run(consume())) == sorted(durations)
+    print("✓ Test passed")
+
+
+def test_wait_timeout_returns_latest_state():
+    """Test: wait() stops at the timeout and reports the last known status"""
+    print("\n=== Test: Wait Timeout ===")
+    watcher, _, _ = make_watcher({"run-1": 3600.0})
+    results = watcher.wait(timeout=300)
+    assert results["run-1"]["status"] == "InProgress"
+    assert watcher.pending == 1
+    print("✓ Test passed")
+
+
+def test_runs_added_after_they_started():
+    """Test: Runs added long after they started (or finished) are still found"""
+    print("\n=== Test: Late Adds ===")
+    clock = VirtualClock()
+    factory = SimulatedFactory(clock, {"done": 600.0, "running": 4 * 3600.0, "hinted": 600.0})
+    clock.sleep(3 * 3600 - 600)
+    watcher = RunWatcher(factory, clock=clock.time, sleep=clock.sleep)
+
+    # Without a hint each run is read once, then polled in bulk from its own lastUpdated
+    watcher.add("done")
+    watcher.add("running")
+    assert [run["runId"] for run in watcher.poll_once()] == ["done"]
+    assert factory.calls == 3 and watcher.pending == 1
+
+    watcher.add("hinted", run_start=format_timestamp(factory.run_start))
+    assert [run["runId"] for run in watcher.poll_once()] == ["hinted"]
+    assert factory.calls == 4
+    results = watcher.wait(timeout=2 * 3600)
+    assert results["running"]["status"] == "Succeeded" and watcher.pending == 0
+    print("✓ Test passed")
+
+
+def test_seed_tolerates_only_not_found():
+    """Test: A 404 on the first read falls back to the add time; other errors propagate"""
+    print("\n=== Test: Seed Errors ===")
+
+    def http_error(status_code: int) -> requests.HTTPError:
+        response = requests.Response()
+        response.status_code = status_code
+        return requests.HTTPError(f"{status_code} Client Error", response=response)
+
+    clock = VirtualClock()
+    factory = SimulatedFactory(clock, {"fresh": 600.0})
+    errors = [http_error(404)]
+
+    def get_pipeline_run(run_id):
+        factory.calls += 1
+        raise errors.pop()
+
+    factory.get_pipeline_run = get_pipeline_run
+    watcher = RunWatcher(factory, clock=clock.time, sleep=clock.sleep)
+    watcher.add("fresh")
+    assert watcher.poll_once() == [] and watcher.pending == 1
+    assert watcher.wait(timeout=3600)["fresh"]["status"] == "Succeeded"
+
+    for error in (http_error(401), http_error(429), AttributeError("get")):
+        errors.append(error)
+        watcher = RunWatcher(factory, clock=clock.time, sleep=clock.sleep)
+        watcher.add("fresh")
+        try:
+            watcher.poll_once()
+        except Exception as e:
+            assert e is error
+        else:
+            raise AssertionError(f"{error!r} was swallowed")
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Run Watcher Tests")
+    print("=" * 50)
+
+    test_all_runs_complete_with_bulk_polls()
+    test_run_ids_are_chunked()
+    test_interval_follows_expected_duration()
+    test_async_completions()
+    test_wait_timeout_returns_latest_state()
+    test_runs_added_after_they_started()
+    test_seed_tolerates_only_not_found()
+
+    print("\n" + "=" * 50)
+    print("All run watcher tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
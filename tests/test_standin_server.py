@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Stand-in server tests
+Checks that the local ADF / Synapse stand-in behaves like the service where the clients depend on it
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from run_query_sharding import RUN_START_ORDER
+from run_utils import parse_timestamp
+from standin_server import StandInConfig, StandInServer
+
+
+def window(days: float = 8):
+    end_time = datetime.utcnow() + timedelta(minutes=5)
+    return end_time - timedelta(days=days), end_time
+
+
+def test_definitions_are_seeded_from_repo():
+    """Test: Pipelines, datasets, linked services and notebooks come from the repo"""
+    print("\n=== Test: Seeded Definitions ===")
+    with StandInServer() as server:
+        adf = server.adf_client()
+        names = {p["name"] for p in adf.list_pipelines()}
+        assert "pl_orchestration_master" in names
+        assert adf.get_dataset("ds_sink_parquet")["name"] == "ds_sink_parquet"
+        assert adf.get_linked_service("ls_azure_sql")["properties"]["type"] == "AzureSqlDatabase"
+
+        synapse = server.synapse_client()
+        assert len(synapse.list_notebooks()) == 3
+        with pytest.raises(requests.HTTPError):
+            adf.get_pipeline("pl_missing")
+    print("✓ Test passed")
+
+
+def test_conditional_get_answers_not_modified():
+    """Test: Definitions carry etags and If-None-Match returns 304"""
+    print("\n=== Test: ETag Revalidation ===")
+    with StandInServer() as server:
+        adf = server.adf_client()
+        for _ in range(3):
+            adf.get_pipeline("pl_copy_blob_to_datalake")
+        assert adf.definition_cache.stats["downloaded"] == 1
+        assert adf.definition_cache.stats["not_modified"] == 2
+    print("✓ Test passed")
+
+
+def test_query_pages_and_filters():
+    """Test: queryPipelineRuns pages with continuation tokens, filters and orders by runStart"""
+    print("\n=== Test: Run Queries ===")
+    with StandInServer(StandInConfig(page_size=25, seed=1)) as server:
+        server.state.seed_history(300, days=7)
+        adf = server.adf_client()
+        start_time, end_time = window()
+
+        runs = adf.query_pipeline_runs(start_time, end_time)
+        assert len(runs) == len(server.state.runs)
+        assert len({run["runId"] for run in runs}) == len(runs)
+
+        page, token = adf.query_pipeline_run_page(start_time, end_time, order_by=RUN_START_ORDER)
+        assert len(page) == 25 and token
+        starts = [parse_timestamp(run["runStart"]) for run in page]
+        assert starts == sorted(starts)
+
+        failed = adf.query_pipeline_runs(start_time, end_time, filters=[
+            {"operand": "Status", "operator": "Equals", "values": ["Failed"]}])
+        assert failed and all(run["status"] == "Failed" for run in failed)
+
+        sharded = adf.query_pipeline_runs_sharded(start_time, end_time, target_runs_per_slice=50)
+        assert {run["runId"] for run in sharded} == {run["runId"] for run in runs}
+
+        activities = adf.query_activity_runs(runs[0]["runId"], start_time, end_time)
+        assert activities and all(a["pipelineRunId"] == runs[0]["runId"] for a in activities)
+    print("✓ Test passed")
+
+
+def test_runs_progress_and_cancel_recursively():
+    """Test: Triggered runs move InProgress -> terminal; recursive cancel reaches child runs"""
+    print("\n=== Test: Run Lifecycle ===")
+    with StandInServer(StandInConfig(run_duration=0.3)) as server:
+        adf = server.adf_client()
+        run_id = adf.create_pipeline_run("pl_copy_blob_to_datalake", {"sourcePath": "a"})
+        assert adf.get_pipeline_run(run_id)["status"] == "InProgress"
+        assert adf.get_pipeline_run(run_id)["parameters"] == {"sourcePath": "a"}
+        time.sleep(0.35)
+        assert adf.get_pipeline_run(run_id)["status"] == "Succeeded"
+
+        master = adf.create_pipeline_run("pl_orchestration_master")
+        children = [run for run in server.state.runs.values()
+                    if run["invokedBy"].get("pipelineRunId") == master]
+        assert len(children) == 1
+
+        server.state.handle("POST", f"{server.factory_url[len(server.url):]}/pipelineruns/{master}/cancel"
+                            "?isRecursive=true&api-version=2018-06-01", {}, None)
+        assert adf.get_pipeline_run(master)["status"] == "Cancelled"
+        assert adf.get_pipeline_run(children[0]["runId"])["status"] == "Cancelled"
+        assert server.state.cancel_requests == [(master, True)]
+    print("✓ Test passed")
+
+
+def test_throttling_and_failure_injection():
+    """Test: Injected 429s are retried by the transport; injected 500s surface as errors"""
+    print("\n=== Test: Fault Injection ===")
+    with StandInServer(StandInConfig(throttle_rate=0.5, retry_after=0, seed=3)) as server:
+        adf = server.adf_client()
+        for _ in range(20):
+            adf.get_pipeline_run(adf.create_pipeline_run("pl_copy_blob_to_datalake"))
+        assert server.requests > 40
+
+    with StandInServer(StandInConfig(failure_rate=1.0)) as server:
+        with pytest.raises(requests.HTTPError):
+            server.adf_client().list_pipelines()
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Stand-in Server Tests")
+    print("=" * 50)
+
+    test_definitions_are_seeded_from_repo()
+    test_conditional_get_answers_not_modified()
+    test_query_pages_and_filters()
+    test_runs_progress_and_cancel_recursively()
+    test_throttling_and_failure_injection()
+
+    print("\n" + "=" * 50)
+    print("All stand-in server tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,30 +4,45 @@ Azure Synapse Analytics REST API Tests
 Tests Synapse workspace operations, notebooks, and Spark pools
 """
 
-import requests
 import json
 import os
 from datetime import datetime, timedelta
-from azure.identity import DefaultAzureCredential
 from typing import Dict, List, Optional
 
+from definition_cache import DefinitionCache
+from http_transport import HttpTransport, get_default_transport
+from token_cache import TokenCache, default_credential
+
 
 class SynapseWorkspaceClient:
     """Client for Azure Synapse Analytics REST API operations"""
 
-    def __init__(self, workspace_name: str):
+    def __init__(self, workspace_name: str, transport: Optional[HttpTransport] = None,
+                 credential=None, token_cache: Optional[TokenCache] = None,
+                 definition_cache: Optional[DefinitionCache] = None):
         self.workspace_name = workspace_name
         self.api_version = "2020-12-01"
         self.dev_endpoint = f"https://{workspace_name}.dev.azuresynapse.net"
 
-        # Authenticate
-        self.credential = DefaultAzureCredential()
-        self.token = self._get_access_token()
+        # Pooled keep-alive connections, shared with other clients by default
+        self.transport = transport or get_default_transport()
+
+        # Authenticate; tokens are cached per scope and refreshed before expiry
+        self.credential = credential or default_credential()
+        self.token_cache = token_cache or TokenCache(
+            self.credential, cache_path=os.getenv("AZURE_TOKEN_CACHE_FILE"))
+
+        # Definitions are revalidated with conditional GETs instead of re-downloaded
+        self.definition_cache = definition_cache if definition_cache is not None else DefinitionCache()
+
+    @property
+    def token(self) -> str:
+        """Current access token, refreshed transparently"""
+        return self._get_access_token()
 
     def _get_access_token(self) -> str:
         """Get Azure AD access token for Synapse"""
-        token = self.credential.get_token("https://dev.azuresynapse.net/.default")
-        return token.token
+        return self.token_cache.get_token("https://dev.azuresynapse.net/.default")
 
     def _get_headers(self) -> Dict[str, str]:
         """Get HTTP headers with authentication"""
@@ -36,49 +51,50 @@ class SynapseWorkspaceClient:
             "Content-Type": "application/json"
         }
 
+    def _list_all(self, url: str) -> List[Dict]:
+        """Every item of a list endpoint, following nextLink across pages"""
+        items = []
+        while url:
+            page = self.definition_cache.get(self.transport, url, self._get_headers())
+            items.extend(page.get("value", []))
+            url = page.get("nextLink")
+        return items
+
     # Notebook Operations
     def list_notebooks(self) -> List[Dict]:
         """List all notebooks"""
         url = f"{self.dev_endpoint}/notebooks?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json().get("value", [])
+        return self._list_all(url)
 
     def get_notebook(self, notebook_name: str) -> Dict:
         """Get notebook definition"""
         url = f"{self.dev_endpoint}/notebooks/{notebook_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
     # Pipeline Operations
     def list_pipelines(self) -> List[Dict]:
         """List all Synapse pipelines"""
         url = f"{self.dev_endpoint}/pipelines?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json().get("value", [])
+        return self._list_all(url)
 
     def get_pipeline(self, pipeline_name: str) -> Dict:
         """Get pipeline definition"""
         url = f"{self.dev_endpoint}/pipelines/{pipeline_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
     def create_pipeline_run(self, pipeline_name: str, parameters: Optional[Dict] = None) -> str:
         """Trigger a pipeline run"""
         url = f"{self.dev_endpoint}/pipelines/{pipeline_name}/createRun?api-version={self.api_version}"
         body = parameters if parameters else {}
 
-        response = requests.post(url, headers=self._get_headers(), json=body)
+        response = self.transport.post(url, headers=self._get_headers(), json=body)
         response.raise_for_status()
         return response.json().get("runId")
 
     def get_pipeline_run(self, run_id: str) -> Dict:
         """Get pipeline run status"""
         url = f"{self.dev_endpoint}/pipelineruns/{run_id}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
+        response = self.transport.get(url, headers=self._get_headers())
         response.raise_for_status()
         return response.json()
 
@@ -94,24 +110,23 @@ class SynapseWorkspaceClient:
     def list_linked_services(self) -> List[Dict]:
         """List all linked services"""
         url = f"{self.dev_endpoint}/linkedservices?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json().get("value", [])
+        return self._list_all(url)
 
     def get_linked_service(self, linked_service_name: str) -> Dict:
         """Get linked service definition"""
         url = f"{self.dev_endpoint}/linkedservices/{linked_service_name}?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json()
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
     # Dataset Operations
     def list_datasets(self) -> List[Dict]:
         """List all datasets"""
         url = f"{self.dev_endpoint}/datasets?api-version={self.api_version}"
-        response = requests.get(url, headers=self._get_headers())
-        response.raise_for_status()
-        return response.json().get("value", [])
+        return self._list_all(url)
+
+    def get_dataset(self, dataset_name: str) -> Dict:
+        """Get dataset definition"""
+        url = f"{self.dev_endpoint}/datasets/{dataset_name}?api-version={self.api_version}"
+        return self.definition_cache.get(self.transport, url, self._get_headers())
 
 
 def test_list_notebooks(client: SynapseWorkspaceClient):
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Token cache tests
+Uses a fake credential, so no Azure login is required
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from azure.core.credentials import AccessToken
+
+from token_cache import TokenCache
+
+SCOPE = "https://management.azure.com/.default"
+
+
+class FakeCredential:
+    """Counts get_token calls and issues tokens with a fixed lifetime"""
+
+    def __init__(self, lifetime: float = 3600.0, delay: float = 0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        return AccessToken(f"token-{call}", int(time.time() + self.lifetime))
+
+
+def test_token_is_reused_until_refresh_window():
+    """Test: A fresh token is served from the cache"""
+    print("\n=== Test: Token Reuse ===")
+    credential = FakeCredential()
+    cache = TokenCache(credential)
+    tokens = {cache.get_token(SCOPE) for _ in range(100)}
+    assert tokens == {"token-1"}
+    assert credential.calls == 1
+    print("✓ Test passed")
+
+
+def test_expiring_token_is_refreshed_in_background():
+    """Test: Inside the refresh margin the old token is served while a new one is fetched"""
+    print("\n=== Test: Proactive Refresh ===")
+    credential = FakeCredential(lifetime=200.0)
+    cache = TokenCache(credential, refresh_margin=300.0, min_validity=60.0)
+
+    assert cache.get_token(SCOPE) == "token-1"
+    # token-1 is inside the refresh margin: still returned, refresh kicked off
+    assert cache.get_token(SCOPE) == "token-1"
+    deadline = time.time() + 5
+    while credential.calls < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert credential.calls == 2
+    print("✓ Test passed")
+
+
+def test_expired_token_blocks_on_refresh():
+    """Test: A token below the minimum validity is replaced before returning"""
+    print("\n=== Test: Expired Token ===")
+    credential = FakeCredential(lifetime=10.0)
+    cache = TokenCache(credential, refresh_margin=300.0, min_validity=60.0)
+    assert cache.get_token(SCOPE) == "token-1"
+    assert cache.get_token(SCOPE) == "token-2"
+    print("✓ Test passed")
+
+
+def test_concurrent_callers_share_one_refresh():
+    """Test: Concurrent cache misses result in a single credential call"""
+    print("\n=== Test: Single-Flight Refresh ===")
+    credential = FakeCredential(delay=0.2)
+    cache = TokenCache(credential)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_token(SCOPE)))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["token-1"] * 20
+    assert credential.calls == 1
+    print("✓ Test passed")
+
+
+def test_tokens_persist_across_instances():
+    """Test: A second cache instance (new process launch) reuses the persisted token"""
+    print("\n=== Test: Persisted Tokens ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tokens.json")
+        first = FakeCredential()
+        assert TokenCache(first, cache_path=path).get_token(SCOPE) == "token-1"
+        assert os.stat(path).st_mode & 0o077 == 0, "Token file is readable by others"
+
+        second = FakeCredential()
+        assert TokenCache(second, cache_path=path).get_token(SCOPE) == "token-1"
+        assert second.calls == 0
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Token Cache Tests")
+    print("=" * 50)
+
+    test_token_is_reused_until_refresh_window()
+    test_expiring_token_is_refreshed_in_background()
+    test_expired_token_blocks_on_refresh()
+    test_concurrent_callers_share_one_refresh()
+    test_tokens_persist_across_instances()
+
+    print("\n" + "=" * 50)
+    print("All token cache tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
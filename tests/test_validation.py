@@ -4,107 +4,84 @@ Validation tests for Data Factory pipeline definitions
 Tests JSON syntax, structure, and logical validation
 """
 
-import json
-import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict
 
+from validation_engine import ValidationEngine, ValidationResult
 
-def validate_json_file(file_path: str) -> bool:
-    """Validate JSON file syntax"""
-    try:
-        with open(file_path, 'r') as f:
-            json.load(f)
-        return True
-    except json.JSONDecodeError as e:
-        print(f"  ✗ JSON Error: {str(e)}")
-        return False
-    except Exception as e:
-        print(f"  ✗ Error: {str(e)}")
-        return False
 
+@lru_cache(maxsize=None)
+def validation_results() -> Dict[str, ValidationResult]:
+    """Parse and check every definition once, with a throwaway content-hash index"""
+    with tempfile.TemporaryDirectory() as tmp:
+        return ValidationEngine(index_path=Path(tmp) / "index.json").validate()
+
+
+def results_for(kind: str):
+    return [result for result in validation_results().values() if result.kind == kind]
 
-def test_pipeline_json_syntax():
-    """Test: Validate all pipeline JSON files"""
-    print("\n=== Test: Pipeline JSON Syntax ===")
-    base_path = Path(__file__).parent.parent / "pipelines"
-    pipelines = list(base_path.glob("*.json"))
 
-    if not pipelines:
-        print("  No pipeline files found")
+def report(result: ValidationResult, valid: bool):
+    print(f"  {'✓' if valid else '✗'} {Path(result.path).name}")
+    if not valid:
+        for issue in result.issues:
+            print(f"    ✗ {issue}")
+
+
+def check_json_syntax(kind: str, label: str):
+    results = results_for(kind)
+    if not results:
+        print(f"  No {label} files found")
         return
 
-    all_valid = True
-    for pipeline_file in pipelines:
-        is_valid = validate_json_file(pipeline_file)
-        status = "✓" if is_valid else "✗"
-        print(f"  {status} {pipeline_file.name}")
-        all_valid = all_valid and is_valid
+    for result in results:
+        report(result, result.parsed)
+
+    assert all(result.parsed for result in results), f"Some {label} files have invalid JSON"
+    print(f"\n✓ All {len(results)} {label} files are valid")
 
-    assert all_valid, "Some pipeline files have invalid JSON"
-    print(f"\n✓ All {len(pipelines)} pipeline files are valid")
+
+def test_pipeline_json_syntax():
+    """Test: Validate all pipeline JSON files"""
+    print("\n=== Test: Pipeline JSON Syntax ===")
+    check_json_syntax("pipelines", "pipeline")
 
 
 def test_linkedservice_json_syntax():
     """Test: Validate all linked service JSON files"""
     print("\n=== Test: Linked Service JSON Syntax ===")
-    base_path = Path(__file__).parent.parent / "linkedservices"
-    linked_services = list(base_path.glob("*.json"))
-
-    if not linked_services:
-        print("  No linked service files found")
-        return
-
-    all_valid = True
-    for ls_file in linked_services:
-        is_valid = validate_json_file(ls_file)
-        status = "✓" if is_valid else "✗"
-        print(f"  {status} {ls_file.name}")
-        all_valid = all_valid and is_valid
-
-    assert all_valid, "Some linked service files have invalid JSON"
-    print(f"\n✓ All {len(linked_services)} linked service files are valid")
+    check_json_syntax("linkedservices", "linked service")
 
 
 def test_dataset_json_syntax():
     """Test: Validate all dataset JSON files"""
     print("\n=== Test: Dataset JSON Syntax ===")
-    base_path = Path(__file__).parent.parent / "datasets"
-    datasets = list(base_path.glob("*.json"))
-
-    if not datasets:
-        print("  No dataset files found")
-        return
-
-    all_valid = True
-    for ds_file in datasets:
-        is_valid = validate_json_file(ds_file)
-        status = "✓" if is_valid else "✗"
-        print(f"  {status} {ds_file.name}")
-        all_valid = all_valid and is_valid
-
-    assert all_valid, "Some dataset files have invalid JSON"
-    print(f"\n✓ All {len(datasets)} dataset files are valid")
+    check_json_syntax("datasets", "dataset")
 
 
 def test_pipeline_structure():
     """Test: Validate pipeline structure"""
     print("\n=== Test: Pipeline Structure ===")
-    base_path = Path(__file__).parent.parent / "pipelines"
-    pipelines = list(base_path.glob("*.json"))
 
-    for pipeline_file in pipelines:
-        with open(pipeline_file, 'r') as f:
-            pipeline = json.load(f)
+    # Reuses the parse from the syntax check instead of loading each file again
+    for result in results_for("pipelines"):
+        assert result.valid, f"Pipeline {Path(result.path).name}: {'; '.join(result.issues)}"
+        print(f"  ✓ {result.summary['name']}: {result.summary['activities']} activities")
+
+    print("\n✓ All pipelines have valid structure")
 
-        # Check required fields
-        assert "name" in pipeline, f"Pipeline {pipeline_file.name} missing 'name' field"
-        assert "properties" in pipeline, f"Pipeline {pipeline_file.name} missing 'properties' field"
-        assert "activities" in pipeline["properties"], f"Pipeline {pipeline_file.name} missing 'activities' field"
 
-        activities = pipeline["properties"]["activities"]
-        print(f"  ✓ {pipeline['name']}: {len(activities)} activities")
+def test_dataset_and_linkedservice_structure():
+    """Test: Validate dataset and linked service structure"""
+    print("\n=== Test: Dataset and Linked Service Structure ===")
 
-    print("\n✓ All pipelines have valid structure")
+    for result in results_for("datasets") + results_for("linkedservices"):
+        assert result.valid, f"{Path(result.path).name}: {'; '.join(result.issues)}"
+        print(f"  ✓ {result.summary['name']}: {result.summary['type']}")
+
+    print("\n✓ All datasets and linked services have valid structure")
 
 
 def test_infrastructure_files():
@@ -135,6 +112,7 @@ def main():
         test_linkedservice_json_syntax()
         test_dataset_json_syntax()
         test_pipeline_structure()
+        test_dataset_and_linkedservice_structure()
         test_infrastructure_files()
 
         print("\n" + "=" * 50)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Validation engine tests
+Runs the engine over copies of the repo definitions in a temporary directory
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from validation_engine import INDEX_FILE_ENV, KIND_FOLDERS, REPO_ROOT, ValidationEngine, default_index_path
+
+
+def make_workspace() -> Path:
+    root = Path(tempfile.mkdtemp())
+    for folder in KIND_FOLDERS.values():
+        shutil.copytree(REPO_ROOT / folder, root / folder)
+    return root
+
+
+def make_engine(root: Path) -> ValidationEngine:
+    """Engine over `root` with its index inside the temporary workspace"""
+    return ValidationEngine(root, index_path=root / "index.json")
+
+
+def test_detects_syntax_and_structure_issues():
+    """Test: Broken JSON, missing fields and dangling dependsOn are reported"""
+    print("\n=== Test: Issue Detection ===")
+    root = make_workspace()
+    try:
+        (root / "pipelines" / "pl_broken.json").write_text('{"name": "pl_broken", ')
+        pipeline = json.loads((root / "pipelines" / "pl_incremental_copy_sql.json").read_text())
+        pipeline["properties"]["activities"][1]["dependsOn"] = [{"activity": "Nowhere"}]
+        (root / "pipelines" / "pl_incremental_copy_sql.json").write_text(json.dumps(pipeline))
+        (root / "datasets" / "ds_untyped.json").write_text('{"name": "ds_untyped", "properties": {}}')
+
+        results = make_engine(root).validate()
+        broken = results["pipelines/pl_broken.json"]
+        assert not broken.parsed and "JSON Error" in broken.issues[0]
+        dangling = results["pipelines/pl_incremental_copy_sql.json"]
+        assert dangling.parsed and not dangling.valid
+        assert "unknown activity 'Nowhere'" in dangling.issues[0]
+        assert results["datasets/ds_untyped.json"].issues == ["missing 'properties.type' field"]
+        valid = [r for r in results.values() if r.valid]
+        assert len(valid) == len(results) - 3
+        assert results["pipelines/pl_orchestration_master.json"].summary["activities"] == 6
+    finally:
+        shutil.rmtree(root)
+    print("✓ Test passed")
+
+
+def test_functions_the_evaluator_lacks_are_valid():
+    """Test: ADF functions missing from the evaluator pass validation; real syntax errors do not"""
+    print("\n=== Test: Unimplemented Functions ===")
+    root = make_workspace()
+    try:
+        path = root / "pipelines" / "pl_incremental_copy_sql.json"
+        pipeline = json.loads(path.read_text())
+        pipeline["properties"]["activities"][0]["description"] = \
+            "@concat(base64(pipeline().RunId), addToTime(utcNow(), 1, 'Hour'), getPastTime(1, 'Day'))"
+        path.write_text(json.dumps(pipeline))
+        assert make_engine(root).validate(["pipelines"])["pipelines/pl_incremental_copy_sql.json"].valid
+
+        pipeline["properties"]["activities"][0]["description"] = "@getPastTime(1, 'Day'"
+        path.write_text(json.dumps(pipeline))
+        result = make_engine(root).validate(["pipelines"])["pipelines/pl_incremental_copy_sql.json"]
+        assert not result.valid and result.issues[0].startswith("invalid expression: Unexpected end")
+    finally:
+        shutil.rmtree(root)
+    print("✓ Test passed")
+
+
+def test_unchanged_files_come_from_index():
+    """Test: A second run re-validates only the edited file; deleted files leave the index"""
+    print("\n=== Test: Content-Hash Index ===")
+    root = make_workspace()
+    try:
+        first = make_engine(root)
+        baseline = first.validate()
+        assert first.stats == {"cached": 0, "validated": len(baseline)}
+
+        second = make_engine(root)
+        assert second.validate() == baseline
+        assert second.stats["validated"] == 0
+
+        # Rewriting identical content changes mtime only: re-hashed, not re-validated
+        path = root / "datasets" / "ds_sink_parquet.json"
+        path.write_bytes(path.read_bytes())
+        edited = root / "pipelines" / "pl_copy_blob_to_datalake.json"
+        edited.write_text(edited.read_text().replace("CopyBlobToDataLake", "CopyBlobToLake"))
+        (root / "linkedservices" / "ls_cosmos_db.json").unlink()
+
+        third = make_engine(root)
+        results = third.validate()
+        assert third.stats["validated"] == 1
+        assert len(results) == len(baseline) - 1
+        index = json.loads((root / "index.json").read_text())
+        assert "linkedservices/ls_cosmos_db.json" not in index["files"]
+    finally:
+        shutil.rmtree(root)
+    print("✓ Test passed")
+
+
+def test_default_index_is_outside_the_root():
+    """Test: Without index_path the index goes to the user cache directory, or $ADF_VALIDATION_INDEX_FILE"""
+    print("\n=== Test: Default Index Location ===")
+    root = make_workspace()
+    previous = {name: os.environ.get(name) for name in ("XDG_CACHE_HOME", INDEX_FILE_ENV)}
+    try:
+        os.environ.pop(INDEX_FILE_ENV, None)
+        os.environ["XDG_CACHE_HOME"] = str(root / "cache")
+        path = default_index_path(root)
+        assert path.parent == root / "cache" / "adf-tests"
+        assert path != default_index_path(REPO_ROOT)
+
+        engine = ValidationEngine(root)
+        engine.validate(["linkedservices"])
+        assert engine.index_path == path and path.exists()
+        assert not any(root.glob("*.json"))
+
+        os.environ[INDEX_FILE_ENV] = str(root / "override.json")
+        assert ValidationEngine(root).index_path == root / "override.json"
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(root)
+    print("✓ Test passed")
+
+
+def test_process_pool_matches_in_process():
+    """Test: Fanning out over worker processes gives the same results"""
+    print("\n=== Test: Process Pool ===")
+    root = make_workspace()
+    try:
+        inline = ValidationEngine(root, index_path=root / "inline.json").validate()
+        pooled = ValidationEngine(root, index_path=root / "pooled.json", max_workers=2, min_parallel=1).validate()
+        assert pooled == inline
+    finally:
+        shutil.rmtree(root)
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Validation Engine Tests")
+    print("=" * 50)
+
+    test_detects_syntax_and_structure_issues()
+    test_functions_the_evaluator_lacks_are_valid()
+    test_unchanged_files_come_from_index()
+    test_default_index_is_outside_the_root()
+    test_process_pool_matches_in_process()
+
+    print("\n" + "=" * 50)
+    print("All validation engine tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
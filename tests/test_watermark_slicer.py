@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Watermark slicer tests
+Slices a bursty backlog in the SQLite stand-in and checks the watermark only moves once every slice commits
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from adf_expressions import ExpressionContext, evaluate
+from sql_standin import connect, create_watermarked_table, sql_timestamp
+from watermark_slicer import SLICE_QUERY, SlicedWatermarkCopy, density_histogram, plan_slices, slice_items
+
+LOW = datetime(2024, 1, 1)
+HIGH = LOW + timedelta(days=2)
+
+
+def make_backlog(connection, rows: int = 5000):
+    rng = random.Random(11)
+    steady = [LOW + timedelta(seconds=rng.random() * 2 * 86400) for _ in range(rows // 5)]
+    burst = [LOW + timedelta(hours=30, seconds=rng.random() * 600) for _ in range(rows - len(steady))]
+    create_watermarked_table(connection, "SalesData", steady + burst, LOW)
+
+
+def count_rows(connection, start: str, end: str) -> int:
+    return connection.execute("SELECT COUNT(*) FROM SalesData WHERE LastModifiedDate > ? AND LastModifiedDate <= ?",
+                              (start, end)).fetchone()[0]
+
+
+def test_balanced_contiguous_slices():
+    """Test: Slices cover the range without gaps and carry similar row counts despite the burst"""
+    print("\n=== Test: Balanced Slices ===")
+    connection = connect()
+    make_backlog(connection)
+    histogram = density_histogram(connection, "SalesData", LOW, HIGH)
+    assert sum(histogram) == 5000
+
+    slices = plan_slices(LOW, HIGH, histogram, slices=5)
+    assert slices[0].start == sql_timestamp(LOW) and slices[-1].end == sql_timestamp(HIGH)
+    assert all(a.end == b.start for a, b in zip(slices, slices[1:]))
+    counts = [count_rows(connection, s.start, s.end) for s in slices]
+    assert sum(counts) == 5000
+    assert max(counts) < 1.1 * 1000 and min(counts) > 0.9 * 1000, counts
+
+    # Equal-width slices put the burst in one slice
+    naive = plan_slices(LOW, HIGH, [1] * 5, slices=5)
+    assert max(count_rows(connection, s.start, s.end) for s in naive) > 4000
+    assert len(plan_slices(LOW, HIGH, histogram, max_rows_per_slice=2000)) == 3
+    assert len(plan_slices(LOW, HIGH, [0] * 8, slices=4)) == 1
+    print(f"  rows per slice: {counts}")
+    print("✓ Test passed")
+
+
+def test_watermark_waits_for_every_slice():
+    """Test: A failed slice holds the watermark back; the rerun copies only what did not commit"""
+    print("\n=== Test: Commit Before Advance ===")
+    connection = connect()
+    make_backlog(connection)
+    job = SlicedWatermarkCopy(connection, "SalesData")
+    slices = job.plan(HIGH, slices=4)
+    # Copiers run in worker threads, so count up front instead of sharing the connection
+    rows = {s.slice_id: count_rows(connection, s.start, s.end) for s in slices}
+    copied = []
+
+    def flaky(piece):
+        if piece.slice_id == 3:
+            raise ConnectionError("sink unavailable")
+        copied.append(piece.slice_id)
+        return rows[piece.slice_id]
+
+    first = job.run(flaky, max_workers=1)
+    assert first["failed"] == [3] and not first["advanced"]
+    assert job.watermark() == sql_timestamp(LOW)
+    assert [s.slice_id for s in job.pending()] == [3]
+    # A later trigger with a newer watermark resumes the unfinished plan
+    assert job.plan(HIGH + timedelta(hours=1), slices=8) == [slices[2]]
+
+    second = job.run(lambda piece: rows[piece.slice_id])
+    assert second["advanced"] and second["watermark"] == sql_timestamp(HIGH)
+    assert first["rows"] + second["rows"] == 5000
+    assert sorted(copied) == [1, 2, 4] and job.pending() == []
+    assert job.plan(HIGH) == []
+    print("✓ Test passed")
+
+
+def test_slice_items_render_queries():
+    """Test: ForEach items feed the slice query through the expression evaluator"""
+    print("\n=== Test: Slice Items ===")
+    connection = connect()
+    make_backlog(connection)
+    slices = plan_slices(LOW, HIGH, density_histogram(connection, "SalesData", LOW, HIGH), slices=3)
+    context = ExpressionContext("pl_incremental_copy_sql", parameters={"tableName": "SalesData"})
+    total = 0
+    for item in slice_items(slices):
+        query = evaluate(SLICE_QUERY, context.with_item(item))
+        assert item["WatermarkStart"] in query and item["WatermarkEnd"] in query
+        total += len(connection.execute(query).fetchall())
+    assert total == 5000
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Watermark Slicer Tests")
+    print("=" * 50)
+
+    test_balanced_contiguous_slices()
+    test_watermark_waits_for_every_slice()
+    test_slice_items_render_queries()
+
+    print("\n" + "=" * 50)
+    print("All watermark slicer tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Workspace sync tests
+Mirrors the stand-in workspace and checks what each re-sync downloads, keeps and removes
+"""
+
+import copy
+import json
+import os
+import tempfile
+
+import pytest
+
+from standin_server import StandInConfig, StandInServer
+from workspace_sync import WorkspaceSync, canonical_definition, content_hash, diff_paths
+
+
+def request_count(server: StandInServer, prefix: str) -> int:
+    return sum(count for operation, count in server.state.request_counts.items() if operation.startswith(prefix))
+
+
+def republish(server: StandInServer, kind: str, name: str, edit=None):
+    """Give an artifact a new etag, optionally editing it first"""
+    definition = copy.deepcopy(server.state.definitions[kind][name])
+    if edit:
+        edit(definition)
+    definition["etag"] = f'"{name}-{request_count(server, "")}"'
+    server.state.definitions[kind][name] = definition
+
+
+def test_hashes_and_paths():
+    """Test: Service fields do not affect the hash; diff_paths names the differing fields"""
+    print("\n=== Test: Hashes and Paths ===")
+    a = {"name": "p", "etag": '"1"', "properties": {"activities": [{"name": "x", "policy": {"timeout": "1"}}],
+                                                  "lastPublishTime": "2024-01-01"}}
+    b = {"properties": {"lastPublishTime": "2024-02-01", "activities": [{"policy": {"timeout": "1"}, "name": "x"}]},
+         "name": "p", "etag": '"2"', "id": "/subscriptions/x"}
+    assert content_hash(a) == content_hash(b)
+    assert canonical_definition(b) == {"name": "p", "properties": {"activities": [{"policy": {"timeout": "1"},
+                                                                                   "name": "x"}]}}
+    b["properties"]["activities"][0]["policy"]["timeout"] = "2"
+    b["properties"]["annotations"] = []
+    assert content_hash(a) != content_hash(b)
+    assert diff_paths(canonical_definition(a), canonical_definition(b)) == [
+        "properties.activities[0].policy.timeout", "properties.annotations"]
+    assert diff_paths([1, 2], [1, 2, 3], "xs") == ["xs"]
+    print("✓ Test passed")
+
+
+def test_incremental_sync():
+    """Test: First sync writes everything; re-syncs touch only added, edited, republished or deleted artifacts"""
+    print("\n=== Test: Incremental Sync ===")
+    with StandInServer() as server, tempfile.TemporaryDirectory() as directory:
+        client = server.synapse_client()
+        total = sum(len(items) for items in server.state.definitions.values())
+
+        first = WorkspaceSync(client, directory).sync()
+        assert len(first.added) == total and first.fetched == 0 and not first.failed
+        assert request_count(server, "GET") == 4
+        synced = WorkspaceSync(client, directory)
+        assert synced.load("pipelines/pl_copy_blob_to_datalake") == \
+            server.state.definitions["pipelines"]["pl_copy_blob_to_datalake"]
+        diff = synced.diff_repo(kinds=("pipelines", "datasets", "linkedservices"))
+        assert diff.changed == {} and diff.only_workspace == [] and diff.only_repo == []
+        assert len(diff.same) == total - len(server.state.definitions["notebooks"])
+
+        second = synced.sync()
+        assert len(second.unchanged) == total and second.added == second.updated == second.removed == []
+
+        def lengthen_timeout(definition):
+            definition["properties"]["activities"][0]["policy"]["timeout"] = "0.02:00:00"
+
+        republish(server, "pipelines", "pl_incremental_copy_sql", lengthen_timeout)
+        republish(server, "datasets", "ds_sink_adls")  # new etag, same content
+        del server.state.definitions["notebooks"]["nb_data_quality_checks"]
+        server.state.definitions["notebooks"]["nb_new"] = dict(
+            server.state.definitions["notebooks"]["nb_curate_processed_data"], name="nb_new", etag='"new"')
+        edited = synced.path("linkedservices/ls_keyvault")
+        edited.write_text(edited.read_text().replace("ls_keyvault", "ls_other"))
+
+        third = WorkspaceSync(client, directory).sync()
+        assert third.added == ["notebooks/nb_new"]
+        assert third.updated == ["linkedservices/ls_keyvault", "pipelines/pl_incremental_copy_sql"]
+        assert third.removed == ["notebooks/nb_data_quality_checks"]
+        assert "datasets/ds_sink_adls" in third.unchanged
+        assert not os.path.exists(synced.path("notebooks/nb_data_quality_checks"))
+        with open(os.path.join(directory, ".sync-manifest.json")) as f:
+            assert json.load(f)["artifacts"]["datasets/ds_sink_adls"]["etag"] == \
+                server.state.definitions["datasets"]["ds_sink_adls"]["etag"]
+
+        diff = WorkspaceSync(client, directory).diff_repo()
+        name = "pipelines/pl_incremental_copy_sql"
+        assert list(diff.changed) == [name]
+        assert diff.changed[name] == ["properties.activities[0].policy.timeout"]
+    print("✓ Test passed")
+
+
+def test_concurrent_gets_and_failures():
+    """Test: Without full listings every changed artifact is fetched once; a failed GET is retried next sync"""
+    print("\n=== Test: Concurrent GETs ===")
+
+    class FlakyClient:
+        def __init__(self, client):
+            self.client = client
+            self.broken = {"ds_source_sql"}
+
+        def __getattr__(self, name):
+            return getattr(self.client, name)
+
+        def get_dataset(self, dataset_name):
+            if dataset_name in self.broken:
+                raise RuntimeError("503 Server Error")
+            return self.client.get_dataset(dataset_name)
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as directory:
+        client = FlakyClient(server.synapse_client())
+        total = sum(len(items) for items in server.state.definitions.values())
+        sync = WorkspaceSync(client, directory, use_listing=False, max_workers=4)
+
+        first = sync.sync()
+        assert first.fetched == total and len(first.added) == total - 1
+        assert list(first.failed) == ["datasets/ds_source_sql"] and "503" in first.failed["datasets/ds_source_sql"]
+        assert request_count(server, "GET pipelines/{id}") == len(server.state.definitions["pipelines"])
+
+        client.broken.clear()
+        second = sync.sync()
+        assert second.fetched == 1 and second.added == ["datasets/ds_source_sql"] and not second.failed
+
+        only = WorkspaceSync(client, directory, kinds=("notebooks",), use_listing=False)
+        assert only.sync().fetched == 0
+        with pytest.raises(ValueError):
+            WorkspaceSync(client, directory, kinds=("triggers",))
+    print("✓ Test passed")
+
+
+def test_paged_listings():
+    """Test: Listings are followed across nextLink pages; a failed listing removes nothing"""
+    print("\n=== Test: Paged Listings ===")
+    with StandInServer(StandInConfig(definition_page_size=2)) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        client = server.synapse_client()
+        total = sum(len(items) for items in server.state.definitions.values())
+        pages = sum(-(-len(items) // 2) for items in server.state.definitions.values())
+        assert len(client.list_pipelines()) == len(server.state.definitions["pipelines"])
+        listed = request_count(server, "GET")
+
+        first = WorkspaceSync(client, directory).sync()
+        assert len(first.added) == total and first.fetched == 0
+        second = WorkspaceSync(client, directory).sync()
+        assert len(second.unchanged) == total and second.removed == []
+        assert request_count(server, "GET") - listed == 2 * pages
+
+        class BrokenListing:
+            def __getattr__(self, name):
+                return getattr(client, name)
+
+            def list_notebooks(self):
+                raise RuntimeError("502 Bad Gateway")
+
+        third = WorkspaceSync(BrokenListing(), directory).sync()
+        assert list(third.failed) == ["notebooks"] and third.removed == []
+        assert len(third.unchanged) == total - len(server.state.definitions["notebooks"])
+        assert os.path.exists(WorkspaceSync(client, directory).path("notebooks/nb_data_quality_checks"))
+    print("✓ Test passed")
+
+
+def main():
+    """Main test execution"""
+    print("Workspace Sync Tests")
+    print("=" * 50)
+
+    test_hashes_and_paths()
+    test_incremental_sync()
+    test_concurrent_gets_and_failures()
+    test_paged_listings()
+
+    print("\n" + "=" * 50)
+    print("All workspace sync tests passed! ✓")
+
+
+if __name__ == "__main__":
+    main()
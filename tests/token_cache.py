@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Expiry-aware Azure AD token cache
+Refreshes tokens in the background before they expire and can persist them across processes
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+
+def default_credential():
+    """DefaultAzureCredential, importing azure.identity only when a client first needs it"""
+    from azure.identity import DefaultAzureCredential
+    return DefaultAzureCredential()
+
+
+class CachedToken(NamedTuple):
+    token: str
+    expires_on: float
+
+
+class _Refresh:
+    """A single in-flight credential call that concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[CachedToken] = None
+        self.error: Optional[BaseException] = None
+
+
+class TokenCache:
+    """Per-scope access token cache with proactive, single-flight refresh"""
+
+    def __init__(self, credential, refresh_margin: float = 300.0,
+                 min_validity: float = 60.0, cache_path: Optional[str] = None):
+        """
+        refresh_margin: start a background refresh this many seconds before expiry
+        min_validity: below this many seconds of validity, callers block on a refresh
+        cache_path: optional JSON file that shares tokens between process launches
+        """
+        self.credential = credential
+        self.refresh_margin = refresh_margin
+        self.min_validity = min_validity
+        self.cache_path = cache_path
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, CachedToken] = {}
+        self._in_flight: Dict[str, _Refresh] = {}
+        self._tokens.update(self._load())
+
+    def get_token(self, scope: str) -> str:
+        """Return a valid access token for `scope`"""
+        now = time.time()
+        cached = self._tokens.get(scope)
+
+        if cached and cached.expires_on - now > self.refresh_margin:
+            return cached.token
+
+        if cached and cached.expires_on - now > self.min_validity:
+            # Still usable: hand it out and refresh behind the caller's back
+            self._start_background_refresh(scope)
+            return cached.token
+
+        # Another process may already have refreshed the persisted token
+        persisted = self._load().get(scope)
+        if persisted and persisted.expires_on - now > self.refresh_margin:
+            with self._lock:
+                self._tokens[scope] = persisted
+            return persisted.token
+
+        return self._refresh(scope).token
+
+    def has_valid_token(self, scope: str) -> bool:
+        """True if get_token(scope) can answer without waiting on the credential"""
+        cached = self._tokens.get(scope)
+        return cached is not None and cached.expires_on - time.time() > self.min_validity
+
+    def invalidate(self, scope: str):
+        """Forget the token for `scope`, e.g. after a 401"""
+        with self._lock:
+            self._tokens.pop(scope, None)
+
+    def _start_background_refresh(self, scope: str):
+        with self._lock:
+            if scope in self._in_flight:
+                return
+        thread = threading.Thread(target=self._refresh_quietly, args=(scope,), daemon=True)
+        thread.start()
+
+    def _refresh_quietly(self, scope: str):
+        try:
+            self._refresh(scope)
+        except Exception:
+            # The current token is still valid; the next caller will retry
+            pass
+
+    def _refresh(self, scope: str) -> CachedToken:
+        """Acquire a new token, sharing one credential call between concurrent callers"""
+        with self._lock:
+            refresh = self._in_flight.get(scope)
+            owner = refresh is None
+            if owner:
+                refresh = self._in_flight[scope] = _Refresh()
+
+        if owner:
+            try:
+                access_token = self.credential.get_token(scope)
+                refresh.result = CachedToken(access_token.token, float(access_token.expires_on))
+                with self._lock:
+                    self._tokens[scope] = refresh.result
+                self._save()
+            except BaseException as e:
+                refresh.error = e
+            finally:
+                with self._lock:
+                    del self._in_flight[scope]
+                refresh.done.set()
+        else:
+            refresh.done.wait()
+
+        if refresh.error is not None:
+            raise refresh.error
+        return refresh.result
+
+    def _load(self) -> Dict[str, CachedToken]:
+        """Read persisted tokens, ignoring a missing or corrupt file"""
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            return {scope: CachedToken(entry["token"], float(entry["expires_on"]))
+                    for scope, entry in data.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def _save(self):
+        """Atomically write unexpired tokens to the cache file (owner-only permissions)"""
+        if not self.cache_path:
+            return
+        now = time.time()
+        with self._lock:
+            merged = {**self._load(), **self._tokens}
+        data = {scope: {"token": cached.token, "expires_on": cached.expires_on}
+                for scope, cached in merged.items() if cached.expires_on > now}
+
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token_cache.")
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
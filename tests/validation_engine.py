@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Validation engine for pipeline, dataset and linked service definitions
+Parses each file once for all checks, fans out over a process pool and skips unchanged files
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from adf_expressions import compile_expression, iter_expressions
+from pipeline_walk import activity_scopes
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Folder of each definition kind, relative to the repo root
+KIND_FOLDERS = {"pipelines": "pipelines", "datasets": "datasets", "linkedservices": "linkedservices"}
+
+# Override for the index location; by default it lives in the user cache directory, keyed by root
+INDEX_FILE_ENV = "ADF_VALIDATION_INDEX_FILE"
+
+# Bump when checks change so cached results from older rules are not reused
+CHECKS_VERSION = "2"
+
+
+class ValidationResult(NamedTuple):
+    path: str
+    kind: str
+    parsed: bool
+    valid: bool
+    issues: List[str]
+    summary: Dict
+
+
+# Checks: check(document) -> list of issues. Each gets the same parsed document.
+def check_pipeline_structure(document: Dict) -> List[str]:
+    issues = [f"missing '{field}' field" for field in ("name", "properties") if field not in document]
+    if "properties" in document and "activities" not in document["properties"]:
+        issues.append("missing 'activities' field")
+    return issues
+
+
+def check_activity_dependencies(document: Dict) -> List[str]:
+    activities = (document.get("properties") or {}).get("activities")
+    if not isinstance(activities, list):
+        return []
+    issues = []
+    # Each nested container is its own dependsOn scope
+    for scope in activity_scopes(activities):
+        names = [activity.get("name") for activity in scope]
+        for name in {n for n in names if names.count(n) > 1}:
+            issues.append(f"duplicate activity name '{name}'")
+        for activity in scope:
+            for dependency in activity.get("dependsOn") or []:
+                if dependency.get("activity") not in names:
+                    issues.append(f"activity '{activity.get('name')}' depends on unknown "
+                                  f"activity '{dependency.get('activity')}'")
+    return issues
+
+
+def check_typed_resource(document: Dict) -> List[str]:
+    issues = [] if "name" in document else ["missing 'name' field"]
+    if "type" not in (document.get("properties") or {}):
+        issues.append("missing 'properties.type' field")
+    return issues
+
+
+def check_expressions(document: Dict) -> List[str]:
+    issues = []
+    for text in iter_expressions(document.get("properties") or {}):
+        try:
+            compile_expression(text)
+        except ValueError as e:
+            issues.append(f"invalid expression: {e}")
+    return issues
+
+
+KIND_CHECKS: Dict[str, Tuple[Callable[[Dict], List[str]], ...]] = {
+    "pipelines": (check_pipeline_structure, check_activity_dependencies, check_expressions),
+    "datasets": (check_typed_resource, check_expressions),
+    "linkedservices": (check_typed_resource, check_expressions),
+}
+
+
+def _summarise(kind: str, document: Dict) -> Dict:
+    summary = {"name": document.get("name")}
+    if kind == "pipelines":
+        summary["activities"] = len((document.get("properties") or {}).get("activities") or [])
+    else:
+        summary["type"] = (document.get("properties") or {}).get("type")
+    return summary
+
+
+def validate_file(path: str, kind: str) -> Tuple[str, Dict]:
+    """Hash, parse and check one file; returns (sha256, result fields). Runs in worker processes."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    try:
+        document = json.loads(content)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return digest, {"parsed": False, "valid": False, "issues": [f"JSON Error: {e}"], "summary": {}}
+    if not isinstance(document, dict):
+        return digest, {"parsed": True, "valid": False, "issues": ["top-level JSON value is not an object"],
+                        "summary": {}}
+
+    issues = []
+    for check in KIND_CHECKS.get(kind, ()):
+        try:
+            issues.extend(check(document))
+        except Exception as e:
+            issues.append(f"{check.__name__} failed: {e}")
+    return digest, {"parsed": True, "valid": not issues, "issues": issues, "summary": _summarise(kind, document)}
+
+
+def _validate_batch(batch: List[Tuple[str, str]]) -> List[Tuple[str, Dict]]:
+    return [validate_file(path, kind) for path, kind in batch]
+
+
+def default_index_path(root: Path) -> Path:
+    """$ADF_VALIDATION_INDEX_FILE, else a per-root file under $XDG_CACHE_HOME (or ~/.cache)/adf-tests"""
+    if os.getenv(INDEX_FILE_ENV):
+        return Path(os.environ[INDEX_FILE_ENV])
+    cache_home = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    key = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_home / "adf-tests" / f"validation-index-{key}.json"
+
+
+class ValidationEngine:
+    """Validate definition files, reusing results for files whose content hash is unchanged"""
+
+    def __init__(self, root: Optional[str] = None, index_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, min_parallel: int = 64):
+        """
+        root: repository root holding pipelines/, datasets/ and linkedservices/
+        index_path: persisted content-hash index (default: default_index_path(root), outside the repo)
+        min_parallel: below this many changed files, validate in-process instead of starting a pool
+        """
+        self.root = Path(root) if root else REPO_ROOT
+        self.index_path = Path(index_path) if index_path else default_index_path(self.root)
+        self.max_workers = max_workers
+        self.min_parallel = min_parallel
+        self.stats = {"cached": 0, "validated": 0}
+        self._index = self._load_index()
+        self._index_changed = False
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != CHECKS_VERSION:
+            return {}
+        return index.get("files", {})
+
+    def _save_index(self):
+        tmp = self.index_path.with_name(f".{self.index_path.name}.{uuid.uuid4().hex}")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w') as f:
+                # One dumps() call is much faster than json.dump's chunked writes
+                f.write(json.dumps({"version": CHECKS_VERSION, "files": self._index}, separators=(",", ":")))
+            os.replace(tmp, self.index_path)
+        except OSError:
+            # The index is only a cache; an unwritable location just means a cold start next time
+            tmp.unlink(missing_ok=True)
+
+    def _scan(self, kinds: Optional[Iterable[str]] = None) -> List[Tuple[str, str, os.stat_result]]:
+        """(relative path, kind, stat) of every definition file; scandir avoids pathlib overhead"""
+        files = []
+        for kind in kinds or KIND_FOLDERS:
+            folder = KIND_FOLDERS[kind]
+            try:
+                entries = sorted((entry.name, entry) for entry in os.scandir(self.root / folder)
+                                 if entry.name.endswith(".json") and entry.is_file())
+            except FileNotFoundError:
+                continue
+            files.extend((f"{folder}/{name}", kind, entry.stat()) for name, entry in entries)
+        return files
+
+    def discover(self, kinds: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """(relative path, kind) of every definition file"""
+        return [(relative, kind) for relative, kind, _ in self._scan(kinds)]
+
+    def _is_unchanged(self, relative: str, stat: os.stat_result) -> bool:
+        """Cheap stat check first; re-hash only when size or mtime moved"""
+        entry = self._index.get(relative)
+        if entry is None:
+            return False
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if entry["size"] != stat.st_size:
+            return False
+        with open(self.root / relative, 'rb') as f:
+            same = hashlib.sha256(f.read()).hexdigest() == entry["sha256"]
+        if same:
+            # Touched but not edited (checkout, copy): remember the new mtime
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._index_changed = True
+        return same
+
+    def validate(self, kinds: Optional[Iterable[str]] = None) -> Dict[str, ValidationResult]:
+        """Validate every file of the given kinds (all by default); returns results keyed by relative path"""
+        files = self._scan(kinds)
+        results: Dict[str, ValidationResult] = {}
+        dirty: List[Tuple[str, str]] = []
+        stats = {}
+        for relative, kind, stat in files:
+            stats[relative] = stat
+            if self._is_unchanged(relative, stat):
+                entry = self._index[relative]
+                results[relative] = ValidationResult(relative, kind, **entry["result"])
+                self.stats["cached"] += 1
+            else:
+                dirty.append((relative, kind))
+
+        for (relative, kind), (digest, result) in zip(dirty, self._run(dirty)):
+            results[relative] = ValidationResult(relative, kind, **result)
+            self._index[relative] = {"sha256": digest, "size": stats[relative].st_size,
+                                     "mtime_ns": stats[relative].st_mtime_ns, "result": result}
+        self.stats["validated"] += len(dirty)
+
+        if kinds is None and len(self._index) != len(files):
+            # Forget files that no longer exist
+            self._index = {relative: self._index[relative] for relative, _, _ in files}
+            self._index_changed = True
+        if dirty or self._index_changed:
+            self._save_index()
+            self._index_changed = False
+        return {relative: results[relative] for relative, _, _ in files}
+
+    def _run(self, dirty: List[Tuple[str, str]]) -> List[Tuple[str, Dict]]:
+        jobs = [(str(self.root / relative), kind) for relative, kind in dirty]
+        if len(jobs) < self.min_parallel:
+            return _validate_batch(jobs)
+        workers = self.max_workers or os.cpu_count() or 1
+        # A few batches per worker keeps IPC overhead low and the load balanced
+        size = max(1, len(jobs) // (workers * 4))
+        batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        # Imported here: multiprocessing costs more startup than a small validation takes
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [result for batch in executor.map(_validate_batch, batches) for result in batch]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Watermark range slicing for incremental copies
+Splits an old..new watermark range into row-balanced slices for a parallel ForEach and advances the watermark only after every slice commits
+"""
+
+import math
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from run_utils import parse_timestamp
+from sql_standin import sql_timestamp
+
+DEFAULT_BUCKETS = 1024
+
+# ForEach body query over one slice; items come from slice_items()
+SLICE_QUERY = ("SELECT * FROM @{pipeline().parameters.tableName} "
+               "WHERE LastModifiedDate > '@{item().WatermarkStart}' AND LastModifiedDate <= '@{item().WatermarkEnd}'")
+
+# Row-density histogram over the watermark range on Azure SQL (index-only scan of LastModifiedDate)
+AZURE_SQL_DENSITY_QUERY = """
+SELECT DATEDIFF_BIG(millisecond, @Low, LastModifiedDate) / @BucketMs AS Bucket, COUNT_BIG(*) AS Rows
+FROM {table}
+WHERE LastModifiedDate > @Low AND LastModifiedDate <= @High
+GROUP BY DATEDIFF_BIG(millisecond, @Low, LastModifiedDate) / @BucketMs
+"""
+
+PENDING, COMMITTED, FAILED = "Pending", "Committed", "Failed"
+
+
+class WatermarkSlice(NamedTuple):
+    slice_id: int
+    start: str          # exclusive
+    end: str            # inclusive
+    estimated_rows: int
+
+
+def _to_datetime(value: Union[datetime, str]) -> datetime:
+    return value if isinstance(value, datetime) else parse_timestamp(value)
+
+
+def density_histogram(connection: sqlite3.Connection, table: str, low: datetime, high: datetime,
+                      buckets: int = DEFAULT_BUCKETS, column: str = "LastModifiedDate") -> List[int]:
+    """Row counts in `buckets` equal-width time buckets over (low, high]"""
+    width = (high - low).total_seconds() / buckets
+    counts = [0] * buckets
+    if width <= 0:
+        return counts
+    query = (f"SELECT CAST((julianday({column}) - julianday(?)) * 86400.0 / ? AS INTEGER) AS bucket, "
+             f"COUNT(*) FROM {table} WHERE {column} > ? AND {column} <= ? GROUP BY bucket")
+    low_text = sql_timestamp(low)
+    for bucket, rows in connection.execute(query, (low_text, width, low_text, sql_timestamp(high))):
+        counts[min(max(bucket, 0), buckets - 1)] += rows
+    return counts
+
+
+def plan_slices(low: datetime, high: datetime, histogram: Sequence[int], slices: Optional[int] = None,
+                max_rows_per_slice: Optional[int] = None,
+                resolution: timedelta = timedelta(milliseconds=1)) -> List[WatermarkSlice]:
+    """
+    Cut (low, high] where the cumulative row count crosses k/n of the total, interpolating
+    inside a bucket, so slices carry similar row counts however bursty the backlog is.
+    Give either the slice count or a row budget per slice. Boundaries snap to `resolution`;
+    slices are contiguous, so every row lands in exactly one.
+    """
+    total = sum(histogram)
+    if slices is None:
+        slices = math.ceil(total / max_rows_per_slice) if max_rows_per_slice else 1
+    slices = max(1, min(slices, total or 1))
+    span = (high - low).total_seconds()
+    width = span / len(histogram) if histogram else span
+
+    cumulative = [0]
+    for count in histogram:
+        cumulative.append(cumulative[-1] + count)
+
+    def rows_before(offset: float) -> float:
+        """Estimated rows in (low, low + offset], assuming rows are uniform within a bucket"""
+        if width <= 0:
+            return float(total)
+        position = min(max(offset / width, 0.0), float(len(histogram)))
+        bucket = min(int(position), len(histogram) - 1)
+        return cumulative[bucket] + histogram[bucket] * (position - bucket)
+
+    step = resolution.total_seconds()
+    boundaries = [0.0]
+    bucket = 0
+    for k in range(1, slices):
+        target = total * k / slices
+        while bucket < len(histogram) - 1 and cumulative[bucket + 1] < target:
+            bucket += 1
+        inside = (target - cumulative[bucket]) / histogram[bucket] if histogram[bucket] else 0.0
+        offset = math.floor((bucket + inside) * width / step) * step
+        if boundaries[-1] < offset < span:
+            boundaries.append(offset)
+    boundaries.append(span)
+
+    result = []
+    for i in range(len(boundaries) - 1):
+        start = low + timedelta(seconds=boundaries[i])
+        end = high if i == len(boundaries) - 2 else low + timedelta(seconds=boundaries[i + 1])
+        estimated = round(rows_before(boundaries[i + 1]) - rows_before(boundaries[i]))
+        result.append(WatermarkSlice(i + 1, sql_timestamp(start), sql_timestamp(end), estimated))
+    return result
+
+
+def slice_items(slices: Sequence[WatermarkSlice]) -> List[Dict]:
+    """ForEach items for SLICE_QUERY: one object per slice"""
+    return [{"SliceId": s.slice_id, "WatermarkStart": s.start, "WatermarkEnd": s.end,
+             "EstimatedRows": s.estimated_rows} for s in slices]
+
+
+class SlicedWatermarkCopy:
+    """
+    Coordinates one sliced catch-up for a table. Slices are persisted in WatermarkSlices
+    so a rerun after a partial failure copies only the slices that did not commit;
+    WatermarkTable moves to the range end only once every slice has committed.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, table: str, column: str = "LastModifiedDate",
+                 buckets: int = DEFAULT_BUCKETS):
+        self.connection = connection
+        self.table = table
+        self.column = column
+        self.buckets = buckets
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS WatermarkSlices (
+                TableName TEXT NOT NULL,
+                SliceId INTEGER NOT NULL,
+                RangeStart TEXT NOT NULL,
+                RangeEnd TEXT NOT NULL,
+                EstimatedRows INTEGER NOT NULL,
+                Status TEXT NOT NULL,
+                RowsCopied INTEGER,
+                Error TEXT,
+                PRIMARY KEY (TableName, SliceId)
+            )""")
+        connection.commit()
+
+    def watermark(self) -> str:
+        row = self.connection.execute("SELECT WatermarkValue FROM WatermarkTable WHERE TableName = ?",
+                                      (self.table,)).fetchone()
+        if row is None:
+            raise KeyError(f"No watermark for table {self.table}")
+        return row[0]
+
+    def pending(self) -> List[WatermarkSlice]:
+        """Slices of an unfinished catch-up that have not committed yet"""
+        rows = self.connection.execute(
+            "SELECT SliceId, RangeStart, RangeEnd, EstimatedRows FROM WatermarkSlices "
+            "WHERE TableName = ? AND Status != ? ORDER BY SliceId", (self.table, COMMITTED)).fetchall()
+        return [WatermarkSlice(*row) for row in rows]
+
+    def plan(self, new_watermark: Union[datetime, str], slices: Optional[int] = None,
+             max_rows_per_slice: Optional[int] = None, histogram: Optional[Sequence[int]] = None
+             ) -> List[WatermarkSlice]:
+        """
+        Slice (current watermark, new_watermark]. An unfinished plan is resumed as-is so the
+        committed slices stay valid; the new watermark then applies to the next catch-up.
+        histogram: precomputed bucket counts (default: density_histogram over the range)
+        """
+        stored = self.connection.execute("SELECT COUNT(*) FROM WatermarkSlices WHERE TableName = ?",
+                                         (self.table,)).fetchone()[0]
+        if stored:
+            return self.pending()
+        low, high = _to_datetime(self.watermark()), _to_datetime(new_watermark)
+        if high <= low:
+            return []
+        if histogram is None:
+            histogram = density_histogram(self.connection, self.table, low, high, self.buckets, self.column)
+        planned = plan_slices(low, high, histogram, slices, max_rows_per_slice)
+        self.connection.executemany(
+            "INSERT INTO WatermarkSlices (TableName, SliceId, RangeStart, RangeEnd, EstimatedRows, Status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.table, s.slice_id, s.start, s.end, s.estimated_rows, PENDING) for s in planned])
+        self.connection.commit()
+        return planned
+
+    def run(self, copy_slice: Callable[[WatermarkSlice], int], max_workers: int = 4) -> Dict:
+        """
+        Copy every pending slice concurrently with copy_slice(slice) -> rows copied, which
+        runs in worker threads. Slice status is recorded here as each finishes.
+        """
+        started = time.perf_counter()
+        pending = self.pending()
+        failed = []
+        rows = 0
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(copy_slice, s): s for s in pending}
+            for future in as_completed(futures):
+                piece = futures[future]
+                try:
+                    copied = future.result()
+                except Exception as e:
+                    failed.append(piece.slice_id)
+                    self.connection.execute(
+                        "UPDATE WatermarkSlices SET Status = ?, Error = ? WHERE TableName = ? AND SliceId = ?",
+                        (FAILED, str(e), self.table, piece.slice_id))
+                else:
+                    rows += copied
+                    self.connection.execute(
+                        "UPDATE WatermarkSlices SET Status = ?, RowsCopied = ?, Error = NULL "
+                        "WHERE TableName = ? AND SliceId = ?", (COMMITTED, copied, self.table, piece.slice_id))
+                self.connection.commit()
+
+        advanced = self._advance_if_complete()
+        return {"table": self.table, "slices": len(pending), "rows": rows, "failed": sorted(failed),
+                "advanced": advanced, "watermark": self.watermark(),
+                "seconds": time.perf_counter() - started}
+
+    def _advance_if_complete(self) -> bool:
+        """Move the watermark and clear the plan in one transaction once nothing is left"""
+        with self.connection:
+            remaining, end = self.connection.execute(
+                "SELECT SUM(Status != ?), MAX(RangeEnd) FROM WatermarkSlices WHERE TableName = ?",
+                (COMMITTED, self.table)).fetchone()
+            if end is None or remaining:
+                return False
+            self.connection.execute("UPDATE WatermarkTable SET WatermarkValue = ? WHERE TableName = ?",
+                                    (end, self.table))
+            self.connection.execute("DELETE FROM WatermarkSlices WHERE TableName = ?", (self.table,))
+        return True
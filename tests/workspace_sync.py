@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Incremental Synapse workspace sync
+Mirrors notebooks, pipelines, datasets and linked services to a local folder with a content-hash manifest
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from validation_engine import KIND_FOLDERS, REPO_ROOT
+
+# (list method, get method) on SynapseWorkspaceClient for each artifact kind
+ARTIFACT_KINDS = {
+    "notebooks": ("list_notebooks", "get_notebook"),
+    "pipelines": ("list_pipelines", "get_pipeline"),
+    "datasets": ("list_datasets", "get_dataset"),
+    "linkedservices": ("list_linked_services", "get_linked_service"),
+}
+
+DEFAULT_MANIFEST_NAME = ".sync-manifest.json"
+
+# Bump when the hashed form changes so older manifests are not trusted
+MANIFEST_VERSION = "1"
+
+# Set by the service on publish; they change without the definition changing
+SERVICE_FIELDS = ("id", "etag", "type")
+SERVICE_PROPERTIES = ("lastPublishTime",)
+
+
+def canonical_definition(definition: Dict) -> Dict:
+    """Definition without service-maintained fields, so workspace and repo copies compare equal"""
+    canonical = {key: value for key, value in definition.items() if key not in SERVICE_FIELDS}
+    properties = canonical.get("properties")
+    if isinstance(properties, dict):
+        canonical["properties"] = {key: value for key, value in properties.items()
+                                   if key not in SERVICE_PROPERTIES}
+    return canonical
+
+
+def content_hash(definition: Dict) -> str:
+    """sha256 of the canonical definition, independent of key order and whitespace"""
+    canonical = json.dumps(canonical_definition(definition), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def diff_paths(old: Any, new: Any, path: str = "") -> List[str]:
+    """JSON paths where two documents differ, e.g. properties.activities[1].policy.timeout"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        paths = []
+        for key in sorted(set(old) | set(new), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in old or key not in new:
+                paths.append(child)
+            else:
+                paths.extend(diff_paths(old[key], new[key], child))
+        return paths
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            return [path]
+        return [p for index, (a, b) in enumerate(zip(old, new)) for p in diff_paths(a, b, f"{path}[{index}]")]
+    return [] if old == new else [path]
+
+
+class SyncResult(NamedTuple):
+    added: List[str]
+    updated: List[str]
+    unchanged: List[str]
+    removed: List[str]
+    failed: Dict[str, str]
+    fetched: int
+
+
+class RepoDiff(NamedTuple):
+    only_workspace: List[str]
+    only_repo: List[str]
+    changed: Dict[str, List[str]]
+    same: List[str]
+
+
+class WorkspaceSync:
+    """Mirror a workspace's artifacts to <directory>/<kind>/<name>.json, re-downloading only what changed"""
+
+    def __init__(self, client, directory: str, kinds: Optional[Iterable[str]] = None,
+                 max_workers: int = 8, use_listing: bool = True, manifest_path: Optional[str] = None):
+        """
+        client: SynapseWorkspaceClient (anything with the list_*/get_* methods in ARTIFACT_KINDS)
+        use_listing: take definitions straight from list responses when they carry properties;
+                     otherwise every changed artifact is fetched with its own GET
+        manifest_path: persisted etag/hash manifest (default: <directory>/.sync-manifest.json)
+        """
+        self.client = client
+        self.directory = Path(directory)
+        self.kinds = tuple(kinds or ARTIFACT_KINDS)
+        unknown = [kind for kind in self.kinds if kind not in ARTIFACT_KINDS]
+        if unknown:
+            raise ValueError(f"Unknown artifact kinds: {unknown}")
+        self.max_workers = max_workers
+        self.use_listing = use_listing
+        self.manifest_path = Path(manifest_path) if manifest_path else self.directory / DEFAULT_MANIFEST_NAME
+        self.manifest = self._load_manifest()
+
+    # Manifest
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("artifacts", {})
+
+    def _save_manifest(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f".{self.manifest_path.name}.{uuid.uuid4().hex}")
+        with open(tmp, 'w') as f:
+            f.write(json.dumps({"version": MANIFEST_VERSION, "artifacts": self.manifest},
+                               sort_keys=True, separators=(",", ":")))
+        os.replace(tmp, self.manifest_path)
+
+    def path(self, relative: str) -> Path:
+        """Local file of an artifact key such as 'pipelines/pl_copy_blob_to_datalake'"""
+        return self.directory / f"{relative}.json"
+
+    def _local_matches(self, relative: str, entry: Dict) -> bool:
+        """Is the local copy still what the manifest says? Stat first, re-hash only when it moved"""
+        try:
+            stat = self.path(relative).stat()
+        except FileNotFoundError:
+            return False
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        try:
+            with open(self.path(relative), 'r') as f:
+                same = content_hash(json.load(f)) == entry["sha256"]
+        except ValueError:
+            return False
+        if same:
+            entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        return same
+
+    def _write(self, relative: str, definition: Dict, digest: str):
+        path = self.path(relative)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with open(tmp, 'w') as f:
+            f.write(json.dumps(definition, indent=4) + "\n")
+        os.replace(tmp, path)
+        stat = path.stat()
+        self.manifest[relative] = {"etag": definition.get("etag"), "sha256": digest,
+                                   "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    # Sync
+    def _list(self, kind: str) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        try:
+            return getattr(self.client, ARTIFACT_KINDS[kind][0])(), None
+        except Exception as e:
+            return None, str(e)
+
+    def _get(self, job: Tuple[str, str]) -> Tuple[Optional[Dict], Optional[str]]:
+        kind, name = job
+        try:
+            return getattr(self.client, ARTIFACT_KINDS[kind][1])(name), None
+        except Exception as e:
+            return None, str(e)
+
+    def sync(self) -> SyncResult:
+        """
+        List every kind concurrently, fetch changed artifacts concurrently, write them and the manifest.
+        A kind whose listing failed is reported under failed[kind] and nothing of that kind is removed.
+        """
+        added, updated, unchanged, removed = [], [], [], []
+        failed: Dict[str, str] = {}
+        candidates: Dict[str, Dict] = {}
+        to_fetch: List[Tuple[str, str]] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listings = dict(zip(self.kinds, executor.map(self._list, self.kinds)))
+            listed = set()
+            for kind, (items, error) in listings.items():
+                if error is not None:
+                    failed[kind] = error
+                    continue
+                for item in items:
+                    relative = f"{kind}/{item['name']}"
+                    listed.add(relative)
+                    entry = self.manifest.get(relative)
+                    etag = item.get("etag")
+                    if entry is not None and etag and entry["etag"] == etag and self._local_matches(relative, entry):
+                        unchanged.append(relative)
+                    elif self.use_listing and "properties" in item:
+                        candidates[relative] = item
+                    else:
+                        to_fetch.append((kind, item["name"]))
+
+            for (kind, name), (definition, error) in zip(to_fetch, executor.map(self._get, to_fetch)):
+                relative = f"{kind}/{name}"
+                if error is not None:
+                    failed[relative] = error
+                else:
+                    candidates[relative] = definition
+
+        for relative, definition in candidates.items():
+            entry = self.manifest.get(relative)
+            digest = content_hash(definition)
+            if entry is not None and entry["sha256"] == digest and self._local_matches(relative, entry):
+                # Republished without edits: keep the file, remember the new etag
+                entry["etag"] = definition.get("etag")
+                unchanged.append(relative)
+                continue
+            self._write(relative, definition, digest)
+            (updated if entry is not None else added).append(relative)
+
+        complete = {kind for kind, (_, error) in listings.items() if error is None}
+        for relative in sorted(self.manifest):
+            if relative.split("/", 1)[0] in complete and relative not in listed:
+                self.path(relative).unlink(missing_ok=True)
+                del self.manifest[relative]
+                removed.append(relative)
+
+        self._save_manifest()
+        return SyncResult(sorted(added), sorted(updated), sorted(unchanged), removed, failed, len(to_fetch))
+
+    # Comparison with the repo
+    def diff_repo(self, root: Optional[str] = None, kinds: Iterable[str] = ("pipelines",)) -> RepoDiff:
+        """
+        Compare the synced copy with the repo's definition folders. Hashes from the manifest
+        are compared first; only artifacts whose hashes differ are loaded and diffed field by field.
+        """
+        root = Path(root) if root else REPO_ROOT
+        only_workspace, only_repo, same = [], [], []
+        changed: Dict[str, List[str]] = {}
+        for kind in kinds:
+            repo: Dict[str, Tuple[str, Dict]] = {}
+            try:
+                names = sorted(name for name in os.listdir(root / KIND_FOLDERS[kind]) if name.endswith(".json"))
+            except FileNotFoundError:
+                names = []
+            for name in names:
+                with open(root / KIND_FOLDERS[kind] / name, 'r') as f:
+                    definition = json.load(f)
+                repo[f"{kind}/{definition.get('name', name[:-5])}"] = (content_hash(definition), definition)
+
+            synced = {relative: entry for relative, entry in self.manifest.items()
+                      if relative.split("/", 1)[0] == kind}
+            for relative in sorted(set(synced) | set(repo)):
+                if relative not in repo:
+                    only_workspace.append(relative)
+                elif relative not in synced:
+                    only_repo.append(relative)
+                elif synced[relative]["sha256"] == repo[relative][0]:
+                    same.append(relative)
+                else:
+                    with open(self.path(relative), 'r') as f:
+                        workspace = json.load(f)
+                    changed[relative] = diff_paths(canonical_definition(repo[relative][1]),
+                                                   canonical_definition(workspace))
+        return RepoDiff(only_workspace, only_repo, changed, same)
+
+    def load(self, relative: str) -> Dict:
+        """Synced definition of one artifact"""
+        with open(self.path(relative), 'r') as f:
+            return json.load(f)